@@ -0,0 +1,121 @@
+"""
+A* 路由核心效能基準
+
+在 1000x1000 網格上比較：
+1. 原始實作（queue.PriorityQueue + dict）
+2. GridAStar（heapq + 扁平節點編號 + NumPy 陣列）
+3. GridAStar 跳點搜尋（JPS）
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import time
+import numpy as np
+from algorithms.astar import astar_search_reference
+from algorithms.grid_astar import GridAStar
+
+
+def create_board_grid(size: int = 1000, n_components: int = 300,
+                      n_traces: int = 40, seed: int = 42) -> np.ndarray:
+    """
+    建立模擬電路板網格
+
+    Args:
+        size: 網格邊長
+        n_components: 矩形障礙物（元件）數量
+        n_traces: 已走線數量（直線，額外成本）
+        seed: 隨機種子
+
+    Returns:
+        網格（0=空閒，1=障礙物，2=已走線）
+    """
+    rng = np.random.default_rng(seed)
+    grid = np.zeros((size, size), dtype=np.int8)
+
+    for _ in range(n_components):
+        w, h = rng.integers(5, size // 20, size=2)
+        x, y = rng.integers(0, size - max(w, h), size=2)
+        grid[y:y+h, x:x+w] = 1
+
+    for _ in range(n_traces):
+        x, y = rng.integers(0, size, size=2)
+        length = int(rng.integers(size // 10, size // 3))
+        if rng.random() < 0.5:
+            segment = grid[y, x:x+length]
+        else:
+            segment = grid[y:y+length, x]
+        segment[segment == 0] = 2
+
+    # 保留起點與終點區域
+    grid[:10, :10] = 0
+    grid[-10:, -10:] = 0
+    return grid
+
+
+def time_search(fn, repeats: int = 1):
+    """執行並計時，回傳（結果, 平均秒數）"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeats
+
+
+def benchmark(size: int = 1000, diagonal: bool = False, n_traces: int = 40,
+              run_reference: bool = True):
+    """
+    執行基準測試
+
+    所有實作使用相同的曼哈頓啟發函數（與原始實作預設相同），
+    八方向模式另外列出可容許的 octile 啟發函數結果。
+    """
+    grid = create_board_grid(size, n_traces=n_traces)
+    start, goal = (2, 2), (size - 3, size - 3)
+    heuristic = 'manhattan'
+
+    print("=" * 64)
+    print(f"網格 {size}x{size}，{'八' if diagonal else '四'}方向移動，"
+          f"已走線 {n_traces} 條")
+    print("=" * 64)
+
+    searcher, build_time = time_search(lambda: GridAStar(grid, diagonal=diagonal))
+    print(f"  建立成本網格: {build_time * 1000:.1f} ms")
+    _, table_time = time_search(searcher.precompute_jump_tables)
+    print(f"  建立跳躍距離表: {table_time * 1000:.1f} ms")
+
+    rows = []
+    if run_reference:
+        path, elapsed = time_search(
+            lambda: astar_search_reference(grid, start, goal, diagonal=diagonal))
+        rows.append(('PriorityQueue (原始)', path, elapsed))
+
+    path, elapsed = time_search(
+        lambda: searcher.search(start, goal, heuristic=heuristic))
+    rows.append(('GridAStar', path, elapsed))
+
+    path, elapsed = time_search(
+        lambda: searcher.search(start, goal, heuristic=heuristic, jump_point=True))
+    rows.append(('GridAStar + JPS', path, elapsed))
+
+    if diagonal:
+        path, elapsed = time_search(
+            lambda: searcher.search(start, goal, heuristic='octile'))
+        rows.append(('GridAStar (octile)', path, elapsed))
+
+        path, elapsed = time_search(
+            lambda: searcher.search(start, goal, heuristic='octile', jump_point=True))
+        rows.append(('GridAStar + JPS (octile)', path, elapsed))
+
+    baseline = rows[0][2]
+    print(f"  {'實作':<26} {'時間 (s)':>10} {'加速':>8} {'路徑成本':>10}")
+    for name, path, elapsed in rows:
+        cost = searcher.path_cost(path) if path else float('nan')
+        print(f"  {name:<26} {elapsed:>10.3f} {baseline / elapsed:>7.1f}x "
+              f"{cost:>10.1f}")
+
+
+if __name__ == "__main__":
+    for n_traces in (0, 40):
+        benchmark(diagonal=False, n_traces=n_traces)
+        benchmark(diagonal=True, n_traces=n_traces)
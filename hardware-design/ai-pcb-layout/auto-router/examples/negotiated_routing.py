@@ -0,0 +1,60 @@
+"""
+多層協商擁塞路由範例
+
+比較逐條 A* 走線與 PathFinder 協商路由在擁擠通道中的完成率。
+逐條走線會讓後面的網路穿越已走線（短路）；協商路由則透過過孔
+與拆除重走，讓所有網路在兩層上互不重疊。
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.router import PCBRouter
+
+
+def create_router(layers: int = 2) -> PCBRouter:
+    """建立中間有狹窄通道的電路板"""
+    router = PCBRouter(board_size=(30, 30), grid_resolution=0.5, layers=layers)
+
+    # 兩個大型元件之間留下 6mm 通道
+    router.add_obstacle(10, 0, 10, 12, layer=0)
+    router.add_obstacle(10, 18, 10, 12, layer=0)
+
+    # 十條需要交叉穿越通道的網路
+    for i in range(10):
+        router.add_connection(
+            start=(2, 2 + i * 2.7),
+            end=(27, 27 - i * 2.7),
+            net_name=f"NET{i}"
+        )
+
+    return router
+
+
+def main():
+    print("=" * 60)
+    print("[1] 逐條 A* 走線")
+    print("=" * 60)
+    sequential = create_router().route(algorithm='astar')
+    print(f"    注意：逐條走線允許穿越已走線，完成率 "
+          f"{sequential['success_rate'] * 100:.0f}% 包含短路")
+
+    print("\n" + "=" * 60)
+    print("[2] PathFinder 協商擁塞路由")
+    print("=" * 60)
+    negotiated = create_router().route(
+        algorithm='pathfinder',
+        max_iterations=40,
+        via_cost=10.0,
+        order='shortest_first'
+    )
+
+    print("\n每次迭代:")
+    for stats in negotiated['iterations']:
+        print(f"  #{stats['iteration']:>2}: 完成率 {stats['completion_rate'] * 100:5.1f}% "
+              f"擁塞格子 {stats['overused_nodes']:>3} 耗時 {stats['runtime']:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
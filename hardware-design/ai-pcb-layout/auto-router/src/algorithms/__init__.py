@@ -3,6 +3,9 @@
 """
 
 from .astar import astar_search, AStarRouter
+from .grid_astar import GridAStar
 from .lee import lee_router, LeeRouter
+from .pathfinder import NegotiatedCongestionRouter
 
-__all__ = ['astar_search', 'AStarRouter', 'lee_router', 'LeeRouter']
+__all__ = ['astar_search', 'AStarRouter', 'GridAStar', 'lee_router', 'LeeRouter',
+           'NegotiatedCongestionRouter']
@@ -7,6 +7,11 @@ from typing import List, Tuple, Optional, Callable
 from queue import PriorityQueue
 import math
 
+try:
+    from .grid_astar import GridAStar
+except ImportError:
+    from grid_astar import GridAStar
+
 
 def manhattan_distance(p1: Tuple[int, int], p2: Tuple[int, int]) -> float:
     """曼哈頓距離啟發函數"""
@@ -28,15 +33,18 @@ def chebyshev_distance(p1: Tuple[int, int], p2: Tuple[int, int]) -> float:
 class AStarRouter:
     """A* 路由器類"""
 
-    def __init__(self, heuristic: str = 'manhattan', diagonal: bool = False):
+    def __init__(self, heuristic: str = 'manhattan', diagonal: bool = False,
+                 jump_point: bool = False):
         """
         初始化 A* 路由器
 
         Args:
             heuristic: 啟發函數類型 ('manhattan', 'euclidean', 'chebyshev')
             diagonal: 是否允許對角移動
+            jump_point: 是否使用跳點搜尋
         """
         self.diagonal = diagonal
+        self.jump_point = jump_point
 
         # 選擇啟發函數
         if heuristic == 'manhattan':
@@ -63,17 +71,62 @@ class AStarRouter:
         """
         return astar_search(grid, start, goal,
                           heuristic=self.heuristic_fn,
-                          diagonal=self.diagonal)
+                          diagonal=self.diagonal,
+                          jump_point=self.jump_point)
+
+
+# 內建啟發函數對應到 GridAStar 的內聯實作
+_HEURISTIC_NAMES = {
+    manhattan_distance: 'manhattan',
+    euclidean_distance: 'euclidean',
+    chebyshev_distance: 'chebyshev',
+}
+
+
+def resolve_heuristic(heuristic: Optional[Callable]):
+    """將啟發函數轉換為 GridAStar 可用的形式（內建函數轉為名稱）"""
+    if heuristic is None:
+        return 'manhattan'
+    return _HEURISTIC_NAMES.get(heuristic, heuristic)
 
 
 def astar_search(grid: np.ndarray,
                 start: Tuple[int, int],
                 goal: Tuple[int, int],
                 heuristic: Callable = None,
-                diagonal: bool = False) -> Optional[List[Tuple[int, int]]]:
+                diagonal: bool = False,
+                jump_point: bool = False) -> Optional[List[Tuple[int, int]]]:
     """
     A* 路徑搜尋演算法
 
+    使用 GridAStar 核心（heapq + 扁平節點編號 + NumPy 陣列）。
+    同一網格需要多次搜尋時，直接建立 GridAStar 可避免重複建立成本網格。
+
+    Args:
+        grid: 網格地圖（0=空閒，1=障礙物，2=已走線）
+        start: 起點座標 (x, y)
+        goal: 終點座標 (x, y)
+        heuristic: 啟發函數
+        diagonal: 是否允許對角移動
+        jump_point: 是否使用跳點搜尋（均勻成本區域內跳躍）
+
+    Returns:
+        路徑點列表，若無法找到則返回 None
+    """
+    searcher = GridAStar(grid, diagonal=diagonal)
+    return searcher.search(start, goal,
+                           heuristic=resolve_heuristic(heuristic),
+                           jump_point=jump_point)
+
+
+def astar_search_reference(grid: np.ndarray,
+                           start: Tuple[int, int],
+                           goal: Tuple[int, int],
+                           heuristic: Callable = None,
+                           diagonal: bool = False) -> Optional[List[Tuple[int, int]]]:
+    """
+    A* 路徑搜尋演算法（原始 PriorityQueue 實作，保留作為基準比較）
+
     Args:
         grid: 網格地圖（0=空閒，1=障礙物，2=已走線）
         start: 起點座標 (x, y)
@@ -0,0 +1,517 @@
+"""
+基於扁平節點編號的高效能 A* 核心
+
+網格四周加上一圈障礙物作為哨兵，節點以 id = (y + 1) * W + (x + 1) 編號，
+鄰居由預先計算的位移量取得，不需要邊界檢查。
+g_score / parent / closed 以 NumPy 陣列儲存，搜尋迴圈透過 memoryview 存取。
+
+支援兩種模式：
+- 一般 A*：heapq 優先隊列 + 延遲刪除
+- 跳點搜尋（JPS）：在均勻成本區域內沿直線/對角線跳躍，
+  已走線（額外成本）格子附近退化為一般展開；直線跳躍距離預先計算（JPS+）
+"""
+
+import math
+from heapq import heappush, heappop
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+
+# 網格值定義（與 PCBRouter 相同）
+FREE = 0
+OBSTACLE = 1
+ROUTED = 2
+
+DIAGONAL_COST = 1.414
+
+
+class GridAStar:
+    """可重複使用的網格 A* 搜尋器（預先計算成本網格）"""
+
+    def __init__(self, grid: np.ndarray, diagonal: bool = False,
+                 routed_penalty: float = 5.0):
+        """
+        初始化搜尋器
+
+        Args:
+            grid: 網格地圖（0=空閒，1=障礙物，2=已走線）
+            diagonal: 是否允許對角移動
+            routed_penalty: 進入已走線格子的額外成本
+        """
+        self.height, self.width = grid.shape
+        self.diagonal = diagonal
+        self.routed_penalty = routed_penalty
+
+        # 加上哨兵邊界後的寬度
+        self.W = self.width + 2
+        self.size = (self.height + 2) * self.W
+
+        self.blocked = np.ones((self.height + 2, self.W), dtype=np.uint8)
+        self.extra_cost = np.zeros((self.height + 2, self.W), dtype=np.float64)
+        self._near_cost = None
+        self._jump_tables = None
+        self.set_region(0, 0, grid)
+
+        W = self.W
+        # (位移量, 基本成本, 轉角檢查位移 1, 轉角檢查位移 2)
+        # 直線移動的轉角檢查位移為 0（即目前節點本身，必為可通行）
+        self.moves = [(W, 1.0, 0, 0), (1, 1.0, 0, 0),
+                      (-W, 1.0, 0, 0), (-1, 1.0, 0, 0)]
+        if diagonal:
+            self.moves += [(W + 1, DIAGONAL_COST, 1, W),
+                           (-W + 1, DIAGONAL_COST, 1, -W),
+                           (-W - 1, DIAGONAL_COST, -1, -W),
+                           (W - 1, DIAGONAL_COST, -1, W)]
+
+        self.g_score = np.empty(self.size, dtype=np.float64)
+        self.parent = np.empty(self.size, dtype=np.int64)
+        self.closed = np.empty(self.size, dtype=np.uint8)
+
+    def node_id(self, point: Tuple[int, int]) -> int:
+        """網格座標 (x, y) 轉換為節點編號"""
+        return (point[1] + 1) * self.W + point[0] + 1
+
+    def node_point(self, node: int) -> Tuple[int, int]:
+        """節點編號轉換為網格座標 (x, y)"""
+        y, x = divmod(node, self.W)
+        return (x - 1, y - 1)
+
+    def set_region(self, x: int, y: int, values: np.ndarray):
+        """
+        以網格值更新一個矩形區域的成本網格
+
+        Args:
+            x, y: 區域左下角網格座標
+            values: 網格值陣列（0=空閒，1=障礙物，2=已走線）
+        """
+        h, w = values.shape
+        self.blocked[y + 1:y + 1 + h, x + 1:x + 1 + w] = (values == OBSTACLE)
+        self.extra_cost[y + 1:y + 1 + h, x + 1:x + 1 + w] = \
+            np.where(values == ROUTED, self.routed_penalty, 0.0)
+        self._near_cost = None
+        self._jump_tables = None
+
+    def set_cells(self, points: List[Tuple[int, int]], value: int):
+        """
+        更新個別格子（例如標記新走線）
+
+        Args:
+            points: 網格座標列表
+            value: 網格值
+        """
+        if not points:
+            return
+        xs = np.array([p[0] for p in points]) + 1
+        ys = np.array([p[1] for p in points]) + 1
+        inside = ((xs >= 1) & (xs <= self.width) &
+                  (ys >= 1) & (ys <= self.height))
+        xs, ys = xs[inside], ys[inside]
+        self.blocked[ys, xs] = (value == OBSTACLE)
+        self.extra_cost[ys, xs] = self.routed_penalty if value == ROUTED else 0.0
+        self._near_cost = None
+        self._jump_tables = None
+
+    def _get_near_cost(self) -> np.ndarray:
+        """標記 8 鄰域內含有額外成本格子的節點（JPS 在此停止跳躍）"""
+        if self._near_cost is None:
+            costed = (self.extra_cost > 0) & (self.blocked == 0)
+            near = costed.copy()
+            padded = np.pad(costed, 1)
+            h, w = costed.shape
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    near |= padded[1 + dy:1 + dy + h, 1 + dx:1 + dx + w]
+            self._near_cost = near.astype(np.uint8).ravel()
+        return self._near_cost
+
+    def _heuristic(self, heuristic: Union[str, Callable],
+                   goal: int) -> Callable[[int], float]:
+        """建立以節點編號為輸入的啟發函數"""
+        W = self.W
+        gy, gx = divmod(goal, W)
+
+        if heuristic == 'manhattan':
+            def h(node):
+                y, x = divmod(node, W)
+                return abs(x - gx) + abs(y - gy)
+        elif heuristic == 'euclidean':
+            def h(node):
+                y, x = divmod(node, W)
+                return math.hypot(x - gx, y - gy)
+        elif heuristic == 'chebyshev':
+            def h(node):
+                y, x = divmod(node, W)
+                return max(abs(x - gx), abs(y - gy))
+        elif heuristic == 'octile':
+            def h(node):
+                y, x = divmod(node, W)
+                dx, dy = abs(x - gx), abs(y - gy)
+                return max(dx, dy) + (DIAGONAL_COST - 1.0) * min(dx, dy)
+        elif callable(heuristic):
+            goal_point = (gx - 1, gy - 1)
+
+            def h(node):
+                y, x = divmod(node, W)
+                return heuristic((x - 1, y - 1), goal_point)
+        else:
+            raise ValueError(f"未知啟發函數: {heuristic}")
+
+        return h
+
+    def _valid(self, point: Tuple[int, int]) -> bool:
+        x, y = point
+        return (0 <= x < self.width and 0 <= y < self.height and
+                not self.blocked[y + 1, x + 1])
+
+    def search(self, start: Tuple[int, int], goal: Tuple[int, int],
+               heuristic: Union[str, Callable] = 'manhattan',
+               jump_point: bool = False) -> Optional[List[Tuple[int, int]]]:
+        """
+        執行搜尋
+
+        Args:
+            start: 起點座標 (x, y)
+            goal: 終點座標 (x, y)
+            heuristic: 啟發函數名稱或函式 f((x, y), goal) -> float
+            jump_point: 是否使用跳點搜尋
+
+        Returns:
+            路徑點列表，若無法找到則返回 None
+        """
+        if not self._valid(start) or not self._valid(goal):
+            return None
+
+        start_id = self.node_id(start)
+        goal_id = self.node_id(goal)
+        h = self._heuristic(heuristic, goal_id)
+
+        self.g_score.fill(np.inf)
+        self.parent.fill(-1)
+        self.closed.fill(0)
+
+        if jump_point:
+            found = self._search_jps(start_id, goal_id, h)
+        else:
+            found = self._search_astar(start_id, goal_id, h)
+
+        if not found:
+            return None
+
+        return self._reconstruct_path(goal_id)
+
+    def _search_astar(self, start: int, goal: int,
+                      h: Callable[[int], float]) -> bool:
+        """一般 A*（延遲刪除：過期的堆積項目在彈出時略過）"""
+        blocked = memoryview(self.blocked).cast('B')
+        extra = memoryview(self.extra_cost).cast('B').cast('d')
+        g = memoryview(self.g_score)
+        parent = memoryview(self.parent)
+        closed = memoryview(self.closed)
+        moves = self.moves
+
+        g[start] = 0.0
+        h_start = h(start)
+        heap = [(h_start, h_start, start)]
+
+        # 堆積項目 (f, h, node)：f 相同時優先展開較接近終點的節點
+        while heap:
+            _, _, node = heappop(heap)
+            if closed[node]:
+                continue
+            if node == goal:
+                return True
+            closed[node] = 1
+            g_node = g[node]
+
+            for offset, base, corner1, corner2 in moves:
+                neighbor = node + offset
+                if blocked[neighbor] or closed[neighbor]:
+                    continue
+                if blocked[node + corner1] or blocked[node + corner2]:
+                    continue
+
+                tentative_g = g_node + base + extra[neighbor]
+                if tentative_g < g[neighbor]:
+                    g[neighbor] = tentative_g
+                    parent[neighbor] = node
+                    h_neighbor = h(neighbor)
+                    heappush(heap, (tentative_g + h_neighbor, h_neighbor, neighbor))
+
+        return False
+
+    def precompute_jump_tables(self):
+        """預先建立跳點搜尋所需的距離表（否則在第一次 JPS 搜尋時建立）"""
+        self._get_jump_tables()
+
+    def _get_jump_tables(self) -> dict:
+        """
+        預先計算四個直線方向的跳躍距離表（JPS+）
+
+        表值 k > 0：沿該方向第 k 格為跳點；k <= 0：前方有 -k 格可通行後遇到障礙物。
+        表只與網格有關（與起點/終點無關），網格改變時重新計算。
+        """
+        if self._jump_tables is not None:
+            return self._jump_tables
+
+        blocked = self.blocked.astype(bool)
+        costed = (self.extra_cost > 0) & ~blocked
+        near_cost = self._get_near_cost().reshape(blocked.shape).astype(bool)
+
+        def shifted(arr, dy, dx):
+            # out[y, x] = arr[y + dy, x + dx]，超出範圍視為障礙物
+            out = np.ones_like(arr)
+            h, w = arr.shape
+            ys = slice(max(-dy, 0), h - max(dy, 0))
+            xs = slice(max(-dx, 0), w - max(dx, 0))
+            ys_src = slice(max(dy, 0), h - max(-dy, 0))
+            xs_src = slice(max(dx, 0), w - max(-dx, 0))
+            out[ys, xs] = arr[ys_src, xs_src]
+            return out
+
+        def forced(dx, dy):
+            # 前進方向 (dx, dy)；側邊可通行但其後方被擋住
+            px, py = (0, 1) if dx else (1, 0)
+            return ((~shifted(blocked, -py, -px) & shifted(blocked, -py - dy, -px - dx)) |
+                    (~shifted(blocked, py, px) & shifted(blocked, py - dy, px - dx)))
+
+        def scan(dx, dy, stop_here):
+            # 0 = 通過，1 = 跳點，2 = 障礙物
+            term = np.where(blocked, 2, np.where(costed | stop_here, 1, 0))
+            dist = np.zeros(blocked.shape, dtype=np.int64)
+            h, w = blocked.shape
+            if dx:
+                order = range(w - 2, 0, -1) if dx > 0 else range(1, w - 1)
+                for x in order:
+                    nxt_term, nxt_dist = term[:, x + dx], dist[:, x + dx]
+                    dist[:, x] = np.where(
+                        nxt_term == 2, 0,
+                        np.where(nxt_term == 1, 1,
+                                 np.where(nxt_dist > 0, nxt_dist + 1, nxt_dist - 1)))
+            else:
+                order = range(h - 2, 0, -1) if dy > 0 else range(1, h - 1)
+                for y in order:
+                    nxt_term, nxt_dist = term[y + dy, :], dist[y + dy, :]
+                    dist[y, :] = np.where(
+                        nxt_term == 2, 0,
+                        np.where(nxt_term == 1, 1,
+                                 np.where(nxt_dist > 0, nxt_dist + 1, nxt_dist - 1)))
+            return dist.ravel()
+
+        right = scan(1, 0, near_cost | forced(1, 0))
+        left = scan(-1, 0, near_cost | forced(-1, 0))
+        up_stop = near_cost | forced(0, 1)
+        down_stop = near_cost | forced(0, -1)
+        if not self.diagonal:
+            # 四方向模式下垂直移動遇到水平跳點即停止
+            horizontal = ((right > 0) | (left > 0)).reshape(blocked.shape)
+            up_stop = up_stop | horizontal
+            down_stop = down_stop | horizontal
+
+        self._jump_tables = {
+            1: right,
+            -1: left,
+            self.W: scan(0, 1, up_stop),
+            -self.W: scan(0, -1, down_stop),
+        }
+        return self._jump_tables
+
+    def _search_jps(self, start: int, goal: int,
+                    h: Callable[[int], float]) -> bool:
+        """
+        跳點搜尋
+
+        均勻成本（額外成本為 0）的節點以 JPS 規則剪枝並跳躍；
+        已走線格子及其相鄰節點展開全部方向，因此仍會考慮穿越已走線的路徑。
+        直線跳躍使用預先計算的距離表，為 O(1) 操作。
+        """
+        W = self.W
+        diagonal = self.diagonal
+        blocked = memoryview(self.blocked).cast('B')
+        extra = memoryview(self.extra_cost).cast('B').cast('d')
+        near_cost = memoryview(self._get_near_cost())
+        tables = {d: memoryview(t) for d, t in self._get_jump_tables().items()}
+        g = memoryview(self.g_score)
+        parent = memoryview(self.parent)
+        closed = memoryview(self.closed)
+        goal_y, goal_x = divmod(goal, W)
+
+        if diagonal:
+            all_dirs = [(1, 0), (-1, 0), (0, 1), (0, -1),
+                        (1, 1), (1, -1), (-1, 1), (-1, -1)]
+        else:
+            all_dirs = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+        def reaches_goal(cell, d, k):
+            # 沿方向 d、最多 |k| 格內是否經過終點
+            cy, cx = divmod(cell, W)
+            if d == 1 or d == -1:
+                if cy != goal_y:
+                    return False
+                m = (goal_x - cx) * d
+            else:
+                if cx != goal_x:
+                    return False
+                m = (goal_y - cy) * (1 if d > 0 else -1)
+            return 1 <= m <= (k if k > 0 else -k)
+
+        def jump_straight(cell, d):
+            k = tables[d][cell]
+            if reaches_goal(cell, d, k):
+                return goal
+            if not diagonal and (d == W or d == -W):
+                # 垂直跳躍經過終點所在列時，水平子跳躍可能到達終點
+                cy, cx = divmod(cell, W)
+                span = k if k > 0 else -k
+                m = (goal_y - cy) * (1 if d > 0 else -1)
+                if 1 <= m and (m < span or (m == span and k <= 0)):
+                    crossing = cell + m * d
+                    hd = 1 if goal_x > cx else -1
+                    if reaches_goal(crossing, hd, tables[hd][crossing]):
+                        return crossing
+            if k > 0:
+                return cell + k * d
+            return -1
+
+        def has_straight_jump(cell, d):
+            k = tables[d][cell]
+            return k > 0 or reaches_goal(cell, d, k)
+
+        def jump_diagonal(cell, dx, dy):
+            dyW = dy * W
+            d = dyW + dx
+            while True:
+                if blocked[cell + dx] or blocked[cell + dyW]:
+                    return -1
+                nxt = cell + d
+                if blocked[nxt]:
+                    return -1
+                if extra[nxt] > 0 or nxt == goal:
+                    return nxt
+                cell = nxt
+                if near_cost[cell]:
+                    return cell
+                if has_straight_jump(cell, dx) or has_straight_jump(cell, dyW):
+                    return cell
+
+        def pruned_dirs(node):
+            py, px = divmod(parent[node], W)
+            ny, nx = divmod(node, W)
+            dx = (nx > px) - (nx < px)
+            dy = (ny > py) - (ny < py)
+            dirs = []
+
+            if dx and dy:
+                walk_y = not blocked[node + dy * W]
+                walk_x = not blocked[node + dx]
+                if walk_y:
+                    dirs.append((0, dy))
+                if walk_x:
+                    dirs.append((dx, 0))
+                if walk_x and walk_y:
+                    dirs.append((dx, dy))
+            elif dx:
+                walk_next = not blocked[node + dx]
+                walk_up = not blocked[node + W]
+                walk_down = not blocked[node - W]
+                if walk_next:
+                    dirs.append((dx, 0))
+                    if diagonal and walk_up:
+                        dirs.append((dx, 1))
+                    if diagonal and walk_down:
+                        dirs.append((dx, -1))
+                if walk_up:
+                    dirs.append((0, 1))
+                if walk_down:
+                    dirs.append((0, -1))
+            else:
+                walk_next = not blocked[node + dy * W]
+                walk_right = not blocked[node + 1]
+                walk_left = not blocked[node - 1]
+                if walk_next:
+                    dirs.append((0, dy))
+                    if diagonal and walk_right:
+                        dirs.append((1, dy))
+                    if diagonal and walk_left:
+                        dirs.append((-1, dy))
+                if walk_right:
+                    dirs.append((1, 0))
+                if walk_left:
+                    dirs.append((-1, 0))
+
+            return dirs
+
+        g[start] = 0.0
+        h_start = h(start)
+        heap = [(h_start, h_start, start)]
+
+        while heap:
+            _, _, node = heappop(heap)
+            if closed[node]:
+                continue
+            if node == goal:
+                return True
+            closed[node] = 1
+            g_node = g[node]
+
+            if node == start or near_cost[node] or extra[node] > 0:
+                dirs = all_dirs
+            else:
+                dirs = pruned_dirs(node)
+
+            ny, nx = divmod(node, W)
+            for dx, dy in dirs:
+                if dx and dy:
+                    successor = jump_diagonal(node, dx, dy)
+                else:
+                    successor = jump_straight(node, dx + dy * W)
+
+                if successor == -1 or closed[successor]:
+                    continue
+
+                sy, sx = divmod(successor, W)
+                steps = max(abs(sx - nx), abs(sy - ny))
+                base = DIAGONAL_COST if dx and dy else 1.0
+                tentative_g = g_node + steps * base + extra[successor]
+
+                if tentative_g < g[successor]:
+                    g[successor] = tentative_g
+                    parent[successor] = node
+                    h_successor = h(successor)
+                    heappush(heap, (tentative_g + h_successor, h_successor,
+                                    successor))
+
+        return False
+
+    def _reconstruct_path(self, goal: int) -> List[Tuple[int, int]]:
+        """
+        由 parent 陣列重建路徑
+
+        跳點之間以單位步長補齊中間格子，輸出與一般 A* 相同格式的逐格路徑。
+        """
+        W = self.W
+        parent = self.parent
+        nodes = [goal]
+        while parent[nodes[-1]] != -1:
+            nodes.append(int(parent[nodes[-1]]))
+        nodes.reverse()
+
+        path = [self.node_point(nodes[0])]
+        for a, b in zip(nodes, nodes[1:]):
+            ay, ax = divmod(a, W)
+            by, bx = divmod(b, W)
+            step_x = (bx > ax) - (bx < ax)
+            step_y = (by > ay) - (by < ay)
+            while (ax, ay) != (bx, by):
+                ax += step_x
+                ay += step_y
+                path.append((ax - 1, ay - 1))
+
+        return path
+
+    def path_cost(self, path: List[Tuple[int, int]]) -> float:
+        """計算路徑成本（與搜尋使用相同的成本模型）"""
+        cost = 0.0
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            cost += DIAGONAL_COST if x1 != x2 and y1 != y2 else 1.0
+            cost += self.extra_cost[y2 + 1, x2 + 1]
+        return cost
@@ -0,0 +1,324 @@
+"""
+PathFinder 協商擁塞路由演算法
+
+在三維網格（層 × 高 × 寬）上同時路由所有連接：
+- 允許多條網路暫時共用格子，以「當前擁塞成本」與「歷史成本」協商
+- 每次迭代拆除並重新走線，直到沒有格子被超量使用
+- 層間以過孔（via）移動，成本為 via_cost
+
+格子成本：c_n = (b_n + h_n) · p_n
+    b_n: 基本成本（1）
+    h_n: 歷史成本，每次迭代累加超量使用量
+    p_n: 當前擁塞成本 1 + pres_fac · (其他網路的佔用數)
+"""
+
+import time
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class NegotiatedCongestionRouter:
+    """PathFinder 協商擁塞路由器"""
+
+    def __init__(self, grids: List[np.ndarray],
+                 via_cost: float = 10.0,
+                 present_factor: float = 0.5,
+                 present_growth: float = 1.5,
+                 history_factor: float = 1.0):
+        """
+        初始化路由器
+
+        Args:
+            grids: 每層的網格（0=空閒，1=障礙物，2=已走線），已走線視為障礙物
+            via_cost: 過孔成本（以網格步數計）
+            present_factor: 初始擁塞成本係數
+            present_growth: 每次迭代擁塞成本係數的倍增率
+            history_factor: 歷史成本累加係數
+        """
+        self.layers = len(grids)
+        self.height, self.width = grids[0].shape
+        self.via_cost = via_cost
+        self.present_factor = present_factor
+        self.present_growth = present_growth
+        self.history_factor = history_factor
+
+        # 三維網格四周（含上下）各加一層哨兵
+        self.W = self.width + 2
+        self.P = (self.height + 2) * self.W
+        self.size = (self.layers + 2) * self.P
+
+        blocked = np.ones((self.layers + 2, self.height + 2, self.W), dtype=np.uint8)
+        for layer, grid in enumerate(grids):
+            blocked[layer + 1, 1:-1, 1:-1] = (grid != 0)
+        self.blocked = blocked.ravel()
+
+        self.occupancy = np.zeros(self.size, dtype=np.int32)
+        self.history = np.zeros(self.size, dtype=np.float64)
+        self._own = np.zeros(self.size, dtype=np.uint8)
+
+        self._g = np.full(self.size, np.inf)
+        self._parent = np.full(self.size, -1, dtype=np.int64)
+        self._closed = np.zeros(self.size, dtype=np.uint8)
+
+    def node_id(self, x: int, y: int, layer: int) -> int:
+        """網格座標轉換為節點編號"""
+        return (layer + 1) * self.P + (y + 1) * self.W + x + 1
+
+    def node_point(self, node: int) -> Tuple[int, int, int]:
+        """節點編號轉換為 (x, y, layer)"""
+        layer, rest = divmod(node, self.P)
+        y, x = divmod(rest, self.W)
+        return (x - 1, y - 1, layer - 1)
+
+    def route(self, connections: List[Dict],
+              max_iterations: int = 30,
+              order: str = 'shortest_first',
+              reroute_all: bool = False,
+              verbose: bool = True) -> Dict:
+        """
+        協商擁塞路由
+
+        Args:
+            connections: 連接列表，每項含 'start' (x, y)、'end' (x, y)、
+                         'layer'（接腳所在層）與 'net'（同名網路可共用格子）
+            max_iterations: 最大迭代次數
+            order: 網路排序方式
+                   ('shortest_first', 'longest_first', 'most_congested', 'insertion')
+            reroute_all: 每次迭代重新走線全部網路；否則只重走經過擁塞格子的網路
+            verbose: 是否輸出每次迭代的統計
+
+        Returns:
+            {'paths', 'legal', 'iterations', 'converged', 'total_runtime'}；
+            paths[i] 為 [(x, y, layer), ...] 或 None，legal[i] 表示該路徑沒有擁塞
+        """
+        terminals = []
+        nets = []
+        for i, conn in enumerate(connections):
+            layer = conn.get('layer', 0)
+            terminals.append((self.node_id(conn['start'][0], conn['start'][1], layer),
+                              self.node_id(conn['end'][0], conn['end'][1], layer)))
+            nets.append(conn.get('net') or f"__connection_{i}")
+
+        # 接腳格子對其他網路視為障礙物，走線時只開放本網路的接腳
+        pins = np.unique(np.array(terminals, dtype=np.int64))
+        pins = pins[self.blocked[pins] == 0]
+        net_terminals: Dict[str, List[int]] = {}
+        for net, pair in zip(nets, terminals):
+            net_terminals.setdefault(net, []).extend(pair)
+        own_pins = {net: np.intersect1d(pins, nodes) for net, nodes in net_terminals.items()}
+        self.blocked[pins] = 1
+        try:
+            return self._negotiate(terminals, nets, own_pins, max_iterations,
+                                   order, reroute_all, verbose)
+        finally:
+            self.blocked[pins] = 0
+
+    def _negotiate(self, terminals: List[Tuple[int, int]], nets: List[str],
+                   own_pins: Dict[str, np.ndarray], max_iterations: int,
+                   order: str, reroute_all: bool, verbose: bool) -> Dict:
+        """協商迭代主迴圈（各網路的接腳格子已設為障礙物）"""
+        n = len(terminals)
+        # 同一網路的各連接共用佔用計數
+        net_usage: Dict[str, Dict[int, int]] = {net: {} for net in nets}
+        paths: List[Optional[List[int]]] = [None] * n
+        iterations = []
+        pres_fac = self.present_factor
+        converged = False
+        total_start = time.perf_counter()
+
+        for iteration in range(1, max_iterations + 1):
+            iter_start = time.perf_counter()
+
+            if iteration == 1 or reroute_all:
+                to_route = list(range(n))
+            else:
+                overused = self.occupancy > 1
+                to_route = [i for i in range(n)
+                            if paths[i] is None or overused[paths[i]].any()]
+
+            for i in self._order_connections(to_route, terminals, paths, order):
+                net = nets[i]
+                self._rip_up(paths[i], net_usage[net])
+                paths[i] = None
+
+                own_nodes = np.fromiter(net_usage[net].keys(), dtype=np.int64,
+                                        count=len(net_usage[net]))
+                self._own[own_nodes] = 1
+                self.blocked[own_pins[net]] = 0
+                path = self._search(terminals[i][0], terminals[i][1], pres_fac)
+                self.blocked[own_pins[net]] = 1
+                self._own[own_nodes] = 0
+
+                if path is not None:
+                    paths[i] = path
+                    self._add_usage(path, net_usage[net])
+
+            overuse = np.maximum(self.occupancy - 1, 0)
+            overused_nodes = int(np.count_nonzero(overuse))
+            overused_mask = overuse > 0
+            legal = sum(1 for p in paths
+                        if p is not None and not overused_mask[p].any())
+
+            stats = {
+                'iteration': iteration,
+                'rerouted': len(to_route),
+                'routed': sum(1 for p in paths if p is not None),
+                'legal': legal,
+                'completion_rate': legal / n if n else 1.0,
+                'overused_nodes': overused_nodes,
+                'runtime': time.perf_counter() - iter_start,
+            }
+            iterations.append(stats)
+
+            if verbose:
+                print(f"  迭代 {iteration}: 重走 {stats['rerouted']} 條, "
+                      f"完成率 {stats['completion_rate'] * 100:.1f}%, "
+                      f"擁塞格子 {overused_nodes}, "
+                      f"耗時 {stats['runtime']:.3f} s")
+
+            if overused_nodes == 0:
+                # 沒有擁塞時成本不再改變，剩餘失敗的連接無法透過協商改善
+                converged = all(p is not None for p in paths)
+                break
+
+            self.history += self.history_factor * overuse
+            pres_fac *= self.present_growth
+
+        overused_mask = self.occupancy > 1
+        return {
+            'paths': [[self.node_point(node) for node in p] if p is not None else None
+                      for p in paths],
+            'legal': [p is not None and not overused_mask[p].any() for p in paths],
+            'iterations': iterations,
+            'converged': converged,
+            'total_runtime': time.perf_counter() - total_start,
+        }
+
+    def _order_connections(self, indices: List[int],
+                           terminals: List[Tuple[int, int]],
+                           paths: List[Optional[List[int]]],
+                           order: str) -> List[int]:
+        """依排序方式排列要走線的連接"""
+        def span(i):
+            x1, y1, _ = self.node_point(terminals[i][0])
+            x2, y2, _ = self.node_point(terminals[i][1])
+            return abs(x2 - x1) + abs(y2 - y1)
+
+        if order == 'insertion':
+            return list(indices)
+        elif order == 'shortest_first':
+            return sorted(indices, key=span)
+        elif order == 'longest_first':
+            return sorted(indices, key=span, reverse=True)
+        elif order == 'most_congested':
+            overused = self.occupancy > 1
+
+            def congestion(i):
+                if paths[i] is None:
+                    return float('inf')
+                return int(np.count_nonzero(overused[paths[i]]))
+
+            return sorted(indices, key=lambda i: (-congestion(i), span(i)))
+        else:
+            raise ValueError(f"未知排序方式: {order}")
+
+    def _add_usage(self, path: List[int], usage: Dict[int, int]):
+        """登記路徑佔用（同一網路重複使用的格子只計一次）"""
+        for node in path:
+            count = usage.get(node, 0)
+            if count == 0:
+                self.occupancy[node] += 1
+            usage[node] = count + 1
+
+    def _rip_up(self, path: Optional[List[int]], usage: Dict[int, int]):
+        """拆除路徑並釋放佔用"""
+        if path is None:
+            return
+        for node in path:
+            count = usage[node] - 1
+            if count == 0:
+                del usage[node]
+                self.occupancy[node] -= 1
+            else:
+                usage[node] = count
+
+    def _search(self, start: int, goal: int,
+                pres_fac: float) -> Optional[List[int]]:
+        """
+        以協商成本進行 A* 搜尋（啟發函數為平面曼哈頓距離加過孔成本，可容許）
+
+        只重設本次搜尋觸及的節點，避免每條網路清除整個三維陣列。
+        """
+        if self.blocked[start] or self.blocked[goal]:
+            return None
+
+        W, P = self.W, self.P
+        via_cost = self.via_cost
+        blocked = memoryview(self.blocked)
+        occupancy = memoryview(self.occupancy)
+        history = memoryview(self.history)
+        own = memoryview(self._own)
+        g = memoryview(self._g)
+        parent = memoryview(self._parent)
+        closed = memoryview(self._closed)
+
+        goal_layer, goal_rest = divmod(goal, P)
+        goal_y, goal_x = divmod(goal_rest, W)
+
+        def heuristic(node):
+            layer, rest = divmod(node, P)
+            y, x = divmod(rest, W)
+            return (abs(x - goal_x) + abs(y - goal_y) +
+                    via_cost * abs(layer - goal_layer))
+
+        moves = ((1, 0.0), (-1, 0.0), (W, 0.0), (-W, 0.0),
+                 (P, via_cost), (-P, via_cost))
+
+        touched = [start]
+        g[start] = 0.0
+        h_start = heuristic(start)
+        heap = [(h_start, h_start, start)]
+        found = False
+
+        while heap:
+            _, _, node = heappop(heap)
+            if closed[node]:
+                continue
+            if node == goal:
+                found = True
+                break
+            closed[node] = 1
+            g_node = g[node]
+
+            for offset, move_cost in moves:
+                neighbor = node + offset
+                if blocked[neighbor] or closed[neighbor]:
+                    continue
+
+                others = occupancy[neighbor] - own[neighbor]
+                node_cost = (1.0 + history[neighbor]) * (1.0 + pres_fac * others)
+                tentative_g = g_node + move_cost + node_cost
+
+                if tentative_g < g[neighbor]:
+                    if g[neighbor] == float('inf'):
+                        touched.append(neighbor)
+                    g[neighbor] = tentative_g
+                    parent[neighbor] = node
+                    h_neighbor = heuristic(neighbor)
+                    heappush(heap, (tentative_g + h_neighbor, h_neighbor, neighbor))
+
+        path = None
+        if found:
+            path = [goal]
+            while path[-1] != start:
+                path.append(parent[path[-1]])
+            path.reverse()
+
+        touched = np.array(touched, dtype=np.int64)
+        self._g[touched] = np.inf
+        self._parent[touched] = -1
+        self._closed[touched] = 0
+
+        return path
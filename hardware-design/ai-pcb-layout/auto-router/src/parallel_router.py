@@ -0,0 +1,217 @@
+"""
+獨立網路的平行走線排程
+
+1. 每條連接的區域 = 起終點外接矩形 + (間距 + 繞線餘量)
+2. 貪婪地將區域互不重疊（或位於不同層）的連接分到同一批次
+3. 同一批次在多個工作行程中平行走線；各行程透過共享記憶體讀取網格，
+   只在自己的區域視窗內搜尋
+4. 合併結果時檢查與同批其他路徑重疊（視窗已含障礙物與先前批次的路徑），
+   衝突或視窗內找不到路徑的連接改為序列走線
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+Region = Tuple[int, int, int, int]  # (x0, y0, x1, y1)，不含 x1 / y1
+
+# 工作行程內的共享網格
+_worker_shm = None
+_worker_grids = None
+
+
+def connection_region(start: Tuple[int, int], end: Tuple[int, int],
+                      margin: int, width: int, height: int) -> Region:
+    """
+    計算連接的走線區域
+
+    Args:
+        start, end: 起終點網格座標
+        margin: 外擴格數
+        width, height: 網格大小
+
+    Returns:
+        (x0, y0, x1, y1)
+    """
+    x0 = max(min(start[0], end[0]) - margin, 0)
+    y0 = max(min(start[1], end[1]) - margin, 0)
+    x1 = min(max(start[0], end[0]) + margin + 1, width)
+    y1 = min(max(start[1], end[1]) + margin + 1, height)
+    return (x0, y0, x1, y1)
+
+
+def regions_overlap(a: Region, b: Region) -> bool:
+    """兩個區域是否重疊"""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def partition_connections(regions: List[Region],
+                          layers: List[int]) -> List[List[int]]:
+    """
+    將連接分批，同一批次內的區域互不重疊（不同層的區域不衝突）
+
+    依輸入順序貪婪著色，保留原本的走線優先順序。
+
+    Args:
+        regions: 各連接的區域
+        layers: 各連接的走線層
+
+    Returns:
+        批次列表，每批為連接索引列表
+    """
+    batches: List[List[int]] = []
+    batch_boxes: List[Dict[int, np.ndarray]] = []
+
+    for i, (region, layer) in enumerate(zip(regions, layers)):
+        box = np.array(region)
+        for batch, boxes in zip(batches, batch_boxes):
+            existing = boxes.get(layer)
+            if existing is not None:
+                overlap = ((box[0] < existing[:, 2]) & (existing[:, 0] < box[2]) &
+                           (box[1] < existing[:, 3]) & (existing[:, 1] < box[3]))
+                if overlap.any():
+                    continue
+                boxes[layer] = np.vstack([existing, box])
+            else:
+                boxes[layer] = box[np.newaxis, :]
+            batch.append(i)
+            break
+        else:
+            batches.append([i])
+            batch_boxes.append({layer: box[np.newaxis, :]})
+
+    return batches
+
+
+def _attach_shared_grids(name: str, shape: Tuple[int, int, int]):
+    """工作行程初始化：連接共享記憶體中的網格"""
+    global _worker_shm, _worker_grids
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_grids = np.ndarray(shape, dtype=np.int8, buffer=_worker_shm.buf)
+
+
+def _route_in_window(task: Tuple) -> Tuple[int, Optional[List[Tuple[int, int]]]]:
+    """
+    在區域視窗內走線（於工作行程中執行）
+
+    Args:
+        task: (連接索引, 層, 起點, 終點, 區域, 演算法, 搜尋參數)
+
+    Returns:
+        (連接索引, 全域座標路徑或 None)
+    """
+    index, layer, start, end, region, algorithm, search_kwargs = task
+    x0, y0, x1, y1 = region
+    window = np.array(_worker_grids[layer, y0:y1, x0:x1])
+    local_start = (start[0] - x0, start[1] - y0)
+    local_end = (end[0] - x0, end[1] - y0)
+
+    if algorithm == 'lee':
+        try:
+            from .algorithms.lee import lee_router
+        except ImportError:
+            from algorithms.lee import lee_router
+        path = lee_router(window, local_start, local_end)
+    else:
+        try:
+            from .algorithms.grid_astar import GridAStar
+        except ImportError:
+            from algorithms.grid_astar import GridAStar
+        searcher = GridAStar(window, diagonal=search_kwargs.get('diagonal', False))
+        path = searcher.search(local_start, local_end,
+                               heuristic=search_kwargs.get('heuristic', 'manhattan'),
+                               jump_point=search_kwargs.get('jump_point', False))
+
+    if path is None:
+        return index, None
+    return index, [(x + x0, y + y0) for x, y in path]
+
+
+def route_in_parallel(grids: List[np.ndarray],
+                      requests: List[Dict],
+                      algorithm: str = 'astar',
+                      workers: Optional[int] = None,
+                      search_kwargs: Optional[Dict] = None) -> Dict:
+    """
+    平行走線互不重疊的連接
+
+    Args:
+        grids: 各層網格（不會被修改）
+        requests: 走線請求，每項含 'index'、'start'、'end'（網格座標）、
+                  'layer' 與 'margin'（區域外擴格數）
+        algorithm: 'astar' 或 'lee'
+        workers: 工作行程數（None 表示 CPU 核心數）
+        search_kwargs: 傳給搜尋器的參數（heuristic 需為名稱字串）
+
+    Returns:
+        {'paths': {索引: 路徑}, 'fallback': [需序列走線的索引],
+         'batches': 批次數, 'conflicts': 衝突數, 'runtime': 秒}
+    """
+    search_kwargs = search_kwargs or {}
+    start_time = time.perf_counter()
+
+    layers = len(grids)
+    height, width = grids[0].shape
+    shape = (layers, height, width)
+
+    regions = [connection_region(r['start'], r['end'], r['margin'], width, height)
+               for r in requests]
+    batches = partition_connections(regions, [r['layer'] for r in requests])
+
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+    try:
+        shared = np.ndarray(shape, dtype=np.int8, buffer=shm.buf)
+        for layer, grid in enumerate(grids):
+            shared[layer] = grid
+
+        paths: Dict[int, List[Tuple[int, int]]] = {}
+        fallback: List[int] = []
+        conflicts = 0
+
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_attach_shared_grids,
+                                 initargs=(shm.name, shape)) as executor:
+            for batch in batches:
+                tasks = [(requests[k]['index'], requests[k]['layer'],
+                          requests[k]['start'], requests[k]['end'],
+                          regions[k], algorithm, search_kwargs)
+                         for k in batch]
+                layer_of = {requests[k]['index']: requests[k]['layer'] for k in batch}
+
+                # 合併：視窗讀取的共享網格已含障礙物與先前批次的路徑，只需檢查同批次重疊
+                claimed = {}
+                for index, path in executor.map(_route_in_window, tasks):
+                    if path is None:
+                        fallback.append(index)
+                        continue
+
+                    layer = layer_of[index]
+                    if any((layer, x, y) in claimed for x, y in path):
+                        conflicts += 1
+                        fallback.append(index)
+                        continue
+
+                    for x, y in path:
+                        claimed[(layer, x, y)] = index
+                    paths[index] = path
+
+                # 已接受的路徑寫回共享網格，供後續批次使用
+                for index in {i for i in claimed.values()}:
+                    cells = np.array(paths[index])
+                    shared[layer_of[index], cells[:, 1], cells[:, 0]] = 2
+
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return {
+        'paths': paths,
+        'fallback': fallback,
+        'batches': len(batches),
+        'conflicts': conflicts,
+        'runtime': time.perf_counter() - start_time,
+    }
@@ -12,6 +12,7 @@ class RoutingAlgorithm(Enum):
     ASTAR = "astar"
     LEE = "lee"
     RL = "rl"
+    PATHFINDER = "pathfinder"
 
 
 class PCBRouter:
@@ -41,6 +42,9 @@ class PCBRouter:
         # 連接列表
         self.connections = []
 
+        # A* 搜尋器快取（每層、每種移動模式一個，隨網格增量更新）
+        self._astar_cache = {}
+
         # 設計規則
         self.design_rules = {
             'min_trace_width': 0.15,
@@ -67,6 +71,13 @@ class PCBRouter:
         # 標記網格為障礙物
         self.grids[layer][grid_y:grid_y+grid_h, grid_x:grid_x+grid_w] = 1
 
+        for (cached_layer, _), searcher in self._astar_cache.items():
+            if cached_layer == layer:
+                searcher.set_region(
+                    grid_x, grid_y,
+                    self.grids[layer][grid_y:grid_y+grid_h, grid_x:grid_x+grid_w]
+                )
+
     def add_connection(self, start: Tuple[float, float], end: Tuple[float, float],
                       width: float = 0.2, clearance: float = 0.15,
                       layer: int = 0, net_name: str = ""):
@@ -125,48 +136,62 @@ class PCBRouter:
         """
         self.design_rules.update(rules)
 
-    def route(self, algorithm: str = 'astar', **kwargs) -> Dict:
+    def route(self, algorithm: str = 'astar', parallel: bool = False,
+              workers: Optional[int] = None, region_margin: float = 2.0,
+              **kwargs) -> Dict:
         """
         執行自動走線
 
         Args:
-            algorithm: 路由演算法 ('astar', 'lee', 'rl')
+            algorithm: 路由演算法 ('astar', 'lee', 'rl', 'pathfinder')
+            parallel: 是否將區域互不重疊的連接分批，以多個行程平行走線
+                      （只支援 'astar' 與 'lee'；'pathfinder' 本身即同時協商所有網路）
+            workers: 平行走線的工作行程數（None 表示 CPU 核心數）
+            region_margin: 平行走線時，連接外接矩形在間距之外的繞線餘量 (mm)
             **kwargs: 演算法特定參數
 
         Returns:
             路由結果字典
         """
+        if algorithm == 'pathfinder':
+            if parallel:
+                raise ValueError("pathfinder 演算法不支援平行走線")
+            return self.route_negotiated(**kwargs)
+        if algorithm not in ('astar', 'lee', 'rl'):
+            raise ValueError(f"未知演算法: {algorithm}")
+
         print(f"開始使用 {algorithm} 演算法進行走線...")
 
         routed_count = 0
         failed_connections = []
         total_length = 0.0
+        parallel_stats = None
 
-        for i, conn in enumerate(self.connections):
-            if conn['routed']:
-                continue
+        pending = [i for i, conn in enumerate(self.connections) if not conn['routed']]
+
+        if parallel and algorithm in ('astar', 'lee') and len(pending) > 1:
+            parallel_stats = self._route_parallel(pending, algorithm, workers,
+                                                  region_margin, **kwargs)
+            for i, path in parallel_stats['paths'].items():
+                total_length += self._commit_path(i, path)
+                routed_count += 1
+            # 視窗內失敗或合併時衝突的連接，依原順序改為序列走線
+            pending = sorted(parallel_stats['fallback'])
+
+        for i in pending:
+            conn = self.connections[i]
 
             # 根據選擇的演算法執行路由
             if algorithm == 'astar':
                 path = self._route_astar(conn, **kwargs)
             elif algorithm == 'lee':
                 path = self._route_lee(conn, **kwargs)
-            elif algorithm == 'rl':
-                path = self._route_rl(conn, **kwargs)
             else:
-                raise ValueError(f"未知演算法: {algorithm}")
+                path = self._route_rl(conn, **kwargs)
 
             if path:
-                conn['path'] = path
-                conn['routed'] = True
+                total_length += self._commit_path(i, path)
                 routed_count += 1
-
-                # 計算路徑長度
-                length = self._calculate_path_length(path)
-                total_length += length
-
-                # 標記網格為已走線
-                self._mark_path_on_grid(path, conn['layer'])
             else:
                 failed_connections.append(i)
 
@@ -181,22 +206,196 @@ class PCBRouter:
             'algorithm': algorithm
         }
 
+        if parallel_stats is not None:
+            result.update({
+                'batches': parallel_stats['batches'],
+                'parallel_routed': len(parallel_stats['paths']),
+                'serial_fallback': len(parallel_stats['fallback']),
+                'conflicts': parallel_stats['conflicts'],
+                'parallel_runtime': parallel_stats['runtime'],
+            })
+
         print(f"走線完成: {routed_count}/{len(self.connections)} ({success_rate*100:.1f}%)")
         print(f"總長度: {total_length:.2f} mm")
+        if parallel_stats is not None:
+            print(f"平行批次: {parallel_stats['batches']}, "
+                  f"平行完成: {len(parallel_stats['paths'])}, "
+                  f"序列補走: {len(parallel_stats['fallback'])}")
+
+        return result
+
+    def _route_parallel(self, indices: List[int], algorithm: str,
+                        workers: Optional[int], region_margin: float,
+                        heuristic=None, diagonal: bool = False,
+                        jump_point: bool = False, **kwargs) -> Dict:
+        """將連接分批平行走線，回傳 route_in_parallel 的結果"""
+        from .algorithms.astar import resolve_heuristic
+        from .parallel_router import route_in_parallel
+
+        if kwargs:
+            raise TypeError(f"平行走線不支援的參數: {', '.join(sorted(kwargs))}")
+
+        heuristic = resolve_heuristic(heuristic)
+        if callable(heuristic):
+            # 自訂函數無法傳遞至工作行程
+            raise ValueError("平行走線只支援具名啟發函數")
+
+        requests = []
+        for i in indices:
+            conn = self.connections[i]
+            margin = int(np.ceil((conn['clearance'] + region_margin) / self.grid_resolution))
+            requests.append({
+                'index': i,
+                'start': self._to_grid_coords(conn['start']),
+                'end': self._to_grid_coords(conn['end']),
+                'layer': conn['layer'],
+                'margin': margin,
+            })
+
+        return route_in_parallel(
+            self.grids, requests, algorithm=algorithm, workers=workers,
+            search_kwargs={'heuristic': heuristic, 'diagonal': diagonal,
+                           'jump_point': jump_point}
+        )
+
+    def _commit_path(self, index: int, path: List[Tuple[int, int]]) -> float:
+        """記錄連接的路徑並標記網格，回傳路徑長度"""
+        conn = self.connections[index]
+        conn['path'] = path
+        conn['routed'] = True
+        self._mark_path_on_grid(path, conn['layer'])
+        return self._calculate_path_length(path)
+
+    def route_negotiated(self, max_iterations: int = 30,
+                         via_cost: float = 10.0,
+                         order: str = 'shortest_first',
+                         reroute_all: bool = False,
+                         present_factor: float = 0.5,
+                         present_growth: float = 1.5,
+                         history_factor: float = 1.0) -> Dict:
+        """
+        多層協商擁塞路由（PathFinder）
+
+        所有未走線的連接同時在全部層上協商資源，每次迭代拆除並重走擁塞的網路，
+        直到沒有格子被多條網路共用。同名網路的連接可以共用格子。
+
+        Args:
+            max_iterations: 最大迭代次數
+            via_cost: 過孔成本（以網格步數計）
+            order: 網路排序方式
+                   ('shortest_first', 'longest_first', 'most_congested', 'insertion')
+            reroute_all: 每次迭代重走全部網路（否則只重走擁塞的網路）
+            present_factor: 初始擁塞成本係數
+            present_growth: 擁塞成本係數每次迭代的倍增率
+            history_factor: 歷史成本累加係數
+
+        Returns:
+            路由結果字典（另含每次迭代的完成率與耗時）
+        """
+        from .algorithms.pathfinder import NegotiatedCongestionRouter
+
+        print(f"開始使用 pathfinder 演算法進行走線（{self.layers} 層）...")
+
+        pending = [i for i, conn in enumerate(self.connections) if not conn['routed']]
+        requests = []
+        for i in pending:
+            conn = self.connections[i]
+            requests.append({
+                'start': self._to_grid_coords(conn['start']),
+                'end': self._to_grid_coords(conn['end']),
+                'layer': conn['layer'],
+                'net': conn['net_name'],
+            })
+
+        negotiator = NegotiatedCongestionRouter(
+            self.grids,
+            via_cost=via_cost,
+            present_factor=present_factor,
+            present_growth=present_growth,
+            history_factor=history_factor
+        )
+        outcome = negotiator.route(requests, max_iterations=max_iterations,
+                                   order=order, reroute_all=reroute_all)
+
+        routed_count = sum(1 for conn in self.connections if conn['routed'])
+        failed_connections = []
+        total_length = 0.0
+        via_count = 0
+
+        for i, path3d, legal in zip(pending, outcome['paths'], outcome['legal']):
+            if not legal:
+                failed_connections.append(i)
+                continue
+
+            conn = self.connections[i]
+            path, path_layers, vias = [], [], []
+            for x, y, layer in path3d:
+                if path and path[-1] == (x, y):
+                    vias.append((x, y, path_layers[-1], layer))
+                    path_layers[-1] = layer
+                    continue
+                path.append((x, y))
+                path_layers.append(layer)
+
+            conn['path'] = path
+            conn['path_layers'] = path_layers
+            conn['vias'] = vias
+            conn['routed'] = True
+            routed_count += 1
+            via_count += len(vias)
+            total_length += self._calculate_path_length(path)
+
+            for layer in range(self.layers):
+                self._mark_path_on_grid(
+                    [(x, y) for x, y, path_layer in path3d if path_layer == layer], layer)
+
+        success_rate = routed_count / len(self.connections) if self.connections else 0
+
+        result = {
+            'success_rate': success_rate,
+            'routed_count': routed_count,
+            'total_connections': len(self.connections),
+            'failed_connections': failed_connections,
+            'total_length': total_length,
+            'via_count': via_count,
+            'iterations': outcome['iterations'],
+            'converged': outcome['converged'],
+            'total_runtime': outcome['total_runtime'],
+            'algorithm': 'pathfinder'
+        }
+
+        print(f"走線完成: {routed_count}/{len(self.connections)} ({success_rate*100:.1f}%)")
+        print(f"總長度: {total_length:.2f} mm, 過孔: {via_count}, "
+              f"迭代: {len(outcome['iterations'])}, "
+              f"耗時: {outcome['total_runtime']:.2f} s")
 
         return result
 
-    def _route_astar(self, connection: Dict, **kwargs) -> Optional[List]:
+    def _route_astar(self, connection: Dict, heuristic=None,
+                     diagonal: bool = False, jump_point: bool = False,
+                     **kwargs) -> Optional[List]:
         """使用 A* 演算法進行路由"""
-        from .algorithms.astar import astar_search
+        from .algorithms.astar import resolve_heuristic
 
         start = self._to_grid_coords(connection['start'])
         end = self._to_grid_coords(connection['end'])
         layer = connection['layer']
 
-        path = astar_search(self.grids[layer], start, end, **kwargs)
+        searcher = self._get_astar_searcher(layer, diagonal)
+        path = searcher.search(start, end,
+                               heuristic=resolve_heuristic(heuristic),
+                               jump_point=jump_point)
         return path
 
+    def _get_astar_searcher(self, layer: int, diagonal: bool):
+        """取得（或建立）某層的 A* 搜尋器"""
+        from .algorithms.grid_astar import GridAStar
+
+        key = (layer, diagonal)
+        if key not in self._astar_cache:
+            self._astar_cache[key] = GridAStar(self.grids[layer], diagonal=diagonal)
+        return self._astar_cache[key]
+
     def _route_lee(self, connection: Dict, **kwargs) -> Optional[List]:
         """使用 Lee 演算法進行路由"""
         from .algorithms.lee import lee_router
@@ -245,6 +444,10 @@ class PCBRouter:
             if 0 <= y < self.grid_height and 0 <= x < self.grid_width:
                 self.grids[layer][y, x] = 2
 
+        for (cached_layer, _), searcher in self._astar_cache.items():
+            if cached_layer == layer:
+                searcher.set_cells(path, 2)
+
     def check_design_rules(self) -> List[Dict]:
         """
         檢查設計規則違規
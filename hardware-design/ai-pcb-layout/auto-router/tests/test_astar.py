@@ -0,0 +1,122 @@
+"""
+测试 A* 路由核心
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from algorithms.astar import astar_search, astar_search_reference
+from algorithms.grid_astar import GridAStar
+
+
+def _random_grid(rng, routed: bool):
+    h, w = rng.integers(5, 30, size=2)
+    grid = (rng.random((h, w)) < rng.uniform(0.0, 0.35)).astype(np.int8)
+    if routed:
+        grid[(rng.random((h, w)) < 0.1) & (grid == 0)] = 2
+    return grid
+
+
+def _assert_valid_path(grid, path, start, goal, diagonal):
+    assert path[0] == start and path[-1] == goal
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        assert max(abs(x2 - x1), abs(y2 - y1)) == 1
+        assert grid[y2, x2] != 1
+        if x1 != x2 and y1 != y2:
+            assert diagonal
+            assert grid[y1, x2] != 1 and grid[y2, x1] != 1
+
+
+def test_simple_path():
+    """测试基本路径搜寻"""
+    grid = np.zeros((10, 10), dtype=np.int8)
+    grid[2:8, 5] = 1
+
+    path = astar_search(grid, (0, 5), (9, 5))
+
+    assert path is not None
+    _assert_valid_path(grid, path, (0, 5), (9, 5), diagonal=False)
+    assert len(path) - 1 == 15
+
+
+def test_blocked_endpoints():
+    """测试起点或终点为障碍物时返回 None"""
+    grid = np.zeros((5, 5), dtype=np.int8)
+    grid[4, 4] = 1
+
+    assert astar_search(grid, (0, 0), (4, 4)) is None
+    assert astar_search(grid, (0, 0), (9, 9)) is None
+
+
+def test_unreachable():
+    """测试无法到达的终点"""
+    grid = np.zeros((5, 5), dtype=np.int8)
+    grid[:, 2] = 1
+
+    assert astar_search(grid, (0, 0), (4, 4)) is None
+    assert astar_search(grid, (0, 0), (4, 4), jump_point=True) is None
+
+
+@pytest.mark.parametrize("diagonal", [False, True])
+def test_matches_reference_cost(diagonal):
+    """测试与原始实作的路径成本一致（4 方向为最优解）"""
+    rng = np.random.default_rng(0)
+
+    for _ in range(50):
+        grid = _random_grid(rng, routed=True)
+        h, w = grid.shape
+        start = (int(rng.integers(w)), int(rng.integers(h)))
+        goal = (int(rng.integers(w)), int(rng.integers(h)))
+
+        searcher = GridAStar(grid, diagonal=diagonal)
+        heuristic = 'octile' if diagonal else 'manhattan'
+        path = searcher.search(start, goal, heuristic=heuristic)
+        reference = astar_search_reference(grid, start, goal, diagonal=diagonal)
+
+        assert (path is None) == (reference is None)
+        if path is None:
+            continue
+        _assert_valid_path(grid, path, start, goal, diagonal)
+        if not diagonal:
+            assert searcher.path_cost(path) == pytest.approx(
+                searcher.path_cost(reference))
+
+
+@pytest.mark.parametrize("diagonal", [False, True])
+@pytest.mark.parametrize("routed", [False, True])
+def test_jump_point_search_is_optimal(diagonal, routed):
+    """测试跳点搜寻与一般 A* 的路径成本相同"""
+    rng = np.random.default_rng(1)
+    heuristic = 'octile' if diagonal else 'manhattan'
+
+    for _ in range(100):
+        grid = _random_grid(rng, routed=routed)
+        h, w = grid.shape
+        start = (int(rng.integers(w)), int(rng.integers(h)))
+        goal = (int(rng.integers(w)), int(rng.integers(h)))
+
+        searcher = GridAStar(grid, diagonal=diagonal)
+        path = searcher.search(start, goal, heuristic=heuristic)
+        jps_path = searcher.search(start, goal, heuristic=heuristic, jump_point=True)
+
+        assert (path is None) == (jps_path is None)
+        if path is None:
+            continue
+        _assert_valid_path(grid, jps_path, start, goal, diagonal)
+        assert searcher.path_cost(jps_path) == pytest.approx(searcher.path_cost(path))
+
+
+def test_incremental_update():
+    """测试增量更新成本网格"""
+    grid = np.zeros((10, 10), dtype=np.int8)
+    searcher = GridAStar(grid)
+
+    before = searcher.search((0, 5), (9, 5), jump_point=True)
+    searcher.set_cells([(5, y) for y in range(10)], 1)
+    after = searcher.search((0, 5), (9, 5), jump_point=True)
+
+    assert len(before) == 10
+    assert after is None
@@ -0,0 +1,121 @@
+"""
+测试独立网路的平行走线排程
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pytest
+from src.parallel_router import (connection_region, partition_connections,
+                                 regions_overlap, route_in_parallel)
+from src.router import PCBRouter
+
+
+def test_connection_region_is_clipped_to_grid():
+    """测试区域外扩后裁切至网格范围"""
+    assert connection_region((2, 3), (10, 1), 4, 12, 20) == (0, 0, 12, 8)
+
+
+def test_partition_batches_are_disjoint_per_layer():
+    """测试同一批次内同层区域互不重叠"""
+    rng = np.random.default_rng(0)
+    regions, layers = [], []
+    for _ in range(60):
+        start = tuple(int(v) for v in rng.integers(0, 100, size=2))
+        end = tuple(int(v) for v in rng.integers(0, 100, size=2))
+        regions.append(connection_region(start, end, 2, 100, 100))
+        layers.append(int(rng.integers(0, 2)))
+
+    batches = partition_connections(regions, layers)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(60))
+    for batch in batches:
+        for a in batch:
+            for b in batch:
+                if a < b and layers[a] == layers[b]:
+                    assert not regions_overlap(regions[a], regions[b])
+
+
+def test_overlapping_regions_on_other_layer_share_batch():
+    """测试不同层的重叠区域可同批走线"""
+    regions = [(0, 0, 10, 10), (0, 0, 10, 10), (5, 5, 15, 15)]
+    assert partition_connections(regions, [0, 1, 0]) == [[0, 1], [2]]
+
+
+def test_route_in_parallel_paths_stay_in_window():
+    """测试平行走线的路径与视窗结果"""
+    grid = np.zeros((40, 40), dtype=np.int8)
+    grid[5, 0:8] = 1
+    requests = [
+        {'index': 0, 'start': (1, 1), 'end': (8, 8), 'layer': 0, 'margin': 2},
+        {'index': 1, 'start': (25, 25), 'end': (35, 30), 'layer': 0, 'margin': 2},
+    ]
+
+    result = route_in_parallel([grid], requests, workers=2)
+
+    assert result['batches'] == 1
+    assert result['fallback'] == []
+    assert grid.max() == 1  # 输入网格不被修改
+    for request in requests:
+        path = result['paths'][request['index']]
+        assert path[0] == request['start'] and path[-1] == request['end']
+        assert all(grid[y, x] != 1 for x, y in path)
+
+
+def test_blocked_window_falls_back_to_serial():
+    """测试视窗内无路径时交由序列走线"""
+    router = PCBRouter(board_size=(10, 10), grid_resolution=0.5, layers=1)
+    # 墙只在上方留缺口，视窗内无法绕过
+    router.add_obstacle(4.0, 0.0, 0.5, 9.0)
+    router.add_connection((2.0, 1.0), (7.0, 1.0))
+    router.add_connection((1.0, 9.5), (3.0, 9.5))
+
+    result = router.route(algorithm='astar', parallel=True, workers=2,
+                          region_margin=0.5)
+
+    assert result['success_rate'] == 1.0
+    assert result['serial_fallback'] >= 1
+    assert all(conn['routed'] for conn in router.connections)
+
+
+def test_parallel_matches_serial_completion():
+    """测试平行走线与序列走线完成率一致"""
+    def build():
+        router = PCBRouter(board_size=(40, 40), grid_resolution=0.5, layers=2)
+        router.add_obstacle(18, 0, 2, 30, layer=0)
+        for k in range(8):
+            y = 2 + 4.5 * k
+            router.add_connection((2, y), (14, y + 1), layer=0)
+            router.add_connection((24, y), (37, y + 1), layer=k % 2)
+        return router
+
+    serial = build().route(algorithm='astar')
+    parallel_router = build()
+    parallel = parallel_router.route(algorithm='astar', parallel=True, workers=2)
+
+    assert parallel['routed_count'] == serial['routed_count']
+    assert parallel['batches'] >= 1
+    for conn in parallel_router.connections:
+        for x, y in conn['path']:
+            assert parallel_router.grids[conn['layer']][y, x] == 2
+
+
+def test_pathfinder_rejects_parallel():
+    """测试 pathfinder 不支援平行走线"""
+    router = PCBRouter(board_size=(5, 5), grid_resolution=0.5, layers=2)
+    router.add_connection((0.5, 0.5), (4.0, 4.0))
+
+    with pytest.raises(ValueError):
+        router.route(algorithm='pathfinder', parallel=True)
+
+
+def test_parallel_rejects_unknown_search_arguments():
+    """测试平行走线拒绝无法传给工作行程的参数"""
+    router = PCBRouter(board_size=(10, 10), grid_resolution=0.5, layers=1)
+    router.add_connection((1.0, 1.0), (4.0, 4.0))
+    router.add_connection((6.0, 6.0), (9.0, 9.0))
+
+    with pytest.raises(TypeError):
+        router.route(algorithm='astar', parallel=True, workers=2, max_nodes=100)
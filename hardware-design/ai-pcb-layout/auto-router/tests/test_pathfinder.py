@@ -0,0 +1,90 @@
+"""
+测试 PathFinder 协商拥塞路由
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from algorithms.pathfinder import NegotiatedCongestionRouter
+
+
+def _crossing_connections():
+    # 两条在中心交叉的连接
+    return [
+        {'start': (0, 5), 'end': (10, 5), 'layer': 0, 'net': 'A'},
+        {'start': (5, 0), 'end': (5, 10), 'layer': 0, 'net': 'B'},
+    ]
+
+
+def test_two_layers_resolve_crossing_with_vias():
+    """测试双层板通过过孔解决交叉"""
+    grids = [np.zeros((11, 11), dtype=np.int8) for _ in range(2)]
+    router = NegotiatedCongestionRouter(grids, via_cost=2.0)
+
+    result = router.route(_crossing_connections(), verbose=False)
+
+    assert result['converged']
+    assert all(result['legal'])
+    cells = [set(path) for path in result['paths']]
+    assert not cells[0] & cells[1]
+    assert any(layer == 1 for path in result['paths'] for _, _, layer in path)
+    assert result['iterations'][-1]['completion_rate'] == 1.0
+
+
+def test_single_layer_crossing_cannot_converge():
+    """测试单层板无法解决交叉（一条必须失败）"""
+    grids = [np.zeros((11, 11), dtype=np.int8)]
+    router = NegotiatedCongestionRouter(grids)
+
+    result = router.route(_crossing_connections(), max_iterations=5, verbose=False)
+
+    assert not result['converged']
+    assert len(result['iterations']) == 5
+    assert not all(result['legal'])
+
+
+def test_same_net_may_share_cells():
+    """测试同一网路的连接可以共用格子"""
+    grids = [np.zeros((5, 11), dtype=np.int8)]
+    grids[0][[0, 1, 3, 4], 5] = 1
+    connections = [
+        {'start': (0, 2), 'end': (10, 2), 'layer': 0, 'net': 'GND'},
+        {'start': (0, 1), 'end': (10, 3), 'layer': 0, 'net': 'GND'},
+    ]
+    router = NegotiatedCongestionRouter(grids)
+
+    result = router.route(connections, verbose=False)
+
+    assert result['converged']
+
+
+@pytest.mark.parametrize("order", ['shortest_first', 'longest_first',
+                                   'most_congested', 'insertion'])
+def test_net_ordering(order):
+    """测试各种网路排序方式"""
+    grids = [np.zeros((11, 11), dtype=np.int8) for _ in range(2)]
+    router = NegotiatedCongestionRouter(grids, via_cost=2.0)
+
+    result = router.route(_crossing_connections(), order=order, verbose=False)
+
+    assert result['converged']
+
+
+def test_foreign_pins_are_obstacles():
+    """测试其他网路的接脚格子不会被占用"""
+    grids = [np.zeros((5, 11), dtype=np.int8)]
+    connections = [
+        {'start': (0, 2), 'end': (10, 2), 'layer': 0, 'net': 'A'},
+        {'start': (5, 2), 'end': (5, 4), 'layer': 0, 'net': 'B'},
+    ]
+    router = NegotiatedCongestionRouter(grids)
+
+    result = router.route(connections, max_iterations=1, verbose=False)
+
+    assert result['converged']
+    assert (5, 2, 0) not in result['paths'][0]
+    assert router.blocked.sum() == NegotiatedCongestionRouter(grids).blocked.sum()
+
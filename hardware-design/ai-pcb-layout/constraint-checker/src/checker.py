@@ -2,10 +2,19 @@
 PCB 設計規則檢查器主模組
 """
 
+import os
+import sys
 import numpy as np
 from typing import List, Dict, Tuple, Optional
 import yaml
 
+# 共用銅箔間距幾何核心（hardware-design/eda-automation/src/clearance.py）
+_SHARED_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           '..', '..', '..', 'eda-automation', 'src')
+if _SHARED_SRC not in sys.path:
+    sys.path.append(_SHARED_SRC)
+import clearance
+
 
 class PCBChecker:
     """PCB 設計規則檢查器"""
@@ -47,19 +56,21 @@ class PCBChecker:
             self.set_rules(flat_rules)
 
     def add_trace(self, start: Tuple[float, float], end: Tuple[float, float],
-                  width: float, layer: int = 0, net_class: str = 'signal'):
-        """添加走線"""
+                  width: float, layer: int = 0, net_class: str = 'signal',
+                  net: Optional[str] = None):
+        """添加走線（net 為網路名稱，同網路的物件之間不檢查間距）"""
         trace = {
             'start': start,
             'end': end,
             'width': width,
             'layer': layer,
-            'net_class': net_class
+            'net_class': net_class,
+            'net': net
         }
         self.traces.append(trace)
 
     def add_via(self, x: float, y: float, diameter: float, drill: float,
-                layer_start: int = 0, layer_end: int = 1):
+                layer_start: int = 0, layer_end: int = 1, net: Optional[str] = None):
         """添加過孔"""
         via = {
             'x': x,
@@ -67,10 +78,29 @@ class PCBChecker:
             'diameter': diameter,
             'drill': drill,
             'layer_start': layer_start,
-            'layer_end': layer_end
+            'layer_end': layer_end,
+            'net': net
         }
         self.vias.append(via)
 
+    def add_pad(self, x: float, y: float, width: float, height: float,
+                shape: str = 'rect', rotation: float = 0.0, layer: int = 0,
+                net: Optional[str] = None):
+        """添加焊盤（shape 為 'rect'、'circle' 或 'oval'，rotation 單位為度）"""
+        if shape not in ('rect', 'circle', 'oval'):
+            raise ValueError(f"未知焊盤形狀: {shape}")
+        pad = {
+            'x': x,
+            'y': y,
+            'width': width,
+            'height': height,
+            'shape': shape,
+            'rotation': rotation,
+            'layer': layer,
+            'net': net
+        }
+        self.pads.append(pad)
+
     def check_all(self) -> List[Dict]:
         """執行所有檢查"""
         violations = []
@@ -156,17 +186,66 @@ class PCBChecker:
 
         return violations
 
+    def _copper_shapes(self) -> Tuple['clearance.Shapes', List[Tuple[str, int]]]:
+        """
+        所有走線、過孔、焊盤的幾何
+
+        Returns:
+            (物件, 每個物件的 (種類, 索引))
+        """
+        net_ids = {}
+
+        def nets(objects):
+            # 未指定網路為 0（與所有物件都檢查）
+            return [0 if o['net'] is None else net_ids.setdefault(o['net'], len(net_ids) + 1)
+                    for o in objects]
+
+        traces, vias, pads = self.traces, self.vias, self.pads
+        trace_shapes = clearance.segment_shapes(
+            [t['start'] for t in traces], [t['end'] for t in traces],
+            [t['width'] for t in traces], [1 << t['layer'] for t in traces], nets(traces))
+        via_shapes = clearance.circle_shapes(
+            [v['x'] for v in vias], [v['y'] for v in vias], [v['diameter'] for v in vias],
+            [(2 << v['layer_end']) - (1 << v['layer_start']) for v in vias], nets(vias))
+        pad_shapes = clearance.pad_shapes(
+            [p['x'] for p in pads], [p['y'] for p in pads],
+            [p['width'] for p in pads], [p['height'] for p in pads], [p['rotation'] for p in pads],
+            [p['shape'] == 'circle' for p in pads], [p['shape'] == 'oval' for p in pads],
+            [1 << p['layer'] for p in pads], nets(pads))
+
+        owners = ([('trace', i) for i in range(len(traces))] +
+                  [('via', i) for i in range(len(vias))] +
+                  [('pad', i) for i in range(len(pads))])
+        return clearance.concat_shapes(trace_shapes, via_shapes, pad_shapes), owners
+
     def check_clearance(self) -> List[Dict]:
-        """檢查間距"""
+        """檢查間距（同層銅箔物件之間的最短距離）"""
         violations = []
-
-        # 檢查走線之間的間距
-        for i in range(len(self.traces)):
-            for j in range(i + 1, len(self.traces)):
-                # 簡化：只檢查同層的走線
-                if self.traces[i]['layer'] == self.traces[j]['layer']:
-                    # TODO: 實現精確的間距計算
-                    pass
+        if len(self.traces) + len(self.vias) + len(self.pads) < 2:
+            return violations
+
+        shapes, owners = self._copper_shapes()
+        spacing = self.rules['min_trace_spacing']
+        center = shapes.core.mean(axis=1)
+        names = {'trace': '走線', 'via': '過孔', 'pad': '焊盤'}
+
+        for i, j, gap, layer in zip(*clearance.find_violations(shapes, np.full((2, 2), spacing))):
+            # 未指定網路的物件相接時視為連接（例如走線接到過孔）
+            if gap <= 0 and (shapes.net[i] == 0 or shapes.net[j] == 0):
+                continue
+
+            (kind_i, index_i), (kind_j, index_j) = owners[i], owners[j]
+            label = f'{names[kind_i]} {index_i} 與 {names[kind_j]} {index_j} '
+            x, y = (center[i] + center[j]) / 2
+            violations.append({
+                'type': 'clearance',
+                'severity': 'error',
+                'description': (f'{label}短路 (第 {layer} 層)' if gap <= 0 else
+                                f'{label}間距 {gap:.3f}mm 小於最小值 {spacing:.3f}mm (第 {layer} 層)'),
+                'x': float(x),
+                'y': float(y),
+                'object_id': (owners[i], owners[j])
+            })
 
         return violations
 
@@ -0,0 +1,61 @@
+"""
+測試 PCBChecker 的間距檢查（共用 eda-automation 的幾何核心）
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from pathlib import Path
+
+import pytest
+import checker
+from checker import PCBChecker
+
+
+def test_uses_shared_clearance_module():
+    """測試間距幾何來自 eda-automation 的共用模組，而不是副本"""
+    shared = Path(__file__).resolve().parents[3] / 'eda-automation' / 'src' / 'clearance.py'
+
+    assert Path(checker.clearance.__file__).resolve() == shared
+    assert not (Path(__file__).resolve().parents[1] / 'src' / 'clearance.py').exists()
+
+
+def test_trace_spacing_violation():
+    """測試不同網路的平行走線間距不足時回報，距離為邊緣間距"""
+    pcb = PCBChecker()
+    pcb.add_trace((0, 0), (10, 0), 0.2, net='A')
+    pcb.add_trace((0, 0.3), (10, 0.3), 0.2, net='B')
+    pcb.add_trace((0, 5), (10, 5), 0.2, net='C')
+
+    violations = pcb.check_clearance()
+
+    assert len(violations) == 1
+    assert violations[0]['object_id'] == (('trace', 0), ('trace', 1))
+    assert '0.100mm' in violations[0]['description']
+    assert violations[0]['y'] == pytest.approx(0.15)
+
+
+def test_same_net_and_other_layer_are_ignored():
+    """測試同網路與不同層的物件不檢查"""
+    pcb = PCBChecker()
+    pcb.add_trace((0, 0), (10, 0), 0.2, net='A')
+    pcb.add_trace((0, 0.25), (10, 0.25), 0.2, net='A')
+    pcb.add_trace((0, 0.1), (10, 0.1), 0.2, layer=1, net='B')
+
+    assert pcb.check_clearance() == []
+
+
+def test_pad_via_short_and_unassigned_contact():
+    """測試不同網路相接為短路；未指定網路的物件相接視為連接"""
+    pcb = PCBChecker()
+    pcb.add_pad(0, 0, 1.0, 1.0, net='GND')
+    pcb.add_via(0.7, 0, 0.6, 0.3, net='VCC')
+    pcb.add_trace((5, 0), (8, 0), 0.2)
+    pcb.add_via(8, 0, 0.6, 0.3)
+
+    violations = pcb.check_clearance()
+
+    assert len(violations) == 1
+    assert set(violations[0]['object_id']) == {('pad', 0), ('via', 0)}
+    assert '短路' in violations[0]['description']
@@ -0,0 +1,88 @@
+"""
+增量與暫態熱分析示例
+
+展示：
+1. 熱源響應疊加：移動單一熱源時無需完整求解
+2. 熱啟動：以上一次溫度場作為迭代初值
+3. Crank–Nicolson 暫態分析：上電功率曲線
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import time
+import numpy as np
+from analyzer import ThermalAnalyzer
+
+
+def create_analyzer():
+    """建立測試電路板"""
+    analyzer = ThermalAnalyzer(board_size=(100, 80), resolution=1.0)
+    analyzer.add_heat_source(x=20, y=40, width=10, height=10,
+                             power=5.0, name="MOSFET_Q1")
+    analyzer.add_heat_source(x=50, y=50, width=8, height=8,
+                             power=3.0, name="Regulator_U1")
+    analyzer.add_heat_source(x=70, y=30, width=12, height=12,
+                             power=0.8, name="Inductor_L1")
+    return analyzer
+
+
+def superposition_placement_sweep(analyzer):
+    """掃描 MOSFET 位置，每次只計算新位置的響應"""
+    print("=" * 60)
+    print("響應疊加：掃描 MOSFET 位置")
+    print("=" * 60)
+
+    best = None
+    start = time.perf_counter()
+    for x in range(10, 80, 10):
+        for y in range(10, 60, 10):
+            analyzer.move_heat_source("MOSFET_Q1", x, y)
+            result = analyzer.analyze(method='superposition')
+            if best is None or result['max_temp'] < best[2]:
+                best = (x, y, result['max_temp'])
+    elapsed = time.perf_counter() - start
+
+    print(f"\n最佳位置: ({best[0]}, {best[1]}) mm, 最高溫度 {best[2]:.2f} °C")
+    print(f"掃描耗時: {elapsed:.3f} s")
+
+    analyzer.move_heat_source("MOSFET_Q1", best[0], best[1])
+    return best
+
+
+def warm_start_resolve(analyzer):
+    """修改功率後以熱啟動重新求解"""
+    print("\n" + "=" * 60)
+    print("熱啟動重新求解")
+    print("=" * 60)
+
+    analyzer.analyze(method='multigrid', convergence=1e-4)
+    analyzer.set_heat_source_power("Regulator_U1", 3.5)
+    return analyzer.analyze(method='multigrid', convergence=1e-4, warm_start=True)
+
+
+def power_up_transient(analyzer):
+    """MOSFET 於 60 秒內線性上電"""
+    print("\n" + "=" * 60)
+    print("暫態分析：上電過程")
+    print("=" * 60)
+
+    result = analyzer.analyze_transient(
+        duration=600.0,
+        time_step=2.0,
+        power_profile={"MOSFET_Q1": lambda t: min(t / 60.0, 1.0)},
+        save_every=50
+    )
+
+    for t, temp in zip(result['snapshot_times'], result['snapshots']):
+        print(f"  t = {t:6.0f} s: 最高溫度 {np.max(temp):.2f} °C")
+
+    return result
+
+
+if __name__ == "__main__":
+    analyzer = create_analyzer()
+    superposition_placement_sweep(analyzer)
+    warm_start_resolve(analyzer)
+    power_up_transient(analyzer)
@@ -0,0 +1,100 @@
+"""
+FDM 求解器收斂與效能基準
+
+比較各穩態求解器在不同網格解析度下的執行時間與誤差：
+1. gauss_seidel - 原始逐點 Gauss-Seidel
+2. sor          - 向量化紅黑 SOR
+3. multigrid    - 幾何多重網格 V-cycle
+4. direct       - 稀疏直接求解（作為參考解）
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import time
+import numpy as np
+from solvers.fdm_solver import fdm_steady_state, direct_steady_state
+
+
+BOARD_SIZE = (100.0, 80.0)   # mm
+THERMAL_CONDUCTIVITY = 0.3   # FR4
+CONVECTION_COEFF = 10.0
+AMBIENT_TEMP = 25.0
+
+
+def create_power_grid(resolution: float) -> np.ndarray:
+    """建立與電源模組範例相同的功率分布"""
+    h = int(BOARD_SIZE[1] / resolution)
+    w = int(BOARD_SIZE[0] / resolution)
+    grid = np.zeros((h, w))
+
+    sources = [
+        (20, 40, 10, 10, 5.0),
+        (50, 50, 8, 8, 3.0),
+        (70, 30, 12, 12, 0.8),
+        (35, 20, 5, 5, 1.2),
+    ]
+    for x, y, sw, sh, power in sources:
+        gx, gy = int(x / resolution), int(y / resolution)
+        gw, gh = int(sw / resolution), int(sh / resolution)
+        grid[gy:gy+gh, gx:gx+gw] += power / ((sw / 1000) * (sh / 1000))
+
+    return grid
+
+
+def run_solver(power_grid: np.ndarray, resolution: float, solver: str,
+               max_iterations: int, convergence: float):
+    """執行單一求解器並計時"""
+    start = time.perf_counter()
+    temp = fdm_steady_state(
+        power_grid=power_grid,
+        initial_temp=AMBIENT_TEMP,
+        thermal_conductivity=THERMAL_CONDUCTIVITY,
+        convection_coeff=CONVECTION_COEFF,
+        ambient_temp=AMBIENT_TEMP,
+        max_iterations=max_iterations,
+        convergence=convergence,
+        resolution=resolution,
+        solver=solver
+    )
+    return temp, time.perf_counter() - start
+
+
+def benchmark(resolutions=(2.0, 1.0, 0.5, 0.25), convergence: float = 1e-4,
+              gauss_seidel_max_grid: int = 100 * 80):
+    """執行基準測試並輸出結果表"""
+    print("=" * 72)
+    print(f"{'解析度':>8} {'網格':>12} {'求解器':>14} {'時間 (s)':>10} "
+          f"{'最大誤差 (°C)':>14}")
+    print("=" * 72)
+
+    for resolution in resolutions:
+        power_grid = create_power_grid(resolution)
+        shape = power_grid.shape
+
+        start = time.perf_counter()
+        reference = direct_steady_state(
+            power_grid, THERMAL_CONDUCTIVITY, CONVECTION_COEFF,
+            AMBIENT_TEMP, resolution
+        )
+        direct_time = time.perf_counter() - start
+
+        results = [('direct', direct_time, 0.0)]
+        for solver in ('multigrid', 'sor', 'gauss_seidel'):
+            if solver == 'gauss_seidel' and power_grid.size > gauss_seidel_max_grid:
+                continue
+            # Gauss-Seidel 僅執行原始預設的 1000 次迭代
+            max_iterations = 1000 if solver == 'gauss_seidel' else 100000
+            temp, elapsed = run_solver(power_grid, resolution, solver,
+                                       max_iterations, convergence)
+            results.append((solver, elapsed, float(np.max(np.abs(temp - reference)))))
+
+        for solver, elapsed, error in results:
+            print(f"{resolution:>8.2f} {shape[0]:>5}x{shape[1]:<6} {solver:>14} "
+                  f"{elapsed:>10.3f} {error:>14.4f}")
+        print("-" * 72)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -3,7 +3,8 @@ PCB 熱分析器主模組
 """
 
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple, Optional, Union
 try:
     from .materials import MaterialDatabase
 except ImportError:
@@ -55,6 +56,12 @@ class ThermalAnalyzer:
             'substrate_material': 'fr4'
         }
 
+        # 增量求解快取：LU 分解與各熱源的單位功率響應
+        self.max_cached_responses = 256
+        self._factorization = None
+        self._factorization_key = None
+        self._response_cache = OrderedDict()
+
     def add_heat_source(self, x: float, y: float,
                        width: float, height: float,
                        power: float,
@@ -81,8 +88,8 @@ class ThermalAnalyzer:
         # 更新功率網格
         self._update_power_grid(heat_source)
 
-    def _update_power_grid(self, heat_source: Dict):
-        """更新功率分布網格"""
+    def _update_power_grid(self, heat_source: Dict, sign: float = 1.0):
+        """更新功率分布網格（sign = -1 表示移除該熱源）"""
         # 轉換為網格座標
         grid_x = int(heat_source['x'] / self.resolution)
         grid_y = int(heat_source['y'] / self.resolution)
@@ -94,7 +101,62 @@ class ThermalAnalyzer:
         power_density = heat_source['power'] / area_m2 if area_m2 > 0 else 0
 
         # 分配到網格
-        self.power_grid[grid_y:grid_y+grid_h, grid_x:grid_x+grid_w] += power_density
+        self.power_grid[grid_y:grid_y+grid_h, grid_x:grid_x+grid_w] += sign * power_density
+
+    def _source_power_grid(self, heat_source: Dict,
+                           power: Optional[float] = None) -> np.ndarray:
+        """單一熱源的功率分布網格（power 為 None 時使用熱源本身的功率）"""
+        grid = np.zeros((self.grid_height, self.grid_width))
+
+        grid_x = int(heat_source['x'] / self.resolution)
+        grid_y = int(heat_source['y'] / self.resolution)
+        grid_w = int(heat_source['width'] / self.resolution)
+        grid_h = int(heat_source['height'] / self.resolution)
+
+        if power is None:
+            power = heat_source['power']
+        area_m2 = (heat_source['width'] / 1000) * (heat_source['height'] / 1000)
+        grid[grid_y:grid_y+grid_h, grid_x:grid_x+grid_w] = \
+            power / area_m2 if area_m2 > 0 else 0
+
+        return grid
+
+    def _find_heat_source(self, name: str) -> Dict:
+        """依名稱查找熱源"""
+        for heat_source in self.heat_sources:
+            if heat_source['name'] == name:
+                return heat_source
+        raise ValueError(f"未知熱源: {name}")
+
+    def move_heat_source(self, name: str, x: float, y: float):
+        """
+        移動熱源
+
+        僅更新該熱源在功率網格中的貢獻；搭配 analyze(method='superposition')
+        時，只有新位置的響應需要計算（已快取的位置不需求解）。
+
+        Args:
+            name: 熱源名稱
+            x, y: 新位置 (mm)
+        """
+        heat_source = self._find_heat_source(name)
+        self._update_power_grid(heat_source, sign=-1.0)
+        heat_source['x'] = x
+        heat_source['y'] = y
+        self._update_power_grid(heat_source)
+
+    def set_heat_source_power(self, name: str, power: float):
+        """
+        修改熱源功率
+
+        Args:
+            name: 熱源名稱
+            power: 新功率 (W)
+        """
+        heat_source = self._find_heat_source(name)
+        self._update_power_grid(heat_source, sign=-1.0)
+        heat_source['power'] = power
+        self._update_power_grid(heat_source)
 
     def set_boundary_conditions(self, ambient_temp: float = None,
                                 convection_coeff: float = None,
@@ -116,14 +178,19 @@ class ThermalAnalyzer:
 
     def analyze(self, method: str = 'fdm',
                 max_iterations: int = 1000,
-                convergence: float = 0.01) -> Dict:
+                convergence: float = 0.01,
+                warm_start: bool = False) -> Dict:
         """
         執行熱分析
 
         Args:
-            method: 分析方法 ('fdm', 'fem', 'ml')
+            method: 分析方法 ('fdm', 'sor', 'multigrid', 'direct',
+                    'gauss_seidel', 'superposition', 'fem', 'ml')；
+                    'fdm' 使用紅黑 SOR
             max_iterations: 最大迭代次數
             convergence: 收斂標準
+            warm_start: 以上一次分析的溫度場作為迭代初值
+                        （僅用於 'fdm'、'sor' 與 'multigrid'）
 
         Returns:
             分析結果字典
@@ -131,7 +198,14 @@ class ThermalAnalyzer:
         print(f"開始熱分析 (方法: {method})...")
 
         if method == 'fdm':
-            result_temp = self._analyze_fdm(max_iterations, convergence)
+            result_temp = self._analyze_fdm(max_iterations, convergence,
+                                            warm_start=warm_start)
+        elif method in ('sor', 'multigrid', 'direct', 'gauss_seidel'):
+            result_temp = self._analyze_fdm(max_iterations, convergence,
+                                            solver=method,
+                                            warm_start=warm_start)
+        elif method == 'superposition':
+            result_temp = self._analyze_superposition()
         elif method == 'fem':
             print("FEM 方法尚未實現，使用 FDM 替代")
             result_temp = self._analyze_fdm(max_iterations, convergence)
@@ -143,6 +217,10 @@ class ThermalAnalyzer:
         # 更新溫度網格
         self.temperature_grid = result_temp
 
+        return self._build_result(result_temp, method)
+
+    def _build_result(self, result_temp: np.ndarray, method: str) -> Dict:
+        """由溫度網格計算統計資訊並組成結果字典"""
         # 計算統計資訊
         max_temp = np.max(result_temp)
         min_temp = np.min(result_temp)
@@ -169,13 +247,17 @@ class ThermalAnalyzer:
 
         return result
 
-    def _analyze_fdm(self, max_iterations: int, convergence: float) -> np.ndarray:
+    def _analyze_fdm(self, max_iterations: int, convergence: float,
+                     solver: str = 'sor',
+                     warm_start: bool = False) -> np.ndarray:
         """
         使用有限差分法進行熱分析
 
         Args:
             max_iterations: 最大迭代次數
             convergence: 收斂標準
+            solver: 求解器 ('sor', 'multigrid', 'direct', 'gauss_seidel')
+            warm_start: 以目前的溫度網格作為迭代初值
 
         Returns:
             溫度網格
@@ -198,11 +280,168 @@ class ThermalAnalyzer:
             ambient_temp=self.boundary_conditions['ambient_temp'],
             max_iterations=max_iterations,
             convergence=convergence,
-            resolution=self.resolution
+            resolution=self.resolution,
+            solver=solver,
+            initial_grid=self.temperature_grid if warm_start else None
         )
 
         return temp_grid
 
+    def _get_factorization(self):
+        """
+        取得係數矩陣的 LU 分解
+
+        分解只與材料、對流係數及網格有關；這些參數改變時重新分解並清除響應快取。
+        """
+        try:
+            from .solvers.fdm_solver import factorize_fdm_system
+        except ImportError:
+            from solvers.fdm_solver import factorize_fdm_system
+
+        material = self.material_db.get_material(
+            self.boundary_conditions['substrate_material'])
+        key = (material['thermal_conductivity'],
+               self.boundary_conditions['convection_coeff'],
+               self.resolution,
+               self.power_grid.shape)
+
+        if self._factorization is None or self._factorization_key != key:
+            self._factorization = factorize_fdm_system(
+                shape=self.power_grid.shape,
+                thermal_conductivity=material['thermal_conductivity'],
+                convection_coeff=self.boundary_conditions['convection_coeff'],
+                resolution=self.resolution
+            )
+            self._factorization_key = key
+            self._response_cache.clear()
+
+        return self._factorization
+
+    def _analyze_superposition(self) -> np.ndarray:
+        """
+        以各熱源響應疊加求解穩態溫度
+
+        每個熱源位置的單位功率響應只計算一次（使用快取的 LU 分解），
+        之後修改功率或移回已計算過的位置都不需要再求解。
+
+        Returns:
+            溫度網格
+        """
+        try:
+            from .solvers.fdm_solver import source_response
+        except ImportError:
+            from solvers.fdm_solver import source_response
+
+        factorization = self._get_factorization()
+        material = self.material_db.get_material(
+            self.boundary_conditions['substrate_material'])
+
+        temp_grid = np.full(self.power_grid.shape,
+                            float(self.boundary_conditions['ambient_temp']))
+
+        for heat_source in self.heat_sources:
+            key = (heat_source['x'], heat_source['y'],
+                   heat_source['width'], heat_source['height'])
+            response = self._response_cache.get(key)
+
+            if response is None:
+                response = source_response(
+                    factorization,
+                    self._source_power_grid(heat_source, power=1.0),
+                    material['thermal_conductivity'],
+                    self.resolution
+                )
+                self._response_cache[key] = response
+                if len(self._response_cache) > self.max_cached_responses:
+                    self._response_cache.popitem(last=False)
+            else:
+                self._response_cache.move_to_end(key)
+
+            temp_grid += heat_source['power'] * response
+
+        return temp_grid
+
+    def analyze_transient(self, duration: float,
+                          time_step: float,
+                          power_profile: Optional[Union[Callable[[float], float],
+                                                        Dict[str, Callable[[float], float]]]] = None,
+                          theta: float = 0.5,
+                          save_every: int = 1,
+                          warm_start: bool = False) -> Dict:
+        """
+        暫態熱分析（Crank–Nicolson 時間步進）
+
+        Args:
+            duration: 模擬時間 (s)
+            time_step: 時間步長 (s)
+            power_profile: 功率曲線；可為函式 f(t) 回傳所有熱源共用的功率倍率，
+                           或 {熱源名稱: f(t)} 分別指定各熱源，None 表示功率恆定
+            theta: 時間積分權重（0.5 = Crank–Nicolson，1.0 = 隱式 Euler）
+            save_every: 每隔幾步保存一次溫度快照
+            warm_start: 以目前的溫度網格作為初始狀態（否則從環境溫度開始）
+
+        Returns:
+            分析結果字典（另含 'times'、'max_temp_history'、'snapshots'、
+            'snapshot_times'）
+        """
+        try:
+            from .solvers.fdm_solver import fdm_transient
+        except ImportError:
+            from solvers.fdm_solver import fdm_transient
+
+        print(f"開始暫態熱分析 (時間: {duration} s, 步長: {time_step} s)...")
+
+        material = self.material_db.get_material(
+            self.boundary_conditions['substrate_material'])
+
+        if power_profile is None:
+            def power_at(t):
+                return self.power_grid
+        elif callable(power_profile):
+            def power_at(t):
+                return self.power_grid * power_profile(t)
+        else:
+            source_grids = [(self._source_power_grid(hs),
+                             power_profile.get(hs['name']))
+                            for hs in self.heat_sources]
+
+            def power_at(t):
+                grid = np.zeros_like(self.power_grid)
+                for source_grid, profile in source_grids:
+                    grid += source_grid * (profile(t) if profile else 1.0)
+                return grid
+
+        if warm_start:
+            initial_temp = self.temperature_grid
+        else:
+            initial_temp = np.full(self.power_grid.shape,
+                                   float(self.boundary_conditions['ambient_temp']))
+
+        transient = fdm_transient(
+            power_at=power_at,
+            initial_temp=initial_temp,
+            thermal_conductivity=material['thermal_conductivity'],
+            convection_coeff=self.boundary_conditions['convection_coeff'],
+            ambient_temp=self.boundary_conditions['ambient_temp'],
+            density=material['density'],
+            specific_heat=material['specific_heat'],
+            duration=duration,
+            time_step=time_step,
+            resolution=self.resolution,
+            theta=theta,
+            save_every=save_every
+        )
+
+        self.temperature_grid = transient['temperature_grid']
+
+        result = self._build_result(transient['temperature_grid'], 'transient')
+        result['times'] = transient['times']
+        result['max_temp_history'] = transient['max_temp']
+        result['snapshots'] = transient['snapshots']
+        result['snapshot_times'] = transient['snapshot_times']
+
+        return result
+
     def _identify_hotspots(self, temp_grid: np.ndarray,
                           threshold: float = 60.0) -> List[Dict]:
         """
@@ -6,7 +6,7 @@ AI 驅動的電路性能優化和成本分析
 
 from .optimizer import CircuitOptimizer, OptimizationResult
 from .bom_optimizer import BOMOptimizer, Component, create_sample_bom
-from .component_selector import ComponentSelector, ComponentSpec, ComponentCategory, ComponentCandidate
+from .component_selector import ComponentSelector, ComponentSpec, ComponentCategory, ComponentCandidate, PartsStore
 from .multi_objective import MultiObjectiveOptimizer, OptimizationObjective, Individual
 from .power_analyzer import PowerAnalyzer, ComponentPower, PowerProfile, PowerMode
 from .ai_recommender import AIComponentRecommender, SmartDesignValidator, DesignAnomaly, DesignPattern
@@ -28,6 +28,7 @@ __all__ = [
     'ComponentSpec',
     'ComponentCategory',
     'ComponentCandidate',
+    'PartsStore',
 
     # 多目標優化
     'MultiObjectiveOptimizer',
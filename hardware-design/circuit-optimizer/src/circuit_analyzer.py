@@ -3,8 +3,9 @@
 提供电路仿真和频率响应分析功能
 """
 
-from typing import Dict, List, Tuple, Optional, Callable
+from typing import Dict, List, Tuple, Optional, Callable, Union
 from dataclasses import dataclass
+from itertools import product
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import signal
@@ -20,20 +21,75 @@ class TransferFunction:
     denominator: List[float]  # 分母系数
     name: str = "H(s)"
 
-    def evaluate(self, frequency: float) -> complex:
+    def evaluate(self, frequency: Union[float, np.ndarray]) -> Union[complex, np.ndarray]:
         """
         在给定频率评估传递函数
 
+        系数可以是数组：每个系数的形状为 (B,) 时表示 B 组参数，一次算出 (B, F) 的响应。
+
         Args:
-            frequency: 频率 (Hz)
+            frequency: 频率 (Hz)，标量或数组
 
         Returns:
-            复数增益
+            复数增益（标量输入返回标量，否则为数组；分母为零处为 0）
         """
-        s = 2j * np.pi * frequency
-        num = sum(c * s**i for i, c in enumerate(reversed(self.numerator)))
-        den = sum(c * s**i for i, c in enumerate(reversed(self.denominator)))
-        return num / den if den != 0 else 0
+        s = 2j * np.pi * np.asarray(frequency, dtype=float)
+        num = polyval_batch(self.numerator, s)
+        den = polyval_batch(self.denominator, s)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            H = np.where(den != 0, num / den, 0)
+        return complex(H) if H.ndim == 0 else H
+
+
+def polyval_batch(coefficients, s: np.ndarray) -> np.ndarray:
+    """
+    以 Horner 法计算多项式（最高次项在前，与 np.polyval 相同）
+
+    Args:
+        coefficients: 系数序列，每个系数为标量或形状 (B,) 的数组
+        s: 自变量数组，形状 (F,)
+
+    Returns:
+        系数皆为标量时形状同 s，否则为 (B, F)
+    """
+    s = np.asarray(s)
+    coefficients = [np.asarray(c, dtype=float) for c in coefficients]
+    if all(c.ndim == 0 for c in coefficients):
+        return np.polyval(coefficients, s)
+
+    result = np.zeros(1, dtype=complex)
+    for c in coefficients:
+        result = result * s + (c[..., None] if c.ndim else c)
+    return result
+
+
+# 电路拓扑：参数名、传递函数系数（最高次项在前）与特征量，参数皆可为数组
+CIRCUIT_TOPOLOGIES: Dict[str, Dict] = {
+    'rc_lowpass': {
+        'params': ('R', 'C'),
+        'transfer_function': lambda R, C: ([1.0], [R * C, 1.0]),
+        'metrics': lambda R, C: {'fc': 1 / (2 * np.pi * R * C)},
+    },
+    'rc_highpass': {
+        'params': ('R', 'C'),
+        'transfer_function': lambda R, C: ([R * C, 0.0], [R * C, 1.0]),
+        'metrics': lambda R, C: {'fc': 1 / (2 * np.pi * R * C)},
+    },
+    'rlc_bandpass': {
+        'params': ('R', 'L', 'C'),
+        'transfer_function': lambda R, L, C: ([R * C, 0.0], [L * C, R * C, 1.0]),
+        'metrics': lambda R, L, C: {
+            'f0': 1 / (2 * np.pi * np.sqrt(L * C)),
+            'Q': np.sqrt(L / C) / R,
+            'BW': R / (2 * np.pi * L),
+        },
+    },
+    'voltage_divider': {
+        'params': ('R1', 'R2'),
+        'transfer_function': lambda R1, R2: ([R2], [R1 + R2]),
+        'metrics': lambda R1, R2: {'ratio': R2 / (R1 + R2)},
+    },
+}
 
 
 class CircuitAnalyzer:
@@ -185,6 +241,213 @@ class CircuitAnalyzer:
             'transfer_function': H
         }
 
+    def transfer_function(self, circuit: str, params: Dict[str, Union[float, np.ndarray]]) -> TransferFunction:
+        """
+        建立电路的传递函数
+
+        Args:
+            circuit: 电路类型（CIRCUIT_TOPOLOGIES 的键）
+            params: 元件参数，数组参数表示一批电路
+
+        Returns:
+            传递函数（批量参数时系数为数组）
+        """
+        topology = self._topology(circuit)
+        missing = [name for name in topology['params'] if name not in params]
+        if missing:
+            raise ValueError(f"缺少元件参数: {', '.join(missing)}")
+
+        values = [np.asarray(params[name], dtype=float) for name in topology['params']]
+        numerator, denominator = topology['transfer_function'](*values)
+        return TransferFunction(list(numerator), list(denominator), name=circuit)
+
+    def sweep_batch(
+        self,
+        circuit: str,
+        params: Dict[str, Union[float, np.ndarray]],
+        frequencies: np.ndarray
+    ) -> Dict:
+        """
+        对多组元件参数一次完成频率扫描
+
+        Args:
+            circuit: 电路类型
+            params: 元件参数，每个值为标量或形状 (B,) 的数组
+            frequencies: 频率点数组 (Hz)
+
+        Returns:
+            分析结果字典，响应数组形状为 (B, F)
+        """
+        frequencies = np.asarray(frequencies, dtype=float)
+        H = self.transfer_function(circuit, params).evaluate(frequencies)
+        H = np.atleast_2d(H)
+
+        magnitude = np.abs(H)
+        return {
+            'type': circuit,
+            'frequencies': frequencies,
+            'magnitude': magnitude,
+            'magnitude_db': 20 * np.log10(magnitude + 1e-10),
+            'phase': np.angle(H, deg=True),
+            'transfer_function': H
+        }
+
+    def monte_carlo(
+        self,
+        circuit: str,
+        nominal: Dict[str, float],
+        tolerances: Dict[str, float],
+        frequencies: Optional[np.ndarray] = None,
+        n_samples: int = 100000,
+        distribution: str = 'uniform',
+        seed: Optional[int] = None,
+        chunk_size: int = 10000
+    ) -> Dict:
+        """
+        元件容差的蒙地卡罗分析
+
+        所有样本的频率响应分块向量化计算，只保留每个频率点的统计量，
+        元件参数与特征量（截止频率、Q 等）则保留每个样本的值。
+
+        Args:
+            circuit: 电路类型
+            nominal: 元件标称值
+            tolerances: 元件相对容差（0.05 表示 ±5%），未列出的元件视为无误差
+            frequencies: 频率点数组 (Hz)，默认为标称特征频率上下两个数量级
+            n_samples: 样本数
+            distribution: 'uniform'（均匀分布于 ±容差）或 'normal'（容差为 3σ）
+            seed: 随机种子
+            chunk_size: 每次向量化计算的样本数
+
+        Returns:
+            分析结果字典
+        """
+        if distribution not in ('uniform', 'normal'):
+            raise ValueError(f"未知分布类型: {distribution}")
+
+        topology = self._topology(circuit)
+        if frequencies is None:
+            frequencies = self._default_frequencies(topology, nominal)
+        frequencies = np.asarray(frequencies, dtype=float)
+
+        rng = np.random.default_rng(seed)
+        samples = {}
+        for name in topology['params']:
+            tolerance = tolerances.get(name, 0.0)
+            if distribution == 'uniform':
+                deviation = rng.uniform(-tolerance, tolerance, n_samples)
+            else:
+                deviation = rng.normal(0.0, tolerance / 3, n_samples)
+            samples[name] = nominal[name] * (1 + deviation)
+
+        # 分块计算频率响应，以 Chan 合并公式累计平均值与方差
+        count = 0
+        mean = np.zeros(len(frequencies))
+        m2 = np.zeros(len(frequencies))
+        low = np.full(len(frequencies), np.inf)
+        high = np.full(len(frequencies), -np.inf)
+        for start in range(0, n_samples, chunk_size):
+            chunk = {name: values[start:start + chunk_size] for name, values in samples.items()}
+            magnitude_db = self.sweep_batch(circuit, chunk, frequencies)['magnitude_db']
+
+            n = len(magnitude_db)
+            chunk_mean = magnitude_db.mean(axis=0)
+            delta = chunk_mean - mean
+            total = count + n
+            mean += delta * n / total
+            m2 += ((magnitude_db - chunk_mean) ** 2).sum(axis=0) + delta ** 2 * count * n / total
+            count = total
+            low = np.minimum(low, magnitude_db.min(axis=0))
+            high = np.maximum(high, magnitude_db.max(axis=0))
+
+        metrics = topology['metrics'](*(samples[name] for name in topology['params']))
+        nominal_result = self.sweep_batch(circuit, nominal, frequencies)
+
+        return {
+            'type': circuit,
+            'n_samples': n_samples,
+            'distribution': distribution,
+            'frequencies': frequencies,
+            'samples': samples,
+            'nominal_db': nominal_result['magnitude_db'][0],
+            'mean_db': mean,
+            'std_db': np.sqrt(m2 / max(count - 1, 1)),
+            'min_db': low,
+            'max_db': high,
+            'metrics': metrics,
+            'metric_stats': {name: self._statistics(values) for name, values in metrics.items()}
+        }
+
+    def corner_analysis(
+        self,
+        circuit: str,
+        nominal: Dict[str, float],
+        tolerances: Dict[str, float],
+        frequencies: Optional[np.ndarray] = None
+    ) -> Dict:
+        """
+        元件容差的极限（corner）分析：所有元件取 ±容差的全部组合一次计算
+
+        Args:
+            circuit: 电路类型
+            nominal: 元件标称值
+            tolerances: 元件相对容差
+            frequencies: 频率点数组 (Hz)
+
+        Returns:
+            分析结果字典，corners 为每个组合各元件的偏差符号
+        """
+        topology = self._topology(circuit)
+        if frequencies is None:
+            frequencies = self._default_frequencies(topology, nominal)
+
+        names = [name for name in topology['params'] if tolerances.get(name, 0.0)]
+        corners = np.array(list(product((-1, 1), repeat=len(names))), dtype=float).reshape(-1, len(names))
+        params = {name: np.full(len(corners), float(nominal[name])) for name in topology['params']}
+        for k, name in enumerate(names):
+            params[name] *= 1 + corners[:, k] * tolerances[name]
+
+        result = self.sweep_batch(circuit, params, frequencies)
+        metrics = topology['metrics'](*(params[name] for name in topology['params']))
+        result.update({
+            'corners': corners,
+            'corner_params': names,
+            'params': params,
+            'min_db': result['magnitude_db'].min(axis=0),
+            'max_db': result['magnitude_db'].max(axis=0),
+            'metrics': metrics,
+            'metric_range': {name: (float(values.min()), float(values.max())) for name, values in metrics.items()}
+        })
+        return result
+
+    def _topology(self, circuit: str) -> Dict:
+        """取得电路拓扑定义"""
+        if circuit not in CIRCUIT_TOPOLOGIES:
+            raise ValueError(f"未知电路类型: {circuit}")
+        return CIRCUIT_TOPOLOGIES[circuit]
+
+    def _default_frequencies(self, topology: Dict, nominal: Dict[str, float], n_points: int = 200) -> np.ndarray:
+        """以标称特征频率为中心，上下两个数量级"""
+        metrics = topology['metrics'](*(np.asarray(nominal[name], dtype=float) for name in topology['params']))
+        center = metrics.get('fc', metrics.get('f0'))
+        if center is None:
+            return np.logspace(0, 6, n_points)
+        return np.logspace(np.log10(center / 100), np.log10(center * 100), n_points)
+
+    @staticmethod
+    def _statistics(values: np.ndarray) -> Dict:
+        """样本统计量"""
+        p1, p50, p99 = np.percentile(values, [1, 50, 99])
+        return {
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'p1': float(p1),
+            'p50': float(p50),
+            'p99': float(p99)
+        }
+
     def analyze_voltage_divider(
         self,
         R1: float,
@@ -3,7 +3,8 @@
 基於需求規格推薦最適合的電子元件
 """
 
-from typing import List, Dict, Optional, Tuple
+from collections.abc import Sequence
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
@@ -57,20 +58,391 @@ class ComponentCandidate:
         return f"{self.part_number} (Score: {self.score:.2f}, ${self.unit_price})"
 
 
+# 依零件編號關鍵字判斷類別（依序比對，先符合者優先）
+CATEGORY_KEYWORDS: Dict[ComponentCategory, List[str]] = {
+    ComponentCategory.RESISTOR: ['RES', 'RESISTOR'],
+    ComponentCategory.CAPACITOR: ['CAP', 'CAPACITOR'],
+    ComponentCategory.IC: ['AMS', 'LM', 'STM', 'TI'],
+}
+# 各關鍵字類別在 keyword_mask 欄位中的位元（零件編號可同時符合多個類別）
+KEYWORD_BITS: Dict[ComponentCategory, int] = {cat: 1 << i for i, cat in enumerate(CATEGORY_KEYWORDS)}
+
+NUMERIC_FIELDS = ('value', 'voltage_rating', 'current_rating', 'power_rating',
+                  'tolerance', 'unit_price', 'availability')
+TEXT_FIELDS = ('part_number', 'manufacturer', 'description', 'package')
+INDEXED_FIELDS = ('value', 'tolerance', 'voltage_rating', 'unit_price')
+
+
+class PartsPartition:
+    """單一類別的欄式元件表，並對關鍵參數維護排序索引"""
+
+    def __init__(self):
+        """初始化空的分割區"""
+        self._pending: List[Dict[str, np.ndarray]] = []
+        self.columns: Dict[str, np.ndarray] = {}
+        self.sorted_rows: Dict[str, np.ndarray] = {}
+        self.sorted_values: Dict[str, np.ndarray] = {}
+        self.package_names = np.array([], dtype=object)
+        self.package_codes = np.array([], dtype=np.int64)
+        self.keyword_bits = 0  # 分割區內所有列 keyword_mask 的聯集
+
+    def __len__(self) -> int:
+        self._build()
+        return len(self.columns.get('sequence', ()))
+
+    def append(self, columns: Dict[str, np.ndarray]) -> None:
+        """加入一批元件（下次查詢時才合併並重建索引）"""
+        self._pending.append(columns)
+        self.keyword_bits |= int(np.bitwise_or.reduce(columns['keyword_mask'], initial=0))
+
+    def _build(self) -> None:
+        """合併待加入的元件並重建排序索引"""
+        if not self._pending:
+            return
+
+        chunks = ([self.columns] if self.columns else []) + self._pending
+        self._pending = []
+        self.columns = {name: np.concatenate([chunk[name] for chunk in chunks])
+                        for name in chunks[0]}
+
+        for name in INDEXED_FIELDS:
+            order = np.argsort(self.columns[name], kind='stable')
+            self.sorted_rows[name] = order
+            self.sorted_values[name] = self.columns[name][order]
+
+        self.package_names, self.package_codes = np.unique(
+            self.columns['package'].astype(str), return_inverse=True)
+
+    def range_rows(
+        self,
+        field: str,
+        low: Optional[float] = None,
+        high: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        以排序索引查詢 low <= 欄位值 <= high 的列
+
+        Args:
+            field: 索引欄位（INDEXED_FIELDS 之一）
+            low: 下限（None 表示不限）
+            high: 上限（None 表示不限）
+
+        Returns:
+            列編號陣列（依欄位值排序）
+        """
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"欄位沒有索引: {field}")
+
+        self._build()
+        values = self.sorted_values.get(field, np.array([]))
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+        return self.sorted_rows.get(field, np.array([], dtype=np.int64))[start:stop]
+
+    def search(
+        self,
+        ranges: Dict[str, Tuple[Optional[float], Optional[float]]],
+        package: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        多欄位範圍查詢
+
+        從命中列數最少的索引欄位取出候選列，其餘條件以向量化遮罩過濾。
+
+        Args:
+            ranges: 欄位 -> (下限, 上限)，任一端可為 None
+            package: 封裝（None 表示不限）
+
+        Returns:
+            符合的列編號（依列編號排序）
+        """
+        self._build()
+        if not self.columns:
+            return np.array([], dtype=np.int64)
+
+        indexed = [name for name in ranges if name in INDEXED_FIELDS]
+        if indexed:
+            slices = [self.range_rows(name, *ranges[name]) for name in indexed]
+            rows = np.sort(min(slices, key=len))
+        else:
+            rows = np.arange(len(self.columns['sequence']))
+
+        mask = np.ones(len(rows), dtype=bool)
+        for name, (low, high) in ranges.items():
+            values = self.columns[name][rows]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        if package is not None:
+            mask &= self.package_codes[rows] == self.package_code(package)
+        return rows[mask]
+
+    def package_code(self, package: str) -> int:
+        """封裝名稱的編碼，不存在時為 -1"""
+        self._build()
+        i = np.searchsorted(self.package_names, package)
+        return int(i) if i < len(self.package_names) and self.package_names[i] == package else -1
+
+    def candidate(self, row: int, score: float = 0.0) -> ComponentCandidate:
+        """將一列轉為候選元件物件"""
+        self._build()
+        fields = {name: self.columns[name][row].item() for name in NUMERIC_FIELDS}
+        fields.update({name: self.columns[name][row] for name in TEXT_FIELDS})
+        return ComponentCandidate(score=float(score), **fields)
+
+
+class PartsStore:
+    """依類別分割的欄式元件資料庫"""
+
+    def __init__(self):
+        """初始化空的資料庫"""
+        self.partitions: Dict[ComponentCategory, PartsPartition] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(
+        self,
+        components: List[ComponentCandidate],
+        category: Optional[ComponentCategory] = None
+    ) -> None:
+        """
+        加入元件物件
+
+        Args:
+            components: 元件列表
+            category: 元件類別（None 表示依零件編號判斷）
+        """
+        if not components:
+            return
+        columns = {name: [getattr(c, name) for c in components] for name in NUMERIC_FIELDS + TEXT_FIELDS}
+        self.add_columns(columns, category)
+
+    def add_columns(
+        self,
+        columns: Dict[str, List],
+        category: Optional[ComponentCategory] = None
+    ) -> None:
+        """
+        以欄位陣列批次加入元件（適合載入大型經銷商目錄）
+
+        Args:
+            columns: 欄位名稱 -> 值序列，需包含 NUMERIC_FIELDS 與 TEXT_FIELDS
+            category: 元件類別（None 表示依零件編號判斷）
+        """
+        missing = [name for name in NUMERIC_FIELDS + TEXT_FIELDS if name not in columns]
+        if missing:
+            raise ValueError(f"缺少欄位: {', '.join(missing)}")
+
+        data = {}
+        for name in NUMERIC_FIELDS:
+            values = np.asarray(columns[name])
+            data[name] = values if values.dtype.kind in 'iuf' else values.astype(float)
+        data.update({name: np.asarray(columns[name], dtype=object) for name in TEXT_FIELDS})
+        n = len(data['part_number'])
+        data['sequence'] = np.arange(self._size, self._size + n)
+        self._size += n
+
+        categories, data['keyword_mask'] = self._classify(data['part_number'])
+        if category is not None:
+            categories = np.full(n, category, dtype=object)
+            data['keyword_mask'] |= KEYWORD_BITS.get(category, 0)
+
+        for cat in dict.fromkeys(categories.tolist()):
+            selected = categories == cat
+            part = {name: values[selected] for name, values in data.items()}
+            self.partitions.setdefault(cat, PartsPartition()).append(part)
+
+    def load_catalog(
+        self,
+        filepath: str,
+        category: Optional[ComponentCategory] = None
+    ) -> int:
+        """
+        從 CSV 載入元件目錄（欄位名稱同 ComponentCandidate）
+
+        Args:
+            filepath: CSV 檔案路徑
+            category: 元件類別（None 表示依零件編號判斷）
+
+        Returns:
+            載入的元件數量
+        """
+        import pandas as pd
+
+        df = pd.read_csv(filepath, dtype={name: str for name in TEXT_FIELDS})
+        for name in TEXT_FIELDS:
+            df[name] = df[name].fillna('') if name in df else ''
+        self.add_columns({name: df[name].to_numpy() for name in NUMERIC_FIELDS + TEXT_FIELDS}, category)
+        return len(df)
+
+    def partitions_for(self, category: ComponentCategory) -> List[PartsPartition]:
+        """
+        查詢類別可能涉及的分割區
+
+        有關鍵字規則的類別查詢含有符合該類別列的分割區（列還需以 keyword_mask 過濾），
+        其他類別（包括 OTHER）與原本的關鍵字比對一樣查詢全部元件。
+        """
+        if category in KEYWORD_BITS:
+            bit = KEYWORD_BITS[category]
+            return [partition for partition in self.partitions.values() if partition.keyword_bits & bit]
+        return list(self.partitions.values())
+
+    def _classify(self, part_numbers: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        依零件編號關鍵字判斷類別
+
+        Returns:
+            (分割區類別：第一個符合的關鍵字類別或 OTHER, 所有符合類別的位元遮罩)
+        """
+        upper = np.char.upper(part_numbers.astype(str))
+        categories = np.full(len(upper), ComponentCategory.OTHER, dtype=object)
+        masks = np.zeros(len(upper), dtype=np.int64)
+        for cat, keywords in CATEGORY_KEYWORDS.items():
+            matched = np.zeros(len(upper), dtype=bool)
+            for keyword in keywords:
+                matched |= np.char.find(upper, keyword) >= 0
+            categories[matched & (masks == 0)] = cat
+            masks[matched] |= KEYWORD_BITS[cat]
+        return categories, masks
+
+
+class ComponentDatabaseView(Sequence):
+    """
+    component_database 的相容視圖
+
+    依加入順序讀取資料庫中的元件，元件只在存取時才建立；
+    append / extend / += 轉給 add_components，其他修改串列的操作拋出 TypeError。
+    加入順序的索引在資料庫改變前只建立一次（O(N)）。
+    """
+
+    def __init__(self, selector: 'ComponentSelector'):
+        """初始化視圖"""
+        self._selector = selector
+        self._key = None
+        self._partitions: List[PartsPartition] = []
+        self._owner = np.array([], dtype=np.int64)
+        self._row = np.array([], dtype=np.int64)
+
+    def _index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """加入順序 -> (分割區編號, 分割區內的列)"""
+        parts = self._selector.parts
+        key = (id(parts), len(parts))
+        if key != self._key:
+            self._partitions = list(parts.partitions.values())
+            self._owner = np.empty(len(parts), dtype=np.int64)
+            self._row = np.empty(len(parts), dtype=np.int64)
+            for k, partition in enumerate(self._partitions):
+                sequence = partition.columns['sequence'] if len(partition) else ()
+                self._owner[sequence] = k
+                self._row[sequence] = np.arange(len(sequence))
+            self._key = key
+        return self._owner, self._row
+
+    def __len__(self) -> int:
+        return len(self._selector.parts)
+
+    def __getitem__(self, index: Union[int, slice]):
+        owner, row = self._index()
+        if isinstance(index, slice):
+            return [self._partitions[k].candidate(r)
+                    for k, r in zip(owner[index].tolist(), row[index].tolist())]
+        return self._partitions[owner[index]].candidate(int(row[index]))
+
+    def __iter__(self) -> Iterator[ComponentCandidate]:
+        owner, row = self._index()
+        for k, r in zip(owner.tolist(), row.tolist()):
+            yield self._partitions[k].candidate(r)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, ComponentDatabaseView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ComponentDatabaseView({len(self)} 個元件)"
+
+    def append(self, component: ComponentCandidate) -> None:
+        """加入一個元件（同 add_components）"""
+        self._selector.add_components([component])
+
+    def extend(self, components: Iterable[ComponentCandidate]) -> None:
+        """加入多個元件（同 add_components）"""
+        self._selector.add_components(list(components))
+
+    def __iadd__(self, components: Iterable[ComponentCandidate]) -> 'ComponentDatabaseView':
+        self.extend(components)
+        return self
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("component_database 只能加入元件，請使用 add_components；"
+                        "其他修改請重新指定整個資料庫")
+
+    __setitem__ = __delitem__ = insert = remove = pop = clear = sort = reverse = _read_only
+
+
 class ComponentSelector:
     """元件選擇器"""
 
     def __init__(self):
         """初始化選擇器"""
-        self.component_database: List[ComponentCandidate] = []
+        self.parts = PartsStore()
+        self._database_view = ComponentDatabaseView(self)
         self._load_default_database()
 
+    @property
+    def component_database(self) -> ComponentDatabaseView:
+        """
+        資料庫中所有元件（依加入順序）
+
+        為唯讀的序列視圖：append / extend 會加入資料庫，
+        指定新的串列會以該串列重建資料庫。
+        """
+        return self._database_view
+
+    @component_database.setter
+    def component_database(self, components: Iterable[ComponentCandidate]) -> None:
+        components = list(components)
+        self.parts = PartsStore()
+        self.parts.add(components)
+
+    def add_components(
+        self,
+        components: List[ComponentCandidate],
+        category: Optional[ComponentCategory] = None
+    ) -> None:
+        """
+        加入元件
+
+        Args:
+            components: 元件列表
+            category: 元件類別（None 表示依零件編號判斷）
+        """
+        self.parts.add(components, category)
+
+    def load_catalog(self, filepath: str, category: Optional[ComponentCategory] = None) -> int:
+        """
+        從 CSV 載入經銷商元件目錄
+
+        Args:
+            filepath: CSV 檔案路徑
+            category: 元件類別（None 表示依零件編號判斷）
+
+        Returns:
+            載入的元件數量
+        """
+        return self.parts.load_catalog(filepath, category)
+
     def _load_default_database(self) -> None:
         """載入預設元件資料庫"""
+        components = []
+
         # 電阻資料庫
         resistor_values = [100, 220, 330, 470, 1000, 2200, 4700, 10000, 22000, 47000, 100000]
         for value in resistor_values:
-            self.component_database.append(ComponentCandidate(
+            components.append(ComponentCandidate(
                 part_number=f"RES-0805-{value}",
                 manufacturer="Yageo",
                 description=f"Resistor {value}Ω 1% 0805",
@@ -87,7 +459,7 @@ class ComponentSelector:
         # 電容資料庫
         capacitor_values = [1e-12, 10e-12, 100e-12, 1e-9, 10e-9, 100e-9, 1e-6, 10e-6, 100e-6]
         for value in capacitor_values:
-            self.component_database.append(ComponentCandidate(
+            components.append(ComponentCandidate(
                 part_number=f"CAP-0805-{self._format_capacitance(value)}",
                 manufacturer="Murata",
                 description=f"Capacitor {self._format_capacitance(value)} 50V X7R 0805",
@@ -104,7 +476,7 @@ class ComponentSelector:
         # LDO 穩壓器
         ldo_voltages = [1.8, 3.3, 5.0]
         for voltage in ldo_voltages:
-            self.component_database.append(ComponentCandidate(
+            components.append(ComponentCandidate(
                 part_number=f"AMS1117-{voltage}",
                 manufacturer="Advanced Monolithic Systems",
                 description=f"LDO Regulator {voltage}V 1A",
@@ -118,6 +490,8 @@ class ComponentSelector:
                 availability=1.0
             ))
 
+        self.add_components(components)
+
     def _format_capacitance(self, value: float) -> str:
         """格式化電容值為可讀字串"""
         if value >= 1e-6:
@@ -130,131 +504,138 @@ class ComponentSelector:
     def select_component(
         self,
         spec: ComponentSpec,
-        sort_by: str = 'score'
+        sort_by: str = 'score',
+        limit: Optional[int] = None
     ) -> List[ComponentCandidate]:
         """
         根據規格選擇元件
 
+        有關鍵字規則的類別只查詢含有該類別元件的分割區，其他類別查詢全部元件；
+        以排序索引取出滿足下限的列後向量化計分。
+        回傳的是新建的候選元件物件，不會修改資料庫。
+
         Args:
             spec: 元件規格要求
             sort_by: 排序依據 ('score', 'price', 'availability')
+            limit: 最多回傳的數量（None 表示全部）
 
         Returns:
             候選元件列表，按匹配度排序
         """
-        candidates = []
-
-        for component in self.component_database:
-            # 檢查基本匹配
-            if not self._matches_category(component, spec):
-                continue
-
-            # 計算匹配分數
-            score = self._calculate_match_score(component, spec)
-            if score > 0:
-                component.score = score
-                candidates.append(component)
-
-        # 排序
-        if sort_by == 'score':
-            candidates.sort(key=lambda c: c.score, reverse=True)
-        elif sort_by == 'price':
-            candidates.sort(key=lambda c: c.unit_price)
-        elif sort_by == 'availability':
-            candidates.sort(key=lambda c: c.availability, reverse=True)
-
-        return candidates
-
-    def _matches_category(
-        self,
-        component: ComponentCandidate,
-        spec: ComponentSpec
-    ) -> bool:
-        """檢查元件是否符合類別"""
-        # 簡單的關鍵字匹配
-        category_keywords = {
-            ComponentCategory.RESISTOR: ['RES', 'RESISTOR'],
-            ComponentCategory.CAPACITOR: ['CAP', 'CAPACITOR'],
-            ComponentCategory.IC: ['AMS', 'LM', 'STM', 'TI'],
+        # 額定值皆為下限要求
+        minimums = {
+            'value': spec.value,
+            'voltage_rating': spec.voltage_rating,
+            'current_rating': spec.current_rating,
+            'power_rating': spec.power_rating,
         }
+        ranges = {name: (low, None) for name, low in minimums.items() if low is not None}
+
+        bit = KEYWORD_BITS.get(spec.category, 0)
+        partitions, part_index, part_rows, part_scores = [], [], [], []
+        for partition in self.parts.partitions_for(spec.category):
+            rows = partition.search(ranges)
+            if bit:
+                rows = rows[(partition.columns['keyword_mask'][rows] & bit) != 0]
+            scores = self._calculate_match_scores(partition, rows, spec)
+            keep = scores > 0
+            part_index.append(np.full(int(keep.sum()), len(partitions)))
+            part_rows.append(rows[keep])
+            part_scores.append(scores[keep])
+            partitions.append(partition)
+        if not partitions:
+            return []
+
+        index = np.concatenate(part_index)
+        rows = np.concatenate(part_rows)
+        scores = np.concatenate(part_scores)
+
+        def column(name):
+            return np.concatenate([p.columns[name][r] for p, r in zip(partitions, part_rows)])
+
+        sequence = column('sequence')
+
+        keys = {
+            'score': lambda: -scores,
+            'price': lambda: column('unit_price'),
+            'availability': lambda: -column('availability'),
+        }
+        # 同分時依加入資料庫的順序；未知排序依據時不排序
+        key = keys[sort_by]() if sort_by in keys else np.zeros(len(rows))
+        if limit is not None and limit < len(rows):
+            threshold = np.partition(key, limit - 1)[limit - 1]
+            subset = np.flatnonzero(key <= threshold)
+            order = subset[np.lexsort((sequence[subset], key[subset]))][:limit]
+        else:
+            order = np.lexsort((sequence, key))
 
-        if spec.category in category_keywords:
-            keywords = category_keywords[spec.category]
-            return any(kw in component.part_number.upper() for kw in keywords)
-
-        return True
+        return [partitions[index[i]].candidate(rows[i], scores[i]) for i in order.tolist()]
 
-    def _calculate_match_score(
+    def _calculate_match_scores(
         self,
-        component: ComponentCandidate,
+        partition: PartsPartition,
+        rows: np.ndarray,
         spec: ComponentSpec
-    ) -> float:
+    ) -> np.ndarray:
         """
-        計算元件與規格的匹配分數
+        計算元件與規格的匹配分數（向量化）
 
         Args:
-            component: 候選元件
+            partition: 元件分割區
+            rows: 要計分的列編號
             spec: 需求規格
 
         Returns:
-            匹配分數 (0-100)
+            匹配分數陣列 (0-100+)，不符合基本要求者為 0
         """
-        score = 100.0
-
-        # 檢查值匹配
-        if spec.value is not None:
-            if component.value < spec.value:
-                return 0  # 不符合基本要求
-            # 值越接近越好
-            value_ratio = component.value / spec.value
-            if value_ratio > 1.5:
-                score -= 20  # 值過大扣分
-
-        # 檢查電壓等級
-        if spec.voltage_rating is not None:
-            if component.voltage_rating < spec.voltage_rating:
-                return 0  # 不符合基本要求
-            # 電壓餘裕適中最好
-            voltage_margin = component.voltage_rating / spec.voltage_rating
-            if voltage_margin < 1.5:
-                score -= 10  # 餘裕不足
-            elif voltage_margin > 3:
-                score -= 5   # 過度設計
-
-        # 檢查電流等級
-        if spec.current_rating is not None:
-            if component.current_rating < spec.current_rating:
-                return 0
-            current_ratio = component.current_rating / spec.current_rating
-            if current_ratio > 2:
-                score -= 5
-
-        # 檢查功率等級
-        if spec.power_rating is not None:
-            if component.power_rating < spec.power_rating:
-                return 0
-            power_ratio = component.power_rating / spec.power_rating
-            if power_ratio > 2:
-                score -= 5
-
-        # 檢查封裝
-        if spec.package is not None:
-            if component.package != spec.package:
-                score -= 15
-
-        # 檢查成本
-        if spec.max_cost is not None:
-            if component.unit_price > spec.max_cost:
-                score -= 30
-            else:
-                # 成本越低越好
-                cost_ratio = component.unit_price / spec.max_cost
-                score += (1 - cost_ratio) * 10
+        def column(name):
+            return partition.columns[name][rows]
+
+        score = np.full(len(rows), 100.0)
+        ok = np.ones(len(rows), dtype=bool)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # 檢查值匹配：值越接近越好
+            if spec.value is not None:
+                value = column('value')
+                ok &= value >= spec.value
+                score -= 20 * (value / spec.value > 1.5)  # 值過大扣分
+
+            # 檢查電壓等級：電壓餘裕適中最好
+            if spec.voltage_rating is not None:
+                voltage = column('voltage_rating')
+                ok &= voltage >= spec.voltage_rating
+                margin = voltage / spec.voltage_rating
+                score -= 10 * (margin < 1.5)  # 餘裕不足
+                score -= 5 * (margin > 3)     # 過度設計
+
+            # 檢查電流等級
+            if spec.current_rating is not None:
+                current = column('current_rating')
+                ok &= current >= spec.current_rating
+                score -= 5 * (current / spec.current_rating > 2)
+
+            # 檢查功率等級
+            if spec.power_rating is not None:
+                power = column('power_rating')
+                ok &= power >= spec.power_rating
+                score -= 5 * (power / spec.power_rating > 2)
+
+            # 檢查封裝
+            if spec.package is not None:
+                score -= 15 * (partition.package_codes[rows] != partition.package_code(spec.package))
+
+            # 檢查成本：成本越低越好
+            if spec.max_cost is not None:
+                price = column('unit_price')
+                over = price > spec.max_cost
+                score -= 30 * over
+                score += np.where(over, 0.0, (1 - price / spec.max_cost) * 10)
 
         # 可用性加分
-        score += component.availability * 10
+        score += column('availability') * 10
 
-        return max(0, score)
+        return np.where(ok, np.maximum(score, 0), 0.0)
 
     def recommend_resistor(
         self,
@@ -5,9 +5,10 @@
 
 from typing import List, Dict, Callable, Tuple, Optional
 from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Executor, ProcessPoolExecutor
 import numpy as np
 from scipy.optimize import differential_evolution, minimize
-import random
 
 
 @dataclass
@@ -17,6 +18,7 @@ class OptimizationObjective:
     weight: float  # 權重 (用於加權求和法)
     minimize: bool  # True 為最小化，False 為最大化
     eval_func: Callable  # 評估函數
+    vectorized: bool = False  # eval_func 是否一次評估整個種群
 
 
 @dataclass
@@ -32,6 +34,167 @@ class Individual:
         return f"Individual({obj_str})"
 
 
+class _MinFront:
+    """兩個目標的前沿：只需記錄第二目標最小的成員（同值時取最先加入者）"""
+
+    __slots__ = ('f1', 'f2')
+
+    def __init__(self, point):
+        self.f1, self.f2 = point[0], point[1]
+
+    def dominates(self, point) -> bool:
+        return self.f2 < point[1] or (self.f2 == point[1] and self.f1 < point[0])
+
+    def add(self, point) -> None:
+        if point[1] < self.f2:
+            self.f1, self.f2 = point[0], point[1]
+
+
+class _StaircaseFront:
+    """
+    三個目標的前沿：成員在後兩個目標上的階梯（第二目標遞增、第三目標嚴格遞減），
+    並記錄每一階最先加入者的第一目標
+    """
+
+    __slots__ = ('f1', 'f2', 'f3')
+
+    def __init__(self, point):
+        self.f1, self.f2, self.f3 = [point[0]], [point[1]], [point[2]]
+
+    def dominates(self, point) -> bool:
+        i = bisect_right(self.f2, point[1]) - 1
+        if i < 0:
+            return False
+        f3 = self.f3[i]
+        return f3 < point[2] or (f3 == point[2] and (self.f2[i] < point[1] or self.f1[i] < point[0]))
+
+    def add(self, point) -> None:
+        i = bisect_right(self.f2, point[1]) - 1
+        if i >= 0 and self.f3[i] <= point[2]:
+            return  # 已被階梯上的點涵蓋
+        lo = bisect_left(self.f2, point[1])
+        hi = lo
+        while hi < len(self.f3) and self.f3[hi] >= point[2]:
+            hi += 1
+        self.f1[lo:hi] = [point[0]]
+        self.f2[lo:hi] = [point[1]]
+        self.f3[lo:hi] = [point[2]]
+
+
+class _ArrayFront:
+    """四個以上目標的前沿：對所有成員向量化比較"""
+
+    __slots__ = ('points', 'size')
+
+    def __init__(self, point):
+        self.points = np.empty((16, len(point)))
+        self.points[0] = point
+        self.size = 1
+
+    def dominates(self, point) -> bool:
+        members = self.points[:self.size]
+        return bool(np.any(np.all(members <= point, axis=1) & np.any(members < point, axis=1)))
+
+    def add(self, point) -> None:
+        if self.size == len(self.points):
+            self.points = np.vstack([self.points, np.empty_like(self.points)])
+        self.points[self.size] = point
+        self.size += 1
+
+
+def non_dominated_ranks(F: np.ndarray) -> np.ndarray:
+    """
+    非支配排序（所有目標皆最小化）
+
+    依字典序排序後逐一加入前沿（ENS-BS）：排在後面的解不可能支配前面的解，
+    而「被第 k 層的某個成員支配」對 k 單調，因此以二分搜尋找出第一個沒有成員支配它的前沿。
+    兩個目標時每次查詢 O(1)、三個目標時 O(log n)，整體 O(N log N)；
+    更多目標時對前沿成員向量化比較。
+
+    Args:
+        F: (N, M) 目標矩陣
+
+    Returns:
+        (N,) 前沿編號（0 為 Pareto 前沿）
+    """
+    F = np.asarray(F, dtype=float)
+    n, m = F.shape
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if m == 1:
+        return np.unique(F[:, 0], return_inverse=True)[1].astype(np.int64)
+
+    front_type = _MinFront if m == 2 else _StaircaseFront if m == 3 else _ArrayFront
+    points = F.tolist() if m <= 3 else F  # 純量比較時 Python float 較快
+    ranks = np.empty(n, dtype=np.int64)
+    fronts = []
+
+    for index in np.lexsort(F.T[::-1]):
+        point = points[index]
+        lo, hi = 0, len(fronts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if fronts[mid].dominates(point):
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(fronts):
+            fronts.append(front_type(point))
+        else:
+            fronts[lo].add(point)
+        ranks[index] = lo
+
+    return ranks
+
+
+def crowding_distances(F: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """
+    擁擠距離（每個前沿分別計算，所有前沿一次向量化完成）
+
+    Args:
+        F: (N, M) 目標矩陣
+        ranks: (N,) 前沿編號
+
+    Returns:
+        (N,) 擁擠距離，前沿在任一目標上的邊界個體為無窮大
+    """
+    F = np.asarray(F, dtype=float)
+    n, m = F.shape
+    distance = np.zeros(n)
+    boundary = np.zeros(n, dtype=bool)
+    if n == 0:
+        return distance
+
+    for k in range(m):
+        order = np.lexsort((F[:, k], ranks))
+        sorted_ranks = ranks[order]
+        values = F[order, k]
+
+        change = sorted_ranks[1:] != sorted_ranks[:-1]
+        first = np.concatenate([[True], change])
+        last = np.concatenate([change, [True]])
+        group = np.cumsum(first) - 1
+        span = (values[last] - values[first])[group]
+
+        gap = np.zeros(n)
+        gap[1:-1] = values[2:] - values[:-2]
+        inner = ~(first | last) & (span > 0)
+        distance[order[inner]] += gap[inner] / span[inner]
+        boundary[order[first | last]] = True
+
+    distance[boundary] = np.inf
+    return distance
+
+
+def _evaluate_rows(funcs: List[Callable], X: np.ndarray) -> np.ndarray:
+    """逐個體計算目標值（在工作程序中執行）"""
+    values = np.empty((len(X), len(funcs)))
+    for i, genes in enumerate(X.tolist()):
+        for k, func in enumerate(funcs):
+            values[i, k] = func(genes)
+    return values
+
+
 class MultiObjectiveOptimizer:
     """多目標優化器"""
 
@@ -39,6 +202,7 @@ class MultiObjectiveOptimizer:
         """初始化優化器"""
         self.objectives: List[OptimizationObjective] = []
         self.constraints: List[Callable] = []
+        self.vectorized_constraints: List[Callable] = []
         self.parameter_bounds: List[Tuple[float, float]] = []
         self.population: List[Individual] = []
 
@@ -47,7 +211,8 @@ class MultiObjectiveOptimizer:
         name: str,
         eval_func: Callable,
         minimize: bool = True,
-        weight: float = 1.0
+        weight: float = 1.0,
+        vectorized: bool = False
     ) -> None:
         """
         添加優化目標
@@ -57,18 +222,24 @@ class MultiObjectiveOptimizer:
             eval_func: 評估函數，輸入參數列表，返回目標值
             minimize: 是否最小化
             weight: 權重
+            vectorized: eval_func 是否可一次評估整個種群：輸入形狀 (參數數, 個體數) 的陣列
+                （`R, C = params` 的寫法不需修改），返回長度為個體數的陣列
         """
-        objective = OptimizationObjective(name, weight, minimize, eval_func)
+        objective = OptimizationObjective(name, weight, minimize, eval_func, vectorized)
         self.objectives.append(objective)
 
-    def add_constraint(self, constraint_func: Callable) -> None:
+    def add_constraint(self, constraint_func: Callable, vectorized: bool = False) -> None:
         """
         添加約束條件
 
         Args:
             constraint_func: 約束函數，返回 True 表示滿足約束
+            vectorized: 是否可一次檢查整個種群（輸入同 add_objective，返回布林陣列）
         """
-        self.constraints.append(constraint_func)
+        if vectorized:
+            self.vectorized_constraints.append(constraint_func)
+        else:
+            self.constraints.append(constraint_func)
 
     def set_parameter_bounds(self, bounds: List[Tuple[float, float]]) -> None:
         """
@@ -104,8 +275,61 @@ class MultiObjectiveOptimizer:
         Returns:
             是否滿足所有約束
         """
+        if self.vectorized_constraints and not self.feasible(np.asarray(genes, dtype=float)[None, :])[0]:
+            return False
         return all(constraint(genes) for constraint in self.constraints)
 
+    def feasible(self, X: np.ndarray) -> np.ndarray:
+        """
+        檢查種群中每個解是否滿足所有約束
+
+        Args:
+            X: (N, D) 參數矩陣
+
+        Returns:
+            (N,) 布林陣列
+        """
+        ok = np.ones(len(X), dtype=bool)
+        for constraint in self.vectorized_constraints:
+            ok &= np.asarray(constraint(X.T), dtype=bool)
+        if self.constraints:
+            ok &= np.array([all(c(genes) for c in self.constraints) for genes in X.tolist()], dtype=bool)
+        return ok
+
+    def evaluate_population(self, X: np.ndarray, pool: Optional[Executor] = None) -> np.ndarray:
+        """
+        評估整個種群
+
+        向量化目標一次計算；其餘目標逐個體計算，提供 pool 時分塊交給工作程序
+        （目標函數需可 pickle，例如模組層級的函數）。
+
+        Args:
+            X: (N, D) 參數矩陣
+            pool: 進程池
+
+        Returns:
+            (N, M) 目標矩陣（最大化目標已取負值）
+        """
+        F = np.empty((len(X), len(self.objectives)))
+        scalar = []
+        for k, obj in enumerate(self.objectives):
+            if obj.vectorized:
+                F[:, k] = obj.eval_func(X.T)
+            else:
+                scalar.append(k)
+
+        if scalar and len(X):
+            funcs = [self.objectives[k].eval_func for k in scalar]
+            if pool is not None:
+                chunks = np.array_split(X, min(len(X), 4 * getattr(pool, '_max_workers', 1)))
+                values = np.vstack(list(pool.map(_evaluate_rows, [funcs] * len(chunks), chunks)))
+            else:
+                values = _evaluate_rows(funcs, X)
+            F[:, scalar] = values
+
+        signs = np.array([1.0 if obj.minimize else -1.0 for obj in self.objectives])
+        return F * signs
+
     def weighted_sum_optimization(self) -> Individual:
         """
         使用加權求和法進行優化
@@ -159,6 +383,11 @@ class MultiObjectiveOptimizer:
 
         return better_in_any
 
+    def _objective_matrix(self, population: List[Individual]) -> np.ndarray:
+        """個體列表的目標矩陣（欄位依第一個個體的目標順序）"""
+        names = list(population[0].objectives)
+        return np.array([[ind.objectives[name] for name in names] for ind in population], dtype=float)
+
     def fast_non_dominated_sort(self, population: List[Individual]) -> List[List[Individual]]:
         """
         快速非支配排序（NSGA-II）
@@ -169,43 +398,14 @@ class MultiObjectiveOptimizer:
         Returns:
             分層的前沿面列表
         """
-        fronts = [[]]
-        domination_count = {}  # 支配個體的計數
-        dominated_solutions = {}  # 被支配的解集合
-
-        for p in population:
-            domination_count[id(p)] = 0
-            dominated_solutions[id(p)] = []
-
-        # 計算支配關係
-        for i, p in enumerate(population):
-            for q in population[i+1:]:
-                if self.pareto_dominate(p, q):
-                    dominated_solutions[id(p)].append(q)
-                    domination_count[id(q)] += 1
-                elif self.pareto_dominate(q, p):
-                    dominated_solutions[id(q)].append(p)
-                    domination_count[id(p)] += 1
-
-            # 第一層前沿面
-            if domination_count[id(p)] == 0:
-                p.rank = 0
-                fronts[0].append(p)
-
-        # 構建其他層
-        i = 0
-        while fronts[i]:
-            next_front = []
-            for p in fronts[i]:
-                for q in dominated_solutions[id(p)]:
-                    domination_count[id(q)] -= 1
-                    if domination_count[id(q)] == 0:
-                        q.rank = i + 1
-                        next_front.append(q)
-            i += 1
-            if next_front:
-                fronts.append(next_front)
-
+        if not population:
+            return [[]]
+
+        ranks = non_dominated_ranks(self._objective_matrix(population))
+        fronts = [[] for _ in range(int(ranks.max()) + 1)]
+        for ind, rank in zip(population, ranks.tolist()):
+            ind.rank = rank
+            fronts[rank].append(ind)
         return fronts
 
     def calculate_crowding_distance(self, front: List[Individual]) -> None:
@@ -218,130 +418,117 @@ class MultiObjectiveOptimizer:
         if len(front) == 0:
             return
 
-        # 初始化
-        for ind in front:
-            ind.crowding_distance = 0
-
-        n_objectives = len(front[0].objectives)
-
-        for obj_name in front[0].objectives:
-            # 按目標值排序
-            front.sort(key=lambda x: x.objectives[obj_name])
-
-            # 邊界個體設為無窮大
-            front[0].crowding_distance = float('inf')
-            front[-1].crowding_distance = float('inf')
-
-            obj_min = front[0].objectives[obj_name]
-            obj_max = front[-1].objectives[obj_name]
-            obj_range = obj_max - obj_min
-
-            if obj_range == 0:
-                continue
-
-            # 計算中間個體的擁擠距離
-            for i in range(1, len(front) - 1):
-                distance = (front[i+1].objectives[obj_name] -
-                           front[i-1].objectives[obj_name]) / obj_range
-                front[i].crowding_distance += distance
+        F = self._objective_matrix(front)
+        for ind, distance in zip(front, crowding_distances(F, np.zeros(len(front), dtype=np.int64))):
+            ind.crowding_distance = float(distance)
 
     def nsga2_optimize(
         self,
         population_size: int = 100,
-        n_generations: int = 50
+        n_generations: int = 50,
+        mutation_rate: float = 0.1,
+        workers: Optional[int] = None,
+        seed: Optional[int] = None
     ) -> List[Individual]:
         """
         使用 NSGA-II 演算法進行多目標優化
 
+        種群以 NumPy 陣列表示，選擇、交叉、變異、排序與擁擠距離都是整個種群一次計算。
+
         Args:
             population_size: 種群大小
             n_generations: 世代數
+            mutation_rate: 每個基因的變異機率
+            workers: 非向量化目標的工作程序數（None 表示在目前程序計算）
+            seed: 隨機種子
 
         Returns:
             Pareto 最優解集
         """
-        # 初始化種群
-        population = []
-        for _ in range(population_size):
-            genes = [random.uniform(lb, ub) for lb, ub in self.parameter_bounds]
-            individual = Individual(genes=genes)
-            self.evaluate_individual(individual)
-            population.append(individual)
-
-        # 演化
-        for generation in range(n_generations):
-            # 非支配排序
-            fronts = self.fast_non_dominated_sort(population)
-
-            # 計算擁擠距離
-            for front in fronts:
-                self.calculate_crowding_distance(front)
-
-            # 選擇
-            offspring = []
-            while len(offspring) < population_size:
-                # 錦標賽選擇
-                parent1 = self._tournament_selection(population)
-                parent2 = self._tournament_selection(population)
-
-                # 交叉
-                child_genes = self._crossover(parent1.genes, parent2.genes)
-
-                # 變異
-                child_genes = self._mutate(child_genes)
-
-                # 創建子代
-                if self.check_constraints(child_genes):
-                    child = Individual(genes=child_genes)
-                    self.evaluate_individual(child)
-                    offspring.append(child)
-
-            # 合併父代和子代
-            population.extend(offspring)
-
-            # 選擇下一代
-            fronts = self.fast_non_dominated_sort(population)
-            new_population = []
-            for front in fronts:
-                if len(new_population) + len(front) <= population_size:
-                    new_population.extend(front)
-                else:
-                    # 按擁擠距離排序
-                    self.calculate_crowding_distance(front)
-                    front.sort(key=lambda x: x.crowding_distance, reverse=True)
-                    new_population.extend(front[:population_size - len(new_population)])
-                    break
-
-            population = new_population
+        rng = np.random.default_rng(seed)
+        lower, upper = np.array(self.parameter_bounds, dtype=float).T
+        pool = ProcessPoolExecutor(max_workers=workers) if workers and workers > 1 else None
+
+        try:
+            # 初始化種群
+            X = rng.uniform(lower, upper, size=(population_size, len(lower)))
+            F = self.evaluate_population(X, pool)
+            ranks = non_dominated_ranks(F)
+            crowding = crowding_distances(F, ranks)
+
+            # 演化
+            for generation in range(n_generations):
+                offspring = self._offspring(X, ranks, crowding, population_size, mutation_rate, rng)
+
+                # 合併父代和子代
+                X = np.vstack([X, offspring])
+                F = np.vstack([F, self.evaluate_population(offspring, pool)])
+
+                # 選擇下一代：依前沿排序，最後一個放不下的前沿依擁擠距離由大到小
+                ranks = non_dominated_ranks(F)
+                crowding = crowding_distances(F, ranks)
+                keep = np.lexsort((-crowding, ranks))[:population_size]
+                X, F, ranks = X[keep], F[keep], ranks[keep]
+                crowding = crowding_distances(F, ranks)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        names = [obj.name for obj in self.objectives]
+        self.population = [
+            Individual(genes=genes, objectives=dict(zip(names, values)), rank=rank, crowding_distance=distance)
+            for genes, values, rank, distance in zip(X.tolist(), F.tolist(), ranks.tolist(), crowding.tolist())
+        ]
 
         # 返回 Pareto 前沿
-        fronts = self.fast_non_dominated_sort(population)
-        return fronts[0] if fronts else []
+        return [ind for ind in self.population if ind.rank == 0]
 
-    def _tournament_selection(self, population: List[Individual]) -> Individual:
-        """錦標賽選擇"""
-        candidates = random.sample(population, min(3, len(population)))
+    def _offspring(
+        self,
+        X: np.ndarray,
+        ranks: np.ndarray,
+        crowding: np.ndarray,
+        count: int,
+        mutation_rate: float,
+        rng: np.random.Generator
+    ) -> np.ndarray:
+        """產生滿足約束的子代"""
+        children = []
+        found = 0
+        while found < count:
+            parents1 = self._tournament_selection(ranks, crowding, count, rng)
+            parents2 = self._tournament_selection(ranks, crowding, count, rng)
+            genes = self._mutate(self._crossover(X[parents1], X[parents2], rng), mutation_rate, rng)
+            genes = genes[self.feasible(genes)]
+            children.append(genes)
+            found += len(genes)
+        return np.vstack(children)[:count]
+
+    def _tournament_selection(
+        self,
+        ranks: np.ndarray,
+        crowding: np.ndarray,
+        count: int,
+        rng: np.random.Generator,
+        size: int = 3
+    ) -> np.ndarray:
+        """錦標賽選擇，回傳 count 個勝出者的索引"""
+        n = len(ranks)
         # 選擇 rank 最小（更好）的，若相同則選擇 crowding_distance 最大的
-        return min(candidates, key=lambda x: (x.rank, -x.crowding_distance))
-
-    def _crossover(self, genes1: List[float], genes2: List[float]) -> List[float]:
-        """模擬二進制交叉（SBX）"""
-        child_genes = []
-        for i in range(len(genes1)):
-            if random.random() < 0.5:
-                child_genes.append(genes1[i])
-            else:
-                child_genes.append(genes2[i])
-        return child_genes
-
-    def _mutate(self, genes: List[float], mutation_rate: float = 0.1) -> List[float]:
-        """多項式變異"""
-        mutated = genes.copy()
-        for i in range(len(mutated)):
-            if random.random() < mutation_rate:
-                lb, ub = self.parameter_bounds[i]
-                mutated[i] = random.uniform(lb, ub)
-        return mutated
+        position = np.empty(n, dtype=np.int64)
+        position[np.lexsort((-crowding, ranks))] = np.arange(n)
+        candidates = rng.integers(0, n, size=(count, min(size, n)))
+        return candidates[np.arange(count), np.argmin(position[candidates], axis=1)]
+
+    def _crossover(self, genes1: np.ndarray, genes2: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """均勻交叉：每個基因各有一半機率來自任一父代"""
+        return np.where(rng.random(genes1.shape) < 0.5, genes1, genes2)
+
+    def _mutate(self, genes: np.ndarray, mutation_rate: float, rng: np.random.Generator) -> np.ndarray:
+        """隨機重設變異：被選中的基因在範圍內重新均勻取樣"""
+        lower, upper = np.array(self.parameter_bounds, dtype=float).T
+        mutate = rng.random(genes.shape) < mutation_rate
+        return np.where(mutate, rng.uniform(lower, upper, size=genes.shape), genes)
 
 
 def demonstrate_multi_objective():
@@ -0,0 +1,118 @@
+"""
+測試批量頻率響應、蒙地卡羅與極限分析與逐頻率純量計算一致
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import math
+
+import numpy as np
+import pytest
+
+pytest.importorskip('matplotlib')
+from circuit_analyzer import CircuitAnalyzer, TransferFunction
+
+
+# 各電路的純量傳遞函數 H(jω)
+SCALAR_RESPONSES = {
+    'rc_lowpass': lambda f, R, C: 1 / (1 + 2j * math.pi * f * R * C),
+    'rc_highpass': lambda f, R, C: (2j * math.pi * f * R * C) / (1 + 2j * math.pi * f * R * C),
+    'rlc_bandpass': lambda f, R, L, C: (
+        (2j * math.pi * f * R * C) /
+        (1 - (2 * math.pi * f) ** 2 * L * C + 2j * math.pi * f * R * C)),
+    'voltage_divider': lambda f, R1, R2: complex(R2 / (R1 + R2)),
+}
+
+NOMINALS = {
+    'rc_lowpass': {'R': 1e3, 'C': 100e-9},
+    'rc_highpass': {'R': 4.7e3, 'C': 10e-9},
+    'rlc_bandpass': {'R': 10.0, 'L': 1e-3, 'C': 1e-6},
+    'voltage_divider': {'R1': 10e3, 'R2': 4.7e3},
+}
+
+
+def _scalar_db(circuit, params, frequencies):
+    """逐頻率以純量計算一組參數的增益 (dB)"""
+    response = SCALAR_RESPONSES[circuit]
+    return np.array([20 * math.log10(abs(response(f, **params)) + 1e-10) for f in frequencies])
+
+
+def _sample_params(samples, k):
+    return {name: float(values[k]) for name, values in samples.items()}
+
+
+def test_evaluate_batch_matches_scalar():
+    """測試陣列係數的傳遞函數與逐組純量計算一致"""
+    R = np.array([1e3, 2.2e3, 4.7e3])
+    C = np.array([1e-9, 10e-9, 100e-9])
+    frequencies = np.logspace(1, 6, 25)
+
+    H = TransferFunction([1.0], [R * C, 1.0]).evaluate(frequencies)
+
+    assert H.shape == (3, 25)
+    for b in range(3):
+        scalar = TransferFunction([1.0], [R[b] * C[b], 1.0])
+        for j, f in enumerate(frequencies):
+            value = scalar.evaluate(f)
+            assert isinstance(value, complex)
+            assert value == pytest.approx(SCALAR_RESPONSES['rc_lowpass'](f, R[b], C[b]))
+            assert H[b, j] == pytest.approx(value)
+
+
+@pytest.mark.parametrize('circuit', sorted(SCALAR_RESPONSES))
+def test_monte_carlo_matches_scalar(circuit):
+    """測試分塊累計的統計量與逐樣本純量計算一致"""
+    analyzer = CircuitAnalyzer()
+    nominal = NOMINALS[circuit]
+    tolerances = {name: 0.1 for name in nominal}
+    frequencies = np.logspace(1, 6, 15)
+
+    result = analyzer.monte_carlo(circuit, nominal, tolerances, frequencies,
+                                  n_samples=300, seed=4, chunk_size=37)
+
+    reference = np.array([_scalar_db(circuit, _sample_params(result['samples'], k), frequencies)
+                          for k in range(300)])
+    np.testing.assert_allclose(result['mean_db'], reference.mean(axis=0), atol=1e-9)
+    np.testing.assert_allclose(result['std_db'], reference.std(axis=0, ddof=1), atol=1e-9)
+    np.testing.assert_allclose(result['min_db'], reference.min(axis=0), atol=1e-9)
+    np.testing.assert_allclose(result['max_db'], reference.max(axis=0), atol=1e-9)
+    np.testing.assert_allclose(result['nominal_db'], _scalar_db(circuit, nominal, frequencies), atol=1e-9)
+    for name, value in nominal.items():
+        assert np.all(np.abs(result['samples'][name] / value - 1) <= 0.1 + 1e-12)
+
+
+def test_monte_carlo_is_reproducible():
+    """測試相同種子得到相同樣本，分塊大小不影響結果"""
+    analyzer = CircuitAnalyzer()
+    args = ('rlc_bandpass', NOMINALS['rlc_bandpass'], {'R': 0.05, 'L': 0.1, 'C': 0.1})
+
+    a = analyzer.monte_carlo(*args, n_samples=500, seed=1, distribution='normal', chunk_size=64)
+    b = analyzer.monte_carlo(*args, n_samples=500, seed=1, distribution='normal', chunk_size=500)
+
+    np.testing.assert_array_equal(a['samples']['R'], b['samples']['R'])
+    np.testing.assert_allclose(a['mean_db'], b['mean_db'])
+    np.testing.assert_allclose(a['std_db'], b['std_db'])
+
+
+@pytest.mark.parametrize('circuit', sorted(SCALAR_RESPONSES))
+def test_corner_analysis_matches_scalar(circuit):
+    """測試每個極限組合的響應與純量計算一致"""
+    analyzer = CircuitAnalyzer()
+    nominal = NOMINALS[circuit]
+    names = list(nominal)
+    tolerances = {name: 0.05 * (k + 1) for k, name in enumerate(names)}
+    frequencies = np.logspace(1, 6, 15)
+
+    result = analyzer.corner_analysis(circuit, nominal, tolerances, frequencies)
+
+    assert result['corner_params'] == names
+    assert len(result['corners']) == 2 ** len(names)
+    reference = []
+    for k, signs in enumerate(result['corners']):
+        params = {name: nominal[name] * (1 + sign * tolerances[name]) for name, sign in zip(names, signs)}
+        reference.append(_scalar_db(circuit, params, frequencies))
+        np.testing.assert_allclose(result['magnitude_db'][k], reference[-1], atol=1e-9)
+    np.testing.assert_allclose(result['min_db'], np.min(reference, axis=0), atol=1e-9)
+    np.testing.assert_allclose(result['max_db'], np.max(reference, axis=0), atol=1e-9)
@@ -0,0 +1,184 @@
+"""
+測試元件選擇器與原本逐筆比對的結果一致
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from component_selector import (
+    ComponentSelector, ComponentSpec, ComponentCategory, ComponentCandidate
+)
+
+
+BASELINE_KEYWORDS = {
+    ComponentCategory.RESISTOR: ['RES', 'RESISTOR'],
+    ComponentCategory.CAPACITOR: ['CAP', 'CAPACITOR'],
+    ComponentCategory.IC: ['AMS', 'LM', 'STM', 'TI'],
+}
+
+
+def _baseline_score(component, spec):
+    # 原本的逐筆計分
+    score = 100.0
+    if spec.value is not None:
+        if component.value < spec.value:
+            return 0
+        if component.value / spec.value > 1.5:
+            score -= 20
+    if spec.voltage_rating is not None:
+        if component.voltage_rating < spec.voltage_rating:
+            return 0
+        margin = component.voltage_rating / spec.voltage_rating
+        if margin < 1.5:
+            score -= 10
+        elif margin > 3:
+            score -= 5
+    if spec.package is not None and component.package != spec.package:
+        score -= 15
+    if spec.max_cost is not None:
+        if component.unit_price > spec.max_cost:
+            score -= 30
+        else:
+            score += (1 - component.unit_price / spec.max_cost) * 10
+    score += component.availability * 10
+    return max(0, score)
+
+
+def _baseline_select(database, spec):
+    # 原本的 select_component：關鍵字類別以零件編號過濾，其他類別比對全部元件
+    candidates = []
+    for component in database:
+        keywords = BASELINE_KEYWORDS.get(spec.category)
+        if keywords and not any(kw in component.part_number.upper() for kw in keywords):
+            continue
+        score = _baseline_score(component, spec)
+        if score > 0:
+            candidates.append((score, component.part_number))
+    candidates.sort(key=lambda c: c[0], reverse=True)
+    return candidates
+
+
+@pytest.fixture
+def selector():
+    rng = np.random.default_rng(0)
+    prefixes = ['RES', 'CAP', 'LM', 'STM32', 'DIODE', 'XTAL', 'CAP-LM', 'HDR']
+    packages = ['0402', '0603', '0805', 'SOT-23']
+    components = [
+        ComponentCandidate(
+            part_number=f"{prefixes[i % len(prefixes)]}-{i:04d}",
+            manufacturer='Test',
+            description='',
+            value=float(rng.choice([10, 100, 1000, 10000])),
+            voltage_rating=float(rng.choice([5, 16, 25, 50])),
+            current_rating=1.0,
+            power_rating=0.25,
+            tolerance=0.05,
+            package=str(rng.choice(packages)),
+            unit_price=float(np.round(rng.uniform(0.001, 0.5), 3)),
+            availability=float(np.round(rng.uniform(0.5, 1.0), 2)),
+        )
+        for i in range(400)
+    ]
+    selector = ComponentSelector()
+    selector.add_components(components)
+    return selector
+
+
+@pytest.mark.parametrize('category', [
+    ComponentCategory.OTHER,
+    ComponentCategory.CRYSTAL,
+    ComponentCategory.RESISTOR,
+    ComponentCategory.CAPACITOR,
+    ComponentCategory.IC,
+])
+def test_select_matches_baseline(selector, category):
+    """測試各類別的候選元件與原本逐筆比對相同"""
+    spec = ComponentSpec(category=category, value=100, voltage_rating=16,
+                         package='0603', max_cost=0.2)
+    expected = _baseline_select(selector.component_database, spec)
+
+    result = selector.select_component(spec)
+
+    assert [c.part_number for c in result] == [name for _, name in expected]
+    assert [c.score for c in result] == pytest.approx([score for score, _ in expected])
+
+
+def test_other_category_searches_whole_catalog(selector):
+    """測試沒有關鍵字規則的類別查詢全部元件"""
+    result = selector.select_component(ComponentSpec(category=ComponentCategory.OTHER))
+
+    assert len(result) == len(selector.component_database)
+
+
+def test_multi_keyword_part_matches_each_category(selector):
+    """測試同時符合多個關鍵字類別的元件在各類別都查得到"""
+    for category in (ComponentCategory.CAPACITOR, ComponentCategory.IC):
+        names = [c.part_number for c in selector.select_component(ComponentSpec(category=category))]
+        assert 'CAP-LM-0006' in names
+
+
+def _part(part_number, value=1000.0):
+    return ComponentCandidate(part_number, 'Test', 'test part', value, 50, 0.1, 0.1,
+                              0.01, '0603', 0.01, 1000)
+
+
+def test_component_database_view_is_ordered_and_lazy():
+    """測試資料庫視圖依加入順序、支援索引與切片，且長度不需建立元件"""
+    selector = ComponentSelector()
+    selector.add_components([_part('CAP-X1'), _part('XTAL-1'), _part('RES-X1')])
+    database = selector.component_database
+
+    assert database is selector.component_database
+    assert len(database) == 26
+    names = [c.part_number for c in database]
+    assert names[-3:] == ['CAP-X1', 'XTAL-1', 'RES-X1']
+    assert database[-2].part_number == 'XTAL-1'
+    assert [c.part_number for c in database[-3::2]] == ['CAP-X1', 'RES-X1']
+    assert database == list(database)
+    with pytest.raises(IndexError):
+        database[26]
+
+
+def test_component_database_append_routes_to_add_components():
+    """測試 append / extend / += 加入資料庫並可被查詢"""
+    selector = ComponentSelector()
+    database = selector.component_database
+
+    database.append(_part('RES-NEW-1', value=123.0))
+    database.extend([_part('RES-NEW-2', value=124.0)])
+    database += [_part('RES-NEW-3', value=125.0)]
+
+    assert [c.part_number for c in selector.component_database][-3:] == [
+        'RES-NEW-1', 'RES-NEW-2', 'RES-NEW-3']
+    found = selector.select_component(ComponentSpec(category=ComponentCategory.RESISTOR, value=123))
+    assert 'RES-NEW-1' in [c.part_number for c in found]
+
+
+def test_component_database_rejects_other_mutations():
+    """測試其他修改操作拋出錯誤而不是無聲失效"""
+    database = ComponentSelector().component_database
+
+    for mutate in (lambda: database.__setitem__(0, _part('X')),
+                   lambda: database.__delitem__(0),
+                   lambda: database.insert(0, _part('X')),
+                   lambda: database.remove(database[0]),
+                   database.pop, database.clear, database.sort, database.reverse):
+        with pytest.raises(TypeError):
+            mutate()
+    assert len(database) == 23
+
+
+def test_component_database_assignment_replaces_store():
+    """測試指定新串列時以該串列重建資料庫"""
+    selector = ComponentSelector()
+    kept = [c for c in selector.component_database if c.part_number.startswith('RES')]
+
+    selector.component_database = kept + [_part('CAP-ONLY')]
+
+    assert [c.part_number for c in selector.component_database] == (
+        [c.part_number for c in kept] + ['CAP-ONLY'])
+    capacitors = selector.select_component(ComponentSpec(category=ComponentCategory.CAPACITOR))
+    assert [c.part_number for c in capacitors] == ['CAP-ONLY']
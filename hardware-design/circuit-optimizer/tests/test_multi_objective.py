@@ -0,0 +1,76 @@
+"""
+測試非支配排序與擁擠距離與逐對比較的結果一致
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from multi_objective import non_dominated_ranks, crowding_distances
+
+
+def _dominates(a, b):
+    return bool(np.all(a <= b) and np.any(a < b))
+
+
+def _brute_force_ranks(F):
+    # 逐層剝除不被剩餘個體支配的個體
+    ranks = np.full(len(F), -1)
+    remaining = set(range(len(F)))
+    rank = 0
+    while remaining:
+        front = {i for i in remaining
+                 if not any(_dominates(F[j], F[i]) for j in remaining if j != i)}
+        for i in front:
+            ranks[i] = rank
+        remaining -= front
+        rank += 1
+    return ranks
+
+
+def _brute_force_crowding(F, ranks):
+    # 教科書 NSGA-II：每個前沿、每個目標穩定排序，邊界為無窮大
+    distance = np.zeros(len(F))
+    for rank in np.unique(ranks):
+        front = [i for i in range(len(F)) if ranks[i] == rank]
+        for k in range(F.shape[1]):
+            ordered = sorted(front, key=lambda i: F[i, k])
+            span = F[ordered[-1], k] - F[ordered[0], k]
+            distance[ordered[0]] = distance[ordered[-1]] = np.inf
+            if span == 0:
+                continue
+            for pos in range(1, len(ordered) - 1):
+                distance[ordered[pos]] += (F[ordered[pos + 1], k] - F[ordered[pos - 1], k]) / span
+    return distance
+
+
+@pytest.mark.parametrize('m', [1, 2, 3, 4, 5])
+@pytest.mark.parametrize('levels', [3, 10, None])
+def test_matches_brute_force(m, levels):
+    """測試排序與擁擠距離與逐對比較一致（levels 越少，同值越多）"""
+    rng = np.random.default_rng(m * 100 + (levels or 0))
+    for _ in range(5):
+        n = int(rng.integers(1, 60))
+        F = rng.integers(0, levels, size=(n, m)).astype(float) if levels else rng.random((n, m))
+
+        ranks = non_dominated_ranks(F)
+        np.testing.assert_array_equal(ranks, _brute_force_ranks(F))
+        np.testing.assert_allclose(crowding_distances(F, ranks), _brute_force_crowding(F, ranks))
+
+
+def test_duplicate_points_share_rank():
+    """測試完全相同的解互不支配，屬於同一前沿"""
+    F = np.array([[1.0, 2.0], [1.0, 2.0], [2.0, 1.0], [2.0, 2.0], [2.0, 2.0]])
+
+    np.testing.assert_array_equal(non_dominated_ranks(F), [0, 0, 0, 1, 1])
+
+
+def test_empty_population():
+    """測試空族群"""
+    F = np.zeros((0, 2))
+    ranks = non_dominated_ranks(F)
+
+    assert ranks.shape == (0,)
+    assert crowding_distances(F, ranks).shape == (0,)
@@ -0,0 +1,9 @@
+"""
+解析式元件擺放器
+以二次連線長度最佳化、密度擴散與 Tetris 合法化快速產生擺放，
+可單獨使用，或作為 SA / GA / MCTS 擺放器的初始解
+"""
+
+from .analytical_placer import AnalyticalPlacer
+
+__all__ = ['AnalyticalPlacer']
@@ -0,0 +1,464 @@
+"""
+解析式（二次）元件擺放器實作
+以稀疏共軛梯度求解加權二次連線長度，搭配密度擴散與 Tetris 合法化
+"""
+
+import math
+import os
+import sys
+import time
+import numpy as np
+from typing import Dict, List, Tuple, Optional, Any
+from dataclasses import dataclass
+from scipy import sparse
+from scipy.sparse.linalg import cg
+
+_SHARED_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+if _SHARED_SRC not in sys.path:
+    sys.path.append(_SHARED_SRC)
+from profiling import NULL_PROFILER
+
+
+def _mark_occupied(grid: np.ndarray, position: np.ndarray, size: np.ndarray,
+                   margin: float, resolution: float):
+    """在佔用網格中標記矩形（外擴 margin）接觸的所有格子"""
+    x0 = max(int(math.floor((position[0] - margin) / resolution)), 0)
+    y0 = max(int(math.floor((position[1] - margin) / resolution)), 0)
+    x1 = int(math.ceil((position[0] + size[0] + margin) / resolution))
+    y1 = int(math.ceil((position[1] + size[1] + margin) / resolution))
+    grid[y0:y1, x0:x1] = True
+
+
+@dataclass
+class Component:
+    """元件資料類別"""
+    name: str
+    size: Tuple[float, float]  # (width, height) in mm
+
+
+@dataclass
+class Connection:
+    """連接資料類別"""
+    comp1: str
+    comp2: str
+    weight: float = 1.0
+
+
+class AnalyticalPlacer:
+    """
+    解析式元件擺放器
+
+    1. 全域擺放：最小化 Σ w_ij · |c_i - c_j|²（c 為元件中心）
+       Laplacian 系統以共軛梯度求解，x、y 兩軸獨立
+    2. 密度擴散：以遞迴二分（依面積切割區域）得到擴散目標，
+       作為錨點加入二次式（密度懲罰），錨點權重逐輪遞增
+    3. 合法化：Tetris 式逐列擺放，消除所有重疊
+    """
+
+    # 合法化的列高為元件高度中位數的幾分之一，矮元件可在同一高度內上下堆疊
+    ROW_SUBDIVISIONS = 4
+
+    # 空位搜尋的佔用網格最多格數
+    MAX_OCCUPANCY_CELLS = 250000
+
+    def __init__(self, board_size: Tuple[float, float] = (100, 80),
+                 target_density: float = 0.6,
+                 spreading_iterations: int = 20,
+                 anchor_weight: float = 0.01,
+                 anchor_growth: float = 1.6,
+                 spacing: float = 0.5):
+        """
+        初始化解析式擺放器
+
+        Args:
+            board_size: 板子大小 (width, height) in mm
+            target_density: 擴散區域的目標面積利用率 (0-1]
+            spreading_iterations: 密度擴散輪數
+            anchor_weight: 初始錨點權重（相對於平均連接權重）
+            anchor_growth: 每輪錨點權重倍增率
+            spacing: 合法化時元件間的最小間距 (mm)
+        """
+        if not 0 < target_density <= 1:
+            raise ValueError(f"目標密度必須介於 0 與 1 之間: {target_density}")
+
+        self.board_size = board_size
+        self.target_density = target_density
+        self.spreading_iterations = spreading_iterations
+        self.anchor_weight = anchor_weight
+        self.anchor_growth = anchor_growth
+        self.spacing = spacing
+
+        self.components: Dict[str, Component] = {}
+        self.connections: List[Connection] = []
+
+        # 分階段效能量測（基準測試工具會換成 PhaseProfiler）
+        self.profiler = NULL_PROFILER
+
+    @classmethod
+    def from_placer(cls, placer: Any, **kwargs) -> 'AnalyticalPlacer':
+        """
+        從其他擺放器複製板子大小、元件與連接
+
+        適用於具有 board_size、components（含 size）與
+        connections（含 comp1、comp2、weight）屬性的擺放器，
+        例如 SimulatedAnnealingPlacer、GeneticPlacer、MCTSComponentPlacer。
+        """
+        analytical = cls(board_size=placer.board_size, **kwargs)
+        for name, comp in placer.components.items():
+            analytical.add_component(name, comp.size)
+        for conn in placer.connections:
+            analytical.add_connection(conn.comp1, conn.comp2, conn.weight)
+        return analytical
+
+    def add_component(self, name: str, size: Tuple[float, float]):
+        """添加元件"""
+        self.components[name] = Component(name, size)
+
+    def add_connection(self, comp1: str, comp2: str, weight: float = 1.0):
+        """添加連接"""
+        self.connections.append(Connection(comp1, comp2, weight))
+
+    def _build_laplacian(self, index: Dict[str, int]) -> sparse.csr_matrix:
+        """建立連接圖的加權 Laplacian（忽略自連接與不存在的元件）"""
+        n = len(index)
+        pairs = [(index[c.comp1], index[c.comp2], c.weight) for c in self.connections
+                 if c.comp1 in index and c.comp2 in index and c.comp1 != c.comp2]
+        if not pairs:
+            return sparse.csr_matrix((n, n))
+
+        a, b, w = (np.array(v) for v in zip(*pairs))
+        rows = np.concatenate([a, b, a, b])
+        cols = np.concatenate([a, b, b, a])
+        vals = np.concatenate([w, w, -w, -w]).astype(float)
+        return sparse.coo_matrix((vals, (rows, cols)), shape=(n, n)).tocsr()
+
+    def _solve(self, laplacian: sparse.csr_matrix, alpha: float,
+               anchors: np.ndarray, x0: np.ndarray) -> np.ndarray:
+        """以共軛梯度求解 (L + αI) x = α · anchors（兩軸分別求解）"""
+        system = (laplacian + alpha * sparse.identity(laplacian.shape[0], format='csr')).tocsr()
+        result = np.empty_like(x0)
+        for axis in range(2):
+            solution, _ = cg(system, alpha * anchors[:, axis], x0=x0[:, axis], maxiter=200)
+            result[:, axis] = solution
+        return result
+
+    def _row_height(self, sizes: np.ndarray) -> float:
+        """合法化使用的列高：（元件高度中位數加間距）/ ROW_SUBDIVISIONS"""
+        return max((float(np.median(sizes[:, 1])) + self.spacing) / self.ROW_SUBDIVISIONS, 1e-6)
+
+    def _footprints(self, sizes: np.ndarray) -> np.ndarray:
+        """
+        元件合法化後實際佔用的尺寸
+
+        寬度加上間距，高度進位到整數列，使擴散區域的面積
+        反映合法化所需的空間，減少合法化時的溢出。
+        """
+        row_height = self._row_height(sizes)
+        spans = np.maximum(np.ceil((sizes[:, 1] + self.spacing) / row_height - 1e-9), 1)
+        return np.column_stack([sizes[:, 0] + self.spacing, spans * row_height])
+
+    def _spreading_region(self, centers: np.ndarray,
+                          sizes: np.ndarray) -> Tuple[float, float, float, float]:
+        """依目標密度決定擴散區域（以目前中心的重心為中心，限制在板內）"""
+        width, height = self.board_size
+        area = float((sizes[:, 0] * sizes[:, 1]).sum()) / self.target_density
+        scale = min(1.0, np.sqrt(area / (width * height)))
+        region_w, region_h = width * scale, height * scale
+
+        cx = np.clip(centers[:, 0].mean(), region_w / 2, width - region_w / 2)
+        cy = np.clip(centers[:, 1].mean(), region_h / 2, height - region_h / 2)
+        return (cx - region_w / 2, cy - region_h / 2, cx + region_w / 2, cy + region_h / 2)
+
+    def _spread_targets(self, centers: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """
+        遞迴二分擴散
+
+        沿區域較長的一軸依座標排序元件，按面積一分為二，
+        區域也依兩半的面積比例切割，直到每個區域只剩一個元件；
+        元件的目標位置為其區域中心。保留元件間的相對順序。
+        """
+        areas = sizes[:, 0] * sizes[:, 1]
+        targets = np.empty_like(centers)
+        stack = [(np.arange(len(centers)), self._spreading_region(centers, sizes))]
+
+        while stack:
+            idx, (x0, y0, x1, y1) = stack.pop()
+            if len(idx) == 1:
+                targets[idx[0]] = ((x0 + x1) / 2, (y0 + y1) / 2)
+                continue
+
+            axis = 0 if (x1 - x0) >= (y1 - y0) else 1
+            order = idx[np.argsort(centers[idx, axis], kind='stable')]
+            cumulative = np.cumsum(areas[order])
+            split = int(np.searchsorted(cumulative, cumulative[-1] / 2)) + 1
+            split = min(max(split, 1), len(order) - 1)
+            fraction = cumulative[split - 1] / cumulative[-1]
+
+            if axis == 0:
+                cut = x0 + fraction * (x1 - x0)
+                stack.append((order[:split], (x0, y0, cut, y1)))
+                stack.append((order[split:], (cut, y0, x1, y1)))
+            else:
+                cut = y0 + fraction * (y1 - y0)
+                stack.append((order[:split], (x0, y0, x1, cut)))
+                stack.append((order[split:], (x0, cut, x1, y1)))
+
+        return targets
+
+    def _legalize(self, centers: np.ndarray, sizes: np.ndarray) -> Tuple[np.ndarray, int]:
+        """
+        Tetris 式合法化
+
+        板子切成高度為元件高度中位數幾分之一的列，每列記錄目前最右端。
+        元件依目標左緣由左至右處理；高度跨 k 列的元件可放在任何連續 k 列，
+        x = max(目標 x, 這些列的最右端)，選擇位移最小的起始列。
+
+        列已滿而放不下的元件，最後在佔用網格中搜尋離目標最近的空位；
+        若仍有元件放不下，改為全部元件都以空位搜尋合法化（大元件優先），
+        取放不下元件較少的結果。
+
+        Returns:
+            (左下角座標, 仍無法合法擺放的元件數)
+        """
+        width, height = self.board_size
+        spacing = self.spacing
+        row_height = self._row_height(sizes)
+        n_rows = max(1, int(height // row_height))
+        frontier = np.zeros(n_rows)
+        row_bottoms = np.arange(n_rows) * row_height
+
+        targets = centers - sizes / 2
+        positions = np.empty_like(targets)
+        overflowed = []
+
+        for i in np.argsort(targets[:, 0], kind='stable'):
+            w, h = sizes[i]
+            tx, ty = targets[i]
+            span = min(n_rows, max(1, int(np.ceil((h + spacing) / row_height - 1e-9))))
+
+            # 每個起始列的可用 x（連續 span 列最右端的最大值），
+            # 盡量靠近目標 x，但不超出板子右緣
+            windows = np.lib.stride_tricks.sliding_window_view(frontier, span).max(axis=1)
+            xs = np.clip(tx, windows, np.maximum(windows, width - w))
+            fits = xs + w <= width
+            cost = np.abs(xs - tx) + np.abs(row_bottoms[:len(xs)] - ty)
+
+            if not fits.any():
+                overflowed.append(i)
+                continue
+
+            start = int(np.argmin(np.where(fits, cost, np.inf)))
+            positions[i] = (xs[start], row_bottoms[start])
+            frontier[start:start + span] = xs[start] + w + spacing
+
+        overflow = self._place_overflow(positions, sizes, targets, overflowed)
+        if overflow:
+            # 列式擺放留下的空隙不足，改以空位搜尋擺放全部元件
+            fallback = np.empty_like(targets)
+            fallback_overflow = self._place_overflow(fallback, sizes, targets,
+                                                     list(range(len(sizes))))
+            if fallback_overflow < overflow:
+                return fallback, fallback_overflow
+        return positions, overflow
+
+    def _place_overflow(self, positions: np.ndarray, sizes: np.ndarray,
+                        targets: np.ndarray, overflowed: List[int]) -> int:
+        """
+        將列已滿的元件放到離目標最近的空位（原地修改 positions）
+
+        已擺放的元件畫入佔用網格（保守地標記所有接觸的格子），
+        以積分影像一次求出所有能容納元件的空位，取離目標最近者。
+        先要求保留間距，找不到時再允許貼齊；面積大的元件先擺。
+        找不到空位的元件夾在板內（會重疊）。
+
+        Returns:
+            找不到空位的元件數
+        """
+        if not overflowed:
+            return 0
+
+        width, height = self.board_size
+        spacing = self.spacing
+        smallest = float(sizes.min()) / 2
+        resolution = max(min(spacing / 2, smallest) if spacing > 0 else smallest,
+                         math.sqrt(width * height / self.MAX_OCCUPANCY_CELLS), 1e-6)
+        nx, ny = max(int(width // resolution), 1), max(int(height // resolution), 1)
+
+        placed = np.ones(len(positions), dtype=bool)
+        placed[overflowed] = False
+        margins = (spacing, 0.0) if spacing > 0 else (0.0,)
+        grids = {margin: np.zeros((ny, nx), dtype=bool) for margin in margins}
+        for i in np.nonzero(placed)[0]:
+            for margin, grid in grids.items():
+                _mark_occupied(grid, positions[i], sizes[i], margin, resolution)
+
+        unplaced = 0
+        for i in sorted(overflowed, key=lambda i: -sizes[i, 0] * sizes[i, 1]):
+            w, h = sizes[i]
+            kw = int(math.ceil(w / resolution - 1e-9))
+            kh = int(math.ceil(h / resolution - 1e-9))
+            position = None
+            for margin in margins:
+                if kw > nx or kh > ny:
+                    break
+                table = np.zeros((ny + 1, nx + 1), dtype=np.int32)
+                table[1:, 1:] = grids[margin].cumsum(axis=0).cumsum(axis=1)
+                window = table[kh:, kw:] - table[:-kh, kw:] - table[kh:, :-kw] + table[:-kh, :-kw]
+                free_y, free_x = np.nonzero(window == 0)
+                if len(free_x):
+                    distance = (np.abs(free_x * resolution - targets[i, 0]) +
+                                np.abs(free_y * resolution - targets[i, 1]))
+                    k = int(np.argmin(distance))
+                    position = (free_x[k] * resolution, free_y[k] * resolution)
+                    break
+            if position is None:
+                position = (float(np.clip(targets[i, 0], 0, max(width - w, 0.0))),
+                            float(np.clip(targets[i, 1], 0, max(height - h, 0.0))))
+                unplaced += 1
+
+            positions[i] = position
+            for margin, grid in grids.items():
+                _mark_occupied(grid, positions[i], sizes[i], margin, resolution)
+
+        return unplaced
+
+    def _wirelength(self, positions: np.ndarray, sizes: np.ndarray,
+                    index: Dict[str, int]) -> float:
+        """加權中心歐幾里得連線長度（與其他擺放器的成本定義相同）"""
+        centers = positions + sizes / 2
+        total = 0.0
+        for conn in self.connections:
+            if conn.comp1 in index and conn.comp2 in index:
+                d = centers[index[conn.comp1]] - centers[index[conn.comp2]]
+                total += float(np.hypot(d[0], d[1])) * conn.weight
+        return total
+
+    def place(self, verbose: bool = True, seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        執行解析式擺放
+
+        Args:
+            verbose: 是否顯示進度
+            seed: 初始微擾的隨機種子
+
+        Returns:
+            擺放結果字典
+        """
+        start_time = time.perf_counter()
+        profiler = self.profiler
+        profiler.start()
+        names = list(self.components.keys())
+        index = {name: i for i, name in enumerate(names)}
+        n = len(names)
+        if n == 0:
+            return {'layout': {}, 'cost': 0.0, 'global_cost': 0.0, 'overflow': 0,
+                    'legal': True, 'iterations': 0, 'runtime': 0.0, 'phase_times': {}}
+
+        sizes = np.array([self.components[name].size for name in names], dtype=float)
+        footprints = self._footprints(sizes)
+        laplacian = self._build_laplacian(index)
+        mean_weight = (float(np.mean([c.weight for c in self.connections]))
+                       if self.connections else 1.0)
+
+        # 1. 無擴散的全域解（以微弱錨點拉向板中心避免奇異）
+        rng = np.random.default_rng(seed)
+        board_center = np.array(self.board_size, dtype=float) / 2
+        jitter = rng.normal(0, 1e-3 * max(self.board_size), size=(n, 2))
+        centers = self._solve(laplacian, 1e-6 * mean_weight,
+                              np.tile(board_center, (n, 1)) + jitter,
+                              np.tile(board_center, (n, 1)) + jitter)
+        global_time = time.perf_counter() - start_time
+        profiler.mark('global')
+
+        # 2. 密度擴散
+        alpha = self.anchor_weight * mean_weight
+        targets = centers
+        for iteration in range(self.spreading_iterations):
+            targets = self._spread_targets(centers, footprints)
+            profiler.mark('spread_targets')
+            centers = self._solve(laplacian, alpha, targets, centers)
+            profiler.mark('solve')
+            alpha *= self.anchor_growth
+
+            if verbose and (iteration + 1) % 5 == 0:
+                displacement = float(np.abs(centers - targets).mean())
+                print(f"擴散第 {iteration + 1} 輪: 與目標平均距離 {displacement:.2f} mm")
+        spread_time = time.perf_counter() - start_time - global_time
+
+        global_positions = targets - sizes / 2
+        global_cost = self._wirelength(global_positions, sizes, index)
+
+        # 3. 合法化
+        legalize_start = time.perf_counter()
+        positions, overflow = self._legalize(targets, sizes)
+        legalize_time = time.perf_counter() - legalize_start
+
+        cost = self._wirelength(positions, sizes, index)
+        profiler.mark('legalization')
+        profiler.record(cost)
+        runtime = time.perf_counter() - start_time
+
+        if verbose:
+            print("\n=== 解析式擺放完成 ===")
+            print(f"擴散後成本: {global_cost:.2f}")
+            print(f"合法化後成本: {cost:.2f}")
+            if overflow:
+                print(f"警告: {overflow} 個元件找不到空位（與其他元件重疊）")
+            print(f"耗時: {runtime:.3f} s")
+
+        return {
+            'layout': {name: (float(x), float(y))
+                       for name, (x, y) in zip(names, positions.tolist())},
+            'cost': cost,
+            'global_cost': global_cost,
+            'overflow': overflow,
+            'legal': overflow == 0,
+            'iterations': self.spreading_iterations,
+            'runtime': runtime,
+            'phase_times': {
+                'global': global_time,
+                'spreading': spread_time,
+                'legalization': legalize_time,
+            }
+        }
+
+    def visualize(self, result: Dict[str, Any], save_path: Optional[str] = None):
+        """視覺化結果"""
+        try:
+            import matplotlib.pyplot as plt
+            import matplotlib.patches as patches
+
+            fig, ax = plt.subplots(figsize=(10, 8))
+            ax.add_patch(patches.Rectangle(
+                (0, 0), self.board_size[0], self.board_size[1],
+                fill=False, edgecolor='black', linewidth=2
+            ))
+
+            layout = result['layout']
+            colors = plt.cm.Set3(np.linspace(0, 1, max(len(layout), 1)))
+            for i, (name, (x, y)) in enumerate(layout.items()):
+                w, h = self.components[name].size
+                ax.add_patch(patches.Rectangle(
+                    (x, y), w, h, facecolor=colors[i], edgecolor='black', alpha=0.7
+                ))
+                if len(layout) <= 100:
+                    ax.text(x + w/2, y + h/2, name, ha='center', va='center', fontsize=7)
+
+            ax.set_xlim(-5, self.board_size[0] + 5)
+            ax.set_ylim(-5, self.board_size[1] + 5)
+            ax.set_aspect('equal')
+            ax.set_xlabel('X (mm)')
+            ax.set_ylabel('Y (mm)')
+            ax.set_title(f'解析式擺放結果\n成本: {result["cost"]:.2f}')
+            ax.grid(True, alpha=0.3)
+
+            if save_path:
+                plt.savefig(save_path, dpi=300, bbox_inches='tight')
+                print(f"圖片已儲存到: {save_path}")
+            else:
+                plt.show()
+
+            plt.close()
+
+        except ImportError:
+            print("需要安裝 matplotlib 才能視覺化結果")
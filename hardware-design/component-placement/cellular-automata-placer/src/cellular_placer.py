@@ -3,11 +3,20 @@
 使用細胞自動機演算法優化 PCB 元件擺放
 """
 
+import os
+import sys
 import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
 from scipy.ndimage import convolve
 
+# 共用空間索引（component-placement/src/spatial_index.py）
+_SHARED_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+if _SHARED_SRC not in sys.path:
+    sys.path.append(_SHARED_SRC)
+from spatial_index import SpatialHash
+from profiling import NULL_PROFILER
+
 
 @dataclass
 class Component:
@@ -51,9 +60,17 @@ class CellularAutomataPlacer:
 
         self.components: Dict[str, Component] = {}
         self.connections: List[Connection] = []
+
+        # 分階段效能量測（基準測試工具會換成 PhaseProfiler）
+        self.profiler = NULL_PROFILER
+
         self.component_map: Dict[int, str] = {}  # component_id -> name
+        self.component_ids: Dict[str, int] = {}  # name -> component_id
         self.next_comp_id = 1
 
+        # 元件邊界框的空間索引（網格單位）
+        self.index = SpatialHash((self.grid_width, self.grid_height))
+
     def add_component(self, name: str, size: Tuple[float, float]):
         """添加元件"""
         # 計算網格大小
@@ -63,6 +80,7 @@ class CellularAutomataPlacer:
         comp = Component(name, size, grid_size=(grid_w, grid_h))
         self.components[name] = comp
         self.component_map[self.next_comp_id] = name
+        self.component_ids[name] = self.next_comp_id
         self.next_comp_id += 1
 
     def add_connection(self, comp1: str, comp2: str, weight: float = 1.0):
@@ -71,34 +89,26 @@ class CellularAutomataPlacer:
 
     def _get_component_id(self, name: str) -> int:
         """獲取元件 ID"""
-        for comp_id, comp_name in self.component_map.items():
-            if comp_name == name:
-                return comp_id
-        return 0
+        return self.component_ids.get(name, 0)
 
     def _initialize_random_placement(self):
         """隨機初始化元件位置"""
         self.occupancy.fill(0)
+        self.index = SpatialHash.for_components(
+            (self.grid_width, self.grid_height),
+            [comp.grid_size for comp in self.components.values()])
 
         for name, comp in self.components.items():
-            placed = False
-            max_attempts = 100
-
-            for _ in range(max_attempts):
-                # 隨機位置
-                x = np.random.randint(0, self.grid_width - comp.grid_size[0] + 1)
-                y = np.random.randint(0, self.grid_height - comp.grid_size[1] + 1)
-
-                # 檢查是否重疊
-                if np.all(self.occupancy[y:y+comp.grid_size[1], x:x+comp.grid_size[0]] == 0):
-                    # 擺放元件
-                    comp_id = self._get_component_id(name)
-                    self.occupancy[y:y+comp.grid_size[1], x:x+comp.grid_size[0]] = comp_id
-                    comp.position = (x, y)
-                    placed = True
-                    break
-
-            if not placed:
+            gw, gh = comp.grid_size
+            position = self.index.sample_free_position(gw, gh, integer=True)
+
+            if position is not None:
+                # 擺放元件
+                x, y = position
+                self.occupancy[y:y+gh, x:x+gw] = self._get_component_id(name)
+                self.index.insert(name, x, y, gw, gh)
+                comp.position = (x, y)
+            else:
                 print(f"警告: 無法擺放元件 {name}")
 
     def _calculate_attraction_field(self) -> np.ndarray:
@@ -165,27 +175,19 @@ class CellularAutomataPlacer:
         x, y = comp.position
         dx, dy = direction
         new_x, new_y = x + dx, y + dy
+        gw, gh = comp.grid_size
 
-        # 檢查邊界
-        if (new_x < 0 or new_y < 0 or
-            new_x + comp.grid_size[0] > self.grid_width or
-            new_y + comp.grid_size[1] > self.grid_height):
-            return False
-
-        # 檢查是否與其他元件重疊
-        comp_id = self._get_component_id(comp_name)
-        target_area = self.occupancy[new_y:new_y+comp.grid_size[1],
-                                     new_x:new_x+comp.grid_size[0]]
-
-        if np.any((target_area > 0) & (target_area != comp_id)):
+        # 檢查邊界與是否與其他元件重疊
+        if not self.index.is_free(new_x, new_y, gw, gh, exclude=(comp_name,)):
             return False
 
         # 移動元件
         # 清除舊位置
-        self.occupancy[y:y+comp.grid_size[1], x:x+comp.grid_size[0]] = 0
+        self.occupancy[y:y+gh, x:x+gw] = 0
 
         # 設置新位置
-        self.occupancy[new_y:new_y+comp.grid_size[1], new_x:new_x+comp.grid_size[0]] = comp_id
+        self.occupancy[new_y:new_y+gh, new_x:new_x+gw] = self._get_component_id(comp_name)
+        self.index.move(comp_name, new_x, new_y)
         comp.position = (new_x, new_y)
 
         return True
@@ -218,7 +220,7 @@ class CellularAutomataPlacer:
             # 根據力場決定移動方向
             if abs(avg_force) < 0.1:  # 力太小，隨機移動
                 if np.random.rand() < 0.1:  # 10% 機率隨機移動
-                    direction = np.random.choice([(-1, 0), (1, 0), (0, -1), (0, 1)])
+                    direction = [(-1, 0), (1, 0), (0, -1), (0, 1)][np.random.randint(4)]
                     self._try_move_component(comp_name, direction)
             else:
                 # 嘗試朝力的方向移動
@@ -277,12 +279,17 @@ class CellularAutomataPlacer:
         Returns:
             優化結果字典
         """
+        profiler = self.profiler
+        profiler.start()
+
         # 初始化隨機擺放
         self._initialize_random_placement()
 
         initial_cost = self._calculate_cost()
         best_cost = initial_cost
         cost_history = [initial_cost]
+        profiler.mark('initialize')
+        profiler.record(initial_cost)
 
         if verbose:
             print(f"初始成本: {initial_cost:.2f}")
@@ -290,13 +297,16 @@ class CellularAutomataPlacer:
         # 演化循環
         for iteration in range(iterations):
             self._evolve_step(attraction_strength, repulsion_strength)
+            profiler.mark('evolve_step')
 
             # 計算成本
             cost = self._calculate_cost()
             cost_history.append(cost)
+            profiler.mark('evaluate')
 
             if cost < best_cost:
                 best_cost = cost
+                profiler.record(best_cost)
 
             # 顯示進度
             if verbose and (iteration + 1) % 20 == 0:
@@ -0,0 +1,63 @@
+"""
+空間索引效能基準
+
+比較隨機擺放 n 個元件時，逐一檢查所有已擺放元件（O(n²)）
+與使用共用 SpatialHash（平均 O(1) 查詢）的耗時。
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import time
+import numpy as np
+from spatial_index import SpatialHash
+
+
+def random_sizes(n: int, seed: int = 0):
+    """隨機元件尺寸"""
+    rng = np.random.default_rng(seed)
+    return [tuple(rng.uniform(1.0, 6.0, size=2)) for _ in range(n)]
+
+
+def place_bruteforce(board_size, sizes, max_attempts: int = 100):
+    """原始方式：每個候選位置與所有已擺放元件比較"""
+    placed = []
+    for w, h in sizes:
+        for _ in range(max_attempts):
+            x = np.random.uniform(0, board_size[0] - w)
+            y = np.random.uniform(0, board_size[1] - h)
+            if all(x + w <= ox or x >= ox + ow or y + h <= oy or y >= oy + oh
+                   for ox, oy, ow, oh in placed):
+                placed.append((x, y, w, h))
+                break
+    return len(placed)
+
+
+def place_indexed(board_size, sizes, max_attempts: int = 100):
+    """SpatialHash：候選位置只與附近格子中的元件比較"""
+    index = SpatialHash.for_components(board_size, sizes)
+    for k, (w, h) in enumerate(sizes):
+        position = index.sample_free_position(w, h, max_attempts=max_attempts)
+        if position is not None:
+            index.insert(k, position[0], position[1], w, h)
+    return len(index)
+
+
+if __name__ == "__main__":
+    np.random.seed(0)
+    print(f"{'元件數':>8} {'逐一比較 (s)':>14} {'空間索引 (s)':>14} {'加速':>8}")
+    for n in (250, 1000, 4000):
+        side = float(np.sqrt(n) * 8)
+        board_size = (side, side)
+        sizes = random_sizes(n)
+
+        start = time.perf_counter()
+        placed_brute = place_bruteforce(board_size, sizes)
+        t_brute = time.perf_counter() - start
+
+        start = time.perf_counter()
+        placed_index = place_indexed(board_size, sizes)
+        t_index = time.perf_counter() - start
+
+        print(f"{n:>8} {t_brute:>14.3f} {t_index:>14.3f} {t_brute / t_index:>7.0f}x"
+              f"   (擺放 {placed_brute} / {placed_index})")
@@ -0,0 +1,86 @@
+"""
+族群適應度計算效能基準
+
+比較：
+1. 逐個體、逐連接的字典查找計算（原始方式）
+2. 整個族群一次向量化計算 (pop_size, n_components, 2)
+3. 含重疊與熱成本的多目標評估：單行程 vs 工作行程池
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import os
+import time
+import numpy as np
+from genetic_placer import GeneticPlacer, population_costs
+
+
+def create_placer(n_components: int = 500, seed: int = 0, **kwargs) -> GeneticPlacer:
+    """建立隨機網表（約 1/5 元件為發熱元件）"""
+    rng = np.random.default_rng(seed)
+    placer = GeneticPlacer(board_size=(300, 300), population_size=100, **kwargs)
+    for i in range(n_components):
+        w, h = rng.uniform(2, 8, size=2)
+        power = float(rng.uniform(0.5, 3.0)) if rng.random() < 0.2 else 0.0
+        placer.add_component(f"C{i}", (float(w), float(h)), power=power)
+    for _ in range(n_components * 2):
+        a, b = rng.choice(n_components, 2, replace=False)
+        placer.add_connection(f"C{a}", f"C{b}", float(rng.uniform(0.5, 2.0)))
+    return placer
+
+
+def reference_costs(placer: GeneticPlacer, population: np.ndarray) -> np.ndarray:
+    """原始方式：逐個體以字典查找計算連線長度"""
+    costs = []
+    for positions in population:
+        genes = placer._array_to_layout(positions)
+        total = 0.0
+        for conn in placer.connections:
+            comp1 = placer.components[conn.comp1]
+            comp2 = placer.components[conn.comp2]
+            pos1, pos2 = genes[conn.comp1], genes[conn.comp2]
+            x1 = pos1[0] + comp1.size[0] / 2
+            y1 = pos1[1] + comp1.size[1] / 2
+            x2 = pos2[0] + comp2.size[0] / 2
+            y2 = pos2[1] + comp2.size[1] / 2
+            total += np.sqrt((x2 - x1)**2 + (y2 - y1)**2) * conn.weight
+        costs.append(total)
+    return np.array(costs)
+
+
+def timed(fn, *args, **kwargs):
+    """執行並計時"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    placer = create_placer()
+    problem = placer._build_problem()
+    rng = np.random.default_rng(1)
+    population = rng.uniform(0, 290, size=(placer.population_size, len(placer.components), 2))
+
+    print("=" * 60)
+    print(f"族群 {population.shape[0]}, 元件 {population.shape[1]}, "
+          f"連接 {len(placer.connections)}")
+    print("=" * 60)
+
+    reference, t_reference = timed(lambda: reference_costs(placer, population))
+    vectorized, t_vectorized = timed(lambda: population_costs(problem, population))
+    assert np.allclose(reference, vectorized)
+    print(f"  逐連接字典查找: {t_reference * 1000:8.1f} ms")
+    print(f"  向量化族群計算: {t_vectorized * 1000:8.1f} ms "
+          f"({t_reference / t_vectorized:.0f}x)")
+
+    # 多目標（連線 + 重疊 + 熱）演化
+    workers = os.cpu_count()
+    print(f"\n多目標演化 20 代（CPU 核心數 {workers}）")
+    for parallel in (False, True):
+        placer = create_placer(overlap_weight=10.0, thermal_weight=50.0)
+        np.random.seed(0)
+        result, elapsed = timed(placer.evolve, generations=20, verbose=False,
+                                parallel=parallel, workers=workers)
+        label = "工作行程池" if parallel else "單行程"
+        print(f"  {label}: {elapsed:.2f} s, 最佳成本 {result['cost']:.1f}")
@@ -1,5 +1,5 @@
 """遺傳演算法元件擺放器模組"""
 
-from .genetic_placer import GeneticPlacer, Component, Connection
+from .genetic_placer import GeneticPlacer, Component, Connection, FitnessProblem, population_costs
 
-__all__ = ['GeneticPlacer', 'Component', 'Connection']
+__all__ = ['GeneticPlacer', 'Component', 'Connection', 'FitnessProblem', 'population_costs']
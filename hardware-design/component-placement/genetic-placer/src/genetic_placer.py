@@ -3,17 +3,28 @@
 使用遺傳演算法優化 PCB 元件擺放
 """
 
+import os
+import sys
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
 import copy
 
+# 共用空間索引（component-placement/src/spatial_index.py）
+_SHARED_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+if _SHARED_SRC not in sys.path:
+    sys.path.append(_SHARED_SRC)
+from spatial_index import SpatialHash
+from profiling import NULL_PROFILER
+
 
 @dataclass
 class Component:
     """元件資料類別"""
     name: str
     size: Tuple[float, float]  # (width, height) in mm
+    power: float = 0.0  # 功耗 (W)，用於熱成本
 
 
 @dataclass
@@ -32,62 +43,126 @@ class Individual:
         self.board_size = board_size
         self.genes: Dict[str, Tuple[float, float]] = {}  # component_name -> (x, y)
         self.fitness = 0.0
+        self.index = SpatialHash.for_components(
+            board_size, [comp.size for comp in components.values()])
+
+    def set_gene(self, comp_name: str, position: Tuple[float, float]):
+        """設定元件位置並同步空間索引"""
+        comp = self.components[comp_name]
+        self.genes[comp_name] = position
+        self.index.insert(comp_name, position[0], position[1], comp.size[0], comp.size[1])
 
     def initialize_random(self):
         """隨機初始化基因"""
         for name, comp in self.components.items():
-            max_attempts = 100
-            placed = False
-
-            for _ in range(max_attempts):
-                x = np.random.uniform(0, self.board_size[0] - comp.size[0])
-                y = np.random.uniform(0, self.board_size[1] - comp.size[1])
-
-                if self._is_valid_position(name, (x, y)):
-                    self.genes[name] = (x, y)
-                    placed = True
-                    break
+            position = self.index.sample_free_position(comp.size[0], comp.size[1],
+                                                       exclude=(name,))
 
-            if not placed:
+            if position is None:
                 # 強制擺放
                 x = np.random.uniform(0, max(0, self.board_size[0] - comp.size[0]))
                 y = np.random.uniform(0, max(0, self.board_size[1] - comp.size[1]))
-                self.genes[name] = (x, y)
+                position = (x, y)
+
+            self.set_gene(name, position)
 
     def _is_valid_position(self, comp_name: str, position: Tuple[float, float],
                           exclude_comp: Optional[str] = None) -> bool:
         """檢查位置是否有效（不與其他元件重疊）"""
-        comp = self.components[comp_name]
-        x, y = position
-        w, h = comp.size
-
-        # 檢查邊界
-        if x < 0 or y < 0 or x + w > self.board_size[0] or y + h > self.board_size[1]:
-            return False
-
-        # 檢查與其他元件的重疊
-        for other_name, other_pos in self.genes.items():
-            if other_name == comp_name or other_name == exclude_comp:
-                continue
-
-            other_comp = self.components[other_name]
-            ox, oy = other_pos
-            ow, oh = other_comp.size
-
-            # 檢查矩形重疊
-            if not (x + w <= ox or x >= ox + ow or y + h <= oy or y >= oy + oh):
-                return False
-
-        return True
+        w, h = self.components[comp_name].size
+        return self.index.is_free(position[0], position[1], w, h,
+                                  exclude=(comp_name, exclude_comp))
 
     def copy(self) -> 'Individual':
         """複製個體"""
-        new_ind = Individual(self.components, self.board_size)
+        new_ind = Individual.__new__(Individual)
+        new_ind.components = self.components
+        new_ind.board_size = self.board_size
         new_ind.genes = self.genes.copy()
         new_ind.fitness = self.fitness
+        new_ind.index = self.index.copy()
         return new_ind
 
 
+@dataclass
+class FitnessProblem:
+    """
+    族群適應度計算所需的靜態陣列
+
+    元件依加入順序編號，族群位置陣列形狀為 (pop_size, n_components, 2)。
+    """
+    sizes: np.ndarray        # (n, 2)
+    half_sizes: np.ndarray   # (n, 2)
+    powers: np.ndarray       # (n,)
+    conn_a: np.ndarray       # (m,) 連接端點索引
+    conn_b: np.ndarray       # (m,)
+    weights: np.ndarray      # (m,)
+    overlap_weight: float = 0.0
+    thermal_weight: float = 0.0
+
+
+def population_costs(problem: FitnessProblem, positions: np.ndarray) -> np.ndarray:
+    """
+    計算整個族群的成本
+
+    成本 = 加權連線長度
+         + overlap_weight × 元件重疊面積
+         + thermal_weight × Σ P_i·P_j / (1 + d_ij)（發熱元件彼此靠近的懲罰）
+
+    連線長度以一次索引收集計算全族群；重疊與熱成本為 O(n²)，逐個體計算。
+
+    Args:
+        problem: 靜態問題陣列
+        positions: 族群位置 (pop_size, n_components, 2)（左下角座標）
+
+    Returns:
+        各個體成本 (pop_size,)
+    """
+    centers = positions + problem.half_sizes
+    diff = centers[:, problem.conn_a] - centers[:, problem.conn_b]
+    costs = np.sqrt((diff * diff).sum(axis=2)) @ problem.weights
+
+    if problem.overlap_weight or problem.thermal_weight:
+        n = problem.sizes.shape[0]
+        upper = np.triu(np.ones((n, n), dtype=bool), k=1)
+        hot = problem.powers > 0
+        power_pairs = np.outer(problem.powers[hot], problem.powers[hot])
+        hot_upper = np.triu(np.ones_like(power_pairs, dtype=bool), k=1)
+
+        for k in range(positions.shape[0]):
+            if problem.overlap_weight:
+                low = positions[k]
+                high = low + problem.sizes
+                overlap = (np.clip(np.minimum(high[:, None, 0], high[None, :, 0]) -
+                                   np.maximum(low[:, None, 0], low[None, :, 0]), 0, None) *
+                           np.clip(np.minimum(high[:, None, 1], high[None, :, 1]) -
+                                   np.maximum(low[:, None, 1], low[None, :, 1]), 0, None))
+                costs[k] += problem.overlap_weight * overlap[upper].sum()
+
+            if problem.thermal_weight and hot.any():
+                c = centers[k, hot]
+                distance = np.sqrt(((c[:, None, :] - c[None, :, :]) ** 2).sum(axis=2))
+                costs[k] += problem.thermal_weight * (
+                    power_pairs / (1.0 + distance))[hot_upper].sum()
+
+    return costs
+
+
+# 工作行程內的問題資料（由 _init_worker 設定）
+_worker_problem: Optional[FitnessProblem] = None
+
+
+def _init_worker(problem: FitnessProblem):
+    """工作行程初始化：保存靜態問題陣列"""
+    global _worker_problem
+    _worker_problem = problem
+
+
+def _evaluate_chunk(positions: np.ndarray) -> np.ndarray:
+    """在工作行程中計算一部分族群的成本"""
+    return population_costs(_worker_problem, positions)
+
+
 class GeneticPlacer:
     """遺傳演算法元件擺放器"""
 
@@ -95,7 +170,9 @@ class GeneticPlacer:
                  population_size: int = 50,
                  mutation_rate: float = 0.1,
                  crossover_rate: float = 0.8,
-                 elitism_rate: float = 0.1):
+                 elitism_rate: float = 0.1,
+                 overlap_weight: float = 0.0,
+                 thermal_weight: float = 0.0):
         """
         初始化遺傳演算法擺放器
 
@@ -105,200 +182,301 @@ class GeneticPlacer:
             mutation_rate: 突變率
             crossover_rate: 交叉率
             elitism_rate: 菁英保留比例
+            overlap_weight: 重疊面積成本權重（0 表示不計）
+            thermal_weight: 熱成本權重（0 表示不計）
         """
         self.board_size = board_size
         self.population_size = population_size
         self.mutation_rate = mutation_rate
         self.crossover_rate = crossover_rate
         self.elitism_rate = elitism_rate
+        self.overlap_weight = overlap_weight
+        self.thermal_weight = thermal_weight
 
         self.components: Dict[str, Component] = {}
         self.connections: List[Connection] = []
-        self.population: List[Individual] = []
 
-    def add_component(self, name: str, size: Tuple[float, float]):
+        # 分階段效能量測（基準測試工具會換成 PhaseProfiler）
+        self.profiler = NULL_PROFILER
+
+        # 族群 (population_size, n_components, 2) 與對應適應度
+        self.population: Optional[np.ndarray] = None
+        self.fitness: Optional[np.ndarray] = None
+
+    def add_component(self, name: str, size: Tuple[float, float], power: float = 0.0):
         """添加元件"""
-        self.components[name] = Component(name, size)
+        self.components[name] = Component(name, size, power)
 
     def add_connection(self, comp1: str, comp2: str, weight: float = 1.0):
         """添加連接"""
         self.connections.append(Connection(comp1, comp2, weight))
 
+    def _build_problem(self) -> FitnessProblem:
+        """建立適應度計算所需的靜態陣列"""
+        names = list(self.components.keys())
+        index = {name: i for i, name in enumerate(names)}
+        sizes = np.array([self.components[name].size for name in names],
+                         dtype=float).reshape(len(names), 2)
+        valid = [conn for conn in self.connections
+                 if conn.comp1 in index and conn.comp2 in index]
+
+        return FitnessProblem(
+            sizes=sizes,
+            half_sizes=sizes / 2,
+            powers=np.array([self.components[name].power for name in names], dtype=float),
+            conn_a=np.array([index[c.comp1] for c in valid], dtype=np.int64),
+            conn_b=np.array([index[c.comp2] for c in valid], dtype=np.int64),
+            weights=np.array([c.weight for c in valid], dtype=float),
+            overlap_weight=self.overlap_weight,
+            thermal_weight=self.thermal_weight
+        )
+
+    def _genes_to_array(self, genes: Dict[str, Tuple[float, float]]) -> np.ndarray:
+        """基因字典轉換為位置陣列 (n_components, 2)"""
+        return np.array([genes[name] for name in self.components],
+                        dtype=float).reshape(len(self.components), 2)
+
+    def _array_to_layout(self, positions: np.ndarray) -> Dict[str, Tuple[float, float]]:
+        """位置陣列轉換為佈局字典"""
+        return {name: (float(x), float(y))
+                for name, (x, y) in zip(self.components, positions.tolist())}
+
     def _calculate_fitness(self, individual: Individual) -> float:
-        """計算個體適應度（越高越好）"""
-        # 計算總連線長度
-        total_wire_length = 0.0
+        """計算單一個體適應度（越高越好）"""
+        positions = self._genes_to_array(individual.genes)[np.newaxis]
+        cost = population_costs(self._build_problem(), positions)[0]
 
-        for conn in self.connections:
-            if conn.comp1 in individual.genes and conn.comp2 in individual.genes:
-                comp1 = self.components[conn.comp1]
-                comp2 = self.components[conn.comp2]
+        # 適應度 = 1 / (1 + 總成本)
+        return 1.0 / (1.0 + cost)
+
+    def _evaluate(self, problem: FitnessProblem, population: np.ndarray,
+                  executor: Optional[ProcessPoolExecutor] = None,
+                  n_chunks: int = 1) -> np.ndarray:
+        """計算族群適應度（有工作行程池時分塊平行計算）"""
+        if executor is None:
+            costs = population_costs(problem, population)
+        else:
+            chunks = np.array_split(population, n_chunks)
+            costs = np.concatenate(list(executor.map(
+                _evaluate_chunk, [chunk for chunk in chunks if len(chunk)])))
+        return 1.0 / (1.0 + costs)
+
+    def _initialize_population(self, problem: FitnessProblem,
+                               initial_layout: Optional[Dict[str, Tuple[float, float]]] = None,
+                               seeded_fraction: float = 0.25) -> np.ndarray:
+        """
+        初始化族群（各個體以不重疊的隨機擺放開始）
 
-                pos1 = individual.genes[conn.comp1]
-                pos2 = individual.genes[conn.comp2]
+        提供 initial_layout 時（例如解析式擺放器的結果），第 0 個個體為該佈局，
+        另有 seeded_fraction 比例的個體為其突變複本，其餘仍為隨機擺放以保留多樣性。
+        """
+        population = np.empty((self.population_size, len(self.components), 2))
+        seeded = 0
+        if initial_layout is not None:
+            seed = self._genes_to_array(initial_layout)
+            seeded = min(self.population_size,
+                         max(1, int(self.population_size * seeded_fraction)))
+            population[:seeded] = seed
+            if seeded > 1:
+                self._mutate(population[1:seeded], problem)
+
+        for k in range(seeded, self.population_size):
+            individual = Individual(self.components, self.board_size)
+            individual.initialize_random()
+            population[k] = self._genes_to_array(individual.genes)
+        return population
 
-                # 元件中心
-                x1 = pos1[0] + comp1.size[0] / 2
-                y1 = pos1[1] + comp1.size[1] / 2
-                x2 = pos2[0] + comp2.size[0] / 2
-                y2 = pos2[1] + comp2.size[1] / 2
+    def _select_parents(self, fitness: np.ndarray, count: int,
+                        tournament_size: int = 3) -> np.ndarray:
+        """
+        錦標賽選擇（每場不重複抽樣），返回 count 個父代索引
 
-                distance = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-                total_wire_length += distance * conn.weight
+        直接抽 count × tournament_size 個索引，有重複的場次重抽；
+        錦標賽規模超過族群一半時重複機率高，改為對每場排序隨機鍵。
+        """
+        pop_size = fitness.shape[0]
+        tournament_size = min(tournament_size, pop_size)
+        if 2 * tournament_size > pop_size:
+            contestants = np.argsort(np.random.rand(count, pop_size),
+                                     axis=1)[:, :tournament_size]
+        else:
+            contestants = np.random.randint(0, pop_size, size=(count, tournament_size))
+            redraw = np.arange(count)
+            while len(redraw):
+                ordered = np.sort(contestants[redraw], axis=1)
+                redraw = redraw[np.any(ordered[:, 1:] == ordered[:, :-1], axis=1)]
+                contestants[redraw] = np.random.randint(0, pop_size,
+                                                        size=(len(redraw), tournament_size))
+        winners = np.argmax(fitness[contestants], axis=1)
+        return contestants[np.arange(count), winners]
+
+    def _crossover(self, parents1: np.ndarray, parents2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        單點交叉（整批父代一次完成）
 
-        # 適應度 = 1 / (1 + 總成本)
-        fitness = 1.0 / (1.0 + total_wire_length)
+        Args:
+            parents1, parents2: 父代位置 (k, n_components, 2)
 
-        return fitness
+        Returns:
+            兩組子代位置
+        """
+        k, n, _ = parents1.shape
+        if n < 2:
+            return parents1.copy(), parents2.copy()
 
-    def _initialize_population(self):
-        """初始化族群"""
-        self.population = []
+        points = np.random.randint(1, n, size=k)
+        do_cross = np.random.rand(k) < self.crossover_rate
+        swap = (np.arange(n)[np.newaxis, :] >= points[:, np.newaxis]) & do_cross[:, np.newaxis]
+        swap = swap[:, :, np.newaxis]
 
-        for _ in range(self.population_size):
-            individual = Individual(self.components, self.board_size)
-            individual.initialize_random()
-            individual.fitness = self._calculate_fitness(individual)
-            self.population.append(individual)
-
-    def _select_parent(self) -> Individual:
-        """錦標賽選擇"""
-        tournament_size = 3
-        tournament = np.random.choice(self.population, tournament_size, replace=False)
-        return max(tournament, key=lambda ind: ind.fitness)
-
-    def _crossover(self, parent1: Individual, parent2: Individual) -> Tuple[Individual, Individual]:
-        """單點交叉"""
-        child1 = parent1.copy()
-        child2 = parent2.copy()
-
-        if np.random.rand() < self.crossover_rate:
-            # 選擇交叉點
-            comp_names = list(self.components.keys())
-            crossover_point = np.random.randint(1, len(comp_names))
-
-            # 交換基因
-            for i in range(crossover_point, len(comp_names)):
-                comp_name = comp_names[i]
-                child1.genes[comp_name], child2.genes[comp_name] = \
-                    child2.genes[comp_name], child1.genes[comp_name]
-
-        return child1, child2
-
-    def _mutate(self, individual: Individual):
-        """突變操作"""
-        for comp_name in self.components.keys():
-            if np.random.rand() < self.mutation_rate:
-                # 隨機移動元件
-                comp = self.components[comp_name]
-
-                # 嘗試找到新的有效位置
-                max_attempts = 20
-                mutated = False
-
-                for _ in range(max_attempts):
-                    # 在當前位置附近小範圍移動
-                    current_pos = individual.genes[comp_name]
-                    offset = 20.0  # mm
-
-                    new_x = current_pos[0] + np.random.uniform(-offset, offset)
-                    new_y = current_pos[1] + np.random.uniform(-offset, offset)
-
-                    new_x = np.clip(new_x, 0, self.board_size[0] - comp.size[0])
-                    new_y = np.clip(new_y, 0, self.board_size[1] - comp.size[1])
-
-                    # 暫時保存舊位置
-                    old_pos = individual.genes[comp_name]
-                    individual.genes[comp_name] = (new_x, new_y)
-
-                    if individual._is_valid_position(comp_name, (new_x, new_y)):
-                        mutated = True
-                        break
-                    else:
-                        # 還原
-                        individual.genes[comp_name] = old_pos
-
-                if not mutated:
-                    # 完全隨機重新擺放
-                    new_x = np.random.uniform(0, max(0, self.board_size[0] - comp.size[0]))
-                    new_y = np.random.uniform(0, max(0, self.board_size[1] - comp.size[1]))
-                    individual.genes[comp_name] = (new_x, new_y)
-
-    def evolve(self, generations: int = 100, verbose: bool = True) -> Dict[str, Any]:
+        return np.where(swap, parents2, parents1), np.where(swap, parents1, parents2)
+
+    def _mutate(self, population: np.ndarray, problem: FitnessProblem,
+                max_attempts: int = 20, offset: float = 20.0):
+        """
+        突變操作（原地修改）
+
+        以突變率選出要移動的基因，在 ±offset 範圍內一次產生全部候選位置；
+        候選位置需與同一個體目前的佈局及同回合已接受的候選都不重疊，
+        重疊者重新抽樣，max_attempts 次後仍無效者完全隨機擺放。
+        """
+        pop_size, n, _ = population.shape
+        limits = np.maximum(np.array(self.board_size) - problem.sizes, 0)
+
+        pending = np.argwhere(np.random.rand(pop_size, n) < self.mutation_rate)
+        for _ in range(max_attempts):
+            if len(pending) == 0:
+                return
+            ind, comp = pending[:, 0], pending[:, 1]
+            candidates = np.clip(population[ind, comp] +
+                                 np.random.uniform(-offset, offset, size=(len(pending), 2)),
+                                 0, limits[comp])
+
+            low, high = candidates, candidates + problem.sizes[comp]
+            valid = np.zeros(len(pending), dtype=bool)
+            for k in np.unique(ind):
+                rows = np.nonzero(ind == k)[0]
+                others_low = population[k]
+                others_high = others_low + problem.sizes
+                overlap = ((low[rows, None, 0] < others_high[None, :, 0]) &
+                           (high[rows, None, 0] > others_low[None, :, 0]) &
+                           (low[rows, None, 1] < others_high[None, :, 1]) &
+                           (high[rows, None, 1] > others_low[None, :, 1]))
+                overlap[np.arange(len(rows)), comp[rows]] = False
+                rows = rows[~overlap.any(axis=1)]
+
+                # 同一個體同回合的候選彼此也不可重疊：依序接受，與已接受者重疊者留待下回合
+                if len(rows) > 1:
+                    pair = ((low[rows, None, 0] < high[None, rows, 0]) &
+                            (high[rows, None, 0] > low[None, rows, 0]) &
+                            (low[rows, None, 1] < high[None, rows, 1]) &
+                            (high[rows, None, 1] > low[None, rows, 1]))
+                    keep = np.ones(len(rows), dtype=bool)
+                    for i in range(1, len(rows)):
+                        keep[i] = not (pair[i, :i] & keep[:i]).any()
+                    rows = rows[keep]
+                valid[rows] = True
+
+            population[ind[valid], comp[valid]] = candidates[valid]
+            pending = pending[~valid]
+
+        if len(pending):
+            # 完全隨機重新擺放
+            ind, comp = pending[:, 0], pending[:, 1]
+            population[ind, comp] = np.random.uniform(0, 1, size=(len(pending), 2)) * limits[comp]
+
+    def evolve(self, generations: int = 100, verbose: bool = True,
+               parallel: bool = False, workers: Optional[int] = None,
+               initial_layout: Optional[Dict[str, Tuple[float, float]]] = None) -> Dict[str, Any]:
         """
         執行遺傳演算法演化
 
         Args:
             generations: 演化代數
             verbose: 是否顯示進度
+            parallel: 是否以工作行程池計算適應度（適合含重疊與熱成本的昂貴評估）
+            workers: 工作行程數（None 表示 CPU 核心數）
+            initial_layout: 作為種子的初始佈局（None 表示全部隨機）
 
         Returns:
             優化結果字典
         """
-        # 初始化族群
-        self._initialize_population()
+        profiler = self.profiler
+        profiler.start()
+        problem = self._build_problem()
+        executor = None
+        n_chunks = 1
+        if parallel:
+            n_chunks = workers or os.cpu_count() or 1
+            executor = ProcessPoolExecutor(max_workers=n_chunks, initializer=_init_worker,
+                                           initargs=(problem,))
 
-        best_individual = max(self.population, key=lambda ind: ind.fitness)
-        best_fitness_history = [best_individual.fitness]
-        avg_fitness_history = [np.mean([ind.fitness for ind in self.population])]
-
-        if verbose:
-            cost = 1.0 / best_individual.fitness - 1.0
-            print(f"第 0 代 - 最佳成本: {cost:.2f}")
-
-        # 演化循環
-        for generation in range(generations):
-            new_population = []
+        try:
+            # 初始化族群
+            self.population = self._initialize_population(problem, initial_layout)
+            self.fitness = self._evaluate(problem, self.population, executor, n_chunks)
+
+            best = int(np.argmax(self.fitness))
+            best_positions = self.population[best].copy()
+            best_fitness = float(self.fitness[best])
+            best_fitness_history = [best_fitness]
+            avg_fitness_history = [float(self.fitness.mean())]
+            profiler.mark('initialize')
+            profiler.record(1.0 / best_fitness - 1.0)
+
+            if verbose:
+                cost = 1.0 / best_fitness - 1.0
+                print(f"第 0 代 - 最佳成本: {cost:.2f}")
 
-            # 菁英保留
             elite_count = int(self.population_size * self.elitism_rate)
-            elites = sorted(self.population, key=lambda ind: ind.fitness, reverse=True)[:elite_count]
-            new_population.extend([elite.copy() for elite in elites])
-
-            # 生成新個體
-            while len(new_population) < self.population_size:
-                # 選擇父代
-                parent1 = self._select_parent()
-                parent2 = self._select_parent()
-
-                # 交叉
-                child1, child2 = self._crossover(parent1, parent2)
-
-                # 突變
-                self._mutate(child1)
-                self._mutate(child2)
-
-                # 計算適應度
-                child1.fitness = self._calculate_fitness(child1)
-                child2.fitness = self._calculate_fitness(child2)
-
-                new_population.append(child1)
-                if len(new_population) < self.population_size:
-                    new_population.append(child2)
-
-            self.population = new_population
-
-            # 更新最佳個體
-            current_best = max(self.population, key=lambda ind: ind.fitness)
-            if current_best.fitness > best_individual.fitness:
-                best_individual = current_best.copy()
-
-            # 記錄歷史
-            best_fitness_history.append(best_individual.fitness)
-            avg_fitness_history.append(np.mean([ind.fitness for ind in self.population]))
-
-            # 顯示進度
-            if verbose and (generation + 1) % 10 == 0:
-                cost = 1.0 / best_individual.fitness - 1.0
-                print(f"第 {generation + 1} 代 - 最佳成本: {cost:.2f}")
+            n_pairs = (self.population_size - elite_count + 1) // 2
+
+            # 演化循環
+            for generation in range(generations):
+                # 菁英保留
+                elites = np.argsort(-self.fitness, kind='stable')[:elite_count]
+
+                # 選擇、交叉、突變（整批）
+                parents = self._select_parents(self.fitness, 2 * n_pairs)
+                children1, children2 = self._crossover(self.population[parents[:n_pairs]],
+                                                       self.population[parents[n_pairs:]])
+                children = np.stack([children1, children2], axis=1).reshape(
+                    2 * n_pairs, *children1.shape[1:])
+                children = children[:self.population_size - elite_count]
+                self._mutate(children, problem)
+                profiler.mark('variation')
+
+                children_fitness = self._evaluate(problem, children, executor, n_chunks)
+                profiler.mark('evaluate')
+                self.population = np.concatenate([self.population[elites], children])
+                self.fitness = np.concatenate([self.fitness[elites], children_fitness])
+
+                # 更新最佳個體
+                current_best = int(np.argmax(self.fitness))
+                if self.fitness[current_best] > best_fitness:
+                    best_fitness = float(self.fitness[current_best])
+                    best_positions = self.population[current_best].copy()
+                    profiler.record(1.0 / best_fitness - 1.0)
+
+                # 記錄歷史
+                best_fitness_history.append(best_fitness)
+                avg_fitness_history.append(float(self.fitness.mean()))
+
+                # 顯示進度
+                if verbose and (generation + 1) % 10 == 0:
+                    cost = 1.0 / best_fitness - 1.0
+                    print(f"第 {generation + 1} 代 - 最佳成本: {cost:.2f}")
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
         # 轉換結果
-        final_cost = 1.0 / best_individual.fitness - 1.0
+        final_cost = 1.0 / best_fitness - 1.0
 
         return {
-            'layout': best_individual.genes,
+            'layout': self._array_to_layout(best_positions),
             'cost': final_cost,
-            'fitness': best_individual.fitness,
+            'fitness': best_fitness,
             'best_fitness_history': best_fitness_history,
             'avg_fitness_history': avg_fitness_history,
             'generations': generations
@@ -0,0 +1,90 @@
+"""
+測試遺傳演算法擺放器的突變操作
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from genetic_placer import GeneticPlacer
+
+
+def _grid_placer(side: int = 4, pitch: float = 15.0, size: float = 6.0) -> GeneticPlacer:
+    placer = GeneticPlacer(board_size=(side * pitch, side * pitch), population_size=30,
+                           mutation_rate=1.0)
+    for i in range(side * side):
+        placer.add_component(f"C{i}", (size, size))
+    return placer
+
+
+def _grid_population(placer: GeneticPlacer, side: int = 4, pitch: float = 15.0) -> np.ndarray:
+    cells = np.array([(x * pitch, y * pitch) for y in range(side) for x in range(side)], dtype=float)
+    return np.repeat(cells[np.newaxis], placer.population_size, axis=0)
+
+
+def _overlapping_pairs(positions: np.ndarray, sizes: np.ndarray) -> int:
+    low, high = positions, positions + sizes
+    overlap = ((low[:, None, 0] < high[None, :, 0]) & (high[:, None, 0] > low[None, :, 0]) &
+               (low[:, None, 1] < high[None, :, 1]) & (high[:, None, 1] > low[None, :, 1]))
+    np.fill_diagonal(overlap, False)
+    return int(overlap.sum()) // 2
+
+
+def test_mutation_never_creates_overlaps():
+    """測試同一個體中同時突變的基因不會彼此重疊"""
+    np.random.seed(0)
+    placer = _grid_placer()
+    problem = placer._build_problem()
+    population = _grid_population(placer)
+
+    for _ in range(20):
+        before = population.copy()
+        placer._mutate(population, problem, max_attempts=500)
+        assert not np.array_equal(before, population)
+        for positions in population:
+            assert _overlapping_pairs(positions, problem.sizes) == 0
+
+
+def test_mutation_stays_on_board():
+    """測試突變後元件仍在板內"""
+    np.random.seed(1)
+    placer = _grid_placer()
+    problem = placer._build_problem()
+    population = _grid_population(placer)
+
+    placer._mutate(population, problem)
+
+    limits = np.array(placer.board_size) - problem.sizes
+    assert np.all(population >= 0)
+    assert np.all(population <= limits)
+
+
+def test_tournament_selection_without_replacement():
+    """測試錦標賽不重複抽樣：最差個體永遠不會勝出，最佳個體勝率約為 k / n"""
+    np.random.seed(2)
+    placer = _grid_placer()
+    for pop_size, tournament_size in [(100, 3), (5, 3), (4, 4), (1, 3)]:
+        fitness = np.random.permutation(pop_size).astype(float)
+        parents = placer._select_parents(fitness, 20000, tournament_size)
+
+        assert parents.shape == (20000,)
+        assert parents.min() >= 0 and parents.max() < pop_size
+        k = min(tournament_size, pop_size)
+        if pop_size > 1:
+            assert not np.any(parents == np.argmin(fitness))
+        best_rate = np.mean(parents == np.argmax(fitness))
+        assert abs(best_rate - k / pop_size) < 0.02
+
+
+def test_tournament_selection_scales_with_count_not_population():
+    """測試大族群選擇不建立 count × pop_size 的矩陣"""
+    np.random.seed(3)
+    placer = _grid_placer()
+    fitness = np.random.rand(200000)
+
+    parents = placer._select_parents(fitness, 200000)
+
+    assert parents.shape == (200000,)
+    # 三個均勻分佈適應度的最大值期望為 0.75
+    assert abs(fitness[parents].mean() - 0.75) < 0.01
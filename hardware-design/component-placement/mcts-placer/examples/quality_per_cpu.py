@@ -0,0 +1,48 @@
+"""
+MCTS 解品質 / CPU 時間比較
+
+1. 原始單樹 MCTS（optimize_reference，隨機模擬）
+2. 順序決策 + 子樹重用 + 貪婪模擬（optimize，單行程）
+3. 同上，根平行（每個 CPU 核心一棵樹，合併根節點統計）
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import os
+import numpy as np
+from mcts_placer import MCTSComponentPlacer
+
+
+def create_placer(n_components: int = 20, seed: int = 3) -> MCTSComponentPlacer:
+    """建立隨機電路"""
+    rng = np.random.default_rng(seed)
+    placer = MCTSComponentPlacer(board_size=(100, 80))
+    for i in range(n_components):
+        w, h = rng.uniform(2, 8, size=2)
+        placer.add_component(f"C{i}", (float(w), float(h)))
+    for _ in range(n_components * 2):
+        a, b = rng.choice(n_components, 2, replace=False)
+        placer.add_connection(f"C{a}", f"C{b}", float(rng.uniform(0.5, 2.0)))
+    return placer
+
+
+def report(name: str, result):
+    """輸出成本與 CPU 時間"""
+    cost = f"{result['cost']:9.2f}" if result['layout'] else "未找到完整佈局"
+    print(f"  {name:<28} 成本 {cost:>9}  CPU {result['cpu_time']:>6.2f} s  "
+          f"牆鐘 {result['runtime']:>6.2f} s")
+
+
+if __name__ == "__main__":
+    workers = os.cpu_count() or 1
+    placer = create_placer()
+    print(f"元件 {len(placer.components)}, 連接 {len(placer.connections)}, "
+          f"CPU 核心數 {workers}\n")
+
+    report("原始單樹 (隨機模擬)", placer.optimize_reference(iterations=400, verbose=False, seed=0))
+    report("順序決策 + 貪婪模擬", placer.optimize(iterations=400, verbose=False, seed=0))
+    report("順序決策 + 隨機模擬", placer.optimize(iterations=400, verbose=False, seed=0,
+                                           rollout='random'))
+    report(f"根平行 ({max(workers, 2)} 棵樹)",
+           placer.optimize(iterations=400, verbose=False, seed=0, workers=max(workers, 2)))
@@ -1,5 +1,5 @@
 """MCTS 元件擺放器模組"""
 
-from .mcts_placer import MCTSComponentPlacer, Component, Connection
+from .mcts_placer import MCTSComponentPlacer, Component, Connection, SearchNode
 
-__all__ = ['MCTSComponentPlacer', 'Component', 'Connection']
+__all__ = ['MCTSComponentPlacer', 'Component', 'Connection', 'SearchNode']
@@ -3,11 +3,23 @@ MCTS 元件擺放器實作
 使用 Monte Carlo Tree Search 演算法優化 PCB 元件擺放
 """
 
+import os
+import sys
+import time
 import numpy as np
 import math
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
 
+# 共用空間索引（component-placement/src/spatial_index.py）
+_SHARED_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+if _SHARED_SRC not in sys.path:
+    sys.path.append(_SHARED_SRC)
+from spatial_index import SpatialHash
+from profiling import NULL_PROFILER
+
 
 @dataclass
 class Component:
@@ -29,19 +41,26 @@ class Connection:
 class PlacementState:
     """擺放狀態類別"""
 
-    def __init__(self, board_size: Tuple[float, float], components: Dict[str, Component]):
+    def __init__(self, board_size: Tuple[float, float], components: Dict[str, Component],
+                 rng: Optional[np.random.Generator] = None):
         self.board_size = board_size
+        # 隨機採樣使用的產生器（複製的狀態共用同一個）
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.components = {name: Component(comp.name, comp.size) for name, comp in components.items()}
         self.connections: List[Connection] = []
+        # 已擺放元件的空間索引
+        self.index = SpatialHash.for_components(
+            board_size, [comp.size for comp in components.values()])
 
     def copy(self) -> 'PlacementState':
         """複製狀態"""
-        new_state = PlacementState(self.board_size, self.components)
+        new_state = PlacementState(self.board_size, self.components, self.rng)
         new_state.connections = self.connections.copy()
         for name, comp in self.components.items():
             if comp.is_placed:
                 new_state.components[name].position = comp.position
                 new_state.components[name].is_placed = True
+        new_state.index = self.index.copy()
         return new_state
 
     def get_unplaced_components(self) -> List[str]:
@@ -53,49 +72,23 @@ class PlacementState:
         return len(self.get_unplaced_components()) == 0
 
     def is_valid_position(self, comp_name: str, position: Tuple[float, float]) -> bool:
-        """檢查位置是否有效"""
-        comp = self.components[comp_name]
-        x, y = position
-        w, h = comp.size
-
-        # 檢查是否在板子範圍內
-        if x < 0 or y < 0 or x + w > self.board_size[0] or y + h > self.board_size[1]:
-            return False
-
-        # 檢查是否與其他元件重疊
-        for other_name, other_comp in self.components.items():
-            if other_name == comp_name or not other_comp.is_placed:
-                continue
-
-            ox, oy = other_comp.position
-            ow, oh = other_comp.size
-
-            # 檢查重疊
-            if not (x + w <= ox or x >= ox + ow or y + h <= oy or y >= oy + oh):
-                return False
-
-        return True
+        """檢查位置是否有效（板內且不與已擺放元件重疊）"""
+        w, h = self.components[comp_name].size
+        return self.index.is_free(position[0], position[1], w, h, exclude=(comp_name,))
 
     def place_component(self, comp_name: str, position: Tuple[float, float]) -> None:
         """擺放元件"""
         if self.is_valid_position(comp_name, position):
-            self.components[comp_name].position = position
-            self.components[comp_name].is_placed = True
+            comp = self.components[comp_name]
+            comp.position = position
+            comp.is_placed = True
+            self.index.insert(comp_name, position[0], position[1], comp.size[0], comp.size[1])
 
     def get_random_valid_position(self, comp_name: str, max_attempts: int = 100) -> Optional[Tuple[float, float]]:
         """獲取隨機有效位置"""
-        comp = self.components[comp_name]
-        w, h = comp.size
-
-        for _ in range(max_attempts):
-            x = np.random.uniform(0, self.board_size[0] - w)
-            y = np.random.uniform(0, self.board_size[1] - h)
-            position = (x, y)
-
-            if self.is_valid_position(comp_name, position):
-                return position
-
-        return None
+        w, h = self.components[comp_name].size
+        return self.index.sample_free_position(w, h, max_attempts=max_attempts,
+                                               exclude=(comp_name,), rng=self.rng)
 
     def evaluate(self, connections: List[Connection]) -> float:
         """評估當前狀態的成本（越低越好）"""
@@ -180,7 +173,7 @@ class MCTSNode:
             return self
 
         # 隨機選擇一個未嘗試的動作
-        action = self.untried_actions.pop(np.random.randint(len(self.untried_actions)))
+        action = self.untried_actions.pop(int(self.state.rng.integers(len(self.untried_actions))))
         comp_name, position = action
 
         # 創建新狀態
@@ -217,12 +210,130 @@ class MCTSNode:
         return reward
 
     def backpropagate(self, value: float):
-        """回傳更新節點值"""
-        self.visits += 1
-        self.value += value
+        """回傳更新節點值（迭代方式，深樹不受遞迴深度限制）"""
+        node = self
+        while node is not None:
+            node.visits += 1
+            node.value += value
+            node = node.parent
+
+
+class SearchNode:
+    """
+    順序擺放搜索樹節點
+
+    第 depth 層的節點決定擺放順序中第 depth 個元件的位置。
+    候選位置以「基礎種子 + 路徑」產生，相同路徑在任何行程中都得到相同的候選，
+    因此根平行的各棵樹可以依動作編號合併統計。
+    """
 
-        if self.parent:
-            self.parent.backpropagate(value)
+    __slots__ = ('parent', 'action', 'path', 'candidates', 'untried',
+                 'children', 'visits', 'value')
+
+    def __init__(self, parent: Optional['SearchNode'] = None, action: Optional[int] = None):
+        self.parent = parent
+        self.action = action
+        self.path: Tuple[int, ...] = () if parent is None else parent.path + (action,)
+        self.candidates: Optional[List[Tuple[float, float]]] = None
+        self.untried: List[int] = []
+        self.children: Dict[int, 'SearchNode'] = {}
+        self.visits = 0
+        self.value = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self.path)
+
+    def ucb1_child(self, exploration_weight: float) -> 'SearchNode':
+        """以 UCB1 選擇子節點"""
+        log_visits = math.log(max(self.visits, 1))
+        return max(self.children.values(),
+                   key=lambda c: c.value / c.visits +
+                   exploration_weight * math.sqrt(log_visits / c.visits))
+
+    def backpropagate(self, value: float):
+        """沿父節點迭代回傳"""
+        node = self
+        while node is not None:
+            node.visits += 1
+            node.value += value
+            node = node.parent
+
+
+# 工作行程內的擺放器與搜索樹（由 _init_worker 設定）
+_worker_placer = None
+_worker_trees: Dict[int, SearchNode] = {}
+
+
+def _init_worker(placer: 'MCTSComponentPlacer'):
+    """工作行程初始化：保存擺放器"""
+    global _worker_placer, _worker_trees
+    _worker_placer = placer
+    _worker_trees = {}
+
+
+@contextmanager
+def _search_pool(placer: 'MCTSComponentPlacer', workers: int):
+    """
+    取得在工作行程中執行搜索的 map 函數（workers=1 時在目前行程執行）
+
+    每個副本固定在自己的單行程執行器上，副本的樹因此總在同一行程中延續，
+    子樹重用與結果不受任務排程影響。任務的第一個欄位為副本編號。
+    """
+    if workers == 1:
+        _init_worker(placer)
+        yield map
+    else:
+        with ExitStack() as stack:
+            executors = [stack.enter_context(ProcessPoolExecutor(
+                max_workers=1, initializer=_init_worker, initargs=(placer,)))
+                for _ in range(workers)]
+
+            def pool_map(fn, tasks):
+                futures = [executors[task[0]].submit(fn, task) for task in tasks]
+                return [future.result() for future in futures]
+
+            yield pool_map
+
+
+def _search_task(args: Tuple) -> Dict[str, Any]:
+    """
+    在工作行程中對目前決策執行一批 MCTS 迭代
+
+    各副本的樹保存在工作行程內；已決定的路徑若延續上次的根，
+    直接沿子節點下移重用子樹，否則重新建立根節點。
+    """
+    replica, path, iterations, seed, reference_cost = args
+    start = time.process_time()
+
+    root = _worker_trees.get(replica)
+    if root is not None and root.path == tuple(path[:root.depth]):
+        for action in path[root.depth:]:
+            root = root.children.get(action)
+            if root is None:
+                break
+    else:
+        root = None
+    if root is None:
+        root = SearchNode()
+        root.path = tuple(path)
+    root.parent = None
+    _worker_trees[replica] = root
+
+    reused_visits = root.visits
+    rng = np.random.default_rng(seed)
+    best_cost, best_layout = _worker_placer._run_iterations(
+        root, iterations, rng, reference_cost)
+
+    return {
+        'stats': {action: (child.visits, child.value)
+                  for action, child in root.children.items()},
+        'n_candidates': len(root.candidates) if root.candidates is not None else 0,
+        'best_cost': best_cost,
+        'best_layout': best_layout,
+        'reused_visits': reused_visits,
+        'cpu_time': time.process_time() - start,
+    }
 
 
 class MCTSComponentPlacer:
@@ -242,6 +353,17 @@ class MCTSComponentPlacer:
         self.components: Dict[str, Component] = {}
         self.connections: List[Connection] = []
 
+        # 分階段效能量測（基準測試工具會換成 PhaseProfiler）
+        self.profiler = NULL_PROFILER
+
+        # 搜索設定（由 optimize 設定）
+        self.num_samples = 10
+        self.rollout = 'greedy'
+        self.seed = 0
+        self.initial_layout: Optional[Dict[str, Tuple[float, float]]] = None
+        self._order: List[str] = []
+        self._neighbors: Dict[str, List[Tuple[str, float]]] = {}
+
     def add_component(self, name: str, size: Tuple[float, float]):
         """添加元件"""
         self.components[name] = Component(name, size)
@@ -250,19 +372,318 @@ class MCTSComponentPlacer:
         """添加連接"""
         self.connections.append(Connection(comp1, comp2, weight))
 
-    def optimize(self, iterations: int = 1000, verbose: bool = True) -> Dict[str, Any]:
+    def _prepare_search(self):
+        """建立鄰接表與擺放順序（連接權重總和高者先擺）"""
+        self._neighbors = {name: [] for name in self.components}
+        for conn in self.connections:
+            if conn.comp1 in self._neighbors and conn.comp2 in self._neighbors:
+                self._neighbors[conn.comp1].append((conn.comp2, conn.weight))
+                self._neighbors[conn.comp2].append((conn.comp1, conn.weight))
+
+        self._order = sorted(self.components,
+                             key=lambda name: -sum(w for _, w in self._neighbors[name]))
+
+    def _incremental_cost(self, state: PlacementState, comp_name: str,
+                          position: Tuple[float, float]) -> float:
+        """元件擺放在 position 時，與已擺放鄰居的加權連線長度"""
+        w, h = state.components[comp_name].size
+        cx, cy = position[0] + w / 2, position[1] + h / 2
+        cost = 0.0
+        for other_name, weight in self._neighbors[comp_name]:
+            other = state.components[other_name]
+            if other.is_placed:
+                ox = other.position[0] + other.size[0] / 2
+                oy = other.position[1] + other.size[1] / 2
+                cost += weight * math.hypot(cx - ox, cy - oy)
+        return cost
+
+    def _sample_positions(self, state: PlacementState, comp_name: str,
+                          count: int, rng: np.random.Generator) -> List[Tuple[float, float]]:
+        """
+        採樣候選位置：一半靠近已擺放鄰居的加權中心，一半在板上隨機取樣
+
+        有初始佈局時，該元件在初始佈局中的位置（若仍有效）為第一個候選。
+        """
+        comp = state.components[comp_name]
+        w, h = comp.size
+        positions = []
+
+        if self.initial_layout is not None and comp_name in self.initial_layout:
+            seeded = tuple(self.initial_layout[comp_name])
+            if state.is_valid_position(comp_name, seeded):
+                positions.append(seeded)
+
+        # 已擺放鄰居的加權中心
+        total_weight = 0.0
+        target_x = target_y = 0.0
+        for other_name, weight in self._neighbors[comp_name]:
+            other = state.components[other_name]
+            if other.is_placed:
+                target_x += weight * (other.position[0] + other.size[0] / 2)
+                target_y += weight * (other.position[1] + other.size[1] / 2)
+                total_weight += weight
+
+        if total_weight > 0:
+            target_x, target_y = target_x / total_weight, target_y / total_weight
+            spread = 2.0 * max(w, h)
+            for _ in range(4 * count):
+                if len(positions) >= (count + 1) // 2:
+                    break
+                x = target_x - w / 2 + rng.normal(0, spread)
+                y = target_y - h / 2 + rng.normal(0, spread)
+                if state.is_valid_position(comp_name, (x, y)):
+                    positions.append((x, y))
+
+        while len(positions) < count:
+            position = state.index.sample_free_position(w, h, max_attempts=20,
+                                                        exclude=(comp_name,), rng=rng)
+            if position is None:
+                break
+            positions.append(position)
+
+        return positions
+
+    def _seeded_cost(self, layout: Dict[str, Tuple[float, float]]) -> Optional[float]:
+        """初始佈局的成本（缺少元件或有重疊、出界時返回 None）"""
+        state = PlacementState(self.board_size, self.components)
+        for comp_name in self._order:
+            position = layout.get(comp_name)
+            if position is None or not state.is_valid_position(comp_name, tuple(position)):
+                return None
+            state.place_component(comp_name, tuple(position))
+        return state.evaluate(self.connections)
+
+    def _candidates(self, node: SearchNode, state: PlacementState) -> List[Tuple[float, float]]:
+        """節點的候選位置（以基礎種子與路徑決定，各行程一致）"""
+        if node.candidates is None:
+            rng = np.random.default_rng([self.seed, *node.path])
+            comp_name = self._order[node.depth]
+            node.candidates = self._sample_positions(state, comp_name, self.num_samples, rng)
+            node.untried = list(range(len(node.candidates)))
+        return node.candidates
+
+    def _rollout(self, state: PlacementState, rng: np.random.Generator) -> Optional[float]:
+        """
+        由目前狀態擺放剩餘元件並返回總成本（無法擺放時返回 None）
+
+        greedy：每個元件在少量候選位置中選擇增量連線長度最小者
+        random：隨機擺放（原始方式）
+        """
+        for comp_name in self._order:
+            if state.components[comp_name].is_placed:
+                continue
+
+            if self.rollout == 'greedy':
+                candidates = self._sample_positions(state, comp_name, 4, rng)
+                if not candidates:
+                    return None
+                position = min(candidates,
+                               key=lambda p: self._incremental_cost(state, comp_name, p))
+            else:
+                w, h = state.components[comp_name].size
+                position = state.index.sample_free_position(w, h, exclude=(comp_name,), rng=rng)
+                if position is None:
+                    return None
+
+            state.place_component(comp_name, position)
+
+        return state.evaluate(self.connections)
+
+    def _run_iterations(self, root: SearchNode, iterations: int,
+                        rng: np.random.Generator,
+                        reference_cost: float) -> Tuple[float, Optional[Dict]]:
+        """
+        從根節點執行 MCTS 迭代
+
+        獎勵 = reference_cost / (reference_cost + cost)，介於 0 與 1 之間，
+        使 UCB1 的探索項與成本尺度無關。
+
+        Returns:
+            (模擬中最佳成本, 對應佈局)
+        """
+        root_state = PlacementState(self.board_size, self.components, rng)
+        for depth, action in enumerate(root.path):
+            node_path = SearchNode()
+            node_path.path = root.path[:depth]
+            candidates = self._candidates(node_path, root_state)
+            root_state.place_component(self._order[depth], candidates[action])
+
+        n_total = len(self._order)
+        best_cost = float('inf')
+        best_layout = None
+
+        for _ in range(iterations):
+            state = root_state.copy()
+            node = root
+
+            # 1. Selection / 2. Expansion
+            dead_end = False
+            while node.depth < n_total:
+                candidates = self._candidates(node, state)
+                if not candidates:
+                    dead_end = True
+                    break
+                if node.untried:
+                    action = node.untried.pop(int(rng.integers(len(node.untried))))
+                    child = SearchNode(node, action)
+                    node.children[action] = child
+                    state.place_component(self._order[node.depth], candidates[action])
+                    node = child
+                    break
+                node = node.ucb1_child(self.exploration_weight)
+                state.place_component(self._order[node.depth - 1], candidates[node.action])
+
+            # 3. Simulation
+            cost = None if dead_end else self._rollout(state, rng)
+            if cost is None:
+                reward = 0.0
+            else:
+                reward = reference_cost / (reference_cost + cost)
+                if cost < best_cost:
+                    best_cost = cost
+                    best_layout = {name: comp.position
+                                   for name, comp in state.components.items()}
+
+            # 4. Backpropagation
+            node.backpropagate(reward)
+
+        return best_cost, best_layout
+
+    def optimize(self, iterations: int = 1000, verbose: bool = True,
+                 workers: int = 1, num_samples: int = 10,
+                 rollout: str = 'greedy', seed: Optional[int] = None,
+                 initial_layout: Optional[Dict[str, Tuple[float, float]]] = None) -> Dict[str, Any]:
         """
         執行 MCTS 優化
 
+        依擺放順序逐一決定元件位置：每次決策在目前根節點上執行 MCTS，
+        選擇訪問次數最多的動作，並以該子節點的子樹作為下一次決策的根（子樹重用）。
+        workers > 1 時為根平行：每個工作行程維護自己的樹，合併根節點各動作的
+        訪問次數與價值後再決策。
+
+        Args:
+            iterations: 每個工作行程的總迭代次數（平均分配給各次決策）
+            verbose: 是否顯示進度
+            workers: 工作行程數（1 表示在目前行程執行）
+            num_samples: 每個節點的候選位置數
+            rollout: 模擬策略 ('greedy', 'random')
+            seed: 隨機種子
+            initial_layout: 作為種子的初始佈局，其位置會成為每個節點的第一個候選
+
+        Returns:
+            優化結果字典
+        """
+        if rollout not in ('greedy', 'random'):
+            raise ValueError(f"未知模擬策略: {rollout}")
+
+        start_time = time.perf_counter()
+        main_cpu_start = time.process_time()
+        profiler = self.profiler
+        profiler.start()
+        self.num_samples = num_samples
+        self.rollout = rollout
+        self.initial_layout = initial_layout
+        self.seed = int(np.random.SeedSequence(seed).generate_state(1)[0])
+        self._prepare_search()
+
+        n_total = len(self._order)
+        per_decision = max(1, iterations // max(n_total, 1))
+        seed_rng = np.random.default_rng(self.seed)
+
+        # 以一次貪婪模擬的成本作為獎勵尺度
+        reference_rng = np.random.default_rng(self.seed)
+        reference_state = PlacementState(self.board_size, self.components, reference_rng)
+        reference_cost = self._rollout(reference_state, reference_rng)
+        best_cost = reference_cost if reference_cost is not None else float('inf')
+        best_layout = ({name: comp.position
+                        for name, comp in reference_state.components.items()}
+                       if reference_cost is not None else None)
+        if initial_layout is not None:
+            seeded_cost = self._seeded_cost(initial_layout)
+            if seeded_cost is not None and seeded_cost < best_cost:
+                best_cost = seeded_cost
+                best_layout = {name: tuple(initial_layout[name]) for name in self.components}
+        if not reference_cost:
+            reference_cost = 1.0
+        profiler.mark('initialize')
+        profiler.record(best_cost)
+
+        path: List[int] = []
+        worker_cpu = 0.0
+        tree_visits = 0
+        reused_visits = 0
+
+        with _search_pool(self, workers) as pool_map:
+            while len(path) < n_total:
+                seeds = seed_rng.integers(0, 2**31 - 1, size=workers)
+                tasks = [(replica, tuple(path), per_decision, int(seeds[replica]), reference_cost)
+                         for replica in range(workers)]
+                outcomes = list(pool_map(_search_task, tasks))
+                profiler.mark('search')
+
+                # 合併根節點統計
+                merged: Dict[int, List[float]] = {}
+                for outcome in outcomes:
+                    worker_cpu += outcome['cpu_time']
+                    reused_visits += outcome['reused_visits']
+                    for action, (visits, value) in outcome['stats'].items():
+                        entry = merged.setdefault(action, [0, 0.0])
+                        entry[0] += visits
+                        entry[1] += value
+                    if outcome['best_cost'] < best_cost:
+                        best_cost = outcome['best_cost']
+                        best_layout = outcome['best_layout']
+                        profiler.record(best_cost)
+
+                if not merged:
+                    # 目前元件已無有效位置，保留模擬中的最佳佈局
+                    if verbose:
+                        print(f"決策 {len(path) + 1}: 無有效位置，停止搜索")
+                    break
+
+                if not path:
+                    tree_visits = sum(entry[0] for entry in merged.values())
+
+                action = max(merged, key=lambda a: (merged[a][0], merged[a][1]))
+                path.append(action)
+
+                if verbose:
+                    print(f"決策 {len(path)}/{n_total}: {self._order[len(path) - 1]} "
+                          f"(訪問 {merged[action][0]}), 最佳成本: {best_cost:.2f}")
+
+        runtime = time.perf_counter() - start_time
+        cpu_time = (time.process_time() - main_cpu_start) + (worker_cpu if workers > 1 else 0.0)
+
+        return {
+            'layout': best_layout,
+            'cost': best_cost,
+            'iterations': per_decision * len(path) * workers,
+            'tree_visits': tree_visits,
+            'reused_visits': reused_visits,
+            'decisions': len(path),
+            'runtime': runtime,
+            'cpu_time': cpu_time
+        }
+
+    def optimize_reference(self, iterations: int = 1000, verbose: bool = True,
+                           seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        原始單樹 MCTS（每次模擬隨機擺放全部剩餘元件），保留作為比較基準
+
         Args:
             iterations: 搜索迭代次數
             verbose: 是否顯示進度
+            seed: 隨機種子
 
         Returns:
             優化結果字典
         """
+        start_time = time.perf_counter()
+        cpu_start = time.process_time()
+
         # 初始化根節點
-        initial_state = PlacementState(self.board_size, self.components)
+        initial_state = PlacementState(self.board_size, self.components,
+                                       np.random.default_rng(seed))
         initial_state.connections = self.connections
         root = MCTSNode(initial_state)
 
@@ -304,7 +725,9 @@ class MCTSComponentPlacer:
             'layout': best_layout,
             'cost': best_cost,
             'iterations': iterations,
-            'tree_visits': root.visits
+            'tree_visits': root.visits,
+            'runtime': time.perf_counter() - start_time,
+            'cpu_time': time.process_time() - cpu_start
         }
 
     def visualize(self, result: Dict[str, Any], save_path: Optional[str] = None):
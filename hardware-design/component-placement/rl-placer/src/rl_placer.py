@@ -3,6 +3,8 @@
 使用 PPO (Proximal Policy Optimization) 演算法
 """
 
+import os
+import sys
 import numpy as np
 import gymnasium as gym
 from gymnasium import spaces
@@ -10,6 +12,12 @@ from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
 import math
 
+# 共用空間索引（component-placement/src/spatial_index.py）
+_SHARED_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+if _SHARED_SRC not in sys.path:
+    sys.path.append(_SHARED_SRC)
+from spatial_index import SpatialHash
+
 
 @dataclass
 class Component:
@@ -105,8 +113,10 @@ class PlacementEnv(gym.Env):
             for name, comp in self.components_template.items()
         }
 
-        # 重置網格
+        # 重置網格（觀察用）與空間索引（重疊檢查用）
         self.occupancy_grid = np.zeros((self.grid_height, self.grid_width), dtype=np.float32)
+        self.index = SpatialHash.for_components(
+            self.board_size, [comp.size for comp in self.components_template.values()])
 
         self.current_step = 0
         self.placed_components = []
@@ -153,29 +163,9 @@ class PlacementEnv(gym.Env):
         return obs
 
     def _is_valid_position(self, comp: Component, position: Tuple[float, float]) -> bool:
-        """檢查位置是否有效"""
-        x, y = position
+        """檢查位置是否有效（板內且不與已擺放元件重疊）"""
         w, h = comp.size
-
-        # 檢查邊界
-        if x < 0 or y < 0 or x + w > self.board_size[0] or y + h > self.board_size[1]:
-            return False
-
-        # 轉換為網格座標
-        gx = int(x / self.grid_resolution)
-        gy = int(y / self.grid_resolution)
-        gw = max(1, int(np.ceil(w / self.grid_resolution)))
-        gh = max(1, int(np.ceil(h / self.grid_resolution)))
-
-        # 確保不超出網格邊界
-        if gx + gw > self.grid_width or gy + gh > self.grid_height:
-            return False
-
-        # 檢查重疊
-        if np.any(self.occupancy_grid[gy:gy+gh, gx:gx+gw] > 0):
-            return False
-
-        return True
+        return self.index.is_free(position[0], position[1], w, h)
 
     def _place_component(self, comp: Component, position: Tuple[float, float]):
         """擺放元件"""
@@ -192,6 +182,7 @@ class PlacementEnv(gym.Env):
         gh = max(1, int(np.ceil(h / self.grid_resolution)))
 
         self.occupancy_grid[gy:gy+gh, gx:gx+gw] = 1.0
+        self.index.insert(comp.name, x, y, w, h)
         self.placed_components.append(comp.name)
 
     def _calculate_wire_length(self) -> float:
@@ -273,18 +264,12 @@ class PlacementEnv(gym.Env):
             reward = -100.0
 
             # 嘗試隨機擺放
-            max_attempts = 50
-            placed = False
-
-            for _ in range(max_attempts):
-                rand_x = np.random.uniform(0, max(0, max_x))
-                rand_y = np.random.uniform(0, max(0, max_y))
-                rand_pos = (rand_x, rand_y)
-
-                if self._is_valid_position(current_comp, rand_pos):
-                    self._place_component(current_comp, rand_pos)
-                    placed = True
-                    break
+            rand_pos = self.index.sample_free_position(
+                current_comp.size[0], current_comp.size[1], max_attempts=50)
+            placed = rand_pos is not None
+
+            if placed:
+                self._place_component(current_comp, rand_pos)
 
             if not placed:
                 # 無法擺放，強制結束
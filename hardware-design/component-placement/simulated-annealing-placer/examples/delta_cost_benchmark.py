@@ -0,0 +1,85 @@
+"""
+增量成本評估效能基準
+
+比較 10k 元件網表上每秒可評估的移動數：
+1. 原始方式：複製佈局字典 + 完整重算所有連接（_generate_neighbor + _calculate_cost）
+2. PlacementState：NumPy 位置陣列 + 相關連接索引，O(degree) 增量成本與復原
+"""
+
+import sys
+sys.path.insert(0, '../src')
+
+import time
+import numpy as np
+from sa_placer import SimulatedAnnealingPlacer, PlacementState
+
+
+def create_netlist(n_components: int = 10000, avg_degree: float = 3.0,
+                   seed: int = 42):
+    """
+    建立大型隨機網表與網格狀初始佈局
+
+    Returns:
+        (擺放器, 初始佈局)
+    """
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(n_components)))
+    pitch = 10.0
+    placer = SimulatedAnnealingPlacer(board_size=(side * pitch, side * pitch))
+
+    layout = {}
+    for i in range(n_components):
+        name = f"C{i}"
+        w, h = rng.uniform(1.0, 8.0, size=2)
+        placer.add_component(name, (float(w), float(h)))
+        layout[name] = (float((i % side) * pitch), float((i // side) * pitch))
+
+    n_connections = int(n_components * avg_degree / 2)
+    for _ in range(n_connections):
+        a, b = rng.choice(n_components, 2, replace=False)
+        placer.add_connection(f"C{a}", f"C{b}", float(rng.uniform(0.5, 2.0)))
+
+    return placer, layout
+
+
+def benchmark_reference(placer, layout, moves: int) -> float:
+    """原始方式的每秒移動數"""
+    start = time.perf_counter()
+    for _ in range(moves):
+        neighbor = placer._generate_neighbor(layout, 50.0)
+        placer._calculate_cost(neighbor)
+    return moves / (time.perf_counter() - start)
+
+
+def benchmark_state(placer, layout, moves: int) -> float:
+    """PlacementState 的每秒移動數（一半的移動被復原）"""
+    state = PlacementState(placer.components, placer.connections, layout)
+    start = time.perf_counter()
+    for k in range(moves):
+        delta = placer._propose_move(state, 50.0)
+        if delta is not None and k % 2:
+            state.undo()
+    return moves / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    np.random.seed(0)
+
+    for n_components in (1000, 10000):
+        placer, layout = create_netlist(n_components)
+        print("=" * 60)
+        print(f"{n_components} 元件, {len(placer.connections)} 連接")
+        print("=" * 60)
+
+        reference = benchmark_reference(placer, layout, moves=20)
+        incremental = benchmark_state(placer, layout, moves=20000)
+        print(f"  原始（完整重算）: {reference:10.0f} 移動/秒")
+        print(f"  增量（PlacementState）: {incremental:10.0f} 移動/秒")
+        print(f"  加速: {incremental / reference:.0f}x\n")
+
+    placer, layout = create_netlist(10000)
+    placer.alpha = 0.9999  # 緩慢降溫，完整跑完迭代次數
+    result = placer.optimize(iterations=50000, verbose=False, adaptive=False,
+                             initial_layout=layout)
+    print(f"10k 元件退火 {result['iterations']} 次迭代: {result['runtime']:.2f} s, "
+          f"成本 {result['initial_cost']:.0f} → {result['cost']:.0f}")
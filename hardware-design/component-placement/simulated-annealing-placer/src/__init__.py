@@ -3,6 +3,6 @@
 使用經典的模擬退火演算法優化元件擺放
 """
 
-from .sa_placer import SimulatedAnnealingPlacer
+from .sa_placer import SimulatedAnnealingPlacer, PlacementState
 
-__all__ = ['SimulatedAnnealingPlacer']
+__all__ = ['SimulatedAnnealingPlacer', 'PlacementState']
@@ -3,12 +3,24 @@
 使用經典的 Simulated Annealing 演算法優化 PCB 元件擺放
 """
 
+import os
+import sys
 import numpy as np
 import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
 import copy
 
+# 共用空間索引（component-placement/src/spatial_index.py）
+_SHARED_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+if _SHARED_SRC not in sys.path:
+    sys.path.append(_SHARED_SRC)
+from spatial_index import SpatialHash
+from profiling import NULL_PROFILER
+
 
 @dataclass
 class Component:
@@ -26,6 +38,171 @@ class Connection:
     weight: float = 1.0
 
 
+class PlacementState:
+    """
+    陣列化的擺放狀態
+
+    位置存放於 NumPy 陣列，並以 CSR 格式建立「元件 → 相關連接」索引，
+    移動少數元件時只重算其相關連接（O(degree)），可直接復原而不需複製佈局。
+    """
+
+    def __init__(self, components: Dict[str, Component],
+                 connections: List[Connection],
+                 layout: Dict[str, Tuple[float, float]]):
+        """
+        建立擺放狀態
+
+        Args:
+            components: 元件字典
+            connections: 連接列表（端點不存在於佈局中的連接會被忽略）
+            layout: 初始佈局 {name: (x, y)}（左下角座標）
+        """
+        self.names = list(components.keys())
+        self.index = {name: i for i, name in enumerate(self.names)}
+        n = len(self.names)
+
+        self.sizes = np.array([components[name].size for name in self.names],
+                              dtype=float).reshape(n, 2)
+        self.half_sizes = self.sizes / 2
+        self.positions = np.array([layout[name] for name in self.names],
+                                  dtype=float).reshape(n, 2)
+
+        valid = [conn for conn in connections
+                 if conn.comp1 in self.index and conn.comp2 in self.index]
+        m = len(valid)
+        self.conn_a = np.array([self.index[c.comp1] for c in valid], dtype=np.int64)
+        self.conn_b = np.array([self.index[c.comp2] for c in valid], dtype=np.int64)
+        self.weights = np.array([c.weight for c in valid], dtype=float)
+
+        # 元件 → 相關連接（CSR）
+        endpoints = np.concatenate([self.conn_a, self.conn_b])
+        conn_ids = np.concatenate([np.arange(m), np.arange(m)])
+        order = np.argsort(endpoints, kind='stable')
+        self.adj = conn_ids[order]
+        self.adj_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(endpoints, minlength=n), out=self.adj_ptr[1:])
+
+        self.conn_costs = self._connection_costs(np.arange(m))
+        self.cost = float(self.conn_costs.sum())
+        self._undo = None
+
+    def _connection_costs(self, conn_ids: np.ndarray) -> np.ndarray:
+        """計算指定連接的加權中心距離"""
+        a = self.conn_a[conn_ids]
+        b = self.conn_b[conn_ids]
+        diff = (self.positions[a] + self.half_sizes[a]) - (self.positions[b] + self.half_sizes[b])
+        return np.sqrt((diff * diff).sum(axis=1)) * self.weights[conn_ids]
+
+    def incident_connections(self, indices: List[int]) -> np.ndarray:
+        """取得元件的相關連接編號"""
+        if len(indices) == 1:
+            i = indices[0]
+            return self.adj[self.adj_ptr[i]:self.adj_ptr[i + 1]]
+        return np.unique(np.concatenate(
+            [self.adj[self.adj_ptr[i]:self.adj_ptr[i + 1]] for i in indices]))
+
+    def move(self, indices: List[int], new_positions: np.ndarray) -> float:
+        """
+        移動元件並增量更新成本
+
+        Args:
+            indices: 元件索引
+            new_positions: 新位置，形狀 (len(indices), 2)
+
+        Returns:
+            成本變化量
+        """
+        affected = self.incident_connections(indices)
+        old_positions = self.positions[indices]
+        old_costs = self.conn_costs[affected]
+
+        self.positions[indices] = new_positions
+        new_costs = self._connection_costs(affected)
+        self.conn_costs[affected] = new_costs
+
+        delta = float(new_costs.sum() - old_costs.sum())
+        self.cost += delta
+        self._undo = (indices, old_positions, affected, old_costs, delta)
+        return delta
+
+    def undo(self):
+        """復原上一次移動"""
+        if self._undo is None:
+            return
+        indices, old_positions, affected, old_costs, delta = self._undo
+        self.positions[indices] = old_positions
+        self.conn_costs[affected] = old_costs
+        self.cost -= delta
+        self._undo = None
+
+    def recompute_cost(self) -> float:
+        """完整重算成本（消除浮點累積誤差）"""
+        self.conn_costs = self._connection_costs(np.arange(len(self.weights)))
+        self.cost = float(self.conn_costs.sum())
+        return self.cost
+
+    def set_positions(self, positions: np.ndarray):
+        """設定全部位置並重算成本"""
+        self.positions[:] = positions
+        self._undo = None
+        self.recompute_cost()
+
+    def to_layout(self, positions: Optional[np.ndarray] = None) -> Dict[str, Tuple[float, float]]:
+        """轉換為佈局字典"""
+        if positions is None:
+            positions = self.positions
+        return {name: (float(x), float(y))
+                for name, (x, y) in zip(self.names, positions.tolist())}
+
+
+# 工作行程內的擺放器與狀態（由 _init_worker 設定）
+_worker_placer = None
+_worker_state = None
+
+
+def _init_worker(placer: 'SimulatedAnnealingPlacer'):
+    """工作行程初始化：保存擺放器並建立可重用的擺放狀態"""
+    global _worker_placer, _worker_state
+    _worker_placer = placer
+    _worker_state = PlacementState(placer.components, placer.connections,
+                                   {name: (0.0, 0.0) for name in placer.components})
+
+
+@contextmanager
+def _placement_pool(placer: 'SimulatedAnnealingPlacer', workers: Optional[int]):
+    """
+    取得在工作行程中執行任務的 map 函數
+
+    workers=1 時直接在目前行程執行，方便除錯與重現結果。
+    """
+    if workers == 1:
+        _init_worker(placer)
+        yield map
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(placer,)) as executor:
+            yield executor.map
+
+
+def _multistart_task(args: Tuple) -> Dict[str, Any]:
+    """獨立執行一次完整的模擬退火"""
+    seed, iterations, initial_layout, kwargs = args
+    np.random.seed(seed)
+    return _worker_placer.optimize(iterations=iterations, verbose=False,
+                                   initial_layout=initial_layout, **kwargs)
+
+
+def _tempering_task(args: Tuple) -> Tuple[np.ndarray, float, np.ndarray, float, int]:
+    """在固定溫度下推進一個副本"""
+    positions, temperature, steps, seed = args
+    np.random.seed(seed)
+    _worker_state.set_positions(positions)
+    best_positions, best_cost, accepted = _worker_placer._metropolis_steps(
+        _worker_state, temperature, steps)
+    return (_worker_state.positions.copy(), _worker_state.cost,
+            best_positions, best_cost, accepted)
+
+
 class SimulatedAnnealingPlacer:
     """模擬退火元件擺放器"""
 
@@ -53,6 +230,9 @@ class SimulatedAnnealingPlacer:
         self.components: Dict[str, Component] = {}
         self.connections: List[Connection] = []
 
+        # 分階段效能量測（基準測試工具會換成 PhaseProfiler）
+        self.profiler = NULL_PROFILER
+
     def add_component(self, name: str, size: Tuple[float, float]):
         """添加元件"""
         self.components[name] = Component(name, size)
@@ -62,40 +242,22 @@ class SimulatedAnnealingPlacer:
         self.connections.append(Connection(comp1, comp2, weight))
 
     def _generate_random_layout(self) -> Dict[str, Tuple[float, float]]:
-        """生成隨機初始佈局"""
+        """生成隨機初始佈局（以空間索引檢查重疊）"""
         layout = {}
+        index = SpatialHash.for_components(
+            self.board_size, [comp.size for comp in self.components.values()])
 
         for name, comp in self.components.items():
-            max_attempts = 100
-            placed = False
-
-            for _ in range(max_attempts):
-                x = np.random.uniform(0, self.board_size[0] - comp.size[0])
-                y = np.random.uniform(0, self.board_size[1] - comp.size[1])
-
-                # 檢查重疊
-                valid = True
-                for other_name, other_pos in layout.items():
-                    other_comp = self.components[other_name]
-                    ox, oy = other_pos
-                    ow, oh = other_comp.size
-
-                    # 檢查矩形重疊
-                    if not (x + comp.size[0] <= ox or x >= ox + ow or
-                           y + comp.size[1] <= oy or y >= oy + oh):
-                        valid = False
-                        break
-
-                if valid:
-                    layout[name] = (x, y)
-                    placed = True
-                    break
+            position = index.sample_free_position(comp.size[0], comp.size[1])
 
-            if not placed:
+            if position is None:
                 # 強制擺放
                 x = np.random.uniform(0, max(0, self.board_size[0] - comp.size[0]))
                 y = np.random.uniform(0, max(0, self.board_size[1] - comp.size[1]))
-                layout[name] = (x, y)
+                position = (x, y)
+
+            layout[name] = position
+            index.insert(name, position[0], position[1], comp.size[0], comp.size[1])
 
         return layout
 
@@ -245,26 +407,80 @@ class SimulatedAnnealingPlacer:
             # 默認使用指數降溫
             return temperature * self.alpha
 
+    def _propose_move(self, state: PlacementState, temperature: float) -> Optional[float]:
+        """
+        在擺放狀態上套用鄰近移動（策略與 _generate_neighbor 相同）
+
+        Returns:
+            成本變化量；未改變佈局時返回 None（無需復原）
+        """
+        n = len(state.names)
+        operation = np.random.rand()
+
+        if operation < 0.7:
+            # 移動一個元件
+            i = np.random.randint(n)
+            perturbation_scale = min(20.0, 5.0 + temperature / 5.0)
+            dx, dy = np.random.normal(0, perturbation_scale, size=2)
+            x, y = state.positions[i]
+            w, h = state.sizes[i]
+
+            new_x = min(max(x + dx, 0.0), self.board_size[0] - w)
+            new_y = min(max(y + dy, 0.0), self.board_size[1] - h)
+            return state.move([i], np.array([[new_x, new_y]]))
+
+        elif operation < 0.9:
+            # 交換兩個元件的位置
+            if n < 2:
+                return None
+            i = np.random.randint(n)
+            j = np.random.randint(n - 1)
+            if j >= i:
+                j += 1
+
+            (x1, y1), (x2, y2) = state.positions[i], state.positions[j]
+            (w1, h1), (w2, h2) = state.sizes[i], state.sizes[j]
+            if (x1 + w2 <= self.board_size[0] and y1 + h2 <= self.board_size[1] and
+                    x2 + w1 <= self.board_size[0] and y2 + h1 <= self.board_size[1]):
+                return state.move([i, j], np.array([[x2, y2], [x1, y1]]))
+            return None
+
+        # 旋轉：目前不改變佈局（與 _generate_neighbor 相同）
+        return None
+
     def optimize(self, iterations: int = 1000,
                 verbose: bool = True,
-                adaptive: bool = True) -> Dict[str, Any]:
+                adaptive: bool = True,
+                initial_layout: Optional[Dict[str, Tuple[float, float]]] = None) -> Dict[str, Any]:
         """
         執行模擬退火優化
 
+        使用 PlacementState 增量計算成本：每次移動只重算相關連接，
+        拒絕時直接復原，不複製整個佈局。
+
         Args:
             iterations: 迭代次數
             verbose: 是否顯示進度
             adaptive: 是否使用自適應重啟
+            initial_layout: 初始佈局（None 表示隨機生成）
 
         Returns:
             優化結果字典
         """
+        start_time = time.perf_counter()
+        profiler = self.profiler
+        profiler.start()
+
         # 生成初始佈局
-        current_layout = self._generate_random_layout()
-        current_cost = self._calculate_cost(current_layout)
+        if initial_layout is None:
+            initial_layout = self._generate_random_layout()
+        state = PlacementState(self.components, self.connections, initial_layout)
+        current_cost = state.cost
+        profiler.mark('initialize')
+        profiler.record(current_cost)
 
         # 記錄最佳解
-        best_layout = current_layout.copy()
+        best_positions = state.positions.copy()
         best_cost = current_cost
 
         # 初始化溫度
@@ -286,27 +502,30 @@ class SimulatedAnnealingPlacer:
 
         # 模擬退火主循環
         for iteration in range(iterations):
-            # 生成鄰近解
-            new_layout = self._generate_neighbor(current_layout, temperature)
-            new_cost = self._calculate_cost(new_layout)
+            # 套用鄰近移動
+            delta = self._propose_move(state, temperature)
+            moved = delta is not None
 
             # 計算接受概率
-            accept_prob = self._acceptance_probability(current_cost, new_cost, temperature)
+            accept_prob = self._acceptance_probability(0.0, delta if moved else 0.0,
+                                                       temperature)
 
             # 決定是否接受新解
             if np.random.rand() < accept_prob:
-                current_layout = new_layout
-                current_cost = new_cost
+                current_cost = state.cost
                 accepted_moves += 1
 
                 # 更新最佳解
                 if current_cost < best_cost:
-                    best_layout = current_layout.copy()
+                    best_positions[:] = state.positions
                     best_cost = current_cost
                     no_improvement_count = 0
+                    profiler.record(best_cost)
                 else:
                     no_improvement_count += 1
             else:
+                if moved:
+                    state.undo()
                 rejected_moves += 1
                 no_improvement_count += 1
 
@@ -316,8 +535,9 @@ class SimulatedAnnealingPlacer:
                     print(f"  迭代 {iteration}: 執行自適應重啟")
 
                 # 重新生成佈局
-                current_layout = self._generate_random_layout()
-                current_cost = self._calculate_cost(current_layout)
+                layout = self._generate_random_layout()
+                state.set_positions(np.array([layout[name] for name in state.names]))
+                current_cost = state.cost
                 temperature = self.initial_temperature
                 no_improvement_count = 0
 
@@ -343,22 +563,234 @@ class SimulatedAnnealingPlacer:
                     print(f"\n溫度低於最終溫度 ({self.final_temperature})，提早停止")
                 break
 
+        profiler.mark('anneal')
+
+        # 以完整重算的成本回報最佳解，消除增量累積誤差
+        state.set_positions(best_positions)
+        best_cost = state.cost
+        profiler.mark('finalize')
+        runtime = time.perf_counter() - start_time
+
         if verbose:
-            print(f"\n=== 優化完成 ===")
+            print("\n=== 優化完成 ===")
             print(f"最終成本: {best_cost:.2f}")
             print(f"改進: {((cost_history[0] - best_cost) / cost_history[0] * 100):.1f}%")
             print(f"接受的移動: {accepted_moves}")
             print(f"拒絕的移動: {rejected_moves}")
 
         return {
-            'layout': best_layout,
+            'layout': state.to_layout(),
             'cost': best_cost,
             'initial_cost': cost_history[0],
             'cost_history': cost_history,
             'temperature_history': temperature_history,
             'iterations': iteration + 1,
             'accepted_moves': accepted_moves,
-            'rejected_moves': rejected_moves
+            'rejected_moves': rejected_moves,
+            'runtime': runtime
+        }
+
+    def _metropolis_steps(self, state: PlacementState, temperature: float,
+                          steps: int) -> Tuple[np.ndarray, float, int]:
+        """
+        在固定溫度下執行 Metropolis 移動
+
+        Returns:
+            (此段最佳位置, 此段最佳成本, 接受的移動數)
+        """
+        best_positions = state.positions.copy()
+        best_cost = state.cost
+        accepted = 0
+
+        for _ in range(steps):
+            delta = self._propose_move(state, temperature)
+            if delta is None:
+                continue
+            if delta <= 0 or np.random.rand() < math.exp(-delta / temperature):
+                accepted += 1
+                if state.cost < best_cost:
+                    best_positions[:] = state.positions
+                    best_cost = state.cost
+            else:
+                state.undo()
+
+        return best_positions, best_cost, accepted
+
+    def _initial_positions(self, state_names: List[str],
+                           initial_layout: Optional[Dict[str, Tuple[float, float]]]) -> np.ndarray:
+        """取得初始位置陣列（未指定時隨機生成）"""
+        if initial_layout is None:
+            initial_layout = self._generate_random_layout()
+        return np.array([initial_layout[name] for name in state_names], dtype=float)
+
+    def optimize_multistart(self, n_starts: int = 4,
+                            iterations: int = 1000,
+                            workers: Optional[int] = None,
+                            seed: Optional[int] = None,
+                            verbose: bool = True,
+                            initial_layout: Optional[Dict[str, Tuple[float, float]]] = None,
+                            **kwargs) -> Dict[str, Any]:
+        """
+        多起點平行模擬退火
+
+        各起點以不同隨機種子在工作行程中獨立執行 optimize，返回最佳結果。
+
+        Args:
+            n_starts: 起點數
+            iterations: 每個起點的迭代次數
+            workers: 工作行程數（None 表示 CPU 核心數，1 表示在目前行程執行）
+            seed: 隨機種子
+            verbose: 是否顯示結果
+            initial_layout: 所有起點共用的初始佈局（None 表示各自隨機生成）
+            **kwargs: 傳給 optimize 的其他參數（如 adaptive）
+
+        Returns:
+            最佳起點的結果字典，另含 'start_costs' 與 'runtime'
+        """
+        start_time = time.perf_counter()
+        if seed is not None:
+            np.random.seed(seed)
+        seeds = np.random.default_rng(seed).integers(0, 2**31 - 1, size=n_starts)
+        tasks = [(int(s), iterations, initial_layout, kwargs) for s in seeds]
+
+        with _placement_pool(self, workers) as pool_map:
+            results = list(pool_map(_multistart_task, tasks))
+
+        best = min(results, key=lambda r: r['cost'])
+        best = dict(best)
+        best['start_costs'] = [r['cost'] for r in results]
+        best['runtime'] = time.perf_counter() - start_time
+
+        if verbose:
+            print(f"多起點退火: {n_starts} 個起點")
+            print(f"各起點成本: {', '.join(f'{c:.2f}' for c in best['start_costs'])}")
+            print(f"最佳成本: {best['cost']:.2f}, 耗時 {best['runtime']:.2f} s")
+
+        return best
+
+    def optimize_parallel_tempering(self, n_replicas: int = 4,
+                                    rounds: int = 100,
+                                    steps_per_round: int = 200,
+                                    temperatures: Optional[List[float]] = None,
+                                    workers: Optional[int] = None,
+                                    seed: Optional[int] = None,
+                                    target_cost: Optional[float] = None,
+                                    verbose: bool = True,
+                                    initial_layout: Optional[Dict[str, Tuple[float, float]]] = None
+                                    ) -> Dict[str, Any]:
+        """
+        平行回火（replica exchange）
+
+        多個副本在不同固定溫度下於工作行程中平行執行，
+        每回合結束後相鄰溫度的副本依 Metropolis 準則交換狀態：
+            P(swap) = min(1, exp((1/T_i - 1/T_j)(E_i - E_j)))
+
+        Args:
+            n_replicas: 副本數
+            rounds: 交換回合數
+            steps_per_round: 每回合每個副本的移動數
+            temperatures: 溫度階梯（None 表示在初始與最終溫度間等比分布）
+            workers: 工作行程數（None 表示 CPU 核心數，1 表示在目前行程執行）
+            seed: 隨機種子
+            target_cost: 目標成本，達到即停止
+            verbose: 是否顯示進度
+            initial_layout: 所有副本共用的初始佈局（None 表示各自隨機生成）
+
+        Returns:
+            優化結果字典
+        """
+        start_time = time.perf_counter()
+        if seed is not None:
+            np.random.seed(seed)
+        rng = np.random.default_rng(seed)
+
+        if temperatures is None:
+            temperatures = np.geomspace(self.initial_temperature,
+                                        self.final_temperature, n_replicas)
+        temperatures = sorted((float(t) for t in temperatures), reverse=True)
+        n_replicas = len(temperatures)
+
+        state = PlacementState(self.components, self.connections,
+                               {name: (0.0, 0.0) for name in self.components})
+        replicas = []
+        for _ in range(n_replicas):
+            state.set_positions(self._initial_positions(state.names, initial_layout))
+            replicas.append((state.positions.copy(), state.cost))
+
+        best_positions, best_cost = min(replicas, key=lambda r: r[1])
+        best_positions = best_positions.copy()
+        initial_cost = best_cost
+        cost_history = [best_cost]
+        exchange_attempts = 0
+        exchange_accepted = 0
+        accepted_moves = 0
+        time_to_target = None
+        rounds_completed = 0
+
+        if verbose:
+            print(f"平行回火: {n_replicas} 個副本, 溫度 "
+                  f"{', '.join(f'{t:.2f}' for t in temperatures)}")
+            print(f"初始最佳成本: {best_cost:.2f}\n")
+
+        with _placement_pool(self, workers) as pool_map:
+            for round_index in range(rounds):
+                seeds = rng.integers(0, 2**31 - 1, size=n_replicas)
+                tasks = [(replicas[k][0], temperatures[k], steps_per_round, int(seeds[k]))
+                         for k in range(n_replicas)]
+                outcomes = list(pool_map(_tempering_task, tasks))
+
+                replicas = []
+                for positions, cost, segment_best, segment_cost, accepted in outcomes:
+                    replicas.append((positions, cost))
+                    accepted_moves += accepted
+                    if segment_cost < best_cost:
+                        best_positions, best_cost = segment_best, segment_cost
+
+                # 相鄰溫度交換（奇偶回合交替配對）
+                for k in range(round_index % 2, n_replicas - 1, 2):
+                    exchange_attempts += 1
+                    log_ratio = ((1.0 / temperatures[k] - 1.0 / temperatures[k + 1]) *
+                                 (replicas[k][1] - replicas[k + 1][1]))
+                    if log_ratio >= 0 or rng.random() < math.exp(log_ratio):
+                        replicas[k], replicas[k + 1] = replicas[k + 1], replicas[k]
+                        exchange_accepted += 1
+
+                cost_history.append(best_cost)
+                rounds_completed = round_index + 1
+
+                if verbose and (round_index + 1) % 10 == 0:
+                    print(f"回合 {round_index + 1}/{rounds}: 最佳成本 {best_cost:.2f}, "
+                          f"各副本 {', '.join(f'{c:.1f}' for _, c in replicas)}")
+
+                if target_cost is not None and best_cost <= target_cost:
+                    time_to_target = time.perf_counter() - start_time
+                    if verbose:
+                        print(f"\n達到目標成本 {target_cost:.2f}，提早停止")
+                    break
+
+        # 以完整重算的成本回報最佳解
+        state.set_positions(best_positions)
+        best_cost = state.cost
+        runtime = time.perf_counter() - start_time
+
+        if verbose:
+            print("\n=== 平行回火完成 ===")
+            print(f"最終成本: {best_cost:.2f}")
+            print(f"交換接受率: {exchange_accepted / max(exchange_attempts, 1) * 100:.1f}%")
+            print(f"耗時: {runtime:.2f} s")
+
+        return {
+            'layout': state.to_layout(),
+            'cost': best_cost,
+            'initial_cost': initial_cost,
+            'cost_history': cost_history,
+            'temperatures': temperatures,
+            'replica_costs': [cost for _, cost in replicas],
+            'rounds': rounds_completed,
+            'accepted_moves': accepted_moves,
+            'exchange_acceptance': exchange_accepted / max(exchange_attempts, 1),
+            'time_to_target': time_to_target,
+            'runtime': runtime
         }
 
     def visualize(self, result: Dict[str, Any], save_path: Optional[str] = None):
@@ -0,0 +1,151 @@
+"""
+測試多起點退火與平行回火
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from sa_placer import SimulatedAnnealingPlacer, PlacementState
+
+
+def _create_placer(n_components: int = 12, seed: int = 3) -> SimulatedAnnealingPlacer:
+    rng = np.random.default_rng(seed)
+    placer = SimulatedAnnealingPlacer(board_size=(60, 50), alpha=0.99)
+    for i in range(n_components):
+        w, h = rng.uniform(2, 6, size=2)
+        placer.add_component(f"C{i}", (float(w), float(h)))
+    for _ in range(n_components * 2):
+        a, b = rng.choice(n_components, 2, replace=False)
+        placer.add_connection(f"C{a}", f"C{b}")
+    return placer
+
+
+def _recomputed_cost(placer, layout):
+    return PlacementState(placer.components, placer.connections, layout).cost
+
+
+def test_parallel_tempering_improves_and_reports_exact_cost():
+    """測試平行回火改善成本且回報的是完整重算的成本"""
+    placer = _create_placer()
+    result = placer.optimize_parallel_tempering(
+        n_replicas=3, rounds=10, steps_per_round=50, workers=1, seed=1, verbose=False)
+
+    assert result['rounds'] == 10
+    assert len(result['cost_history']) == 11
+    assert result['cost'] <= result['initial_cost']
+    assert np.all(np.diff(result['cost_history']) <= 0)
+    assert result['temperatures'] == sorted(result['temperatures'], reverse=True)
+    assert 0.0 <= result['exchange_acceptance'] <= 1.0
+    assert result['cost'] == pytest.approx(_recomputed_cost(placer, result['layout']))
+
+
+def test_parallel_tempering_zero_rounds():
+    """測試 rounds=0 時直接回傳初始最佳解"""
+    placer = _create_placer()
+    result = placer.optimize_parallel_tempering(
+        n_replicas=2, rounds=0, workers=1, seed=1, verbose=False)
+
+    assert result['rounds'] == 0
+    assert result['cost'] == pytest.approx(result['initial_cost'])
+
+
+def test_parallel_tempering_stops_at_target_cost():
+    """測試達到目標成本時提早停止"""
+    placer = _create_placer()
+    result = placer.optimize_parallel_tempering(
+        n_replicas=2, rounds=50, steps_per_round=20, workers=1, seed=1,
+        target_cost=float('inf'), verbose=False)
+
+    assert result['rounds'] == 1
+    assert result['time_to_target'] is not None
+
+
+def test_parallel_tempering_reproducible_across_workers():
+    """測試相同種子在不同工作行程數下結果一致"""
+    placer = _create_placer()
+    kwargs = dict(n_replicas=3, rounds=4, steps_per_round=30, seed=5, verbose=False)
+
+    serial = placer.optimize_parallel_tempering(workers=1, **kwargs)
+    parallel = placer.optimize_parallel_tempering(workers=2, **kwargs)
+
+    assert parallel['cost'] == pytest.approx(serial['cost'])
+    assert parallel['cost_history'] == pytest.approx(serial['cost_history'])
+
+
+def test_multistart_returns_best_start():
+    """測試多起點退火回傳各起點中的最佳結果"""
+    placer = _create_placer()
+    result = placer.optimize_multistart(n_starts=3, iterations=200, workers=1,
+                                        seed=2, verbose=False)
+
+    assert len(result['start_costs']) == 3
+    assert result['cost'] == min(result['start_costs'])
+    assert result['cost'] == pytest.approx(_recomputed_cost(placer, result['layout']))
+
+
+def test_multistart_reproducible_across_workers():
+    """測試相同種子在不同工作行程數下結果一致"""
+    placer = _create_placer()
+    kwargs = dict(n_starts=3, iterations=150, seed=9, verbose=False)
+
+    serial = placer.optimize_multistart(workers=1, **kwargs)
+    parallel = placer.optimize_multistart(workers=2, **kwargs)
+
+    assert parallel['start_costs'] == pytest.approx(serial['start_costs'])
+
+
+def test_incremental_cost_matches_full_recalculation():
+    """測試隨機移動、交換與復原後，增量成本與完整重算一致"""
+    placer = _create_placer(n_components=15, seed=8)
+    placer.add_component('isolated', (3.0, 3.0))
+    placer.add_connection('C0', 'C0', 2.0)
+    placer.add_connection('C1', 'C2', 0.5)
+    placer.add_connection('C1', 'missing')
+    state = PlacementState(placer.components, placer.connections, placer._generate_random_layout())
+    n = len(state.names)
+    rng = np.random.default_rng(4)
+
+    def check():
+        expected = placer._calculate_cost(state.to_layout())
+        assert state.cost == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+    check()
+    for step in range(2000):
+        operation = rng.random()
+        before = state.cost
+        if operation < 0.4:
+            i = int(rng.integers(n))
+            delta = state.move([i], rng.uniform(0, 40, size=(1, 2)))
+        elif operation < 0.6:
+            i, j = (int(k) for k in rng.choice(n, 2, replace=False))
+            delta = state.move([i, j], state.positions[[j, i]].copy())
+        elif operation < 0.7:
+            indices = [int(k) for k in rng.choice(n, 4, replace=False)]
+            delta = state.move(indices, rng.uniform(0, 40, size=(4, 2)))
+        elif operation < 0.85:
+            np.random.seed(step)
+            delta = placer._propose_move(state, temperature=float(rng.uniform(0, 100)))
+        else:
+            state.undo()
+            check()
+            state.undo()
+            check()
+            continue
+
+        check()
+        if delta is None:
+            # 未改變佈局的提議沒有可復原的移動
+            assert state.cost == before
+            continue
+        assert state.cost - before == pytest.approx(delta, abs=1e-9)
+        if rng.random() < 0.5:
+            state.undo()
+            assert state.cost == pytest.approx(before, abs=1e-9)
+            check()
+
+    state.set_positions(rng.uniform(0, 40, size=(n, 2)))
+    check()
+    assert state.recompute_cost() == pytest.approx(placer._calculate_cost(state.to_layout()))
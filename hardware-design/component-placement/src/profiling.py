@@ -0,0 +1,77 @@
+"""
+擺放器的分階段效能量測掛鉤
+
+各擺放器持有一個 profiler 屬性，預設為不做任何事的 NULL_PROFILER；
+基準測試工具換成 PhaseProfiler 後即可取得：
+- 各階段（初始化、搜尋、合法化…）的累計時間與次數
+- 時間-品質曲線：每次最佳成本改善時的 (經過時間, 最佳成本)
+
+擺放器在執行開始時呼叫 start()，每個階段結束時呼叫 mark(階段名稱)，
+最佳成本改善時呼叫 record(成本)。掛鉤只放在粗粒度的位置，
+未啟用時的額外負擔可忽略。
+"""
+
+import time
+from typing import Any, Dict, List, Tuple
+
+
+class PhaseProfiler:
+    """分階段計時與時間-品質曲線記錄器"""
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.trace: List[Tuple[float, float]] = []
+        self._start = self._last = time.perf_counter()
+
+    def start(self):
+        """清除紀錄並重新開始計時（擺放器在每次執行開始時呼叫）"""
+        self.phases = {}
+        self.trace = []
+        self._start = self._last = time.perf_counter()
+
+    def elapsed(self) -> float:
+        """自開始計時起經過的秒數"""
+        return time.perf_counter() - self._start
+
+    def mark(self, name: str):
+        """將上一個標記（或開始）到現在的時間計入階段 name（同名階段會累加）"""
+        now = time.perf_counter()
+        entry = self.phases.setdefault(name, {'time': 0.0, 'calls': 0})
+        entry['time'] += now - self._last
+        entry['calls'] += 1
+        self._last = now
+
+    def record(self, cost: float):
+        """記錄目前最佳成本（只保留嚴格改善的點）"""
+        if not self.trace or cost < self.trace[-1][1]:
+            self.trace.append((self.elapsed(), float(cost)))
+
+    def time_to_quality(self, target_cost: float) -> float:
+        """最佳成本首次不高於 target_cost 的時間（未達到時返回 inf）"""
+        for elapsed, cost in self.trace:
+            if cost <= target_cost:
+                return elapsed
+        return float('inf')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """轉換為可序列化為 JSON 的字典"""
+        return {
+            'phases': {name: dict(entry) for name, entry in self.phases.items()},
+            'trace': [list(point) for point in self.trace],
+        }
+
+
+class _NullProfiler:
+    """不做任何事的 profiler（擺放器的預設值）"""
+
+    def start(self):
+        pass
+
+    def mark(self, name: str):
+        pass
+
+    def record(self, cost: float):
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
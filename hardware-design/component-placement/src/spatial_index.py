@@ -0,0 +1,222 @@
+"""
+元件邊界框的空間索引
+
+以均勻網格雜湊儲存已擺放元件的矩形邊界框，供各擺放器共用：
+- 重疊查詢只檢查候選矩形覆蓋的格子，平均 O(1)
+- 在板上隨機採樣不與任何元件重疊的位置
+
+重疊判定與各擺放器原本的規則相同：邊緣相接不算重疊。
+"""
+
+import math
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+Box = Tuple[float, float, float, float]  # (x, y, width, height)
+
+
+class SpatialHash:
+    """均勻網格空間雜湊"""
+
+    def __init__(self, board_size: Tuple[float, float], cell_size: float = 10.0):
+        """
+        初始化空間索引
+
+        Args:
+            board_size: 板子大小 (width, height)
+            cell_size: 雜湊格子邊長，約為元件平均尺寸的 1~2 倍時效果最好
+        """
+        if cell_size <= 0:
+            raise ValueError(f"格子邊長必須為正數: {cell_size}")
+
+        self.board_size = board_size
+        self.cell_size = float(cell_size)
+        self.boxes: Dict[Hashable, Box] = {}
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+
+    @classmethod
+    def for_components(cls, board_size: Tuple[float, float],
+                       sizes: Iterable[Tuple[float, float]]) -> 'SpatialHash':
+        """
+        依元件尺寸選擇格子邊長並建立索引
+
+        Args:
+            board_size: 板子大小 (width, height)
+            sizes: 元件尺寸列表 [(width, height), ...]
+        """
+        extents = [max(w, h) for w, h in sizes]
+        cell_size = 2.0 * float(np.mean(extents)) if extents else 10.0
+        return cls(board_size, cell_size=max(cell_size, 1e-6))
+
+    def _cell_range(self, x: float, y: float, w: float, h: float) -> Tuple[int, int, int, int]:
+        """矩形覆蓋的格子範圍（含端點）"""
+        size = self.cell_size
+        return (math.floor(x / size), math.floor(y / size),
+                math.floor((x + w) / size), math.floor((y + h) / size))
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.boxes
+
+    def insert(self, key: Hashable, x: float, y: float, w: float, h: float):
+        """加入（或更新）元件邊界框"""
+        if key in self.boxes:
+            self.remove(key)
+
+        self.boxes[key] = (x, y, w, h)
+        x0, y0, x1, y1 = self._cell_range(x, y, w, h)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self._cells.setdefault((cx, cy), set()).add(key)
+
+    def remove(self, key: Hashable):
+        """移除元件邊界框（不存在時忽略）"""
+        box = self.boxes.pop(key, None)
+        if box is None:
+            return
+
+        x0, y0, x1, y1 = self._cell_range(*box)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                members = self._cells.get((cx, cy))
+                if members is not None:
+                    members.discard(key)
+                    if not members:
+                        del self._cells[(cx, cy)]
+
+    def move(self, key: Hashable, x: float, y: float):
+        """移動元件（保持尺寸）"""
+        _, _, w, h = self.boxes[key]
+        self.insert(key, x, y, w, h)
+
+    def _candidates(self, x: float, y: float, w: float, h: float) -> Set[Hashable]:
+        """矩形覆蓋格子中的所有元件"""
+        x0, y0, x1, y1 = self._cell_range(x, y, w, h)
+        found: Set[Hashable] = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                members = self._cells.get((cx, cy))
+                if members:
+                    found |= members
+        return found
+
+    def query(self, x: float, y: float, w: float, h: float,
+              exclude: Iterable[Hashable] = ()) -> List[Hashable]:
+        """
+        查詢與矩形重疊的元件
+
+        Args:
+            x, y, w, h: 查詢矩形
+            exclude: 忽略的元件
+
+        Returns:
+            重疊元件列表
+        """
+        excluded = set(exclude)
+        result = []
+        for key in self._candidates(x, y, w, h):
+            if key in excluded:
+                continue
+            ox, oy, ow, oh = self.boxes[key]
+            if not (x + w <= ox or x >= ox + ow or y + h <= oy or y >= oy + oh):
+                result.append(key)
+        return result
+
+    def overlaps(self, x: float, y: float, w: float, h: float,
+                 exclude: Iterable[Hashable] = ()) -> bool:
+        """矩形是否與任何元件重疊"""
+        excluded = set(exclude)
+        x0, y0, x1, y1 = self._cell_range(x, y, w, h)
+        checked: Set[Hashable] = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                members = self._cells.get((cx, cy))
+                if not members:
+                    continue
+                for key in members:
+                    if key in checked or key in excluded:
+                        continue
+                    checked.add(key)
+                    ox, oy, ow, oh = self.boxes[key]
+                    if not (x + w <= ox or x >= ox + ow or y + h <= oy or y >= oy + oh):
+                        return True
+        return False
+
+    def in_bounds(self, x: float, y: float, w: float, h: float) -> bool:
+        """矩形是否完全位於板內"""
+        return x >= 0 and y >= 0 and x + w <= self.board_size[0] and y + h <= self.board_size[1]
+
+    def is_free(self, x: float, y: float, w: float, h: float,
+                exclude: Iterable[Hashable] = ()) -> bool:
+        """矩形是否位於板內且不與任何元件重疊"""
+        return self.in_bounds(x, y, w, h) and not self.overlaps(x, y, w, h, exclude)
+
+    def sample_free_position(self, w: float, h: float,
+                             max_attempts: int = 100,
+                             exclude: Iterable[Hashable] = (),
+                             integer: bool = False,
+                             rng: Optional[np.random.Generator] = None
+                             ) -> Optional[Tuple[float, float]]:
+        """
+        在板上隨機採樣不重疊的位置
+
+        先從沒有任何元件的雜湊格子中取樣（這些區域通常可直接放下），
+        再退回整板均勻取樣；每次檢查平均 O(1)。
+
+        Args:
+            w, h: 元件尺寸
+            max_attempts: 最大嘗試次數
+            exclude: 忽略的元件
+            integer: 是否只取整數座標（網格擺放器使用）
+            rng: 隨機數產生器（None 表示使用 np.random 全域狀態）
+
+        Returns:
+            左下角座標 (x, y)，找不到時返回 None
+        """
+        max_x = self.board_size[0] - w
+        max_y = self.board_size[1] - h
+        if max_x < 0 or max_y < 0:
+            return None
+
+        random = np.random if rng is None else rng
+        size = self.cell_size
+        n_cx = max(1, math.ceil(self.board_size[0] / size))
+        n_cy = max(1, math.ceil(self.board_size[1] / size))
+        occupied_ratio = len(self._cells) / (n_cx * n_cy)
+
+        # 整數座標時上界包含 max_x / max_y
+        span_x = max_x + 1 if integer else max_x
+        span_y = max_y + 1 if integer else max_y
+
+        for attempt in range(max_attempts):
+            if attempt % 2 == 0 and occupied_ratio < 0.9:
+                # 從空格子中取樣：隨機選格子，若已被佔用則改用均勻取樣
+                cx = int(random.uniform(0, n_cx))
+                cy = int(random.uniform(0, n_cy))
+                if (cx, cy) not in self._cells:
+                    x = min(cx * size + random.uniform(0, size), max_x)
+                    y = min(cy * size + random.uniform(0, size), max_y)
+                else:
+                    x = random.uniform(0, span_x)
+                    y = random.uniform(0, span_y)
+            else:
+                x = random.uniform(0, span_x)
+                y = random.uniform(0, span_y)
+
+            if integer:
+                x, y = min(int(x), int(max_x)), min(int(y), int(max_y))
+
+            if not self.overlaps(x, y, w, h, exclude):
+                return (x, y)
+
+        return None
+
+    def copy(self) -> 'SpatialHash':
+        """複製索引"""
+        new_index = SpatialHash(self.board_size, self.cell_size)
+        new_index.boxes = self.boxes.copy()
+        new_index._cells = {cell: members.copy() for cell, members in self._cells.items()}
+        return new_index
@@ -0,0 +1,206 @@
+"""
+測試共用空間索引 SpatialHash
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from spatial_index import SpatialHash
+
+
+def _brute_force_query(boxes, x, y, w, h, exclude=()):
+    return sorted(key for key, (ox, oy, ow, oh) in boxes.items()
+                  if key not in exclude and
+                  not (x + w <= ox or x >= ox + ow or y + h <= oy or y >= oy + oh))
+
+
+def _cells_of(index, key):
+    return {cell for cell, members in index._cells.items() if key in members}
+
+
+def test_insert_query_remove():
+    """測試加入、查詢與移除後格子被清空"""
+    index = SpatialHash((100, 80), cell_size=10)
+    index.insert('A', 5, 5, 4, 4)
+    index.insert('B', 12, 5, 4, 4)
+
+    assert len(index) == 2 and 'A' in index
+    assert sorted(index.query(0, 0, 20, 20)) == ['A', 'B']
+    assert index.query(8, 5, 2, 2) == ['A']
+    assert index.query(9.5, 0, 2, 2) == []
+
+    index.remove('A')
+    index.remove('missing')
+
+    assert 'A' not in index
+    assert index.query(5, 5, 4, 4) == []
+    assert _cells_of(index, 'A') == set()
+    assert all(index._cells.values())
+
+
+def test_move_and_reinsert_update_cells():
+    """測試移動與重新加入同一元件只保留新位置"""
+    index = SpatialHash((100, 80), cell_size=10)
+    index.insert('A', 1, 1, 3, 3)
+    index.move('A', 51, 61)
+
+    assert index.boxes['A'] == (51, 61, 3, 3)
+    assert index.query(0, 0, 10, 10) == []
+    assert index.query(50, 60, 5, 5) == ['A']
+    assert _cells_of(index, 'A') == {(5, 6)}
+
+    index.insert('A', 20, 20, 1, 1)
+    assert _cells_of(index, 'A') == {(2, 2)}
+    assert len(index) == 1
+
+
+def test_component_larger_than_cell():
+    """測試跨越多個格子的元件在每個格子都查得到"""
+    index = SpatialHash((100, 80), cell_size=5)
+    index.insert('U1', 3, 3, 32, 21)
+
+    assert len(_cells_of(index, 'U1')) >= 7 * 5
+    # 查詢矩形完全位於元件內部、遠離其左下角的格子
+    assert index.query(30, 20, 1, 1) == ['U1']
+    assert index.overlaps(18, 12, 0.5, 0.5)
+
+    index.remove('U1')
+    assert index._cells == {}
+
+
+def test_touching_is_not_overlap():
+    """測試只有邊相接的矩形不算重疊"""
+    index = SpatialHash((100, 80), cell_size=10)
+    index.insert('A', 10, 10, 10, 10)
+
+    for x, y in [(0, 10), (20, 10), (10, 0), (10, 20), (20, 20), (0, 0)]:
+        assert not index.overlaps(x, y, 10, 10), (x, y)
+        assert index.query(x, y, 10, 10) == []
+    assert index.overlaps(19.999, 10, 10, 10)
+    assert index.overlaps(10, 10, 10, 10, exclude=('B',))
+    assert not index.overlaps(10, 10, 10, 10, exclude=('A',))
+
+
+def test_in_bounds_at_board_edges():
+    """測試貼齊板邊的元件在板內，超出一點即出界"""
+    index = SpatialHash((100, 80), cell_size=10)
+
+    assert index.in_bounds(0, 0, 100, 80)
+    assert index.in_bounds(90, 70, 10, 10)
+    assert not index.in_bounds(90.001, 70, 10, 10)
+    assert not index.in_bounds(0, 70.001, 10, 10)
+    assert not index.in_bounds(-0.001, 0, 10, 10)
+    assert not index.in_bounds(0, -0.001, 10, 10)
+
+    index.insert('edge', 90, 70, 10, 10)
+    assert index.query(95, 75, 10, 10) == ['edge']
+    assert index.is_free(80, 70, 10, 10)
+    assert not index.is_free(85, 70, 10, 10)
+    assert not index.is_free(95, 0, 10, 10)
+
+
+@pytest.mark.parametrize('cell_size', [0.7, 3.0, 25.0, 200.0])
+def test_queries_match_brute_force(cell_size):
+    """測試隨機插入、移動、移除後查詢與逐一比較一致"""
+    rng = np.random.default_rng(int(cell_size * 10))
+    index = SpatialHash((60, 40), cell_size=cell_size)
+    boxes = {}
+    for step in range(400):
+        key = int(rng.integers(30))
+        op = rng.random()
+        if op < 0.5:
+            w, h = rng.uniform(0.2, 15, size=2)
+            box = (float(rng.uniform(0, 60 - w)), float(rng.uniform(0, 40 - h)), float(w), float(h))
+            index.insert(key, *box)
+            boxes[key] = box
+        elif op < 0.7 and key in boxes:
+            x, y = rng.uniform(0, 45), rng.uniform(0, 25)
+            index.move(key, x, y)
+            boxes[key] = (x, y, *boxes[key][2:])
+        elif op < 0.8:
+            index.remove(key)
+            boxes.pop(key, None)
+
+        w, h = rng.uniform(0.1, 20, size=2)
+        x, y = rng.uniform(-5, 60), rng.uniform(-5, 40)
+        exclude = (int(rng.integers(30)),)
+        expected = _brute_force_query(boxes, x, y, w, h, exclude)
+        assert sorted(index.query(x, y, w, h, exclude)) == expected
+        assert index.overlaps(x, y, w, h, exclude) == bool(expected)
+
+    assert index.boxes == boxes
+
+
+def test_copy_is_independent():
+    """測試複製的索引與原索引互不影響"""
+    index = SpatialHash((100, 80), cell_size=10)
+    index.insert('A', 5, 5, 4, 4)
+    clone = index.copy()
+    clone.move('A', 50, 50)
+    clone.insert('B', 5, 5, 4, 4)
+
+    assert index.boxes == {'A': (5, 5, 4, 4)}
+    assert index.query(50, 50, 4, 4) == []
+    assert sorted(clone.query(0, 0, 100, 80)) == ['A', 'B']
+
+
+def test_for_components_cell_size():
+    """測試格子邊長為元件最大邊平均的兩倍"""
+    index = SpatialHash.for_components((100, 80), [(2, 4), (6, 2)])
+
+    assert index.cell_size == pytest.approx(10.0)
+    assert SpatialHash.for_components((100, 80), []).cell_size == 10.0
+    with pytest.raises(ValueError):
+        SpatialHash((100, 80), cell_size=0)
+
+
+@pytest.mark.parametrize('integer', [False, True])
+def test_sample_free_position(integer):
+    """測試採樣的位置在板內、不重疊，且以相同產生器可重現"""
+    index = SpatialHash((50, 40), cell_size=6)
+    rng = np.random.default_rng(0)
+    for key in range(40):
+        w, h = rng.uniform(1, 8, size=2)
+        position = index.sample_free_position(w, h, integer=integer, rng=rng)
+        if position is None:
+            continue
+        x, y = position
+        assert index.is_free(x, y, w, h)
+        if integer:
+            assert x == int(x) and y == int(y)
+        index.insert(key, x, y, w, h)
+
+    assert len(index) > 20
+    first = index.copy().sample_free_position(3, 3, integer=integer, rng=np.random.default_rng(5))
+    second = index.copy().sample_free_position(3, 3, integer=integer, rng=np.random.default_rng(5))
+    assert first == second
+
+
+def test_sample_free_position_edge_cases():
+    """測試與板同大、大於板子、板已滿與排除自己的採樣"""
+    rng = np.random.default_rng(1)
+    index = SpatialHash((20, 10), cell_size=4)
+
+    assert index.sample_free_position(20, 10, rng=rng) == (0.0, 0.0)
+    assert index.sample_free_position(20.5, 1, rng=rng) is None
+    assert index.sample_free_position(1, 10.5, rng=rng) is None
+
+    index.insert('full', 0, 0, 20, 10)
+    assert index.sample_free_position(1, 1, max_attempts=50, rng=rng) is None
+    assert index.sample_free_position(5, 5, exclude=('full',), rng=rng) is not None
+
+    x, y = index.sample_free_position(19, 9, exclude=('full',), integer=True, rng=rng)
+    assert 0 <= x <= 1 and 0 <= y <= 1
+
+
+def test_sample_free_position_uses_global_state_without_rng():
+    """測試未指定產生器時使用 np.random 全域狀態"""
+    index = SpatialHash((50, 40), cell_size=6)
+
+    np.random.seed(3)
+    first = index.sample_free_position(2, 2)
+    np.random.seed(3)
+    assert index.sample_free_position(2, 2) == first
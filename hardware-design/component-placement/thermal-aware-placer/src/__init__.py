@@ -1,5 +1,6 @@
 """熱感知元件擺放器模組"""
 
 from .thermal_placer import ThermalAwarePlacer, Component, Connection, HeatsinkArea
+from .thermal_model import ThermalField
 
-__all__ = ['ThermalAwarePlacer', 'Component', 'Connection', 'HeatsinkArea']
+__all__ = ['ThermalAwarePlacer', 'Component', 'Connection', 'HeatsinkArea', 'ThermalField']
@@ -0,0 +1,364 @@
+"""
+熱擴散模型的快速求解
+
+ThermalAwarePlacer 的參考模型是在網格上迭代 N 步的顯式擴散，以溫升 u（高於環境溫度的部分）表示：
+
+    u ← B(M(u + D·∇²u + S))
+
+其中 S 為熱源強度圖、M 為散熱區域遮罩（乘上 1 - 效率）、B 將板邊設為環境溫度。
+模型對 S 為線性且不隨時間變化，因此可以不逐步迭代：
+
+- 無散熱區域時，板邊為 Dirichlet 條件，∇² 可由 DST-I（奇延拓後的 FFT）對角化，
+  N 步結果等於每個頻率上的幾何級數，一次正反轉換即得到與迭代相同的結果
+- 熱脈衝響應核（自由空間 N 步響應）只與 (N, D) 有關，預先計算並截斷到
+  能量可忽略的半徑；單一元件移動時，溫度變化是局部區域與核的 FFT 卷積，
+  板邊以奇對稱鏡像處理
+- 散熱區域的遮罩使響應隨位置改變，無法用單一核表示；受其影響的熱源
+  （距散熱區域在核半徑內）改在包含散熱區域的小視窗上做精確迭代
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy.fft import dstn, idstn
+from scipy.ndimage import maximum_filter
+from scipy.signal import fftconvolve
+
+Rect = Tuple[int, int, int, int]  # (gy, gy_end, gx, gx_end) 網格座標
+
+# 截斷熱脈衝響應核時允許遺漏的相對能量
+KERNEL_TOLERANCE = 1e-12
+
+
+def _laplacian(u: np.ndarray) -> np.ndarray:
+    """5 點差分拉普拉斯算子（視窗外視為 0，即環境溫度）"""
+    lap = -4.0 * u
+    lap[1:, :] += u[:-1, :]
+    lap[:-1, :] += u[1:, :]
+    lap[:, 1:] += u[:, :-1]
+    lap[:, :-1] += u[:, 1:]
+    return lap
+
+
+@lru_cache(maxsize=16)
+def impulse_response(num_iterations: int, diffusivity: float) -> Tuple[np.ndarray, int]:
+    """
+    自由空間的 N 步熱脈衝響應核
+
+    Args:
+        num_iterations: 熱模擬迭代次數 N
+        diffusivity: 熱擴散係數 D
+
+    Returns:
+        (截斷後的核, 核半徑)；核為唯讀陣列
+    """
+    n = max(1, num_iterations)
+    size = 2 * n + 1
+    impulse = np.zeros((size, size))
+    impulse[n, n] = 1.0
+
+    response = np.zeros((size, size))
+    for _ in range(num_iterations):
+        response = response + diffusivity * _laplacian(response) + impulse
+
+    # 找出外圍能量可忽略的最小半徑
+    magnitude = np.abs(response)
+    total = magnitude.sum()
+    radius = n
+    for r in range(n + 1):
+        inside = magnitude[n - r:n + r + 1, n - r:n + r + 1].sum()
+        if total - inside <= KERNEL_TOLERANCE * total:
+            radius = r
+            break
+
+    kernel = response[n - radius:n + radius + 1, n - radius:n + radius + 1].copy()
+    kernel.flags.writeable = False
+    return kernel, radius
+
+
+@lru_cache(maxsize=16)
+def spectral_transfer(grid_height: int, grid_width: int,
+                      num_iterations: int, diffusivity: float) -> np.ndarray:
+    """
+    板內網格（去除板邊）在 DST-I 頻域的 N 步轉移函數
+
+    一步迭代在頻率 (k, l) 上乘以 λ = 1 + D·(2cos(πk/(H-1)) + 2cos(πl/(W-1)) - 4)，
+    N 步後熱源的總響應為 1 + λ + ... + λ^(N-1)。
+
+    Returns:
+        形狀為 (H-2, W-2) 的唯讀陣列
+    """
+    eigen_y = 2 * np.cos(np.pi * np.arange(1, grid_height - 1) / (grid_height - 1)) - 2
+    eigen_x = 2 * np.cos(np.pi * np.arange(1, grid_width - 1) / (grid_width - 1)) - 2
+    step = 1 + diffusivity * (eigen_y[:, None] + eigen_x[None, :])
+
+    gap = 1 - step
+    degenerate = np.abs(gap) < 1e-12
+    transfer = (1 - step ** num_iterations) / np.where(degenerate, 1.0, gap)
+    transfer[degenerate] = num_iterations
+    transfer.flags.writeable = False
+    return transfer
+
+
+def spectral_solve(source: np.ndarray, num_iterations: int, diffusivity: float) -> np.ndarray:
+    """
+    無散熱區域時的 N 步溫升（與逐步迭代的結果相同，誤差為浮點捨入）
+
+    Args:
+        source: 熱源強度圖 (H, W)
+        num_iterations: 熱模擬迭代次數
+        diffusivity: 熱擴散係數
+
+    Returns:
+        溫升分佈 (H, W)，板邊為 0
+    """
+    grid_height, grid_width = source.shape
+    rise = np.zeros(source.shape)
+    if grid_height < 3 or grid_width < 3 or num_iterations <= 0:
+        return rise
+
+    transfer = spectral_transfer(grid_height, grid_width, num_iterations, diffusivity)
+    rise[1:-1, 1:-1] = idstn(transfer * dstn(source[1:-1, 1:-1], type=1), type=1)
+    return rise
+
+
+def diffuse(source: np.ndarray, mask: np.ndarray, num_iterations: int,
+            diffusivity: float, board_edges: Tuple[bool, bool, bool, bool]) -> np.ndarray:
+    """
+    在視窗上逐步迭代顯式擴散（含散熱區域遮罩）
+
+    Args:
+        source: 視窗內的熱源強度
+        mask: 視窗內的散熱效率
+        num_iterations: 熱模擬迭代次數
+        diffusivity: 熱擴散係數
+        board_edges: 視窗的 (下, 上, 左, 右) 邊是否為板邊（板邊固定為環境溫度）
+
+    Returns:
+        視窗內的溫升
+    """
+    keep = 1 - mask
+    rise = np.zeros(source.shape)
+    low_y, high_y, low_x, high_x = board_edges
+    for _ in range(num_iterations):
+        rise = (rise + diffusivity * _laplacian(rise) + source) * keep
+        if low_y:
+            rise[0, :] = 0
+        if high_y:
+            rise[-1, :] = 0
+        if low_x:
+            rise[:, 0] = 0
+        if high_x:
+            rise[:, -1] = 0
+    return rise
+
+
+def _axis_images(start: int, end: int, size: int,
+                 lo: int, hi: int) -> List[Tuple[int, bool, float]]:
+    """
+    一維上區間 [start, end) 對板邊 0 與 size-1 奇對稱鏡像後，與 [lo, hi) 相交的像
+
+    Returns:
+        [(像的起點, 是否反轉, 符號), ...]
+    """
+    period = 2 * (size - 1)
+    images = []
+    k_min = (lo - end) // period - 1
+    k_max = (hi + end) // period + 1
+    for k in range(k_min, k_max + 1):
+        shift = k * period
+        # 平移像：i → i + kP
+        if start + shift < hi and end + shift > lo:
+            images.append((start + shift, False, 1.0))
+        # 反射像：i → kP - i，佔據 [kP - end + 1, kP - start + 1)
+        if shift - end + 1 < hi and shift - start + 1 > lo:
+            images.append((shift - end + 1, True, -1.0))
+    return images
+
+
+class ThermalField:
+    """
+    可增量更新的溫升場
+
+    保存熱源強度圖與溫升分佈；移動單一元件時只重算受影響的局部區域，
+    並可撤銷最後一次移動（供模擬退火拒絕提案時使用）。
+    """
+
+    def __init__(self, shape: Tuple[int, int], heatsink_mask: np.ndarray,
+                 rects: List[Rect], intensities: List[float],
+                 num_iterations: int = 50, diffusivity: float = 0.1):
+        """
+        初始化溫升場
+
+        Args:
+            shape: 網格大小 (grid_height, grid_width)
+            heatsink_mask: 散熱效率圖
+            rects: 各熱源的網格矩形（依繪製順序，後者覆蓋前者）
+            intensities: 各熱源的強度
+            num_iterations: 熱模擬迭代次數
+            diffusivity: 熱擴散係數
+        """
+        self.shape = shape
+        self.num_iterations = num_iterations
+        self.diffusivity = diffusivity
+        self.mask = heatsink_mask
+        self.rects = np.array(rects, dtype=int).reshape(-1, 4)
+        self.intensities = np.asarray(intensities, dtype=float)
+
+        self.kernel, self.radius = impulse_response(num_iterations, diffusivity)
+
+        # 只有板內的散熱區域會影響結果（板邊本來就是環境溫度）
+        interior = np.zeros(shape, dtype=bool)
+        interior[1:-1, 1:-1] = heatsink_mask[1:-1, 1:-1] > 0
+        self.has_heatsinks = bool(interior.any())
+        self.near_heatsink = (maximum_filter(interior, size=2 * self.radius + 1)
+                              if self.has_heatsinks else None)
+
+        self._undo: Optional[Tuple] = None
+        self.source = self._paint((0, shape[0], 0, shape[1]))
+        self.rise = self._solve_full()
+
+    def _paint(self, region: Rect) -> np.ndarray:
+        """重新繪製區域內的熱源強度（與參考模型相同的覆蓋順序）"""
+        y0, y1, x0, x1 = region
+        painted = np.zeros((y1 - y0, x1 - x0))
+        rects = self.rects
+        hits = np.nonzero((rects[:, 0] < y1) & (rects[:, 1] > y0) &
+                          (rects[:, 2] < x1) & (rects[:, 3] > x0))[0]
+        for i in hits:
+            gy, gy_end, gx, gx_end = rects[i]
+            painted[max(gy, y0) - y0:min(gy_end, y1) - y0,
+                    max(gx, x0) - x0:min(gx_end, x1) - x0] = self.intensities[i]
+        return painted
+
+    def _expand(self, region: Rect, margin: int) -> Rect:
+        """向外擴張 margin 格並裁切到板內"""
+        y0, y1, x0, x1 = region
+        return (max(0, y0 - margin), min(self.shape[0], y1 + margin),
+                max(0, x0 - margin), min(self.shape[1], x1 + margin))
+
+    def _board_edges(self, window: Rect) -> Tuple[bool, bool, bool, bool]:
+        y0, y1, x0, x1 = window
+        return (y0 == 0, y1 == self.shape[0], x0 == 0, x1 == self.shape[1])
+
+    def _diffuse(self, source: np.ndarray, window: Rect) -> np.ndarray:
+        """視窗內的精確迭代（source 已裁切到視窗）"""
+        y0, y1, x0, x1 = window
+        return diffuse(source, self.mask[y0:y1, x0:x1], self.num_iterations,
+                       self.diffusivity, self._board_edges(window))
+
+    def _solve_full(self) -> np.ndarray:
+        """整板求解：遠離散熱區域的熱源用頻域解，其餘在散熱區域附近的視窗上迭代"""
+        if not self.has_heatsinks:
+            return spectral_solve(self.source, self.num_iterations, self.diffusivity)
+
+        near = self.near_heatsink
+        rise = spectral_solve(np.where(near, 0.0, self.source),
+                              self.num_iterations, self.diffusivity)
+
+        rows = np.nonzero(near.any(axis=1))[0]
+        cols = np.nonzero(near.any(axis=0))[0]
+        window = self._expand((rows[0], rows[-1] + 1, cols[0], cols[-1] + 1), self.radius)
+        y0, y1, x0, x1 = window
+        near_source = np.where(near[y0:y1, x0:x1], self.source[y0:y1, x0:x1], 0.0)
+        rise[y0:y1, x0:x1] += self._diffuse(near_source, window)
+        return rise
+
+    def _convolve_local(self, delta: np.ndarray, region: Rect, window: Rect) -> np.ndarray:
+        """區域熱源變化在視窗內造成的溫升變化（核卷積 + 板邊鏡像）"""
+        radius = self.radius
+        ry0, ry1, rx0, rx1 = region
+        wy0, wy1, wx0, wx1 = window
+        cy0, cy1 = wy0 - radius, wy1 + radius
+        cx0, cx1 = wx0 - radius, wx1 + radius
+        canvas = np.zeros((cy1 - cy0, cx1 - cx0))
+
+        for sy, flip_y, sign_y in _axis_images(ry0, ry1, self.shape[0], cy0, cy1):
+            for sx, flip_x, sign_x in _axis_images(rx0, rx1, self.shape[1], cx0, cx1):
+                block = delta[::-1 if flip_y else 1, ::-1 if flip_x else 1]
+                h, w = block.shape
+                # 裁切到畫布內
+                ty0, tx0 = max(sy, cy0), max(sx, cx0)
+                ty1, tx1 = min(sy + h, cy1), min(sx + w, cx1)
+                canvas[ty0 - cy0:ty1 - cy0, tx0 - cx0:tx1 - cx0] += (
+                    sign_y * sign_x * block[ty0 - sy:ty1 - sy, tx0 - sx:tx1 - sx])
+
+        return fftconvolve(canvas, self.kernel, mode='valid')
+
+    def move(self, index: int, rect: Rect):
+        """
+        移動第 index 個熱源到新的網格矩形並增量更新溫升
+
+        Args:
+            index: 熱源索引（建構時 rects 的順序）
+            rect: 新的網格矩形
+        """
+        old_rect = tuple(self.rects[index])
+        if old_rect == tuple(rect):
+            self._undo = None
+            return
+
+        region = (min(old_rect[0], rect[0]), max(old_rect[1], rect[1]),
+                  min(old_rect[2], rect[2]), max(old_rect[3], rect[3]))
+        y0, y1, x0, x1 = region
+        window = self._expand(region, self.radius)
+        wy0, wy1, wx0, wx1 = window
+
+        old_source = self.source[y0:y1, x0:x1].copy()
+        self._undo = (index, old_rect, region, old_source, window,
+                      self.rise[wy0:wy1, wx0:wx1].copy())
+
+        self.rects[index] = rect
+        new_source = self._paint(region)
+        self.source[y0:y1, x0:x1] = new_source
+
+        if self.shape[0] < 3 or self.shape[1] < 3:
+            return
+
+        # 板邊上的熱源每步都被重設為環境溫度，不產生溫升
+        delta = new_source - old_source
+        if y0 == 0:
+            delta[0, :] = 0
+        if y1 == self.shape[0]:
+            delta[-1, :] = 0
+        if x0 == 0:
+            delta[:, 0] = 0
+        if x1 == self.shape[1]:
+            delta[:, -1] = 0
+        if not delta.any():
+            return
+
+        if self.has_heatsinks and self.near_heatsink[y0:y1, x0:x1].any():
+            padded = np.zeros((wy1 - wy0, wx1 - wx0))
+            padded[y0 - wy0:y1 - wy0, x0 - wx0:x1 - wx0] = delta
+            change = self._diffuse(padded, window)
+        else:
+            change = self._convolve_local(delta, region, window)
+
+        rise = self.rise[wy0:wy1, wx0:wx1]
+        rise += change
+        if wy0 == 0:
+            rise[0, :] = 0
+        if wy1 == self.shape[0]:
+            rise[-1, :] = 0
+        if wx0 == 0:
+            rise[:, 0] = 0
+        if wx1 == self.shape[1]:
+            rise[:, -1] = 0
+
+    def undo(self):
+        """撤銷最後一次 move"""
+        if self._undo is None:
+            return
+        index, old_rect, region, old_source, window, old_rise = self._undo
+        y0, y1, x0, x1 = region
+        wy0, wy1, wx0, wx1 = window
+        self.rects[index] = old_rect
+        self.source[y0:y1, x0:x1] = old_source
+        self.rise[wy0:wy1, wx0:wx1] = old_rise
+        self._undo = None
+
+    def max_rise(self) -> float:
+        """最高溫升"""
+        return float(self.rise.max())
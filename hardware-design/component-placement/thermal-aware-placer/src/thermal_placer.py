@@ -3,11 +3,23 @@
 考慮熱分佈的 PCB 元件擺放優化
 """
 
+import os
+import sys
+from collections import OrderedDict
 import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
 from scipy.ndimage import convolve
 
+from thermal_model import ThermalField
+
+# 共用空間索引（component-placement/src/spatial_index.py）
+_SHARED_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+if _SHARED_SRC not in sys.path:
+    sys.path.append(_SHARED_SRC)
+from spatial_index import SpatialHash
+from profiling import NULL_PROFILER
+
 
 @dataclass
 class Component:
@@ -40,7 +52,9 @@ class ThermalAwarePlacer:
 
     def __init__(self, board_size: Tuple[float, float] = (100, 80),
                  ambient_temp: float = 25.0,
-                 grid_resolution: float = 1.0):
+                 grid_resolution: float = 1.0,
+                 thermal_model: str = 'fast',
+                 thermal_cache_size: int = 64):
         """
         初始化熱感知擺放器
 
@@ -48,10 +62,16 @@ class ThermalAwarePlacer:
             board_size: 板子大小 (width, height) in mm
             ambient_temp: 環境溫度 (°C)
             grid_resolution: 熱模擬網格解析度 (mm)
+            thermal_model: 熱模型 ('fast': 頻域求解 + 局部卷積, 'diffusion': 逐步迭代)
+            thermal_cache_size: 溫度場快取的最大筆數（0 表示不快取）
         """
+        if thermal_model not in ('fast', 'diffusion'):
+            raise ValueError(f"未知熱模型: {thermal_model}")
+
         self.board_size = board_size
         self.ambient_temp = ambient_temp
         self.grid_resolution = grid_resolution
+        self.thermal_model = thermal_model
 
         # 計算熱模擬網格大小
         self.grid_width = int(board_size[0] / grid_resolution)
@@ -59,11 +79,19 @@ class ThermalAwarePlacer:
 
         self.components: Dict[str, Component] = {}
         self.connections: List[Connection] = []
+
+        # 分階段效能量測（基準測試工具會換成 PhaseProfiler）
+        self.profiler = NULL_PROFILER
+
         self.heatsink_areas: List[HeatsinkArea] = []
 
         # 熱模擬參數
         self.thermal_diffusivity = 0.1  # 熱擴散係數
 
+        # 溫度場快取：以網格量化後的熱源佈局為鍵（LRU）
+        self.thermal_cache_size = thermal_cache_size
+        self._thermal_cache: 'OrderedDict[Tuple, np.ndarray]' = OrderedDict()
+
     def add_component(self, name: str, size: Tuple[float, float],
                      power: float = 0.0, thermal_resistance: float = 10.0):
         """
@@ -93,48 +121,46 @@ class ThermalAwarePlacer:
         """
         self.heatsink_areas.append(HeatsinkArea(position, size, efficiency))
 
-    def _simulate_thermal(self, layout: Dict[str, Tuple[float, float]],
-                         num_iterations: int = 50) -> np.ndarray:
+    def _heat_rect(self, comp: Component,
+                   position: Tuple[float, float]) -> Tuple[Tuple[int, int, int, int], float]:
         """
-        模擬熱分佈
-
-        Args:
-            layout: 元件佈局
-            num_iterations: 熱模擬迭代次數
+        元件熱源在網格上的矩形與強度
 
         Returns:
-            溫度分佈矩陣
+            ((gy, gy_end, gx, gx_end), 熱源強度)
         """
-        # 初始化溫度場
-        temperature = np.ones((self.grid_height, self.grid_width)) * self.ambient_temp
+        x, y = position
+        # 轉換為網格座標
+        gx = int(x / self.grid_resolution)
+        gy = int(y / self.grid_resolution)
+        gw = max(1, int(comp.size[0] / self.grid_resolution))
+        gh = max(1, int(comp.size[1] / self.grid_resolution))
 
-        # 初始化熱源
-        heat_source = np.zeros((self.grid_height, self.grid_width))
+        # 確保不超出邊界
+        gx = min(gx, self.grid_width - 1)
+        gy = min(gy, self.grid_height - 1)
+        gx_end = min(gx + gw, self.grid_width)
+        gy_end = min(gy + gh, self.grid_height)
 
-        # 添加元件熱源
+        # 計算熱源強度（功率 / 面積）
+        area = gw * gh * (self.grid_resolution ** 2)
+        heat_intensity = comp.power / (area / 1000)  # W/mm²轉換
+
+        return (gy, gy_end, gx, gx_end), heat_intensity
+
+    def _heat_sources(self, layout: Dict[str, Tuple[float, float]]
+                      ) -> List[Tuple[str, Tuple[int, int, int, int], float]]:
+        """佈局中有功耗元件的熱源（依佈局順序，後者覆蓋前者）"""
+        sources = []
         for name, position in layout.items():
             comp = self.components[name]
             if comp.power > 0:
-                x, y = position
-                # 轉換為網格座標
-                gx = int(x / self.grid_resolution)
-                gy = int(y / self.grid_resolution)
-                gw = max(1, int(comp.size[0] / self.grid_resolution))
-                gh = max(1, int(comp.size[1] / self.grid_resolution))
-
-                # 確保不超出邊界
-                gx = min(gx, self.grid_width - 1)
-                gy = min(gy, self.grid_height - 1)
-                gx_end = min(gx + gw, self.grid_width)
-                gy_end = min(gy + gh, self.grid_height)
-
-                # 計算熱源強度（功率 / 面積）
-                area = gw * gh * (self.grid_resolution ** 2)
-                heat_intensity = comp.power / (area / 1000)  # W/mm²轉換
+                rect, intensity = self._heat_rect(comp, position)
+                sources.append((name, rect, intensity))
+        return sources
 
-                heat_source[gy:gy_end, gx:gx_end] = heat_intensity
-
-        # 散熱區域遮罩
+    def _heatsink_mask(self) -> np.ndarray:
+        """散熱區域遮罩（各格的散熱效率）"""
         heatsink_mask = np.zeros((self.grid_height, self.grid_width))
         for heatsink in self.heatsink_areas:
             x, y = heatsink.position
@@ -150,6 +176,80 @@ class ThermalAwarePlacer:
 
             heatsink_mask[gy:gy_end, gx:gx_end] = heatsink.efficiency
 
+        return heatsink_mask
+
+    def _field_from_sources(self, sources: List[Tuple[str, Tuple[int, int, int, int], float]],
+                            num_iterations: int = 50) -> ThermalField:
+        """由熱源列表建立可增量更新的溫升場"""
+        return ThermalField(
+            (self.grid_height, self.grid_width), self._heatsink_mask(),
+            [rect for _, rect, _ in sources], [intensity for _, _, intensity in sources],
+            num_iterations=num_iterations, diffusivity=self.thermal_diffusivity)
+
+    def _simulate_thermal(self, layout: Dict[str, Tuple[float, float]],
+                         num_iterations: int = 50) -> np.ndarray:
+        """
+        模擬熱分佈
+
+        'fast' 模型的結果與逐步迭代相同（誤差為浮點捨入），並依網格量化後的
+        熱源佈局快取；返回的快取陣列為唯讀。
+
+        Args:
+            layout: 元件佈局
+            num_iterations: 熱模擬迭代次數
+
+        Returns:
+            溫度分佈矩陣
+        """
+        if self.thermal_model == 'diffusion':
+            return self._simulate_thermal_diffusion(layout, num_iterations)
+
+        sources = self._heat_sources(layout)
+        heatsinks = tuple((hs.position, hs.size, hs.efficiency) for hs in self.heatsink_areas)
+        key = (tuple((rect, intensity) for _, rect, intensity in sources), heatsinks,
+               num_iterations, self.thermal_diffusivity, self.ambient_temp)
+
+        cached = self._thermal_cache.get(key)
+        if cached is not None:
+            self._thermal_cache.move_to_end(key)
+            return cached
+
+        field = self._field_from_sources(sources, num_iterations)
+        temperature = field.rise + self.ambient_temp
+        temperature.flags.writeable = False
+
+        if self.thermal_cache_size > 0:
+            self._thermal_cache[key] = temperature
+            while len(self._thermal_cache) > self.thermal_cache_size:
+                self._thermal_cache.popitem(last=False)
+
+        return temperature
+
+    def _simulate_thermal_diffusion(self, layout: Dict[str, Tuple[float, float]],
+                                    num_iterations: int = 50) -> np.ndarray:
+        """
+        模擬熱分佈（逐步迭代的參考實作）
+
+        Args:
+            layout: 元件佈局
+            num_iterations: 熱模擬迭代次數
+
+        Returns:
+            溫度分佈矩陣
+        """
+        # 初始化溫度場
+        temperature = np.ones((self.grid_height, self.grid_width)) * self.ambient_temp
+
+        # 初始化熱源
+        heat_source = np.zeros((self.grid_height, self.grid_width))
+
+        # 添加元件熱源
+        for _, (gy, gy_end, gx, gx_end), heat_intensity in self._heat_sources(layout):
+            heat_source[gy:gy_end, gx:gx_end] = heat_intensity
+
+        # 散熱區域遮罩
+        heatsink_mask = self._heatsink_mask()
+
         # 熱傳導核心（5點差分）
         kernel = np.array([
             [0, 1, 0],
@@ -224,10 +324,14 @@ class ThermalAwarePlacer:
 
     def _calculate_cost(self, layout: Dict[str, Tuple[float, float]],
                        wire_weight: float = 1.0,
-                       thermal_weight: float = 1.0) -> Tuple[float, Dict[str, float]]:
+                       thermal_weight: float = 1.0,
+                       field: Optional[ThermalField] = None) -> Tuple[float, Dict[str, float]]:
         """
         計算總成本
 
+        Args:
+            field: 與 layout 同步的溫升場（提供時不重新模擬）
+
         Returns:
             (總成本, 成本詳情字典)
         """
@@ -235,7 +339,10 @@ class ThermalAwarePlacer:
         wire_length = self._calculate_wire_length(layout)
 
         # 熱成本
-        max_temp = self._get_max_temperature(layout)
+        if field is not None:
+            max_temp = self.ambient_temp + field.max_rise()
+        else:
+            max_temp = self._get_max_temperature(layout)
         thermal_cost = max(0, max_temp - self.ambient_temp)
 
         # 總成本
@@ -251,37 +358,21 @@ class ThermalAwarePlacer:
         return total_cost, details
 
     def _random_layout(self) -> Dict[str, Tuple[float, float]]:
-        """生成隨機佈局"""
+        """生成隨機佈局（以空間索引檢查重疊）"""
         layout = {}
+        index = SpatialHash.for_components(
+            self.board_size, [comp.size for comp in self.components.values()])
 
         for name, comp in self.components.items():
-            max_attempts = 100
-            placed = False
-
-            for _ in range(max_attempts):
-                x = np.random.uniform(0, self.board_size[0] - comp.size[0])
-                y = np.random.uniform(0, self.board_size[1] - comp.size[1])
-
-                # 簡單檢查重疊
-                valid = True
-                for other_name, other_pos in layout.items():
-                    other_comp = self.components[other_name]
-                    ox, oy = other_pos
-
-                    if not (x + comp.size[0] <= ox or x >= ox + other_comp.size[0] or
-                           y + comp.size[1] <= oy or y >= oy + other_comp.size[1]):
-                        valid = False
-                        break
-
-                if valid:
-                    layout[name] = (x, y)
-                    placed = True
-                    break
-
-            if not placed:
+            position = index.sample_free_position(comp.size[0], comp.size[1])
+
+            if position is None:
                 x = np.random.uniform(0, max(0, self.board_size[0] - comp.size[0]))
                 y = np.random.uniform(0, max(0, self.board_size[1] - comp.size[1]))
-                layout[name] = (x, y)
+                position = (x, y)
+
+            layout[name] = position
+            index.insert(name, position[0], position[1], comp.size[0], comp.size[1])
 
         return layout
 
@@ -301,11 +392,24 @@ class ThermalAwarePlacer:
         Returns:
             優化結果字典
         """
+        profiler = self.profiler
+        profiler.start()
+
         # 初始化隨機佈局
         current_layout = self._random_layout()
+
+        # 快速模型：溫升場隨每次移動增量更新，拒絕時撤銷
+        field, source_index = None, {}
+        if self.thermal_model == 'fast':
+            sources = self._heat_sources(current_layout)
+            field = self._field_from_sources(sources)
+            source_index = {name: i for i, (name, _, _) in enumerate(sources)}
+
         current_cost, current_details = self._calculate_cost(
-            current_layout, wire_weight, thermal_weight
+            current_layout, wire_weight, thermal_weight, field
         )
+        profiler.mark('initialize')
+        profiler.record(current_cost)
 
         best_layout = current_layout.copy()
         best_cost = current_cost
@@ -343,11 +447,16 @@ class ThermalAwarePlacer:
             # 創建新佈局
             new_layout = current_layout.copy()
             new_layout[comp_name] = (new_x, new_y)
+            profiler.mark('propose')
 
             # 計算新成本
+            moved_source = field is not None and comp_name in source_index
+            if moved_source:
+                field.move(source_index[comp_name], self._heat_rect(comp, (new_x, new_y))[0])
             new_cost, new_details = self._calculate_cost(
-                new_layout, wire_weight, thermal_weight
+                new_layout, wire_weight, thermal_weight, field
             )
+            profiler.mark('evaluate')
 
             # 決定是否接受
             delta = new_cost - current_cost
@@ -361,6 +470,9 @@ class ThermalAwarePlacer:
                     best_layout = current_layout.copy()
                     best_cost = current_cost
                     best_details = current_details.copy()
+                    profiler.record(best_cost)
+            elif moved_source:
+                field.undo()
 
             # 降溫
             temperature *= alpha
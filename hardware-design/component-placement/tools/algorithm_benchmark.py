@@ -6,10 +6,26 @@
 import sys
 import os
 import time
+import json
+import random
+import argparse
+import importlib
+import platform
+import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-from typing import Dict, List, Tuple, Any
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+from typing import Dict, List, Tuple, Any, Optional, Callable
+
+try:
+    import matplotlib.pyplot as plt
+except ImportError:  # 只在視覺化時需要
+    plt = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 
 # 設置路徑以導入各個演算法
@@ -19,6 +35,8 @@ sys.path.insert(0, os.path.join(base_path, 'genetic-placer/src'))
 sys.path.insert(0, os.path.join(base_path, 'thermal-aware-placer/src'))
 sys.path.insert(0, os.path.join(base_path, 'cellular-automata-placer/src'))
 sys.path.insert(0, os.path.join(base_path, 'simulated-annealing-placer/src'))
+sys.path.insert(0, os.path.join(base_path, 'analytical-placer/src'))
+sys.path.insert(0, os.path.join(base_path, 'src'))
 
 
 def create_test_circuit(size: str = 'medium') -> Tuple[Dict, List]:
@@ -99,6 +117,74 @@ def create_test_circuit(size: str = 'medium') -> Tuple[Dict, List]:
     return components, connections, board_size
 
 
+def generate_rent_circuit(n_components: int, rent_exponent: float = 0.6,
+                          terminals_per_component: float = 3.0,
+                          utilization: float = 0.3,
+                          seed: int = 0) -> Tuple[Dict, List, Tuple[float, float]]:
+    """
+    產生符合 Rent 定律的測試電路
+
+    以遞迴二分建立階層：大小為 B 的區塊對外端子數 T(B) = t · B^p，
+    區塊的兩個子區塊之間的連接數為 (T(B₁) + T(B₂) - T(B)) / 2（至少 1 條），
+    端點在兩個子區塊中隨機選擇。區域性與真實電路相近，規模可到數萬個元件。
+
+    Args:
+        n_components: 元件數量
+        rent_exponent: Rent 指數 p（典型 0.5~0.75）
+        terminals_per_component: 每個元件的平均端子數 t
+        utilization: 元件總面積佔板面積的比例（決定板子大小）
+        seed: 隨機種子（相同參數與種子產生相同電路）
+
+    Returns:
+        (components, connections, board_size)
+    """
+    if n_components < 2:
+        raise ValueError(f"元件數量至少為 2: {n_components}")
+
+    rng = np.random.default_rng(seed)
+
+    # 元件：約 5% IC、25% 中型元件、其餘為小型被動元件
+    kinds = rng.choice(3, size=n_components, p=[0.05, 0.25, 0.70])
+    low = np.array([6.0, 3.0, 1.0])[kinds]
+    high = np.array([14.0, 6.0, 3.0])[kinds]
+    sizes = np.round(rng.uniform(low[:, None], high[:, None], size=(n_components, 2)), 1)
+    prefixes = np.array(['U', 'Q', 'C'])[kinds]
+    names = [f'{prefix}{i}' for i, prefix in enumerate(prefixes)]
+    components = {name: (float(w), float(h)) for name, (w, h) in zip(names, sizes)}
+
+    def terminals(size: int) -> float:
+        return terminals_per_component * size ** rent_exponent
+
+    # 遞迴二分：每個區塊是隨機排列中的連續一段
+    order = rng.permutation(n_components)
+    connections = []
+    stack = [(0, n_components)]
+    while stack:
+        lo, hi = stack.pop()
+        size = hi - lo
+        if size < 2:
+            continue
+        mid = lo + size // 2
+        crossing = (terminals(mid - lo) + terminals(hi - mid) - terminals(size)) / 2
+        count = max(1, int(round(crossing)))
+
+        ends_a = order[rng.integers(lo, mid, size=count)]
+        ends_b = order[rng.integers(mid, hi, size=count)]
+        weights = rng.choice([1.0, 1.5, 2.0], size=count, p=[0.7, 0.2, 0.1])
+        connections.extend((names[a], names[b], float(w))
+                           for a, b, w in zip(ends_a, ends_b, weights))
+
+        stack.append((lo, mid))
+        stack.append((mid, hi))
+
+    # 板子：4:3，面積 = 元件總面積 / 利用率
+    area = float((sizes[:, 0] * sizes[:, 1]).sum()) / utilization
+    width = max(float(np.sqrt(area * 4 / 3)), float(sizes.max()) * 2)
+    board_size = (round(width, 1), round(width * 3 / 4, 1))
+
+    return components, connections, board_size
+
+
 class AlgorithmBenchmark:
     """演算法基準測試類別"""
 
@@ -344,6 +430,10 @@ class AlgorithmBenchmark:
             print("尚未運行任何演算法")
             return
 
+        if plt is None:
+            print("需要安裝 matplotlib 才能視覺化結果")
+            return
+
         fig = plt.figure(figsize=(16, 10))
         gs = fig.add_gridspec(2, 2, hspace=0.3, wspace=0.3)
 
@@ -448,6 +538,611 @@ class AlgorithmBenchmark:
         plt.close()
 
 
+# ---------------------------------------------------------------------------
+# 可擴展基準測試：產生的 Rent 電路、固定種子、時間-品質曲線、峰值記憶體、
+# 分階段計時，結果輸出為 JSON 以追蹤各版本的效能回歸
+# ---------------------------------------------------------------------------
+
+SCHEMA_VERSION = 2
+
+# 時間-品質：達到「電路最佳已知連線長度 × 比例」所需的時間
+QUALITY_RATIOS = (1.5, 1.2, 1.1, 1.05)
+
+
+def _populate(placer, circuit: Dict[str, Any], with_power: bool = False):
+    """將電路的元件與連接加入擺放器"""
+    for name, size in circuit['components'].items():
+        if with_power:
+            placer.add_component(name, size, power=2.0 if name.startswith('U') else 0.0)
+        else:
+            placer.add_component(name, size)
+    for comp1, comp2, weight in circuit['connections']:
+        placer.add_connection(comp1, comp2, weight)
+    return placer
+
+
+def _run_analytical(circuit, seed, budget_scale, profiler):
+    from analytical_placer import AnalyticalPlacer
+    placer = _populate(AnalyticalPlacer(board_size=circuit['board_size']), circuit)
+    placer.profiler = profiler
+    result = placer.place(verbose=False, seed=seed)
+    return result, placer.spreading_iterations
+
+
+def _run_simulated_annealing(circuit, seed, budget_scale, profiler):
+    from sa_placer import SimulatedAnnealingPlacer
+    n = len(circuit['components'])
+    iterations = max(1, int(budget_scale * min(max(100 * n, 2000), 1_000_000)))
+    # 指數降溫在整個迭代預算內由初始溫度降到最終溫度
+    placer = _populate(SimulatedAnnealingPlacer(
+        board_size=circuit['board_size'],
+        initial_temperature=100.0,
+        final_temperature=0.1,
+        alpha=(0.1 / 100.0) ** (1.0 / iterations)
+    ), circuit)
+    placer.profiler = profiler
+    # 自適應重啟會整個重新隨機擺放，在大規模電路上不適用
+    result = placer.optimize(iterations=iterations, verbose=False, adaptive=False)
+    return result, iterations
+
+
+def _run_genetic(circuit, seed, budget_scale, profiler):
+    from genetic_placer import GeneticPlacer
+    generations = max(1, int(budget_scale * 100))
+    placer = _populate(GeneticPlacer(board_size=circuit['board_size'],
+                                     population_size=50, mutation_rate=0.1), circuit)
+    placer.profiler = profiler
+    result = placer.evolve(generations=generations, verbose=False)
+    return result, generations
+
+
+def _run_mcts(circuit, seed, budget_scale, profiler):
+    from mcts_placer import MCTSComponentPlacer
+    n = len(circuit['components'])
+    iterations = max(1, int(budget_scale * max(500, 20 * n)))
+    placer = _populate(MCTSComponentPlacer(board_size=circuit['board_size']), circuit)
+    placer.profiler = profiler
+    result = placer.optimize(iterations=iterations, verbose=False, seed=seed)
+    return result, iterations
+
+
+def _run_thermal_aware(circuit, seed, budget_scale, profiler):
+    from thermal_placer import ThermalAwarePlacer
+    iterations = max(1, int(budget_scale * 200))
+    placer = _populate(ThermalAwarePlacer(board_size=circuit['board_size'],
+                                          grid_resolution=2.0), circuit, with_power=True)
+    placer.profiler = profiler
+    result = placer.optimize(iterations=iterations, verbose=False)
+    return result, iterations
+
+
+def _run_cellular_automata(circuit, seed, budget_scale, profiler):
+    from cellular_placer import CellularAutomataPlacer
+    iterations = max(1, int(budget_scale * 200))
+    placer = _populate(CellularAutomataPlacer(board_size=circuit['board_size'],
+                                              grid_resolution=2.0), circuit)
+    placer.profiler = profiler
+    result = placer.evolve(iterations=iterations, verbose=False)
+    return result, iterations
+
+
+# 名稱 -> (執行函數, 模組, 預設元件數上限, 內部目標是否為純連線長度)
+PLACER_REGISTRY: Dict[str, Tuple[Callable, str, int, bool]] = {
+    'analytical': (_run_analytical, 'analytical_placer', 50000, True),
+    'simulated_annealing': (_run_simulated_annealing, 'sa_placer', 50000, True),
+    'genetic': (_run_genetic, 'genetic_placer', 2000, True),
+    'cellular_automata': (_run_cellular_automata, 'cellular_placer', 2000, True),
+    'mcts': (_run_mcts, 'mcts_placer', 200, True),
+    'thermal_aware': (_run_thermal_aware, 'thermal_placer', 5000, False),
+}
+
+
+def layout_metrics(circuit: Dict[str, Any], layout: Optional[Dict]) -> Dict[str, Any]:
+    """
+    以統一定義計算佈局品質（不依賴各擺放器自己的成本函數）
+
+    Returns:
+        {'wirelength': 加權中心歐幾里得距離, 'overlaps': 重疊元件對數,
+         'out_of_bounds': 出界元件數, 'placed': 已擺放元件數,
+         'legal': 全部元件都已擺放、無重疊且無出界}
+    """
+    from spatial_index import SpatialHash
+
+    components = circuit['components']
+    if not layout:
+        return {'wirelength': None, 'overlaps': None, 'out_of_bounds': None, 'placed': 0,
+                'legal': False}
+
+    centers = {name: (x + components[name][0] / 2, y + components[name][1] / 2)
+               for name, (x, y) in layout.items() if name in components}
+    wirelength = 0.0
+    for comp1, comp2, weight in circuit['connections']:
+        if comp1 in centers and comp2 in centers:
+            (x1, y1), (x2, y2) = centers[comp1], centers[comp2]
+            wirelength += weight * float(np.hypot(x2 - x1, y2 - y1))
+
+    index = SpatialHash.for_components(circuit['board_size'], components.values())
+    overlaps = 0
+    out_of_bounds = 0
+    for name, (x, y) in layout.items():
+        w, h = components[name]
+        overlaps += len(index.query(x, y, w, h))
+        if not index.in_bounds(x, y, w, h):
+            out_of_bounds += 1
+        index.insert(name, x, y, w, h)
+
+    return {'wirelength': wirelength, 'overlaps': overlaps,
+            'out_of_bounds': out_of_bounds, 'placed': len(centers),
+            'legal': (overlaps == 0 and out_of_bounds == 0
+                      and len(centers) == len(components))}
+
+
+def _peak_memory_mb() -> Optional[float]:
+    """目前行程的峰值常駐記憶體 (MB)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 回報，macOS 以 bytes 回報
+    return peak / 1024 / (1024 if sys.platform == 'darwin' else 1)
+
+
+def _benchmark_task(task: Tuple) -> Dict[str, Any]:
+    """
+    執行單次基準測試（在獨立行程中執行以量測峰值記憶體）
+
+    Args:
+        task: (演算法名稱, 電路, 種子, 預算倍率)
+    """
+    from profiling import PhaseProfiler
+
+    algorithm, circuit, seed, budget_scale = task
+    runner = PLACER_REGISTRY[algorithm][0]
+
+    np.random.seed(seed)
+    random.seed(seed)
+    profiler = PhaseProfiler()
+
+    baseline_mb = _peak_memory_mb()
+    if baseline_mb is None:
+        import tracemalloc
+        tracemalloc.start()
+
+    start_time = time.perf_counter()
+    try:
+        result, budget = runner(circuit, seed, budget_scale, profiler)
+    except Exception as e:
+        return {'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+    runtime = time.perf_counter() - start_time
+
+    if baseline_mb is None:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory = {'method': 'tracemalloc', 'peak_mb': peak / 2**20, 'delta_mb': peak / 2**20}
+    else:
+        peak_mb = _peak_memory_mb()
+        memory = {'method': 'ru_maxrss', 'peak_mb': peak_mb, 'delta_mb': peak_mb - baseline_mb}
+
+    profile = profiler.to_dict()
+    return {
+        'status': 'ok',
+        'cost': float(result['cost']) if result.get('cost') is not None else None,
+        'budget': budget,
+        'runtime': runtime,
+        'memory': memory,
+        'phases': profile['phases'],
+        'trace': profile['trace'],
+        **layout_metrics(circuit, result.get('layout')),
+    }
+
+
+def _json_safe(value: Any) -> Any:
+    """將 inf / nan 轉為 None、numpy 數值轉為 Python 型別，以輸出標準 JSON"""
+    if isinstance(value, dict):
+        return {str(k): _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        return value if np.isfinite(value) else None
+    return value
+
+
+class ScalableBenchmark:
+    """可擴展的演算法基準測試"""
+
+    def __init__(self, sizes: List[int] = (10, 100, 1000, 10000, 50000),
+                 algorithms: Optional[List[str]] = None,
+                 runs: int = 3,
+                 seed: int = 0,
+                 rent_exponent: float = 0.6,
+                 budget_scale: float = 1.0,
+                 max_components: Optional[Dict[str, int]] = None,
+                 isolate: bool = True):
+        """
+        初始化基準測試
+
+        Args:
+            sizes: 電路規模（元件數）列表
+            algorithms: 要測試的演算法（None 表示 PLACER_REGISTRY 全部）
+            runs: 每個演算法在每個電路上的運行次數
+            seed: 基礎種子；電路種子為 seed + 元件數，第 k 次運行種子為 seed + k
+            rent_exponent: 產生電路的 Rent 指數
+            budget_scale: 各演算法迭代預算的倍率
+            max_components: 覆寫各演算法的元件數上限（超過時記為 skipped）
+            isolate: 每次運行在獨立行程中執行（峰值記憶體才有意義）
+        """
+        algorithms = list(algorithms) if algorithms else list(PLACER_REGISTRY)
+        for algorithm in algorithms:
+            if algorithm not in PLACER_REGISTRY:
+                raise ValueError(f"未知演算法: {algorithm}")
+
+        self.sizes = sorted(sizes)
+        self.algorithms = algorithms
+        self.runs = runs
+        self.seed = seed
+        self.rent_exponent = rent_exponent
+        self.budget_scale = budget_scale
+        self.max_components = {name: spec[2] for name, spec in PLACER_REGISTRY.items()}
+        self.max_components.update(max_components or {})
+        self.isolate = isolate
+        self.report: Dict[str, Any] = {}
+
+    def _execute(self, task: Tuple) -> Dict[str, Any]:
+        """執行單次測試（依設定在獨立行程或目前行程中）"""
+        if not self.isolate:
+            return _benchmark_task(task)
+
+        # fork 讓子行程不必重新匯入模組；峰值記憶體以相對於開始時的增量為準
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            return executor.submit(_benchmark_task, task).result()
+
+    def run(self, verbose: bool = True) -> Dict[str, Any]:
+        """
+        執行全部測試
+
+        Returns:
+            報告字典（可直接以 save() 輸出為 JSON）
+        """
+        # 先在主行程匯入擺放器，fork 出的子行程不再計入匯入時間與記憶體
+        for algorithm in self.algorithms:
+            try:
+                importlib.import_module(PLACER_REGISTRY[algorithm][1])
+            except ImportError as e:
+                if verbose:
+                    print(f"警告: 無法匯入 {algorithm}: {e}")
+
+        circuits = []
+        results = []
+
+        for n in self.sizes:
+            circuit_seed = self.seed + n
+            components, connections, board_size = generate_rent_circuit(
+                n, rent_exponent=self.rent_exponent, seed=circuit_seed)
+            circuit = {'components': components, 'connections': connections,
+                       'board_size': board_size}
+            circuits.append({
+                'name': f'rent_{n}',
+                'n_components': n,
+                'n_connections': len(connections),
+                'board_size': list(board_size),
+                'rent_exponent': self.rent_exponent,
+                'seed': circuit_seed,
+            })
+
+            if verbose:
+                print(f"\n電路 rent_{n}: {n} 元件, {len(connections)} 連接, 板子 {board_size}")
+
+            for algorithm in self.algorithms:
+                for run in range(self.runs):
+                    entry = {'algorithm': algorithm, 'circuit': f'rent_{n}',
+                             'n_components': n, 'run': run, 'seed': self.seed + run}
+
+                    if n > self.max_components[algorithm]:
+                        entry['status'] = 'skipped'
+                        results.append(entry)
+                        continue
+
+                    entry.update(self._execute((algorithm, circuit, self.seed + run,
+                                                self.budget_scale)))
+                    results.append(entry)
+
+                    if verbose:
+                        if entry['status'] == 'ok':
+                            print(f"  {algorithm:<20} 運行 {run + 1}/{self.runs}: "
+                                  f"連線長度={entry['wirelength']:.1f}, "
+                                  f"重疊={entry['overlaps']}, "
+                                  f"時間={entry['runtime']:.2f}s, "
+                                  f"記憶體 +{entry['memory']['delta_mb']:.1f} MB")
+                        else:
+                            print(f"  {algorithm:<20} 運行 {run + 1}/{self.runs}: "
+                                  f"失敗: {entry['error']}")
+
+                if verbose and n > self.max_components[algorithm]:
+                    print(f"  {algorithm:<20} 略過（上限 {self.max_components[algorithm]} 元件）")
+
+        self._add_time_to_quality(results)
+
+        self.report = {
+            'schema_version': SCHEMA_VERSION,
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'environment': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+            },
+            'config': {
+                'sizes': self.sizes,
+                'algorithms': self.algorithms,
+                'runs': self.runs,
+                'seed': self.seed,
+                'rent_exponent': self.rent_exponent,
+                'budget_scale': self.budget_scale,
+                'max_components': self.max_components,
+                'quality_ratios': list(QUALITY_RATIOS),
+                'isolate': self.isolate,
+            },
+            'circuits': circuits,
+            'results': results,
+            'summary': summarize_results(results),
+        }
+        return self.report
+
+    @staticmethod
+    def _add_time_to_quality(results: List[Dict[str, Any]]):
+        """
+        以各電路上所有合法佈局的最佳連線長度為基準，
+        計算每次運行達到基準 × 比例的時間（只適用內部目標為連線長度的演算法）
+
+        時間取自擺放器自己的最佳成本曲線，曲線不反映重疊；
+        最終佈局不合法的運行無法確認曾達到該品質，各比例一律記為未達到。
+        """
+        reference: Dict[str, float] = {}
+        for entry in results:
+            if entry.get('status') == 'ok' and entry['legal']:
+                best = reference.get(entry['circuit'], float('inf'))
+                reference[entry['circuit']] = min(best, entry['wirelength'])
+
+        for entry in results:
+            if entry.get('status') != 'ok':
+                continue
+            target = reference.get(entry['circuit'])
+            entry['reference_wirelength'] = target
+            if target is None or not PLACER_REGISTRY[entry['algorithm']][3]:
+                entry['time_to_quality'] = None
+                continue
+            if not entry['legal']:
+                entry['time_to_quality'] = {str(ratio): None for ratio in QUALITY_RATIOS}
+                continue
+
+            ttq = {}
+            for ratio in QUALITY_RATIOS:
+                reached = [t for t, cost in entry['trace'] if cost <= target * ratio]
+                ttq[str(ratio)] = reached[0] if reached else None
+            entry['time_to_quality'] = ttq
+
+    def save(self, path: str):
+        """將報告輸出為 JSON"""
+        if not self.report:
+            raise ValueError("尚未執行基準測試")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(_json_safe(self.report), f, ensure_ascii=False, indent=2)
+
+    def print_summary(self):
+        """列印各演算法在各規模的中位數"""
+        print_summary_table(self.report.get('summary', []))
+
+
+def summarize_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    依 (演算法, 元件數) 彙總成功運行的中位數
+
+    Returns:
+        彙總列表，每項含 median_wirelength、best_wirelength、median_runtime、
+        median_memory_mb、max_overlaps、legal_runs（最終佈局合法的運行數）、
+        phases（各階段平均時間）與 time_to_quality（各比例的中位時間）
+    """
+    groups: Dict[Tuple[str, int], List[Dict]] = {}
+    for entry in results:
+        if entry.get('status') == 'ok':
+            groups.setdefault((entry['algorithm'], entry['n_components']), []).append(entry)
+
+    summary = []
+    for (algorithm, n), runs in sorted(groups.items(), key=lambda item: (item[0][1], item[0][0])):
+        wirelengths = [r['wirelength'] for r in runs if r['wirelength'] is not None]
+        phases: Dict[str, float] = {}
+        for r in runs:
+            for name, entry in r['phases'].items():
+                phases[name] = phases.get(name, 0.0) + entry['time'] / len(runs)
+
+        ttq = None
+        if all(r.get('time_to_quality') for r in runs):
+            ttq = {}
+            for ratio in QUALITY_RATIOS:
+                times = [r['time_to_quality'][str(ratio)] for r in runs]
+                reached = [t for t in times if t is not None]
+                # 過半數運行未達到時記為 None
+                ttq[str(ratio)] = (float(np.median(times)) if len(reached) == len(times)
+                                   else float(np.median(reached))
+                                   if len(reached) > len(times) / 2 else None)
+
+        summary.append({
+            'algorithm': algorithm,
+            'n_components': n,
+            'runs': len(runs),
+            'median_wirelength': float(np.median(wirelengths)) if wirelengths else None,
+            'best_wirelength': float(min(wirelengths)) if wirelengths else None,
+            'median_runtime': float(np.median([r['runtime'] for r in runs])),
+            'median_memory_mb': float(np.median([r['memory']['delta_mb'] for r in runs])),
+            'max_overlaps': max(r['overlaps'] or 0 for r in runs),
+            'legal_runs': sum(1 for r in runs if r['legal']),
+            'phases': phases,
+            'time_to_quality': ttq,
+        })
+
+    return summary
+
+
+def print_summary_table(summary: List[Dict[str, Any]]):
+    """列印彙總表"""
+    print("\n" + "=" * 103)
+    print(f"{'元件數':>8} {'演算法':<22} {'中位連線長度':>14} {'中位時間(s)':>12} "
+          f"{'記憶體(MB)':>11} {'重疊':>6} {'合法':>6}  主要階段")
+    print("-" * 103)
+    for row in summary:
+        phases = sorted(row['phases'].items(), key=lambda item: -item[1])[:2]
+        phase_text = ', '.join(f"{name} {t:.2f}s" for name, t in phases)
+        wirelength = (f"{row['median_wirelength']:.1f}"
+                      if row['median_wirelength'] is not None else '-')
+        legal = f"{row['legal_runs']}/{row['runs']}"
+        print(f"{row['n_components']:>8} {row['algorithm']:<22} {wirelength:>14} "
+              f"{row['median_runtime']:>12.2f} {row['median_memory_mb']:>11.1f} "
+              f"{row['max_overlaps']:>6} {legal:>6}  {phase_text}")
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    runtime_tolerance: float = 0.25,
+                    quality_tolerance: float = 0.05,
+                    memory_tolerance: float = 0.25) -> List[Dict[str, Any]]:
+    """
+    比較兩份報告，找出效能回歸
+
+    Args:
+        baseline: 基準報告（舊版本）
+        current: 目前報告
+        runtime_tolerance: 中位時間允許的相對增加
+        quality_tolerance: 中位連線長度允許的相對增加
+        memory_tolerance: 中位記憶體增量允許的相對增加
+
+    Returns:
+        回歸列表，每項含 algorithm、n_components、metric、baseline、current、change
+    """
+    if baseline.get('config', {}).get('seed') != current.get('config', {}).get('seed'):
+        print("警告: 兩份報告的種子不同，比較結果可能不具代表性")
+
+    base_rows = {(row['algorithm'], row['n_components']): row
+                 for row in baseline.get('summary', [])}
+    checks = (('median_runtime', runtime_tolerance),
+              ('median_wirelength', quality_tolerance),
+              ('median_memory_mb', memory_tolerance))
+
+    regressions = []
+    for row in current.get('summary', []):
+        base = base_rows.get((row['algorithm'], row['n_components']))
+        if base is None:
+            continue
+        for metric, tolerance in checks:
+            old, new = base.get(metric), row.get(metric)
+            if old is None or new is None or old <= 0:
+                continue
+            change = (new - old) / old
+            if change > tolerance:
+                regressions.append({
+                    'algorithm': row['algorithm'],
+                    'n_components': row['n_components'],
+                    'metric': metric,
+                    'baseline': old,
+                    'current': new,
+                    'change': change,
+                })
+        if (row.get('max_overlaps') or 0) > (base.get('max_overlaps') or 0):
+            regressions.append({
+                'algorithm': row['algorithm'],
+                'n_components': row['n_components'],
+                'metric': 'max_overlaps',
+                'baseline': base.get('max_overlaps'),
+                'current': row['max_overlaps'],
+                'change': None,
+            })
+        if base.get('legal_runs') is not None and row.get('legal_runs') is not None \
+                and row['legal_runs'] < base['legal_runs']:
+            regressions.append({
+                'algorithm': row['algorithm'],
+                'n_components': row['n_components'],
+                'metric': 'legal_runs',
+                'baseline': base['legal_runs'],
+                'current': row['legal_runs'],
+                'change': None,
+            })
+
+    return regressions
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    """
+    命令列介面
+
+    suite   : 執行可擴展基準測試並輸出 JSON
+    compare : 比較兩份 JSON 報告，有回歸時返回 1
+    """
+    parser = argparse.ArgumentParser(description='元件擺放演算法基準測試')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    suite = subparsers.add_parser('suite', help='執行可擴展基準測試')
+    suite.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 50000])
+    suite.add_argument('--algorithms', nargs='+', choices=list(PLACER_REGISTRY))
+    suite.add_argument('--runs', type=int, default=3)
+    suite.add_argument('--seed', type=int, default=0)
+    suite.add_argument('--rent-exponent', type=float, default=0.6)
+    suite.add_argument('--budget-scale', type=float, default=1.0)
+    suite.add_argument('--max-components', nargs='+', default=[], metavar='ALGO=N',
+                       help='覆寫元件數上限，例如 genetic=5000')
+    suite.add_argument('--no-isolate', action='store_true',
+                       help='在目前行程中執行（較快，但記憶體量測不準確）')
+    suite.add_argument('--output', default='benchmark_results.json')
+
+    compare = subparsers.add_parser('compare', help='比較兩份報告')
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--runtime-tolerance', type=float, default=0.25)
+    compare.add_argument('--quality-tolerance', type=float, default=0.05)
+    compare.add_argument('--memory-tolerance', type=float, default=0.25)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'suite':
+        limits = {}
+        for item in args.max_components:
+            name, _, value = item.partition('=')
+            limits[name] = int(value)
+
+        benchmark = ScalableBenchmark(sizes=args.sizes, algorithms=args.algorithms,
+                                      runs=args.runs, seed=args.seed,
+                                      rent_exponent=args.rent_exponent,
+                                      budget_scale=args.budget_scale,
+                                      max_components=limits,
+                                      isolate=not args.no_isolate)
+        benchmark.run()
+        benchmark.print_summary()
+        benchmark.save(args.output)
+        print(f"\n結果已儲存到: {args.output}")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+
+    regressions = compare_reports(baseline, current,
+                                  runtime_tolerance=args.runtime_tolerance,
+                                  quality_tolerance=args.quality_tolerance,
+                                  memory_tolerance=args.memory_tolerance)
+    if not regressions:
+        print("沒有發現效能回歸")
+        return 0
+
+    print(f"發現 {len(regressions)} 項效能回歸:")
+    for item in regressions:
+        change = f"{item['change'] * 100:+.1f}%" if item['change'] is not None else ''
+        print(f"  {item['algorithm']:<22} {item['n_components']:>7} 元件  "
+              f"{item['metric']:<18} {item['baseline']} -> {item['current']} {change}")
+    return 1
+
+
 def main():
     """主函數"""
     print("=" * 80)
@@ -491,4 +1186,6 @@ def main():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli())
     main()
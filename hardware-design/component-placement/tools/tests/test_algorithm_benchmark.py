@@ -0,0 +1,191 @@
+"""
+測試可擴展基準測試：電路產生、佈局品質、時間-品質、JSON 報告與回歸比較
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+
+import numpy as np
+import pytest
+import algorithm_benchmark as bench
+from profiling import PhaseProfiler
+
+
+def _circuit():
+    components = {'A': (2.0, 2.0), 'B': (2.0, 2.0), 'C': (4.0, 1.0)}
+    connections = [('A', 'B', 1.0), ('B', 'C', 2.0)]
+    return {'components': components, 'connections': connections, 'board_size': (10.0, 10.0)}
+
+
+def _entry(algorithm, wirelength, trace, legal=True, n=10, runtime=1.0, memory=5.0):
+    return {'algorithm': algorithm, 'circuit': f'rent_{n}', 'n_components': n,
+            'status': 'ok', 'wirelength': wirelength, 'overlaps': 0 if legal else 3,
+            'out_of_bounds': 0, 'placed': n, 'legal': legal, 'trace': trace,
+            'runtime': runtime, 'memory': {'delta_mb': memory},
+            'phases': {'search': {'time': runtime, 'calls': 1}}}
+
+
+def test_generate_rent_circuit_is_deterministic():
+    """測試相同種子產生相同電路，連接端點都是有效元件"""
+    a = bench.generate_rent_circuit(300, seed=4)
+    b = bench.generate_rent_circuit(300, seed=4)
+    c = bench.generate_rent_circuit(300, seed=5)
+    components, connections, (width, height) = a
+
+    assert a == b
+    assert a != c
+    assert len(components) == 300
+    assert all(comp1 in components and comp2 in components and comp1 != comp2
+               for comp1, comp2, _ in connections)
+    area = sum(w * h for w, h in components.values())
+    assert area / (width * height) == pytest.approx(0.3, rel=0.05)
+    with pytest.raises(ValueError):
+        bench.generate_rent_circuit(1)
+
+
+def test_rent_exponent_controls_connectivity():
+    """測試 Rent 指數越大，連接越多"""
+    low = bench.generate_rent_circuit(2000, rent_exponent=0.5, seed=1)[1]
+    high = bench.generate_rent_circuit(2000, rent_exponent=0.75, seed=1)[1]
+
+    assert len(high) > len(low)
+
+
+def test_layout_metrics():
+    """測試連線長度、重疊、出界與合法性"""
+    circuit = _circuit()
+
+    legal = bench.layout_metrics(circuit, {'A': (0, 0), 'B': (2, 0), 'C': (0, 2)})
+    assert legal['wirelength'] == pytest.approx(2.0 + 2.0 * np.hypot(1.0, 1.5))
+    assert (legal['overlaps'], legal['out_of_bounds'], legal['placed']) == (0, 0, 3)
+    assert legal['legal']
+
+    overlapping = bench.layout_metrics(circuit, {'A': (0, 0), 'B': (1, 1), 'C': (7, 9.5)})
+    assert (overlapping['overlaps'], overlapping['out_of_bounds']) == (1, 1)
+    assert not overlapping['legal']
+
+    partial = bench.layout_metrics(circuit, {'A': (0, 0), 'B': (2, 0)})
+    assert partial['placed'] == 2
+    assert not partial['legal']
+
+    empty = bench.layout_metrics(circuit, None)
+    assert empty['placed'] == 0 and empty['wirelength'] is None and not empty['legal']
+
+
+def test_phase_profiler(monkeypatch):
+    """測試階段累計、只記錄嚴格改善的成本與時間-品質查詢"""
+    clock = iter([-3.0, 0.0, 1.0, 1.5, 2.0, 2.5, 4.0, 5.0])
+    monkeypatch.setattr('profiling.time.perf_counter', lambda: next(clock))
+    profiler = PhaseProfiler()      # -3.0
+    profiler.start()                # 0.0
+    profiler.mark('search')         # 1.0
+    profiler.record(10.0)           # 1.5
+    profiler.record(12.0)           # 未改善，不讀時間
+    profiler.mark('search')         # 2.0
+    profiler.record(8.0)            # 2.5
+    profiler.mark('legalization')   # 4.0
+
+    data = profiler.to_dict()
+    assert data['phases'] == {'search': {'time': 2.0, 'calls': 2},
+                              'legalization': {'time': 2.0, 'calls': 1}}
+    assert data['trace'] == [[1.5, 10.0], [2.5, 8.0]]
+    assert profiler.time_to_quality(9.0) == 2.5
+    assert profiler.time_to_quality(10.0) == 1.5
+    assert profiler.time_to_quality(7.0) == float('inf')
+    assert json.loads(json.dumps(data)) == data
+
+
+def test_time_to_quality_ignores_illegal_layouts():
+    """測試基準只取合法佈局，最終不合法的運行記為未達到"""
+    results = [
+        _entry('analytical', 100.0, [[0.5, 130.0], [1.0, 100.0]]),
+        _entry('simulated_annealing', 60.0, [[0.1, 60.0]], legal=False),
+        _entry('thermal_aware', 90.0, [[0.2, 90.0]]),
+        {'algorithm': 'mcts', 'circuit': 'rent_10', 'status': 'error', 'error': 'x'},
+    ]
+
+    bench.ScalableBenchmark._add_time_to_quality(results)
+
+    analytical, annealing, thermal, failed = results
+    assert analytical['reference_wirelength'] == 90.0
+    assert analytical['time_to_quality'] == {'1.5': 0.5, '1.2': 1.0, '1.1': None, '1.05': None}
+    assert annealing['time_to_quality'] == {str(r): None for r in bench.QUALITY_RATIOS}
+    # 內部目標不是純連線長度的演算法不計算
+    assert thermal['time_to_quality'] is None
+    assert 'time_to_quality' not in failed
+
+
+def test_summary_counts_legal_runs_and_majority_time_to_quality():
+    """測試彙總的合法運行數，以及過半數未達到時記為 None"""
+    results = [_entry('analytical', 100.0 + k, [[0.1 * (k + 1), 100.0]]) for k in range(3)]
+    results += [_entry('simulated_annealing', 120.0, [[0.1, 120.0]], legal=k == 0) for k in range(3)]
+    bench.ScalableBenchmark._add_time_to_quality(results)
+
+    summary = {row['algorithm']: row for row in bench.summarize_results(results)}
+
+    assert summary['analytical']['legal_runs'] == 3
+    assert summary['analytical']['median_wirelength'] == 101.0
+    assert summary['analytical']['time_to_quality']['1.05'] == pytest.approx(0.2)
+    assert summary['simulated_annealing']['legal_runs'] == 1
+    assert summary['simulated_annealing']['max_overlaps'] == 3
+    assert summary['simulated_annealing']['time_to_quality']['1.5'] is None
+
+
+def test_compare_reports_flags_regressions():
+    """測試回歸判斷：容許範圍內不回報，超出或合法運行數減少時回報"""
+    base = [_entry('analytical', 100.0, [], runtime=1.0, memory=10.0) for _ in range(2)]
+    baseline = {'config': {'seed': 0}, 'summary': bench.summarize_results(base)}
+
+    same = [_entry('analytical', 104.0, [], runtime=1.2, memory=12.0) for _ in range(2)]
+    assert bench.compare_reports(baseline, {'config': {'seed': 0},
+                                            'summary': bench.summarize_results(same)}) == []
+
+    worse = [_entry('analytical', 110.0, [], runtime=2.0, memory=20.0),
+             _entry('analytical', 110.0, [], legal=False, runtime=2.0, memory=20.0)]
+    regressions = bench.compare_reports(baseline, {'config': {'seed': 0},
+                                                   'summary': bench.summarize_results(worse)})
+    assert sorted(item['metric'] for item in regressions) == [
+        'legal_runs', 'max_overlaps', 'median_memory_mb', 'median_runtime', 'median_wirelength']
+
+    # 舊版報告沒有 legal_runs 時不比較該項
+    for row in baseline['summary']:
+        del row['legal_runs']
+    regressions = bench.compare_reports(baseline, {'config': {'seed': 0},
+                                                   'summary': bench.summarize_results(worse)})
+    assert 'legal_runs' not in [item['metric'] for item in regressions]
+
+
+def test_suite_report_schema(tmp_path):
+    """測試小規模執行的 JSON 報告結構，以及 compare 命令的結束碼"""
+    benchmark = bench.ScalableBenchmark(sizes=[10, 30], algorithms=['analytical', 'mcts'],
+                                        runs=1, budget_scale=0.1, isolate=False,
+                                        max_components={'mcts': 10})
+    benchmark.run(verbose=False)
+    path = tmp_path / 'report.json'
+    benchmark.save(str(path))
+    report = json.loads(path.read_text(encoding='utf-8'))
+
+    assert report['schema_version'] == bench.SCHEMA_VERSION
+    assert set(report) == {'schema_version', 'created', 'environment', 'config',
+                           'circuits', 'results', 'summary'}
+    assert [c['name'] for c in report['circuits']] == ['rent_10', 'rent_30']
+    statuses = {(r['algorithm'], r['n_components']): r['status'] for r in report['results']}
+    assert statuses == {('analytical', 10): 'ok', ('analytical', 30): 'ok',
+                        ('mcts', 10): 'ok', ('mcts', 30): 'skipped'}
+    for entry in report['results']:
+        if entry['status'] != 'ok':
+            continue
+        assert {'wirelength', 'overlaps', 'out_of_bounds', 'placed', 'legal', 'runtime',
+                'memory', 'phases', 'trace', 'reference_wirelength',
+                'time_to_quality'} <= set(entry)
+        assert entry['placed'] == entry['n_components']
+        if not entry['legal']:
+            assert all(t is None for t in entry['time_to_quality'].values())
+    for row in report['summary']:
+        assert {'median_wirelength', 'median_runtime', 'median_memory_mb',
+                'max_overlaps', 'legal_runs', 'time_to_quality'} <= set(row)
+
+    assert bench.cli(['compare', str(path), str(path)]) == 0
@@ -3,10 +3,30 @@ DRC Checker
 PCB 設計規則檢查工具
 """
 
-from typing import List, Optional, Dict
+import os
+import sys
+import json
+import signal
+import hashlib
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Dict, Tuple
 from pathlib import Path
 from datetime import datetime
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+# 共用 KiCAD 檔案解析器（eda-automation/src/kicad_parser.py）
+_SHARED_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+if _SHARED_SRC not in sys.path:
+    sys.path.append(_SHARED_SRC)
+from kicad_parser import BoardModel, PAD_SHAPES, PAD_TYPES, file_hash, load_board as load_kicad_board, _arc_points
+import clearance
+
+# 檢查邏輯變更時遞增，使舊的結果快取失效
+RESULT_VERSION = 1
 
 
 @dataclass
@@ -33,6 +53,7 @@ class DRCResult:
     timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
     errors: List[DRCError] = field(default_factory=list)
     warnings: List[DRCError] = field(default_factory=list)
+    cached: bool = False  # 是否完全取自結果快取（檔案未解析）
 
     @property
     def passed(self) -> bool:
@@ -56,6 +77,30 @@ class DRCResult:
         else:
             self.warnings.append(error)
 
+    def to_dict(self) -> Dict:
+        """轉為 JSON 報告格式"""
+        return {
+            'project': self.project,
+            'timestamp': self.timestamp,
+            'summary': {
+                'passed': self.passed,
+                'error_count': self.error_count,
+                'warning_count': self.warning_count
+            },
+            'errors': [
+                {
+                    'type': e.type,
+                    'severity': e.severity,
+                    'message': e.message,
+                    'layer': e.layer,
+                    'location': {'x': e.x, 'y': e.y},
+                    'required': e.required,
+                    'actual': e.actual
+                }
+                for e in self.errors + self.warnings
+            ]
+        }
+
 
 class DRCRules:
     """DRC 規則"""
@@ -91,6 +136,19 @@ class DRCRules:
             'max_diameter': 6.35
         }
 
+    def digest(self, *sections: str) -> str:
+        """
+        規則雜湊（用於結果快取）
+
+        Args:
+            sections: 規則分類名稱（clearance、track、via、board、drill）
+
+        Returns:
+            SHA-256 十六進位字串
+        """
+        data = {name: getattr(self, name) for name in sections}
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
     def set_clearance(self, value: float) -> None:
         """設定所有間距為相同值"""
         for key in self.clearance:
@@ -118,28 +176,87 @@ class DRCRules:
             self.drill['max_diameter'] = max
 
 
+class ResultCache:
+    """
+    DRC 結果快取
+
+    每個檔案的每個檢查項目各存一份，鍵為 (檔案內容雜湊, 檢查項目, 該項目使用的規則雜湊)，
+    只修改某一類規則時，其他檢查項目仍直接取用快取。每個項目一個檔案並以原子替換寫入，
+    多個工作程序可共用同一目錄。
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: 快取目錄
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, file_digest: str, check: str, rules_digest: str) -> Path:
+        return (self.directory / file_digest[:2] /
+                f"{file_digest}-{check}-{rules_digest[:16]}-v{RESULT_VERSION}.json")
+
+    def get(self, file_digest: str, check: str, rules_digest: str) -> Optional[List[DRCError]]:
+        """
+        讀取快取
+
+        Returns:
+            該檢查項目的錯誤列表（未命中時為 None）
+        """
+        try:
+            with open(self._path(file_digest, check, rules_digest), encoding='utf-8') as f:
+                return [DRCError(**error) for error in json.load(f)]
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def put(self, file_digest: str, check: str, rules_digest: str, errors: List[DRCError]) -> None:
+        """寫入快取"""
+        path = self._path(file_digest, check, rules_digest)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump([asdict(error) for error in errors], f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
 class DRCChecker:
     """DRC 檢查器"""
 
-    def __init__(self, rules: Optional[DRCRules] = None):
+    # 檢查項目與其使用的規則分類（結果快取依此判斷規則是否變更）
+    CHECKS = (
+        ('track_width', ('track',)),
+        ('clearances', ('clearance',)),
+        ('vias', ('via',)),
+        ('board_edge', ('board',)),
+    )
+
+    def __init__(self, rules: Optional[DRCRules] = None, cache_dir: Optional[str] = None,
+                 result_cache: Optional[ResultCache] = None, verbose: bool = True):
+        """
+        Args:
+            rules: DRC 規則
+            cache_dir: 解析結果的磁碟快取目錄（None 表示只用記憶體快取）
+            result_cache: 檢查結果快取（供 check_file 使用）
+            verbose: 是否輸出進度訊息
+        """
         self.rules = rules or DRCRules()
-        self.board = None
+        self.board: Optional[BoardModel] = None
         self.pcb_file = ""
+        self.cache_dir = cache_dir
+        self.result_cache = result_cache
+        self.verbose = verbose
 
     def load_board(self, pcb_file: str) -> None:
         """
-        載入 PCB 板子
+        載入 PCB 板子（直接解析 .kicad_pcb,不需要 pcbnew）
 
         Args:
             pcb_file: PCB 檔案路徑
         """
-        try:
-            import pcbnew
-        except ImportError:
-            raise ImportError("需要 pcbnew 模組,請在 KiCAD 環境中執行")
-
-        print(f"📋 載入 PCB: {pcb_file}")
-        self.board = pcbnew.LoadBoard(pcb_file)
+        if self.verbose:
+            print(f"📋 載入 PCB: {pcb_file}")
+        self.board = load_kicad_board(pcb_file, cache_dir=self.cache_dir)
         self.pcb_file = pcb_file
 
     def run_drc(self) -> DRCResult:
@@ -152,92 +269,201 @@ class DRCChecker:
         if not self.board:
             raise ValueError("請先使用 load_board() 載入板子")
 
-        print(f"🔍 執行 DRC 檢查...")
+        if self.verbose:
+            print(f"🔍 執行 DRC 檢查...")
 
         result = DRCResult(project=Path(self.pcb_file).name)
+        self._run_checks(result, {})
 
-        # 執行各項檢查
-        self._check_track_width(result)
-        self._check_clearances(result)
-        self._check_vias(result)
-        self._check_board_edge(result)
+        if self.verbose:
+            print(f"✅ DRC 檢查完成")
+            print(f"   錯誤: {result.error_count}")
+            print(f"   警告: {result.warning_count}")
 
-        print(f"✅ DRC 檢查完成")
-        print(f"   錯誤: {result.error_count}")
-        print(f"   警告: {result.warning_count}")
+        return result
+
+    def check_file(self, pcb_file: str) -> DRCResult:
+        """
+        載入並檢查單一 PCB 檔案
+
+        有結果快取時，檔案內容與相關規則都未變更的檢查項目直接取用快取；
+        全部命中時不解析檔案。
 
+        Args:
+            pcb_file: PCB 檔案路徑
+
+        Returns:
+            DRCResult 物件
+        """
+        digest = None
+        cached = {}
+        if self.result_cache is not None:
+            digest = file_hash(pcb_file)
+            for name, sections in self.CHECKS:
+                errors = self.result_cache.get(digest, name, self.rules.digest(*sections))
+                if errors is not None:
+                    cached[name] = errors
+
+        result = DRCResult(project=Path(pcb_file).name)
+        if len(cached) == len(self.CHECKS):
+            result.cached = True
+            self.board, self.pcb_file = None, pcb_file
+        else:
+            self.load_board(pcb_file)
+        self._run_checks(result, cached, digest)
         return result
 
-    def _check_track_width(self, result: DRCResult) -> None:
-        """檢查走線寬度"""
-        try:
-            import pcbnew
-        except ImportError:
-            return
+    def _run_checks(self, result: DRCResult, cached: Dict[str, List[DRCError]],
+                    digest: Optional[str] = None) -> None:
+        """
+        依序執行各項檢查（已快取的項目直接取用）
 
-        for track in self.board.GetTracks():
-            if not isinstance(track, pcbnew.PCB_TRACK):
-                continue
+        Args:
+            result: 結果
+            cached: 檢查項目 → 快取的錯誤列表
+            digest: 檔案內容雜湊（提供時將新結果寫入快取）
+        """
+        for name, sections in self.CHECKS:
+            errors = cached.get(name)
+            if errors is None:
+                partial = DRCResult(project=result.project)
+                getattr(self, f'_check_{name}')(partial)
+                errors = partial.errors + partial.warnings
+                if digest is not None:
+                    self.result_cache.put(digest, name, self.rules.digest(*sections), errors)
+            for error in errors:
+                result.add_error(error)
 
-            width_mm = pcbnew.ToMM(track.GetWidth())
-            min_width = self.rules.track['min_width']
-            max_width = self.rules.track['max_width']
+    def _check_track_width(self, result: DRCResult) -> None:
+        """檢查走線寬度"""
+        tracks = self.board.tracks
+        min_width = self.rules.track['min_width']
+        max_width = self.rules.track['max_width']
+
+        for i in np.nonzero((tracks.width < min_width) | (tracks.width > max_width))[0]:
+            width_mm = float(tracks.width[i])
+            too_narrow = width_mm < min_width
+            limit = min_width if too_narrow else max_width
+            result.add_error(DRCError(
+                type='track_width',
+                severity='error' if too_narrow else 'warning',
+                message=(f'走線寬度 {width_mm:.3f}mm 小於最小值 {min_width}mm' if too_narrow
+                         else f'走線寬度 {width_mm:.3f}mm 大於最大值 {max_width}mm'),
+                layer=self.board.layer_name(tracks.layer[i]),
+                x=float(tracks.start[i, 0]),
+                y=float(tracks.start[i, 1]),
+                required=limit,
+                actual=width_mm
+            ))
+
+    def _copper_shapes(self) -> Tuple[clearance.Shapes, List[str]]:
+        """
+        板上所有銅箔物件的幾何（走線、焊盤、過孔）
 
-            if width_mm < min_width:
-                result.add_error(DRCError(
-                    type='track_width',
-                    severity='error',
-                    message=f'走線寬度 {width_mm:.3f}mm 小於最小值 {min_width}mm',
-                    layer=track.GetLayerName(),
-                    x=pcbnew.ToMM(track.GetStart().x),
-                    y=pcbnew.ToMM(track.GetStart().y),
-                    required=min_width,
-                    actual=width_mm
-                ))
-            elif width_mm > max_width:
-                result.add_error(DRCError(
-                    type='track_width',
-                    severity='warning',
-                    message=f'走線寬度 {width_mm:.3f}mm 大於最大值 {max_width}mm',
-                    layer=track.GetLayerName(),
-                    x=pcbnew.ToMM(track.GetStart().x),
-                    y=pcbnew.ToMM(track.GetStart().y),
-                    required=max_width,
-                    actual=width_mm
-                ))
+        Returns:
+            (物件, 每個物件的描述)
+        """
+        board = self.board
+        tracks, pads, vias = board.tracks, board.pads, board.vias
+        copper = {name: bit for bit, name in enumerate(board.copper_layers)}
+        track_mask = np.array([1 << copper[name] if name in copper else 0 for name in board.layers] + [0],
+                              dtype=np.int64)[tracks.layer]
+
+        # 弧線走線拆成折線段
+        start, end = tracks.start, tracks.end
+        owner = np.arange(len(tracks))
+        arcs = np.nonzero(tracks.is_arc)[0]
+        if len(arcs):
+            straight = np.nonzero(~tracks.is_arc)[0]
+            chords = [(i, np.asarray(_arc_points(tuple(start[i]), tuple(tracks.mid[i]), tuple(end[i]))))
+                      for i in arcs]
+            owner = np.concatenate([straight] + [np.full(len(pts) - 1, i) for i, pts in chords])
+            start = np.vstack([start[straight]] + [pts[:-1] for _, pts in chords])
+            end = np.vstack([end[straight]] + [pts[1:] for _, pts in chords])
+
+        track_shapes = clearance.segment_shapes(
+            start, end, tracks.width[owner], track_mask[owner], tracks.net[owner])
+
+        # 非電鍍孔沒有銅箔，只參與鑽孔間距檢查
+        plated = pads.pad_type != PAD_TYPES.index('np_thru_hole')
+        pad_shapes = clearance.pad_shapes(
+            pads.x, pads.y, pads.width, pads.height, pads.rotation,
+            pads.shape == PAD_SHAPES.index('circle'), pads.shape == PAD_SHAPES.index('oval'),
+            np.where(plated, pads.layer_mask, 0), pads.net)
+        via_shapes = clearance.circle_shapes(vias.x, vias.y, vias.diameter, vias.layer_mask, vias.net)
+
+        labels = ([f'走線 ({board.net_name(tracks.net[i]) or "無網路"})' for i in owner] +
+                  [f'焊盤 {board.footprints[f].reference}.{number}'
+                   for f, number in zip(pads.footprint, pads.number)] +
+                  [f'過孔 ({board.net_name(net) or "無網路"})' for net in vias.net])
+        return clearance.concat_shapes(track_shapes, pad_shapes, via_shapes), labels
 
     def _check_clearances(self, result: DRCResult) -> None:
-        """檢查間距 (簡化版)"""
-        # 實際的間距檢查需要更複雜的幾何計算
-        # 這裡只是示範結構
-        pass
+        """檢查間距（走線、焊盤、過孔之間的銅箔間距，以及鑽孔之間的間距）"""
+        rules = self.rules.clearance
+        shapes, labels = self._copper_shapes()
+        copper = self.board.copper_layers
+
+        rule_names = [['track_to_track', 'track_to_pad'], ['track_to_pad', 'pad_to_pad']]
+        limits = np.array([[rules[name] for name in row] for row in rule_names])
+        center = shapes.core.mean(axis=1)
+
+        for i, j, gap, layer in zip(*clearance.find_violations(shapes, limits, layers=len(copper))):
+            rule = rule_names[shapes.kind[i]][shapes.kind[j]]
+            x, y = (center[i] + center[j]) / 2
+            result.add_error(DRCError(
+                type='clearance',
+                severity='error',
+                message=(f'{labels[i]} 與 {labels[j]} 短路 (重疊 {-gap:.3f}mm)' if gap <= 0 else
+                         f'{labels[i]} 與 {labels[j]} 間距 {gap:.3f}mm 小於最小值 {rules[rule]}mm'),
+                layer=copper[layer],
+                x=float(x),
+                y=float(y),
+                required=rules[rule],
+                actual=float(gap)
+            ))
+
+        self._check_hole_clearances(result)
+
+    def _check_hole_clearances(self, result: DRCResult) -> None:
+        """檢查鑽孔之間的間距（貫穿所有層，不分網路）"""
+        pads, vias = self.board.pads, self.board.vias
+        drilled = pads.drill > 0
+        x = np.concatenate([pads.x[drilled], vias.x])
+        y = np.concatenate([pads.y[drilled], vias.y])
+        holes = clearance.circle_shapes(x, y, np.concatenate([pads.drill[drilled], vias.drill]),
+                                        np.ones(len(x), dtype=np.int64), np.zeros(len(x), dtype=np.int64))
+        min_gap = self.rules.clearance['hole_to_hole']
+
+        for i, j, gap, _ in zip(*clearance.find_violations(holes, np.full((2, 2), min_gap), layers=1)):
+            result.add_error(DRCError(
+                type='hole_clearance',
+                severity='error',
+                message=f'鑽孔間距 {gap:.3f}mm 小於最小值 {min_gap}mm',
+                x=float((x[i] + x[j]) / 2),
+                y=float((y[i] + y[j]) / 2),
+                required=min_gap,
+                actual=float(gap)
+            ))
 
     def _check_vias(self, result: DRCResult) -> None:
         """檢查過孔"""
-        try:
-            import pcbnew
-        except ImportError:
-            return
+        vias = self.board.vias
+        min_dia = self.rules.via['min_diameter']
+        min_drill = self.rules.via['min_drill']
 
-        for track in self.board.GetTracks():
-            if not isinstance(track, pcbnew.PCB_VIA):
-                continue
-
-            via = track
-            diameter_mm = pcbnew.ToMM(via.GetWidth())
-            drill_mm = pcbnew.ToMM(via.GetDrillValue())
-
-            min_dia = self.rules.via['min_diameter']
-            max_dia = self.rules.via['max_diameter']
-            min_drill = self.rules.via['min_drill']
+        for i in np.nonzero((vias.diameter < min_dia) | (vias.drill < min_drill))[0]:
+            diameter_mm = float(vias.diameter[i])
+            drill_mm = float(vias.drill[i])
+            x, y = float(vias.x[i]), float(vias.y[i])
 
             if diameter_mm < min_dia:
                 result.add_error(DRCError(
                     type='via_diameter',
                     severity='error',
                     message=f'過孔直徑 {diameter_mm:.3f}mm 小於最小值 {min_dia}mm',
-                    x=pcbnew.ToMM(via.GetPosition().x),
-                    y=pcbnew.ToMM(via.GetPosition().y),
+                    x=x,
+                    y=y,
                     required=min_dia,
                     actual=diameter_mm
                 ))
@@ -247,8 +473,8 @@ class DRCChecker:
                     type='via_drill',
                     severity='error',
                     message=f'過孔鑽孔 {drill_mm:.3f}mm 小於最小值 {min_drill}mm',
-                    x=pcbnew.ToMM(via.GetPosition().x),
-                    y=pcbnew.ToMM(via.GetPosition().y),
+                    x=x,
+                    y=y,
                     required=min_drill,
                     actual=drill_mm
                 ))
@@ -343,32 +569,8 @@ class DRCChecker:
 
     def _generate_json_report(self, result: DRCResult, output: str) -> None:
         """生成 JSON 報告"""
-        import json
-
-        data = {
-            'project': result.project,
-            'timestamp': result.timestamp,
-            'summary': {
-                'passed': result.passed,
-                'error_count': result.error_count,
-                'warning_count': result.warning_count
-            },
-            'errors': [
-                {
-                    'type': e.type,
-                    'severity': e.severity,
-                    'message': e.message,
-                    'layer': e.layer,
-                    'location': {'x': e.x, 'y': e.y},
-                    'required': e.required,
-                    'actual': e.actual
-                }
-                for e in result.errors + result.warnings
-            ]
-        }
-
         with open(output, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+            json.dump(result.to_dict(), f, indent=2, ensure_ascii=False)
 
         print(f"📄 JSON 報告已生成: {output}")
 
@@ -397,57 +599,156 @@ class DRCChecker:
         print(f"📄 文字報告已生成: {output}")
 
 
+@contextmanager
+def _time_limit(seconds: Optional[float]) -> Iterator[None]:
+    """
+    逾時時拋出 TimeoutError（以 SIGALRM 實作，只在 Unix 的主執行緒有效，其他情況不限時）
+    """
+    if not seconds or not hasattr(signal, 'setitimer') or \
+            threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def expire(signum, frame):
+        raise TimeoutError
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _failed_result(pcb_file: str, message: str) -> DRCResult:
+    """建立檢查失敗的結果"""
+    result = DRCResult(project=Path(pcb_file).name)
+    result.add_error(DRCError(type='system', severity='error', message=message))
+    return result
+
+
+def _check_one(checker: DRCChecker, pcb_file: str, timeout: Optional[float]) -> DRCResult:
+    """檢查單一檔案，逾時與例外都轉為失敗結果"""
+    try:
+        with _time_limit(timeout):
+            return checker.check_file(pcb_file)
+    except TimeoutError:
+        return _failed_result(pcb_file, f'檢查逾時 (超過 {timeout}s)')
+    except Exception as e:
+        return _failed_result(pcb_file, f'檢查失敗: {str(e)}')
+
+
+# 工作程序內的檢查器（由 _init_worker 建立，每個程序只建立一次）
+_worker_checker: Optional[DRCChecker] = None
+
+
+def _init_worker(rules: DRCRules, cache_dir: Optional[str], result_dir: Optional[str]) -> None:
+    global _worker_checker
+    _worker_checker = DRCChecker(rules=rules, cache_dir=cache_dir,
+                                 result_cache=ResultCache(result_dir) if result_dir else None,
+                                 verbose=False)
+
+
+def _worker_check(pcb_file: str, timeout: Optional[float]) -> DRCResult:
+    return _check_one(_worker_checker, pcb_file, timeout)
+
+
 class BatchDRCChecker:
     """批次 DRC 檢查器"""
 
-    def __init__(self, rules: Optional[DRCRules] = None):
+    def __init__(self, rules: Optional[DRCRules] = None, cache_dir: Optional[str] = None):
+        """
+        Args:
+            rules: DRC 規則
+            cache_dir: 快取目錄（解析結果，以及增量檢查的結果快取 results/ 子目錄）
+        """
         self.rules = rules or DRCRules()
+        self.cache_dir = cache_dir
 
     def run_batch(
         self,
         files: List[str],
         parallel: bool = False,
-        workers: int = 4
+        workers: int = 4,
+        timeout: Optional[float] = None,
+        incremental: bool = False,
+        report: Optional[str] = None
     ) -> List[DRCResult]:
         """
         批次執行 DRC 檢查
 
         Args:
             files: PCB 檔案列表
-            parallel: 是否並行處理
+            parallel: 是否以多程序並行處理
             workers: 工作程序數
+            timeout: 每個檔案的逾時秒數（None 表示不限，僅支援 Unix）
+            incremental: 是否只重新檢查內容或相關規則有變更的檔案（需要 cache_dir）
+            report: JSON Lines 報告路徑，每完成一個檔案立即寫入一行
 
         Returns:
-            DRC 結果列表
+            DRC 結果列表（與 files 順序相同）
         """
-        results = []
-
-        print(f"🔍 批次 DRC 檢查: {len(files)} 個專案")
+        if incremental and not self.cache_dir:
+            raise ValueError("增量檢查需要指定 cache_dir")
+        result_dir = os.path.join(self.cache_dir, 'results') if incremental else None
 
-        for pcb_file in files:
-            print(f"\n{'='*60}")
-            print(f"檢查: {pcb_file}")
-            print(f"{'='*60}")
+        results: List[Optional[DRCResult]] = [None] * len(files)
+        mode = f"，{workers} 個工作程序" if parallel else ""
+        print(f"🔍 批次 DRC 檢查: {len(files)} 個專案{mode}")
 
-            try:
-                checker = DRCChecker(rules=self.rules)
-                checker.load_board(pcb_file)
-                result = checker.run_drc()
-                results.append(result)
+        stream = open(report, 'w', encoding='utf-8') if report else None
+        try:
+            done = 0
+            for index, result in self._iter_results(files, parallel, workers, timeout, result_dir):
+                results[index] = result
+                done += 1
+                status = '✅' if result.passed else '❌'
+                note = " (未變更)" if result.cached else ""
+                print(f"{status} [{done}/{len(files)}] {files[index]}: "
+                      f"錯誤 {result.error_count}, 警告 {result.warning_count}{note}")
+
+                if stream:
+                    stream.write(json.dumps({'file': str(files[index]), **result.to_dict()},
+                                            ensure_ascii=False) + '\n')
+                    stream.flush()
+        finally:
+            if stream:
+                stream.close()
+
+        skipped = sum(result.cached for result in results)
+        print(f"\n✅ 批次檢查完成" + (f" ({skipped} 個未變更)" if incremental else ""))
+        return results
 
-            except Exception as e:
-                print(f"❌ 檢查失敗: {e}")
-                # 建立失敗結果
-                result = DRCResult(project=Path(pcb_file).name)
-                result.add_error(DRCError(
-                    type='system',
-                    severity='error',
-                    message=f'檢查失敗: {str(e)}'
-                ))
-                results.append(result)
+    def _iter_results(
+        self,
+        files: List[str],
+        parallel: bool,
+        workers: int,
+        timeout: Optional[float],
+        result_dir: Optional[str]
+    ) -> Iterator[Tuple[int, DRCResult]]:
+        """依完成順序產生 (索引, 結果)"""
+        if not parallel or workers <= 1 or len(files) <= 1:
+            checker = DRCChecker(rules=self.rules, cache_dir=self.cache_dir,
+                                 result_cache=ResultCache(result_dir) if result_dir else None,
+                                 verbose=False)
+            for index, pcb_file in enumerate(files):
+                yield index, _check_one(checker, pcb_file, timeout)
+            return
 
-        print(f"\n✅ 批次檢查完成")
-        return results
+        with ProcessPoolExecutor(max_workers=min(workers, len(files)), initializer=_init_worker,
+                                 initargs=(self.rules, self.cache_dir, result_dir)) as pool:
+            futures = {pool.submit(_worker_check, pcb_file, timeout): index
+                       for index, pcb_file in enumerate(files)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 工作程序異常終止（例如記憶體不足）
+                    result = _failed_result(files[index], f'檢查失敗: {str(e)}')
+                yield index, result
 
 
 if __name__ == "__main__":
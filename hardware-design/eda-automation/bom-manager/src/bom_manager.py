@@ -4,11 +4,19 @@ BOM Manager
 """
 
 import csv
+import os
+import sys
 from pathlib import Path
 from typing import List, Dict, Optional
 from collections import defaultdict
 from datetime import datetime
 
+# 共用 KiCAD 檔案解析器（eda-automation/src/kicad_parser.py）
+_SHARED_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+if _SHARED_SRC not in sys.path:
+    sys.path.append(_SHARED_SRC)
+from kicad_parser import load_board, load_schematic
+
 
 class BOMItem:
     """BOM 項目"""
@@ -57,37 +65,38 @@ class BOMManager:
 
     def extract_from_kicad(self, pcb_file: str) -> None:
         """
-        從 KiCAD PCB 檔案提取 BOM
+        從 KiCAD 檔案提取 BOM（直接解析,不需要 pcbnew）
 
         Args:
-            pcb_file: KiCAD PCB 檔案路徑
+            pcb_file: KiCAD PCB 檔案 (.kicad_pcb) 或原理圖檔案 (.kicad_sch) 路徑
         """
-        try:
-            import pcbnew
-        except ImportError:
-            raise ImportError("需要 pcbnew 模組,請在 KiCAD 環境中執行")
-
         print(f"📋 從 KiCAD 提取 BOM: {pcb_file}")
 
-        board = pcbnew.LoadBoard(pcb_file)
         self.metadata['project_name'] = Path(pcb_file).stem
 
+        # (參考編號, 值, 封裝名稱, 屬性) 列表
+        if Path(pcb_file).suffix == '.kicad_sch':
+            parts = [
+                (symbol.reference, symbol.value, symbol.footprint.split(':', 1)[-1], symbol.properties)
+                for symbol in load_schematic(pcb_file).symbols if symbol.in_bom
+            ]
+        else:
+            parts = [
+                (fp.reference, fp.value, fp.name, fp.properties)
+                for fp in load_board(pcb_file).footprints if fp.in_bom
+            ]
+
         # 收集元件資訊
         components = defaultdict(list)
+        details = {}
 
-        for fp in board.GetFootprints():
-            ref = fp.GetReference()
-            value = fp.GetValue()
-            footprint = str(fp.GetFPID().GetLibItemName())
-
-            # 獲取額外屬性
+        for ref, value, footprint, properties in parts:
+            # 嘗試從屬性中獲取 MPN 和製造商
             mpn = ""
             manufacturer = ""
 
-            # 嘗試從屬性中獲取 MPN 和製造商
-            for field in fp.GetFields():
-                field_name = field.GetName().lower()
-                field_value = field.GetText()
+            for field_name, field_value in properties.items():
+                field_name = field_name.lower()
 
                 if 'mpn' in field_name or 'part' in field_name:
                     mpn = field_value
@@ -97,6 +106,7 @@ class BOMManager:
             # 組合鍵: (值, 封裝, MPN)
             key = (value, footprint, mpn)
             components[key].append(ref)
+            details.setdefault(key, manufacturer)
 
         # 建立 BOM 項目
         self.items = []
@@ -105,7 +115,8 @@ class BOMManager:
                 references=refs,
                 value=value,
                 footprint=footprint,
-                mpn=mpn
+                mpn=mpn,
+                manufacturer=details[(value, footprint, mpn)]
             )
             self.items.append(item)
 
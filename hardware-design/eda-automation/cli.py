@@ -151,7 +151,9 @@ def extract_bom(pcb_file, output, format):
 @click.option('--suppliers', '-s', multiple=True, type=click.Choice(['digikey', 'mouser', 'lcsc']), help='供應商')
 @click.option('--output', '-o', type=click.Path(), help='報告輸出路徑')
 @click.option('--format', type=click.Choice(['html', 'csv', 'json']), default='html', help='報告格式')
-def estimate_cost(bom_file, quantity, suppliers, output, format):
+@click.option('--cache', type=click.Path(), help='價格快取 SQLite 檔案（跨次執行保存）')
+@click.option('--workers', '-j', type=int, default=8, help='同時查詢數')
+def estimate_cost(bom_file, quantity, suppliers, output, format, cache, workers):
     """估算 BOM 成本"""
     from src.supplier_integration import SupplierIntegration
     import json
@@ -170,9 +172,8 @@ def estimate_cost(bom_file, quantity, suppliers, output, format):
 
         # 估算成本
         supplier_list = list(suppliers) if suppliers else ['digikey', 'mouser', 'lcsc']
-        integration = SupplierIntegration(suppliers=supplier_list)
-
-        estimate = integration.estimate_bom_cost(bom, quantity=quantity)
+        with SupplierIntegration(suppliers=supplier_list, max_workers=workers, cache_path=cache) as integration:
+            estimate = integration.estimate_bom_cost(bom, quantity=quantity)
 
         click.echo(f"\n✅ 成本估算完成:")
         click.echo(f"  總成本: ${estimate['total_cost']:.2f}")
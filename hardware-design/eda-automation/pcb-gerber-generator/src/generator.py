@@ -4,11 +4,148 @@ PCB Gerber Generator
 """
 
 import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
 import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Iterator, Tuple
 from datetime import datetime
 
+# 共用 KiCAD 檔案解析器（eda-automation/src/kicad_parser.py）
+_SHARED_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+if _SHARED_SRC not in sys.path:
+    sys.path.append(_SHARED_SRC)
+from kicad_parser import layer_digests
+
+# 繪圖設定或快取格式變更時遞增，使舊的輸出快取失效
+CACHE_VERSION = 1
+
+# 鑽孔檔在輸出目標中的名稱
+DRILL = 'drill'
+
+
+class OutputCache:
+    """
+    內容定址的 Gerber 輸出快取
+
+    鍵為 (專案名稱, 層, 該層內容雜湊, 繪圖設定)，只改了部分層時其餘層直接取用；
+    每個鍵一個目錄，存放該層產生的所有檔案（鑽孔可能有 PTH 與 NPTH 兩個檔案）。
+    先寫入暫存目錄再改名，多個程序可共用同一快取。
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: 快取目錄
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(project_name: str, layer: str, digest: str, settings: Dict) -> str:
+        """快取鍵"""
+        data = json.dumps([CACHE_VERSION, project_name, layer, digest, settings],
+                          sort_keys=True, default=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> Optional[List[Path]]:
+        """讀取快取，未命中時為 None"""
+        path = self._path(key)
+        if not path.is_dir():
+            return None
+        return sorted(path.iterdir())
+
+    def put(self, key: str, files: List[Path]) -> List[Path]:
+        """
+        將檔案移入快取
+
+        Returns:
+            快取中的檔案路徑
+        """
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f'.{key[:8]}-', dir=path.parent))
+        for file in files:
+            shutil.move(str(file), str(staging / file.name))
+        try:
+            os.rename(staging, path)
+        except OSError:
+            # 其他程序已寫入相同的鍵
+            shutil.rmtree(staging, ignore_errors=True)
+        return self.get(key)
+
+
+class _PackageWriter:
+    """
+    組裝單一專案的輸出：複製到輸出目錄並逐檔寫入壓縮檔
+
+    每層完成即寫入，壓縮檔在第一個檔案到達時才開啟。
+    """
+
+    def __init__(self, output_path: Path, project_name: str, zip_output: bool):
+        self.output_path = output_path
+        self.zip_file = output_path / f"{project_name}_gerbers.zip" if zip_output else None
+        self.files: Dict[str, List[str]] = {}
+        self._zip: Optional[zipfile.ZipFile] = None
+
+    def add(self, target: str, files: List[str]) -> None:
+        """加入一層的輸出檔案"""
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        placed = []
+        for file in files:
+            source = Path(file)
+            dest = self.output_path / source.name
+            if source.resolve() != dest.resolve():
+                shutil.copyfile(source, dest)
+            if self.zip_file is not None:
+                if self._zip is None:
+                    self._zip = zipfile.ZipFile(self.zip_file, 'w', zipfile.ZIP_DEFLATED)
+                self._zip.write(dest, dest.name)
+            placed.append(str(dest))
+        self.files[target] = placed
+
+    def close(self, targets: List[str]) -> List[str]:
+        """
+        完成壓縮檔
+
+        Returns:
+            依 targets 順序排列的檔案列表
+        """
+        if self._zip is not None:
+            self._zip.close()
+            print(f"  ✅ 壓縮檔: {self.zip_file.name}")
+        return [file for target in targets for file in self.files.get(target, [])]
+
+    def discard(self, files: List[str]) -> None:
+        """刪除已放進輸出目錄、但不會列入結果的檔案（快取中的檔案不受影響）"""
+        _remove_outputs(self.output_path, files)
+
+    def abort(self) -> None:
+        """失敗時刪除未完成的壓縮檔與已輸出的各層檔案"""
+        if self._zip is not None:
+            self._zip.close()
+            self.zip_file.unlink()
+            self._zip = None
+        self.discard([file for files in self.files.values() for file in files])
+        self.files = {}
+
+
+def _remove_outputs(output_path: Path, files: List[str]) -> None:
+    """刪除位於 output_path 中的檔案"""
+    output_path = output_path.resolve()
+    for file in files:
+        path = Path(file)
+        if path.parent.resolve() == output_path:
+            path.unlink(missing_ok=True)
+
 
 class GerberGenerator:
     """PCB Gerber 檔案生成器"""
@@ -35,16 +172,19 @@ class GerberGenerator:
         'Edge.Cuts'
     ]
 
-    def __init__(self, tool: str = 'kicad', config: Optional[dict] = None):
+    def __init__(self, tool: str = 'kicad', config: Optional[dict] = None,
+                 cache_dir: Optional[str] = None):
         """
         初始化生成器
 
         Args:
             tool: EDA 工具 ('kicad', 'altium', 'eagle')
             config: 自訂配置
+            cache_dir: 輸出快取目錄（None 表示不快取）
         """
         self.tool = tool.lower()
         self.config = config or {}
+        self.cache = OutputCache(cache_dir) if cache_dir else None
 
         if self.tool == 'kicad':
             try:
@@ -96,97 +236,173 @@ class GerberGenerator:
 
         print(f"📋 載入 PCB: {input_file}")
 
-        # 載入板子
-        board = self.pcbnew.LoadBoard(input_file)
         project_name = Path(input_file).stem
-
-        # 建立輸出目錄
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
+        targets = self._targets(layers)
 
-        # 設定繪圖控制器
-        plot_controller = self.pcbnew.PLOT_CONTROLLER(board)
-        plot_options = plot_controller.GetPlotOptions()
-
-        # 設定基本選項
-        plot_options.SetOutputDirectory(str(output_path))
-        plot_options.SetPlotFrameRef(False)
-        plot_options.SetSketchPadLineWidth(self.pcbnew.FromMM(0.1))
-        plot_options.SetAutoScale(False)
-        plot_options.SetScale(1)
-        plot_options.SetMirror(False)
-        plot_options.SetUseGerberAttributes(True)
-        plot_options.SetUseGerberProtelExtensions(False)
-        plot_options.SetCreateGerberJobFile(True)
-        plot_options.SetSubtractMaskFromSilk(False)
+        print(f"🎨 繪製 Gerber 層與鑽孔檔...")
 
-        # 根據廠商調整設定
-        if manufacturer == 'jlcpcb':
-            plot_options.SetUseGerberProtelExtensions(True)
+        package = _PackageWriter(output_path, project_name, zip_output)
+        cached_targets = []
+        try:
+            for target, files, cached in self._iter_render(input_file, output_path, manufacturer, targets):
+                package.add(target, files)
+                if cached:
+                    cached_targets.append(target)
+                print(f"  ✅ {self._describe(target)}{' (快取)' if cached else ''}")
+        except Exception:
+            package.abort()
+            raise
+
+        result = self._build_result(output_path, project_name, package.close(targets),
+                                    package.zip_file, cached_targets)
 
-        # 決定要輸出的層
-        layers_to_plot = layers or self.STANDARD_LAYERS
+        print(f"\n✅ Gerber 生成完成!")
+        print(f"📁 輸出目錄: {output_path}")
+        print(f"📄 檔案數量: {result['file_count']}")
 
-        print(f"🎨 繪製 Gerber 層...")
+        return result
 
-        plotted_files = []
+    @staticmethod
+    def _build_result(output_path: Path, project_name: str, files: List[str],
+                      zip_file: Optional[Path], cached: List[str]) -> Dict:
+        """生成結果字典"""
+        return {
+            'success': True,
+            'output_dir': str(output_path),
+            'files': files,
+            'file_count': len(files),
+            'project_name': project_name,
+            'zip_file': str(zip_file) if zip_file else None,
+            'cached_layers': cached,
+            'timestamp': datetime.now().isoformat()
+        }
 
-        # 繪製各層
-        for layer_name in layers_to_plot:
+    def _targets(self, layers: Optional[List[str]]) -> List[str]:
+        """要輸出的層（略過未知的層）加上鑽孔檔"""
+        targets = []
+        for layer_name in layers or self.STANDARD_LAYERS:
             if layer_name not in self.KICAD_LAYERS:
                 print(f"⚠️  警告: 未知的層 {layer_name}")
-                continue
-
-            layer_id = getattr(self.pcbnew, layer_name.replace('.', '_'), None)
-            if layer_id is None:
+            elif getattr(self.pcbnew, layer_name.replace('.', '_'), None) is None:
                 print(f"⚠️  警告: 找不到層 ID: {layer_name}")
+            else:
+                targets.append(layer_name)
+        return targets + [DRILL]
+
+    def _describe(self, target: str) -> str:
+        """輸出目標的說明"""
+        if target == DRILL:
+            return "鑽孔檔 (.drl)"
+        return f"{self.KICAD_LAYERS[target][1]} ({target})"
+
+    def _settings(self, manufacturer: Optional[str]) -> Dict:
+        """影響輸出內容的設定（快取鍵的一部分）"""
+        version = getattr(self.pcbnew, 'Version', None)
+        return {
+            'tool': self.tool,
+            'version': version() if version else None,
+            'manufacturer': manufacturer,
+            'config': self.config
+        }
+
+    def _iter_render(
+        self,
+        input_file: str,
+        output_path: Path,
+        manufacturer: Optional[str],
+        targets: List[str]
+    ) -> Iterator[Tuple[str, List[str], bool]]:
+        """
+        逐一產生指定的層與鑽孔檔（全部命中快取時不載入板子）
+
+        Args:
+            input_file: 輸入 PCB 檔案路徑
+            output_path: 輸出目錄
+            manufacturer: 廠商名稱
+            targets: 層名稱（可包含 DRILL）
+
+        Yields:
+            (層, 檔案路徑, 是否取自快取)；有快取時檔案位於快取目錄，否則位於輸出目錄
+        """
+        project_name = Path(input_file).stem
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        keys = {}
+        if self.cache is not None:
+            digests = layer_digests(input_file, targets)
+            settings = self._settings(manufacturer)
+            keys = {target: OutputCache.key(project_name, target, digests[target], settings)
+                    for target in targets}
+
+        board = None
+        for target in targets:
+            cached = self.cache.get(keys[target]) if self.cache is not None else None
+            if cached:
+                yield target, [str(file) for file in cached], True
                 continue
 
-            ext, description = self.KICAD_LAYERS[layer_name]
+            if board is None:
+                board = self.pcbnew.LoadBoard(input_file)
+
+            # 每層輸出到獨立的暫存目錄，產生的檔案名稱由 KiCAD 決定
+            with tempfile.TemporaryDirectory(prefix='.plot-', dir=output_path) as tmp:
+                files = self._plot_target(board, target, Path(tmp), project_name, manufacturer)
+                if self.cache is not None and files:
+                    files = self.cache.put(keys[target], files)
+                else:
+                    files = [Path(shutil.move(str(file), str(output_path / file.name))) for file in files]
+            yield target, [str(file) for file in files], False
 
-            plot_controller.SetLayer(layer_id)
+    def _plot_target(
+        self,
+        board,
+        target: str,
+        output_path: Path,
+        project_name: str,
+        manufacturer: Optional[str]
+    ) -> List[Path]:
+        """繪製單一層或鑽孔檔到 output_path，回傳產生的檔案"""
+        if target == DRILL:
+            self._generate_drill_file(board, output_path, project_name)
+        else:
+            plot_controller = self._plot_controller(board, output_path, manufacturer)
+            ext, description = self.KICAD_LAYERS[target]
+            plot_controller.SetLayer(getattr(self.pcbnew, target.replace('.', '_')))
             plot_controller.OpenPlotfile(
-                layer_name,
+                target,
                 self.pcbnew.PLOT_FORMAT_GERBER,
                 description
             )
             plot_controller.PlotLayer()
+            plot_controller.ClosePlot()
 
-            # 記錄生成的檔案
-            gerber_file = output_path / f"{project_name}-{layer_name}.{ext}"
-            plotted_files.append(str(gerber_file))
-
-            print(f"  ✅ {description} ({layer_name})")
+        return sorted(path for path in output_path.iterdir() if path.is_file())
 
-        plot_controller.ClosePlot()
-
-        # 生成鑽孔檔
-        print(f"🔨 生成鑽孔檔...")
-        drill_file = self._generate_drill_file(board, output_path, project_name)
-        if drill_file:
-            plotted_files.append(drill_file)
-
-        # 壓縮檔案
-        zip_file = None
-        if zip_output:
-            print(f"📦 壓縮輸出檔案...")
-            zip_file = self._zip_files(plotted_files, output_path, project_name)
+    def _plot_controller(self, board, output_path: Path, manufacturer: Optional[str]):
+        """建立並設定繪圖控制器"""
+        plot_controller = self.pcbnew.PLOT_CONTROLLER(board)
+        plot_options = plot_controller.GetPlotOptions()
 
-        result = {
-            'success': True,
-            'output_dir': str(output_path),
-            'files': plotted_files,
-            'file_count': len(plotted_files),
-            'project_name': project_name,
-            'zip_file': zip_file,
-            'timestamp': datetime.now().isoformat()
-        }
+        # 設定基本選項
+        plot_options.SetOutputDirectory(str(output_path))
+        plot_options.SetPlotFrameRef(False)
+        plot_options.SetSketchPadLineWidth(self.pcbnew.FromMM(0.1))
+        plot_options.SetAutoScale(False)
+        plot_options.SetScale(1)
+        plot_options.SetMirror(False)
+        plot_options.SetUseGerberAttributes(True)
+        plot_options.SetUseGerberProtelExtensions(False)
+        # 逐層繪製時的工作檔只會列出單一層，因此不產生
+        plot_options.SetCreateGerberJobFile(False)
+        plot_options.SetSubtractMaskFromSilk(False)
 
-        print(f"\n✅ Gerber 生成完成!")
-        print(f"📁 輸出目錄: {output_path}")
-        print(f"📄 檔案數量: {len(plotted_files)}")
+        # 根據廠商調整設定
+        if manufacturer == 'jlcpcb':
+            plot_options.SetUseGerberProtelExtensions(True)
 
-        return result
+        return plot_controller
 
     def _generate_drill_file(
         self,
@@ -194,7 +410,12 @@ class GerberGenerator:
         output_path: Path,
         project_name: str
     ) -> Optional[str]:
-        """生成鑽孔檔"""
+        """
+        生成鑽孔檔
+
+        Raises:
+            RuntimeError: KiCAD 無法產生鑽孔檔
+        """
         try:
             drill_writer = self.pcbnew.EXCELLON_WRITER(board)
             drill_writer.SetFormat(False)  # 不使用公制格式標記
@@ -212,32 +433,11 @@ class GerberGenerator:
                 True,   # 生成鑽孔檔
                 False   # 不生成地圖檔
             )
-
-            drill_file = output_path / f"{project_name}.drl"
-            print(f"  ✅ 鑽孔檔 (.drl)")
-
-            return str(drill_file) if drill_file.exists() else None
-
         except Exception as e:
-            print(f"  ⚠️  鑽孔檔生成失敗: {e}")
-            return None
-
-    def _zip_files(
-        self,
-        files: List[str],
-        output_path: Path,
-        project_name: str
-    ) -> str:
-        """壓縮檔案"""
-        zip_filename = output_path / f"{project_name}_gerbers.zip"
-
-        with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file in files:
-                if os.path.exists(file):
-                    zipf.write(file, os.path.basename(file))
+            raise RuntimeError(f"鑽孔檔生成失敗: {e}") from e
 
-        print(f"  ✅ 壓縮檔: {zip_filename.name}")
-        return str(zip_filename)
+        drill_file = output_path / f"{project_name}.drl"
+        return str(drill_file) if drill_file.exists() else None
 
     def generate_all(
         self,
@@ -276,66 +476,165 @@ class GerberGenerator:
         return results
 
 
+# 工作程序內的生成器（由 _init_worker 建立，每個程序只建立一次）
+_worker_generator: Optional[GerberGenerator] = None
+
+
+def _init_worker(tool: str, config: Optional[dict], cache_dir: Optional[str]) -> None:
+    global _worker_generator
+    _worker_generator = GerberGenerator(tool, config, cache_dir=cache_dir)
+
+
+def _worker_render(input_file: str, output_dir: str, manufacturer: Optional[str],
+                   targets: List[str]) -> List[Tuple[str, List[str], bool]]:
+    rendered = []
+    try:
+        for item in _worker_generator._iter_render(input_file, Path(output_dir), manufacturer, targets):
+            rendered.append(item)
+    except Exception:
+        # 失敗前已移到輸出目錄的層不會回傳給主程序，在此刪除
+        _remove_outputs(Path(output_dir), [file for _, files, _ in rendered for file in files])
+        raise
+    return rendered
+
+
 class BatchGerberGenerator:
     """批次 Gerber 生成器"""
 
-    def __init__(self, tool: str = 'kicad', config: Optional[dict] = None):
-        self.generator = GerberGenerator(tool, config)
+    def __init__(self, tool: str = 'kicad', config: Optional[dict] = None,
+                 cache_dir: Optional[str] = None):
+        """
+        Args:
+            tool: EDA 工具
+            config: 自訂配置
+            cache_dir: 輸出快取目錄（None 表示不快取）
+        """
+        self.tool = tool
+        self.config = config
+        self.cache_dir = cache_dir
+        self.generator = GerberGenerator(tool, config, cache_dir=cache_dir)
 
     def process(
         self,
         files: List[str],
         output_base_dir: str,
         manufacturer: Optional[str] = None,
-        parallel: bool = False
+        parallel: bool = False,
+        workers: int = 4
     ) -> List[Dict]:
         """
         批次處理 PCB 檔案
 
+        並行時以多程序同時處理多個專案；專案數少於工作程序數時，同一專案的各層也分給
+        多個程序。每層完成即寫入該專案的壓縮檔。
+
         Args:
             files: PCB 檔案列表
             output_base_dir: 輸出基礎目錄
             manufacturer: 廠商名稱
             parallel: 是否平行處理
+            workers: 工作程序數
 
         Returns:
-            結果列表
+            結果列表（與 files 順序相同）
         """
-        results = []
-
-        for pcb_file in files:
-            print(f"\n{'='*60}")
-            print(f"處理: {pcb_file}")
-            print(f"{'='*60}")
-
-            try:
-                # 為每個專案建立子目錄
+        if not parallel or workers <= 1 or not files:
+            return [self._process_one(pcb_file, output_base_dir, manufacturer) for pcb_file in files]
+
+        targets = self.generator._targets(None)
+        # 每個專案拆成幾份（專案夠多時不拆，避免每個程序重複載入同一塊板子）
+        splits = max(1, min(len(targets), workers // len(files)))
+        print(f"🎨 批次生成: {len(files)} 個專案，{workers} 個工作程序")
+
+        results: List[Optional[Dict]] = [None] * len(files)
+        packages = []
+        pending = []
+        cached: List[List[str]] = [[] for _ in files]
+        errors: List[Optional[str]] = [None] * len(files)
+
+        # pcbnew 不保證在 fork 後可用，工作程序以 spawn 啟動
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(self.tool, self.config, self.cache_dir)) as pool:
+            futures = {}
+            for index, pcb_file in enumerate(files):
                 project_name = Path(pcb_file).stem
                 output_dir = Path(output_base_dir) / project_name
-
-                result = self.generator.generate(
-                    pcb_file,
-                    str(output_dir),
-                    manufacturer=manufacturer,
-                    zip_output=True
-                )
-
-                results.append({
-                    'file': pcb_file,
-                    'success': True,
-                    'result': result
-                })
-
-            except Exception as e:
-                print(f"❌ 處理失敗: {e}")
-                results.append({
-                    'file': pcb_file,
-                    'success': False,
-                    'error': str(e)
-                })
+                packages.append(_PackageWriter(output_dir, project_name, zip_output=True))
+                pending.append(splits)
+                for part in range(splits):
+                    future = pool.submit(_worker_render, pcb_file, str(output_dir),
+                                         manufacturer, targets[part::splits])
+                    futures[future] = index
+
+            done = 0
+            for future in as_completed(futures):
+                index = futures[future]
+                package = packages[index]
+                try:
+                    rendered = future.result()
+                    for target, paths, hit in rendered:
+                        if errors[index] is not None:
+                            # 同專案其他部分已失敗，這部分的輸出不會列入結果
+                            package.discard(paths)
+                            continue
+                        package.add(target, paths)
+                        if hit:
+                            cached[index].append(target)
+                except Exception as e:
+                    errors[index] = str(e)
+
+                pending[index] -= 1
+                if pending[index]:
+                    continue
+
+                done += 1
+                if errors[index] is None:
+                    result = self.generator._build_result(
+                        package.output_path, Path(files[index]).stem, package.close(targets),
+                        package.zip_file, cached[index])
+                    results[index] = {'file': files[index], 'success': True, 'result': result}
+                    print(f"✅ [{done}/{len(files)}] {files[index]}: {result['file_count']} 個檔案")
+                else:
+                    package.abort()
+                    results[index] = {'file': files[index], 'success': False, 'error': errors[index]}
+                    print(f"❌ [{done}/{len(files)}] {files[index]}: {errors[index]}")
 
         return results
 
+    def _process_one(self, pcb_file: str, output_base_dir: str,
+                     manufacturer: Optional[str]) -> Dict:
+        """處理單一 PCB 檔案"""
+        print(f"\n{'='*60}")
+        print(f"處理: {pcb_file}")
+        print(f"{'='*60}")
+
+        try:
+            # 為每個專案建立子目錄
+            project_name = Path(pcb_file).stem
+            output_dir = Path(output_base_dir) / project_name
+
+            result = self.generator.generate(
+                pcb_file,
+                str(output_dir),
+                manufacturer=manufacturer,
+                zip_output=True
+            )
+
+            return {
+                'file': pcb_file,
+                'success': True,
+                'result': result
+            }
+
+        except Exception as e:
+            print(f"❌ 處理失敗: {e}")
+            return {
+                'file': pcb_file,
+                'success': False,
+                'error': str(e)
+            }
+
 
 if __name__ == "__main__":
     # 簡單測試
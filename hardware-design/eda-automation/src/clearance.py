@@ -0,0 +1,312 @@
+"""
+銅箔間距幾何檢查
+
+每個物件表示為「核心 + 半徑」：
+- 走線：線段核心，半徑為線寬的一半（膠囊形）
+- 圓形焊盤、過孔：點核心，半徑為直徑的一半
+- 橢圓焊盤：沿長軸的線段核心，半徑為短邊的一半
+- 矩形類焊盤：旋轉矩形核心，半徑 0（圓角矩形以外接矩形計算，偏保守）
+
+兩物件的間距 = 核心之間的最短距離 - 兩半徑。
+
+候選對以每層的掃描線產生：依 x 下界排序後，以二分搜尋找出 x 範圍（加上最大間距）
+重疊的物件，再以 y 範圍過濾；候選對分塊以向量化核心計算精確距離，記憶體有上限。
+"""
+
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+# 每塊最多處理的候選對數（限制記憶體用量）
+PAIR_BLOCK = 1 << 19
+
+# 物件種類（決定適用的間距規則）
+TRACK = 0
+PAD = 1
+
+
+@dataclass
+class Shapes:
+    """一組物件的幾何（每個欄位長度 n）"""
+    core: np.ndarray        # (n, 4, 2) 核心頂點；點重複 4 次，線段為 [a, b, b, a]
+    radius: np.ndarray      # (n,)
+    polygon: np.ndarray     # (n,) 核心是否為有面積的矩形
+    layer_mask: np.ndarray  # (n,) 銅層位元遮罩
+    net: np.ndarray         # (n,) 網路編號（0 表示未連接）
+    kind: np.ndarray        # (n,) TRACK / PAD
+
+    def __len__(self) -> int:
+        return len(self.radius)
+
+    @property
+    def bounds(self) -> np.ndarray:
+        """(n, 4) 外框 (min_x, min_y, max_x, max_y)，已含半徑"""
+        low = self.core.min(axis=1) - self.radius[:, None]
+        high = self.core.max(axis=1) + self.radius[:, None]
+        return np.hstack([low, high])
+
+
+def _rotate(x: np.ndarray, y: np.ndarray, angle: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """依 KiCAD 慣例（Y 軸向下）旋轉，angle 為度"""
+    rad = np.radians(angle)
+    cos, sin = np.cos(rad), np.sin(rad)
+    return x * cos + y * sin, -x * sin + y * cos
+
+
+def segment_shapes(start: np.ndarray, end: np.ndarray, width: np.ndarray,
+                   layer_mask: np.ndarray, net: np.ndarray, kind: int = TRACK) -> Shapes:
+    """
+    走線（膠囊形）
+
+    Args:
+        start, end: (n, 2) 端點
+        width: 線寬
+        layer_mask: 銅層位元遮罩
+        net: 網路編號
+        kind: 物件種類
+    """
+    start = np.asarray(start, dtype=float).reshape(-1, 2)
+    end = np.asarray(end, dtype=float).reshape(-1, 2)
+    n = len(start)
+    core = np.stack([start, end, end, start], axis=1)
+    return Shapes(core=core, radius=np.asarray(width, dtype=float) / 2,
+                  polygon=np.zeros(n, dtype=bool),
+                  layer_mask=np.asarray(layer_mask, dtype=np.int64),
+                  net=np.asarray(net, dtype=np.int64), kind=np.full(n, kind, dtype=np.int8))
+
+
+def circle_shapes(x: np.ndarray, y: np.ndarray, diameter: np.ndarray,
+                  layer_mask: np.ndarray, net: np.ndarray, kind: int = PAD) -> Shapes:
+    """圓形（過孔、圓形焊盤、鑽孔）"""
+    center = np.stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)], axis=1)
+    n = len(center)
+    return Shapes(core=np.repeat(center[:, None, :], 4, axis=1),
+                  radius=np.asarray(diameter, dtype=float) / 2,
+                  polygon=np.zeros(n, dtype=bool),
+                  layer_mask=np.asarray(layer_mask, dtype=np.int64),
+                  net=np.asarray(net, dtype=np.int64), kind=np.full(n, kind, dtype=np.int8))
+
+
+def pad_shapes(x: np.ndarray, y: np.ndarray, width: np.ndarray, height: np.ndarray,
+               rotation: np.ndarray, round_pad: np.ndarray, oval: np.ndarray,
+               layer_mask: np.ndarray, net: np.ndarray) -> Shapes:
+    """
+    焊盤
+
+    Args:
+        x, y: 中心
+        width, height: 尺寸（焊盤本身座標系）
+        rotation: 旋轉角度（度）
+        round_pad: 是否為圓形
+        oval: 是否為橢圓（長圓）
+        layer_mask: 銅層位元遮罩
+        net: 網路編號
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    w = np.asarray(width, dtype=float)
+    h = np.asarray(height, dtype=float)
+    rotation = np.asarray(rotation, dtype=float)
+    round_pad = np.asarray(round_pad, dtype=bool)
+    oval = np.asarray(oval, dtype=bool) & ~round_pad
+    n = len(x)
+
+    # 矩形：四個角
+    hx, hy = w / 2, h / 2
+    local = np.stack([np.stack([-hx, -hy], 1), np.stack([hx, -hy], 1),
+                      np.stack([hx, hy], 1), np.stack([-hx, hy], 1)], axis=1)
+    radius = np.zeros(n)
+
+    # 橢圓：沿長軸的線段，半徑為短邊的一半
+    half_len = np.abs(hx - hy)
+    along_x = w >= h
+    seg = np.zeros((n, 4, 2))
+    seg[:, 0, 0] = np.where(along_x, -half_len, 0)
+    seg[:, 0, 1] = np.where(along_x, 0, -half_len)
+    seg[:, 1] = -seg[:, 0]
+    seg[:, 2] = seg[:, 1]
+    seg[:, 3] = seg[:, 0]
+    local = np.where(oval[:, None, None], seg, local)
+    radius = np.where(oval, np.minimum(hx, hy), radius)
+
+    # 圓形：點核心
+    local = np.where(round_pad[:, None, None], 0.0, local)
+    radius = np.where(round_pad, np.maximum(hx, hy), radius)
+
+    rx, ry = _rotate(local[..., 0], local[..., 1], rotation[:, None])
+    core = np.stack([rx + x[:, None], ry + y[:, None]], axis=-1)
+    return Shapes(core=core, radius=radius, polygon=~(round_pad | oval),
+                  layer_mask=np.asarray(layer_mask, dtype=np.int64),
+                  net=np.asarray(net, dtype=np.int64), kind=np.full(n, PAD, dtype=np.int8))
+
+
+def concat_shapes(*groups: Shapes) -> Shapes:
+    """合併多組物件（索引依序連接）"""
+    return Shapes(*(np.concatenate([getattr(g, name) for g in groups])
+                    for name in ('core', 'radius', 'polygon', 'layer_mask', 'net', 'kind')))
+
+
+# --- 向量化距離核心 ---
+
+def _cross(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+
+def _point_segment_distance(p: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    ab = b - a
+    length2 = np.einsum('...i,...i->...', ab, ab)
+    t = np.einsum('...i,...i->...', p - a, ab) / np.where(length2 > 0, length2, 1.0)
+    t = np.clip(t, 0.0, 1.0)
+    closest = a + t[..., None] * ab
+    return np.hypot(*np.moveaxis(closest - p, -1, 0))
+
+
+def segment_distance(a1: np.ndarray, b1: np.ndarray, a2: np.ndarray, b2: np.ndarray) -> np.ndarray:
+    """線段 a1-b1 與 a2-b2 的最短距離（相交時為 0）"""
+    distance = np.minimum(
+        np.minimum(_point_segment_distance(a1, a2, b2), _point_segment_distance(b1, a2, b2)),
+        np.minimum(_point_segment_distance(a2, a1, b1), _point_segment_distance(b2, a1, b1)))
+    d1, d2 = b1 - a1, b2 - a2
+    o1, o2 = _cross(d1, a2 - a1), _cross(d1, b2 - a1)
+    o3, o4 = _cross(d2, a1 - a2), _cross(d2, b1 - a2)
+    crossing = (o1 * o2 < 0) & (o3 * o4 < 0)
+    return np.where(crossing, 0.0, distance)
+
+
+def _inside(points: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """點 (P, 2) 是否在凸四邊形 (P, 4, 2) 內（含邊界）"""
+    edges = np.roll(polygon, -1, axis=1) - polygon
+    side = _cross(edges, points[:, None, :] - polygon)
+    return np.all(side >= 0, axis=1) | np.all(side <= 0, axis=1)
+
+
+def pair_gaps(shapes: Shapes, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """
+    物件對的間距（銅箔邊緣之間的距離，重疊時為負值）
+
+    Args:
+        shapes: 物件
+        i, j: 物件索引陣列
+
+    Returns:
+        間距陣列
+    """
+    core_i, core_j = shapes.core[i], shapes.core[j]
+    poly_i, poly_j = shapes.polygon[i], shapes.polygon[j]
+    distance = np.empty(len(i))
+
+    # 膠囊對膠囊（走線、過孔、圓形與橢圓焊盤）：只需一次線段距離
+    simple = ~(poly_i | poly_j)
+    if simple.any():
+        ci, cj = core_i[simple], core_j[simple]
+        distance[simple] = segment_distance(ci[:, 0], ci[:, 1], cj[:, 0], cj[:, 1])
+
+    # 含矩形：4x4 條邊兩兩計算，再處理完全包含的情況
+    general = ~simple
+    if general.any():
+        ci, cj = core_i[general], core_j[general]
+        ai, bi = ci[:, :, None, :], np.roll(ci, -1, axis=1)[:, :, None, :]
+        aj, bj = cj[:, None, :, :], np.roll(cj, -1, axis=1)[:, None, :, :]
+        d = segment_distance(ai, bi, aj, bj).min(axis=(1, 2))
+        contained = (poly_j[general] & _inside(ci[:, 0], cj)) | (poly_i[general] & _inside(cj[:, 0], ci))
+        distance[general] = np.where(contained, 0.0, d)
+
+    return distance - shapes.radius[i] - shapes.radius[j]
+
+
+# --- 候選對 ---
+
+def sweep_pairs(bounds: np.ndarray, margin: float,
+                block: int = PAIR_BLOCK) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    掃描線產生外框（擴張 margin 後）重疊的候選對
+
+    Args:
+        bounds: (n, 4) 外框
+        margin: 額外的間距
+        block: 每塊最多候選對數
+
+    Yields:
+        (i, j) 原始索引陣列，每對只出現一次
+    """
+    n = len(bounds)
+    if n < 2:
+        return
+
+    order = np.argsort(bounds[:, 0], kind='stable')
+    sorted_bounds = bounds[order]
+    xs = sorted_bounds[:, 0]
+    ends = np.searchsorted(xs, sorted_bounds[:, 2] + margin, side='right')
+    counts = np.maximum(ends - np.arange(n) - 1, 0)
+    total = np.concatenate([[0], np.cumsum(counts)])
+
+    start = 0
+    while start < n:
+        # 取到候選對數達到 block 為止（至少一個物件）
+        stop = max(start + 1, int(np.searchsorted(total, total[start] + block, side='right')) - 1)
+        stop = min(stop, n)
+        block_counts = counts[start:stop]
+        size = int(block_counts.sum())
+        if size:
+            first = np.repeat(np.arange(start, stop), block_counts)
+            offsets = np.arange(size) - np.repeat(total[start:stop] - total[start], block_counts)
+            second = first + 1 + offsets
+
+            low, high = sorted_bounds[:, 1], sorted_bounds[:, 3]
+            keep = (low[second] <= high[first] + margin) & (low[first] <= high[second] + margin)
+            yield order[first[keep]], order[second[keep]]
+        start = stop
+
+
+def find_violations(shapes: Shapes, rules: np.ndarray,
+                    layers: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    找出間距不足的物件對（同網路且網路編號非 0 的物件不檢查）
+
+    Args:
+        shapes: 物件
+        rules: (2, 2) 最小間距，依 (kind_i, kind_j) 查表
+        layers: 銅層數（None 表示由 layer_mask 推算）
+
+    Returns:
+        (i, j, 間距, 銅層索引)，每對只回報一次（第一個違規的層）
+    """
+    rules = np.asarray(rules, dtype=float)
+    margin = float(rules.max())
+    if layers is None:
+        layers = int(shapes.layer_mask.max()).bit_length() if len(shapes) else 0
+
+    bounds = shapes.bounds
+    found_i, found_j, found_gap, found_layer = [], [], [], []
+
+    for layer in range(layers):
+        on_layer = np.nonzero((shapes.layer_mask >> layer) & 1)[0]
+        for pi, pj in sweep_pairs(bounds[on_layer], margin):
+            i, j = on_layer[pi], on_layer[pj]
+            net_i, net_j = shapes.net[i], shapes.net[j]
+            candidate = (net_i != net_j) | (net_i == 0)
+            i, j = i[candidate], j[candidate]
+            if not len(i):
+                continue
+
+            gap = pair_gaps(shapes, i, j)
+            bad = gap < rules[shapes.kind[i], shapes.kind[j]]
+            found_i.append(i[bad])
+            found_j.append(j[bad])
+            found_gap.append(gap[bad])
+            found_layer.append(np.full(int(bad.sum()), layer))
+
+    if not found_i:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0), empty
+
+    i = np.concatenate(found_i)
+    j = np.concatenate(found_j)
+    gap = np.concatenate(found_gap)
+    layer = np.concatenate(found_layer)
+
+    # 多層物件（焊盤、過孔）可能在每層都被找到，只保留一次
+    low, high = np.minimum(i, j), np.maximum(i, j)
+    _, first = np.unique(low * len(shapes) + high, return_index=True)
+    return low[first], high[first], gap[first], layer[first]
@@ -0,0 +1,941 @@
+"""
+KiCAD 檔案解析器
+不需要 pcbnew，直接解析 .kicad_pcb / .kicad_sch 的 S-expression 格式
+
+- 串流讀取：逐塊分詞，頂層項目（footprint、segment、via…）解析完即轉換並丟棄，
+  不保留整棵語法樹；filled_polygon 等大型且用不到的子樹直接略過
+- 精簡模型：焊盤、走線、過孔以 NumPy 陣列（structure of arrays）儲存
+- 快取：以檔案內容雜湊為鍵，重複載入同一內容不再解析；可選擇以 pickle 存到磁碟，
+  供多個工作程序與多次執行共用
+"""
+
+import hashlib
+import math
+import os
+import pickle
+import re
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+import numpy as np
+
+SExpr = List[Any]
+
+# 分詞：括號、雙引號字串（可含跳脫字元）、其他原子
+_TOKEN = re.compile(r'\(|\)|"(?:[^"\\]|\\.)*"|[^\s()"]+')
+_ESCAPES = re.compile(r'\\(.)')
+_ESCAPE_MAP = {'n': '\n', 't': '\t', 'r': '\r'}
+
+# 解析時直接略過的子樹（體積大且 DRC/BOM 用不到）
+SKIPPED_SUBTREES = frozenset({'filled_polygon', 'fill_segments', 'model', 'lib_symbols'})
+
+# 焊盤形狀與類型代碼
+PAD_SHAPES = ('circle', 'rect', 'oval', 'roundrect', 'trapezoid', 'custom', 'chamfered_rect')
+PAD_TYPES = ('smd', 'thru_hole', 'np_thru_hole', 'connect')
+
+# 弧線、圓轉為折線時的分段數
+ARC_SEGMENTS = 8
+CIRCLE_SEGMENTS = 32
+
+CACHE_SIZE = 32
+# 模型格式變更時遞增，使舊的磁碟快取失效
+MODEL_VERSION = 2
+CHUNK_SIZE = 1 << 20
+
+
+def _unquote(token: str) -> str:
+    """去除字串引號並還原跳脫字元"""
+    body = token[1:-1]
+    if '\\' not in body:
+        return body
+    return _ESCAPES.sub(lambda m: _ESCAPE_MAP.get(m.group(1), m.group(1)), body)
+
+
+def iter_token_chunks(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[List[str]]:
+    """
+    串流分詞
+
+    KiCAD 檔案的字串不會跨行，因此每塊只處理到最後一個換行，其餘留到下一塊。
+
+    Args:
+        stream: 文字串流
+        chunk_size: 每次讀取的字元數
+
+    Yields:
+        每塊的詞列表：'(' / ')' / 原子（字串保留引號）
+    """
+    pending = ''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        pending += chunk
+        cut = pending.rfind('\n')
+        if cut < 0:
+            continue
+        yield _TOKEN.findall(pending, 0, cut + 1)
+        pending = pending[cut + 1:]
+    if pending:
+        yield _TOKEN.findall(pending)
+
+
+class SExprReader:
+    """
+    串流 S-expression 讀取器
+
+    只為根節點的子項目建立巢狀列表，每個子項目讀完即交給呼叫端；
+    根節點名稱（kicad_pcb / kicad_sch）記錄在 root。
+    """
+
+    def __init__(self, stream: TextIO, skip=SKIPPED_SUBTREES, chunk_size: int = CHUNK_SIZE):
+        self.stream = stream
+        self.skip = skip
+        self.chunk_size = chunk_size
+        self.root: Optional[str] = None
+
+    def __iter__(self) -> Iterator[SExpr]:
+        stack: List[SExpr] = []
+        current: Optional[SExpr] = None  # 正在建立的列表
+        depth = 0          # 目前所在的括號深度（根節點內部為 1）
+        skipping = 0       # 正在略過的子樹內的深度
+        head_pending = False
+        skip = self.skip
+
+        for tokens in iter_token_chunks(self.stream, self.chunk_size):
+            for token in tokens:
+                if skipping:
+                    if token == '(':
+                        skipping += 1
+                    elif token == ')':
+                        skipping -= 1
+                        if not skipping:
+                            depth -= 1
+                elif token == '(':
+                    depth += 1
+                    if depth > 1:
+                        if current is not None:
+                            stack.append(current)
+                        current = []
+                    head_pending = True
+                elif token == ')':
+                    depth -= 1
+                    head_pending = False
+                    if depth >= 1:
+                        item = current
+                        if stack:
+                            current = stack.pop()
+                            current.append(item)
+                        else:
+                            current = None
+                            yield item
+                else:
+                    if token[0] == '"':
+                        token = _unquote(token)
+                    if head_pending:
+                        head_pending = False
+                        if depth == 1:
+                            self.root = token
+                            continue
+                        if token in skip:
+                            current = stack.pop() if stack else None
+                            skipping = 1
+                            continue
+                    if current is not None:
+                        current.append(token)
+
+
+def _children(node: SExpr) -> Dict[str, SExpr]:
+    """子節點名稱 → 子節點（同名時保留第一個）"""
+    found: Dict[str, SExpr] = {}
+    for child in reversed(node):
+        if type(child) is list and child:
+            found[child[0]] = child
+    return found
+
+
+def _find(node: SExpr, head: str) -> Optional[SExpr]:
+    """第一個名稱為 head 的子節點"""
+    for child in node:
+        if type(child) is list and child and child[0] == head:
+            return child
+    return None
+
+
+def _findall(node: SExpr, head: str) -> List[SExpr]:
+    """所有名稱為 head 的子節點"""
+    return [child for child in node if type(child) is list and child and child[0] == head]
+
+
+def _xy(node: Optional[SExpr], default: Tuple[float, float] = (0.0, 0.0)) -> Tuple[float, float]:
+    """(start x y) 之類節點的座標"""
+    if node is None or len(node) < 3:
+        return default
+    return float(node[1]), float(node[2])
+
+
+def _number(node: Optional[SExpr], default: float = 0.0) -> float:
+    """(width w) 之類節點的數值"""
+    if node is None or len(node) < 2:
+        return default
+    return float(node[1])
+
+
+def _rotate(x: float, y: float, angle: float) -> Tuple[float, float]:
+    """依 KiCAD 慣例（Y 軸向下）旋轉座標，angle 為度"""
+    if not angle:
+        return x, y
+    rad = math.radians(angle)
+    cos, sin = math.cos(rad), math.sin(rad)
+    return x * cos + y * sin, -x * sin + y * cos
+
+
+def _arc_points(start: Tuple[float, float], mid: Tuple[float, float],
+                end: Tuple[float, float], segments: int = ARC_SEGMENTS) -> List[Tuple[float, float]]:
+    """三點弧轉為折線（共線時退化為直線）"""
+    (x1, y1), (x2, y2), (x3, y3) = start, mid, end
+    d = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
+    if abs(d) < 1e-12:
+        return [start, end]
+
+    ux = ((x1 ** 2 + y1 ** 2) * (y2 - y3) + (x2 ** 2 + y2 ** 2) * (y3 - y1)
+          + (x3 ** 2 + y3 ** 2) * (y1 - y2)) / d
+    uy = ((x1 ** 2 + y1 ** 2) * (x3 - x2) + (x2 ** 2 + y2 ** 2) * (x1 - x3)
+          + (x3 ** 2 + y3 ** 2) * (x2 - x1)) / d
+    radius = math.hypot(x1 - ux, y1 - uy)
+
+    a1 = math.atan2(y1 - uy, x1 - ux)
+    a2 = math.atan2(y2 - uy, x2 - ux)
+    a3 = math.atan2(y3 - uy, x3 - ux)
+    # 選擇經過中點的方向
+    sweep = (a3 - a1) % (2 * math.pi)
+    if (a2 - a1) % (2 * math.pi) > sweep:
+        sweep -= 2 * math.pi
+
+    return [(ux + radius * math.cos(a1 + sweep * i / segments),
+             uy + radius * math.sin(a1 + sweep * i / segments)) for i in range(segments + 1)]
+
+
+def _polyline_segments(points: List[Tuple[float, float]], closed: bool = False) -> List[Tuple[float, float, float, float]]:
+    """折線的線段列表 (x1, y1, x2, y2)"""
+    segments = [(*points[i], *points[i + 1]) for i in range(len(points) - 1)]
+    if closed and len(points) > 2:
+        segments.append((*points[-1], *points[0]))
+    return segments
+
+
+def _pts(node: Optional[SExpr]) -> List[Tuple[float, float]]:
+    """(pts (xy x y) ...) 的座標列表（arc 節點轉為折線）"""
+    if node is None:
+        return []
+    points: List[Tuple[float, float]] = []
+    for child in node[1:]:
+        if type(child) is not list or not child:
+            continue
+        if child[0] == 'xy':
+            points.append((float(child[1]), float(child[2])))
+        elif child[0] == 'arc':
+            arc = _arc_points(_xy(_find(child, 'start')), _xy(_find(child, 'mid')),
+                              _xy(_find(child, 'end')))
+            points.extend(arc if not points else arc[1:])
+    return points
+
+
+@dataclass
+class Footprint:
+    """封裝（元件）"""
+    reference: str
+    value: str
+    lib_id: str
+    layer: str
+    position: Tuple[float, float]
+    rotation: float = 0.0
+    properties: Dict[str, str] = field(default_factory=dict)
+    attributes: Tuple[str, ...] = ()
+
+    @property
+    def name(self) -> str:
+        """封裝名稱（去除函式庫前綴）"""
+        return self.lib_id.split(':', 1)[-1]
+
+    @property
+    def in_bom(self) -> bool:
+        """是否列入 BOM"""
+        return 'exclude_from_bom' not in self.attributes and 'board_only' not in self.attributes
+
+
+@dataclass
+class Pads:
+    """焊盤（每個欄位為長度 n 的陣列；座標為絕對座標 mm）"""
+    x: np.ndarray
+    y: np.ndarray
+    width: np.ndarray
+    height: np.ndarray
+    rotation: np.ndarray
+    shape: np.ndarray         # PAD_SHAPES 的索引
+    pad_type: np.ndarray      # PAD_TYPES 的索引
+    drill: np.ndarray         # 鑽孔直徑（SMD 為 0）
+    net: np.ndarray
+    layer_mask: np.ndarray    # 銅層位元遮罩（位元 i 對應 copper_layers[i]）
+    footprint: np.ndarray     # 所屬 footprints 的索引
+    number: List[str]
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+
+@dataclass
+class Tracks:
+    """走線（直線段 mid 為 NaN；弧線段保留中點）"""
+    start: np.ndarray         # (n, 2)
+    end: np.ndarray           # (n, 2)
+    mid: np.ndarray           # (n, 2)
+    width: np.ndarray
+    layer: np.ndarray         # layers 的索引
+    net: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.width)
+
+    @property
+    def is_arc(self) -> np.ndarray:
+        return ~np.isnan(self.mid[:, 0])
+
+
+@dataclass
+class Vias:
+    """過孔"""
+    x: np.ndarray
+    y: np.ndarray
+    diameter: np.ndarray
+    drill: np.ndarray
+    net: np.ndarray
+    layer_mask: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+
+@dataclass
+class Zone:
+    """鋪銅區域（只保留外框，不含填充結果）"""
+    net: int
+    net_name: str
+    layers: Tuple[str, ...]
+    outline: np.ndarray       # (k, 2)
+    keepout: bool = False
+
+
+@dataclass
+class BoardModel:
+    """PCB 板子模型"""
+    source: str
+    version: str = ''
+    generator: str = ''
+    layers: List[str] = field(default_factory=list)
+    nets: Dict[int, str] = field(default_factory=dict)
+    footprints: List[Footprint] = field(default_factory=list)
+    pads: Optional[Pads] = None
+    tracks: Optional[Tracks] = None
+    vias: Optional[Vias] = None
+    zones: List[Zone] = field(default_factory=list)
+    outline: np.ndarray = field(default_factory=lambda: np.zeros((0, 4)))  # Edge.Cuts 線段
+
+    @property
+    def copper_layers(self) -> List[str]:
+        """銅層名稱（依檔案順序）"""
+        return [name for name in self.layers if name.endswith('.Cu')]
+
+    def layer_name(self, index: int) -> str:
+        """層索引轉名稱"""
+        return self.layers[index] if 0 <= index < len(self.layers) else ''
+
+    def net_name(self, net: int) -> str:
+        """網路編號轉名稱"""
+        return self.nets.get(int(net), '')
+
+    @property
+    def bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        """板框範圍 (min_x, min_y, max_x, max_y)，沒有 Edge.Cuts 時返回 None"""
+        if len(self.outline) == 0:
+            return None
+        xs = self.outline[:, [0, 2]]
+        ys = self.outline[:, [1, 3]]
+        return float(xs.min()), float(ys.min()), float(xs.max()), float(ys.max())
+
+
+@dataclass
+class SchematicSymbol:
+    """原理圖符號"""
+    reference: str
+    value: str
+    footprint: str
+    lib_id: str
+    properties: Dict[str, str] = field(default_factory=dict)
+    in_bom: bool = True
+    unit: int = 1
+
+
+@dataclass
+class SchematicModel:
+    """原理圖模型"""
+    source: str
+    version: str = ''
+    generator: str = ''
+    symbols: List[SchematicSymbol] = field(default_factory=list)
+
+
+class _BoardBuilder:
+    """將頂層項目累積為 BoardModel"""
+
+    def __init__(self, source: str):
+        self.board = BoardModel(source=source)
+        self.layer_index: Dict[str, int] = {}
+        self.copper_index: Dict[str, int] = {}
+        self.net_by_name: Dict[str, int] = {}
+        self.pads: Dict[str, list] = {key: [] for key in (
+            'x', 'y', 'width', 'height', 'rotation', 'shape', 'pad_type', 'drill', 'net',
+            'layer_mask', 'footprint', 'number')}
+        self.tracks: Dict[str, list] = {key: [] for key in (
+            'start', 'end', 'mid', 'width', 'layer', 'net')}
+        self.vias: Dict[str, list] = {key: [] for key in (
+            'x', 'y', 'diameter', 'drill', 'net', 'layer_mask')}
+        self.outline: List[Tuple[float, float, float, float]] = []
+
+    # --- 層與網路 ---
+
+    def _layer(self, name: str) -> int:
+        index = self.layer_index.get(name)
+        if index is None:
+            index = len(self.board.layers)
+            self.board.layers.append(name)
+            self.layer_index[name] = index
+            if name.endswith('.Cu'):
+                self.copper_index[name] = len(self.copper_index)
+        return index
+
+    def _copper_mask(self, names: List[str]) -> int:
+        """層名稱列表轉銅層位元遮罩（支援 *.Cu 與 F&B.Cu）"""
+        copper = self.copper_index
+        mask = 0
+        for name in names:
+            if name in ('*.Cu', '*.*'):
+                return (1 << len(copper)) - 1
+            targets = ('F.Cu', 'B.Cu') if name == 'F&B.Cu' else (name,)
+            for target in targets:
+                if target in copper:
+                    mask |= 1 << copper[target]
+        return mask
+
+    def _copper_range(self, start: str, end: str) -> int:
+        """過孔跨越的銅層位元遮罩（start 到 end 之間的所有銅層）"""
+        copper = self.copper_index
+        if start not in copper or end not in copper:
+            return self._copper_mask([start, end])
+        i, j = sorted((copper[start], copper[end]))
+        return sum(1 << k for k in range(i, j + 1))
+
+    def _net(self, node: Optional[SExpr]) -> int:
+        """(net 3) / (net 3 "GND") / (net "GND") 轉網路編號"""
+        if node is None or len(node) < 2:
+            return 0
+        value = node[1]
+        try:
+            number = int(value)
+        except ValueError:
+            number = self.net_by_name.get(value)
+            if number is None:
+                number = len(self.board.nets) + 1
+                self.board.nets[number] = value
+                self.net_by_name[value] = number
+            return number
+        if len(node) > 2 and number not in self.board.nets:
+            self.board.nets[number] = node[2]
+            self.net_by_name[node[2]] = number
+        return number
+
+    # --- 頂層項目 ---
+
+    def add(self, item: SExpr):
+        handler = getattr(self, '_item_' + item[0], None) if item else None
+        if handler is not None:
+            handler(item)
+
+    def _item_version(self, item: SExpr):
+        self.board.version = str(item[1])
+
+    def _item_generator(self, item: SExpr):
+        self.board.generator = str(item[1])
+
+    def _item_layers(self, item: SExpr):
+        for layer in item[1:]:
+            if type(layer) is list and len(layer) >= 2:
+                self._layer(layer[1])
+
+    def _item_net(self, item: SExpr):
+        self._net(item)
+
+    def _item_footprint(self, item: SExpr):
+        lib_id = item[1] if len(item) > 1 and type(item[1]) is str else ''
+        x, y = _xy(_find(item, 'at'))
+        at = _find(item, 'at')
+        rotation = float(at[3]) if at is not None and len(at) > 3 else 0.0
+        layer = _find(item, 'layer')
+
+        properties: Dict[str, str] = {}
+        for prop in _findall(item, 'property'):
+            if len(prop) >= 3:
+                properties[prop[1]] = prop[2]
+        for text in _findall(item, 'fp_text'):
+            if len(text) >= 3 and text[1] in ('reference', 'value'):
+                properties.setdefault(text[1].capitalize(), text[2])
+
+        attr = _find(item, 'attr')
+        footprint = Footprint(
+            reference=properties.get('Reference', ''),
+            value=properties.get('Value', ''),
+            lib_id=lib_id,
+            layer=layer[1] if layer is not None else '',
+            position=(x, y),
+            rotation=rotation,
+            properties=properties,
+            attributes=tuple(attr[1:]) if attr is not None else ())
+        index = len(self.board.footprints)
+        self.board.footprints.append(footprint)
+
+        for pad in _findall(item, 'pad'):
+            self._add_pad(pad, index, x, y, rotation)
+
+        for child in item:
+            if type(child) is list and child and child[0] in ('fp_line', 'fp_arc', 'fp_rect', 'fp_circle', 'fp_poly'):
+                layer_node = _find(child, 'layer')
+                if layer_node is not None and layer_node[1] == 'Edge.Cuts':
+                    self._add_outline(child, x, y, rotation)
+
+    _item_module = _item_footprint  # KiCAD 5
+
+    def _add_pad(self, pad: SExpr, footprint: int, fx: float, fy: float, rotation: float):
+        pads = self.pads
+        at = _find(pad, 'at')
+        rx, ry = _xy(at)
+        dx, dy = _rotate(rx, ry, rotation)
+        size = _find(pad, 'size')
+        drill = _find(pad, 'drill')
+        drill_size = 0.0
+        if drill is not None:
+            sizes = [float(v) for v in drill[1:] if type(v) is str and v != 'oval']
+            drill_size = min(sizes) if sizes else 0.0
+        layers = _find(pad, 'layers')
+
+        pads['x'].append(fx + dx)
+        pads['y'].append(fy + dy)
+        pads['width'].append(float(size[1]) if size is not None else 0.0)
+        pads['height'].append(float(size[2]) if size is not None and len(size) > 2 else 0.0)
+        pads['rotation'].append(float(at[3]) if at is not None and len(at) > 3 else rotation)
+        shape = pad[3] if len(pad) > 3 and type(pad[3]) is str else 'circle'
+        pads['shape'].append(PAD_SHAPES.index(shape) if shape in PAD_SHAPES else PAD_SHAPES.index('custom'))
+        pad_type = pad[2] if len(pad) > 2 and type(pad[2]) is str else 'smd'
+        pads['pad_type'].append(PAD_TYPES.index(pad_type) if pad_type in PAD_TYPES else 0)
+        pads['drill'].append(drill_size)
+        pads['net'].append(self._net(_find(pad, 'net')))
+        pads['layer_mask'].append(self._copper_mask(layers[1:]) if layers is not None else 0)
+        pads['footprint'].append(footprint)
+        pads['number'].append(str(pad[1]) if len(pad) > 1 and type(pad[1]) is str else '')
+
+    def _item_segment(self, item: SExpr):
+        # 走線數量最多，只掃描一次子節點
+        children = _children(item)
+        tracks = self.tracks
+        tracks['start'].append(_xy(children.get('start')))
+        tracks['end'].append(_xy(children.get('end')))
+        tracks['mid'].append(_xy(children.get('mid'), (math.nan, math.nan)))
+        tracks['width'].append(_number(children.get('width')))
+        layer = children.get('layer')
+        tracks['layer'].append(self._layer(layer[1]) if layer is not None else -1)
+        tracks['net'].append(self._net(children.get('net')))
+
+    _item_arc = _item_segment
+
+    def _item_via(self, item: SExpr):
+        children = _children(item)
+        vias = self.vias
+        x, y = _xy(children.get('at'))
+        layers = children.get('layers')
+        vias['x'].append(x)
+        vias['y'].append(y)
+        vias['diameter'].append(_number(children.get('size')))
+        vias['drill'].append(_number(children.get('drill')))
+        vias['net'].append(self._net(children.get('net')))
+        if layers is not None and len(layers) >= 3:
+            vias['layer_mask'].append(self._copper_range(layers[1], layers[2]))
+        else:
+            vias['layer_mask'].append(self._copper_mask(['*.Cu']))
+
+    def _item_zone(self, item: SExpr):
+        layers_node = _find(item, 'layers')
+        layer_node = _find(item, 'layer')
+        if layers_node is not None:
+            layers = tuple(layers_node[1:])
+        elif layer_node is not None:
+            layers = (layer_node[1],)
+        else:
+            layers = ()
+        polygon = _find(item, 'polygon')
+        outline = np.array(_pts(_find(polygon, 'pts')) if polygon is not None else [],
+                           dtype=float).reshape(-1, 2)
+        net_name = _find(item, 'net_name')
+        self.board.zones.append(Zone(
+            net=self._net(_find(item, 'net')),
+            net_name=net_name[1] if net_name is not None and len(net_name) > 1 else '',
+            layers=layers,
+            outline=outline,
+            keepout=_find(item, 'keepout') is not None))
+
+    def _add_outline(self, item: SExpr, ox: float = 0.0, oy: float = 0.0, rotation: float = 0.0):
+        """Edge.Cuts 圖形轉為線段（footprint 內的圖形需轉換到板座標）"""
+        kind = item[0].split('_', 1)[1]
+        if kind == 'line':
+            points = [_xy(_find(item, 'start')), _xy(_find(item, 'end'))]
+            closed = False
+        elif kind == 'rect':
+            (x1, y1), (x2, y2) = _xy(_find(item, 'start')), _xy(_find(item, 'end'))
+            points = [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]
+            closed = True
+        elif kind == 'arc':
+            points = _arc_points(_xy(_find(item, 'start')), _xy(_find(item, 'mid')),
+                                 _xy(_find(item, 'end')))
+            closed = False
+        elif kind == 'circle':
+            cx, cy = _xy(_find(item, 'center'))
+            ex, ey = _xy(_find(item, 'end'))
+            radius = math.hypot(ex - cx, ey - cy)
+            points = [(cx + radius * math.cos(2 * math.pi * i / CIRCLE_SEGMENTS),
+                       cy + radius * math.sin(2 * math.pi * i / CIRCLE_SEGMENTS))
+                      for i in range(CIRCLE_SEGMENTS)]
+            closed = True
+        elif kind == 'poly':
+            points = _pts(_find(item, 'pts'))
+            closed = True
+        else:
+            return
+
+        if ox or oy or rotation:
+            points = [(ox + dx, oy + dy) for dx, dy in (_rotate(px, py, rotation) for px, py in points)]
+        self.outline.extend(_polyline_segments(points, closed))
+
+    def _item_gr_line(self, item: SExpr):
+        layer = _find(item, 'layer')
+        if layer is not None and layer[1] == 'Edge.Cuts':
+            self._add_outline(item)
+
+    _item_gr_rect = _item_gr_arc = _item_gr_circle = _item_gr_poly = _item_gr_line
+
+    # --- 完成 ---
+
+    def build(self) -> BoardModel:
+        board = self.board
+        p, t, v = self.pads, self.tracks, self.vias
+
+        board.pads = Pads(
+            x=np.array(p['x'], dtype=float),
+            y=np.array(p['y'], dtype=float),
+            width=np.array(p['width'], dtype=float),
+            height=np.array(p['height'], dtype=float),
+            rotation=np.array(p['rotation'], dtype=float),
+            shape=np.array(p['shape'], dtype=np.int8),
+            pad_type=np.array(p['pad_type'], dtype=np.int8),
+            drill=np.array(p['drill'], dtype=float),
+            net=np.array(p['net'], dtype=np.int32),
+            layer_mask=np.array(p['layer_mask'], dtype=np.int64),
+            footprint=np.array(p['footprint'], dtype=np.int32),
+            number=p['number'])
+        board.tracks = Tracks(
+            start=np.array(t['start'], dtype=float).reshape(-1, 2),
+            end=np.array(t['end'], dtype=float).reshape(-1, 2),
+            mid=np.array(t['mid'], dtype=float).reshape(-1, 2),
+            width=np.array(t['width'], dtype=float),
+            layer=np.array(t['layer'], dtype=np.int16),
+            net=np.array(t['net'], dtype=np.int32))
+        board.vias = Vias(
+            x=np.array(v['x'], dtype=float),
+            y=np.array(v['y'], dtype=float),
+            diameter=np.array(v['diameter'], dtype=float),
+            drill=np.array(v['drill'], dtype=float),
+            net=np.array(v['net'], dtype=np.int32),
+            layer_mask=np.array(v['layer_mask'], dtype=np.int64))
+        board.outline = np.array(self.outline, dtype=float).reshape(-1, 4)
+        return board
+
+
+def parse_board(stream: TextIO, source: str = '', chunk_size: int = CHUNK_SIZE) -> BoardModel:
+    """
+    從文字串流解析 .kicad_pcb
+
+    Args:
+        stream: 文字串流
+        source: 來源名稱（記錄在模型中）
+        chunk_size: 每次讀取的字元數
+
+    Returns:
+        BoardModel
+    """
+    reader = SExprReader(stream, chunk_size=chunk_size)
+    builder = _BoardBuilder(source)
+    for item in reader:
+        builder.add(item)
+    if reader.root not in ('kicad_pcb', None):
+        raise ValueError(f"不是 KiCAD PCB 檔案: {source or reader.root}")
+    return builder.build()
+
+
+def parse_schematic(stream: TextIO, source: str = '', chunk_size: int = CHUNK_SIZE) -> SchematicModel:
+    """
+    從文字串流解析 .kicad_sch（只收集放置的符號；lib_symbols 定義會略過）
+
+    同一參考編號的多單元符號只保留一筆；電源符號（參考編號以 # 開頭）不收錄。
+
+    Args:
+        stream: 文字串流
+        source: 來源名稱
+        chunk_size: 每次讀取的字元數
+
+    Returns:
+        SchematicModel
+    """
+    reader = SExprReader(stream, chunk_size=chunk_size)
+    model = SchematicModel(source=source)
+    seen = set()
+
+    for item in reader:
+        head = item[0] if item else None
+        if head == 'version':
+            model.version = str(item[1])
+        elif head == 'generator':
+            model.generator = str(item[1])
+        elif head == 'symbol':
+            properties = {prop[1]: prop[2] for prop in _findall(item, 'property') if len(prop) >= 3}
+            reference = properties.get('Reference', '')
+            if not reference or reference.startswith('#') or reference in seen:
+                continue
+            seen.add(reference)
+
+            lib_id = _find(item, 'lib_id')
+            in_bom = _find(item, 'in_bom')
+            unit = _find(item, 'unit')
+            model.symbols.append(SchematicSymbol(
+                reference=reference,
+                value=properties.get('Value', ''),
+                footprint=properties.get('Footprint', ''),
+                lib_id=lib_id[1] if lib_id is not None else '',
+                properties=properties,
+                in_bom=in_bom is None or in_bom[1] != 'no',
+                unit=int(unit[1]) if unit is not None else 1))
+
+    if reader.root not in ('kicad_sch', None):
+        raise ValueError(f"不是 KiCAD 原理圖檔案: {source or reader.root}")
+    return model
+
+
+# --- 以內容雜湊為鍵的快取 ---
+
+_model_cache: 'OrderedDict[str, Union[BoardModel, SchematicModel]]' = OrderedDict()
+_hash_memo: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_hash(path: Union[str, Path]) -> str:
+    """
+    檔案內容的 SHA-256（以路徑、大小與修改時間記住結果，未變更的檔案不重讀）
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _hash_memo.get(key)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+                hasher.update(block)
+        digest = hasher.hexdigest()
+        _hash_memo[key] = digest
+    return digest
+
+
+# 項目中的層引用：( layer "F.Cu" ) / ( layers "*.Cu" "*.Mask" )
+_LAYER_REF = re.compile(r'\( layers? ((?:[^()\s]+ )*)\)')
+
+
+def _bucket_matches(bucket: str, layer: str) -> bool:
+    """層引用（可含 *.Cu、F&B.Cu 等萬用字元）是否涵蓋指定層"""
+    if bucket == layer:
+        return True
+    if bucket == 'via':
+        return layer.endswith('.Cu') or layer.endswith('.Mask')
+    prefix, _, suffix = bucket.partition('.')
+    if not suffix or not layer.endswith('.' + suffix):
+        return False
+    return prefix == '*' or (prefix == 'F&B' and layer.split('.', 1)[0] in ('F', 'B'))
+
+
+def layer_digests(path: Union[str, Path], layers: List[str],
+                  chunk_size: int = CHUNK_SIZE) -> Dict[str, str]:
+    """
+    各層的內容雜湊（供 Gerber 等逐層輸出的快取使用）
+
+    逐一讀取頂層項目的詞（忽略空白與排版），依項目引用的層累加到對應的雜湊；
+    沒有層的項目（setup、net、title_block…）計入所有層。過孔視為經過所有銅層與防焊層；
+    'drill' 為所有含鑽孔的項目。
+
+    Args:
+        path: .kicad_pcb 檔案路徑
+        layers: 要計算的層名稱（可包含 'drill'）
+        chunk_size: 每次讀取的字元數
+
+    Returns:
+        層名稱 → SHA-256 十六進位字串
+    """
+    common = hashlib.sha256()
+    buckets: Dict[str, Any] = {}
+    item: List[str] = []
+    depth = 0
+
+    def add(bucket: str, data: bytes):
+        hasher = buckets.get(bucket)
+        if hasher is None:
+            hasher = buckets[bucket] = hashlib.sha256()
+        hasher.update(data)
+
+    with open(path, encoding='utf-8') as f:
+        for tokens in iter_token_chunks(f, chunk_size):
+            for token in tokens:
+                if token == '(':
+                    depth += 1
+                elif token == ')':
+                    depth -= 1
+                    if depth == 1:
+                        item.append(token)
+                        text = ' '.join(item)
+                        data = text.encode('utf-8') + b'\n'
+                        refs = {ref.strip('"') for match in _LAYER_REF.finditer(text)
+                                for ref in match.group(1).split() if ref[0] == '"'}
+                        if item[1] == 'via':
+                            refs.add('via')
+                        if '( drill ' in text:
+                            refs.add('drill')
+                        for ref in refs:
+                            add(ref, data)
+                        if not refs:
+                            common.update(data)
+                        item = []
+                        continue
+                if depth >= 2:
+                    item.append(token)
+
+    common_digest = common.digest()
+    digests = {}
+    for layer in layers:
+        hasher = hashlib.sha256(common_digest)
+        for bucket in sorted(buckets):
+            if _bucket_matches(bucket, layer):
+                hasher.update(bucket.encode('utf-8') + buckets[bucket].digest())
+        digests[layer] = hasher.hexdigest()
+    return digests
+
+
+def _load(path: Union[str, Path], kind: str, parser, cache: bool,
+          cache_dir: Optional[Union[str, Path]]):
+    path = str(path)
+    if not cache:
+        with open(path, 'r', encoding='utf-8') as f:
+            return parser(f, source=path)
+
+    key = f"{kind}-v{MODEL_VERSION}-{file_hash(path)}"
+    model = _model_cache.get(key)
+    if model is not None:
+        _model_cache.move_to_end(key)
+        return model
+
+    disk_path = Path(cache_dir) / f"{key}.pkl" if cache_dir else None
+    if disk_path is not None and disk_path.exists():
+        try:
+            with open(disk_path, 'rb') as f:
+                model = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            model = None
+
+    if model is None:
+        with open(path, 'r', encoding='utf-8') as f:
+            model = parser(f, source=path)
+        if disk_path is not None:
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            # 先寫暫存檔再改名，避免其他工作程序讀到寫一半的檔案
+            tmp_path = disk_path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, disk_path)
+
+    _model_cache[key] = model
+    while len(_model_cache) > CACHE_SIZE:
+        _model_cache.popitem(last=False)
+    return model
+
+
+def load_board(path: Union[str, Path], cache: bool = True,
+               cache_dir: Optional[Union[str, Path]] = None) -> BoardModel:
+    """
+    載入 .kicad_pcb（依內容雜湊快取）
+
+    快取的模型由所有呼叫端共用，請勿修改。
+
+    Args:
+        path: 檔案路徑
+        cache: 是否使用快取
+        cache_dir: 磁碟快取目錄（None 表示只用記憶體快取）
+
+    Returns:
+        BoardModel
+    """
+    return _load(path, 'pcb', parse_board, cache, cache_dir)
+
+
+def load_schematic(path: Union[str, Path], cache: bool = True,
+                   cache_dir: Optional[Union[str, Path]] = None) -> SchematicModel:
+    """
+    載入 .kicad_sch（依內容雜湊快取）
+
+    Args:
+        path: 檔案路徑
+        cache: 是否使用快取
+        cache_dir: 磁碟快取目錄（None 表示只用記憶體快取）
+
+    Returns:
+        SchematicModel
+    """
+    return _load(path, 'sch', parse_schematic, cache, cache_dir)
+
+
+def load_boards(paths: List[Union[str, Path]], workers: Optional[int] = None,
+                cache_dir: Optional[Union[str, Path]] = None) -> List[BoardModel]:
+    """
+    以多個工作程序並行載入多個 .kicad_pcb
+
+    Args:
+        paths: 檔案路徑列表
+        workers: 工作程序數（None 表示 CPU 核心數；1 表示在目前程序中依序載入）
+        cache_dir: 磁碟快取目錄（工作程序之間共用）
+
+    Returns:
+        與 paths 順序相同的 BoardModel 列表
+    """
+    if workers == 1 or len(paths) <= 1:
+        return [load_board(path, cache_dir=cache_dir) for path in paths]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(load_board, paths, [True] * len(paths), [cache_dir] * len(paths),
+                             chunksize=max(1, len(paths) // (4 * (workers or os.cpu_count() or 1)))))
+
+
+def clear_cache():
+    """清除記憶體快取"""
+    _model_cache.clear()
+    _hash_memo.clear()
@@ -5,9 +5,14 @@
 
 import requests
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+import json
 import logging
+import sqlite3
+import threading
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -47,10 +52,108 @@ class ComponentPrice:
         """獲取總價"""
         return self.get_unit_price(quantity) * quantity
 
+    def to_dict(self) -> Dict:
+        """轉為可 JSON 序列化的字典"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ComponentPrice':
+        """從字典建立（JSON 的價格階梯鍵為字串）"""
+        data = dict(data)
+        data['pricing'] = {int(qty): float(price) for qty, price in data.get('pricing', {}).items()}
+        return cls(**data)
+
+
+class RateLimiter:
+    """令牌桶速率限制（執行緒安全）"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: 每秒請求數
+            burst: 可連續發出的請求數
+        """
+        if rate <= 0:
+            raise ValueError(f"速率必須大於 0: {rate}")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """取得一個令牌，必要時等待"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class PriceCache:
+    """價格與庫存的持久化快取（SQLite，逾期自動失效）"""
+
+    def __init__(self, path: str, ttl: float = 24 * 3600):
+        """
+        Args:
+            path: SQLite 檔案路徑
+            ttl: 有效期（秒）
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS prices ("
+            " supplier TEXT NOT NULL, mpn TEXT NOT NULL, manufacturer TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL, payload TEXT NOT NULL,"
+            " PRIMARY KEY (supplier, mpn, manufacturer))"
+        )
+        self._conn.commit()
+
+    def get(self, supplier: str, mpn: str, manufacturer: str = "") -> Optional[List[ComponentPrice]]:
+        """讀取未過期的搜尋結果，沒有時回傳 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, payload FROM prices WHERE supplier=? AND mpn=? AND manufacturer=?",
+                (supplier, mpn, manufacturer)
+            ).fetchone()
+        if row is None or time.time() - row[0] > self.ttl:
+            return None
+        return [ComponentPrice.from_dict(item) for item in json.loads(row[1])]
+
+    def put(self, supplier: str, mpn: str, manufacturer: str, prices: List[ComponentPrice]) -> None:
+        """寫入搜尋結果"""
+        payload = json.dumps([price.to_dict() for price in prices], ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?)",
+                (supplier, mpn, manufacturer, time.time(), payload)
+            )
+            self._conn.commit()
+
+    def purge(self) -> int:
+        """刪除過期資料，回傳刪除筆數"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM prices WHERE fetched_at < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """關閉資料庫連線"""
+        with self._lock:
+            self._conn.close()
+
 
 class SupplierAPI:
     """供應商 API 基類"""
 
+    RATE_LIMIT: Optional[float] = None  # 每秒請求數上限（None 表示不限制）
+
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key
         self.session = requests.Session()
@@ -164,17 +267,83 @@ class LCSCAPI(SupplierAPI):
         ]
 
 
+class HTTPSupplierAPI(SupplierAPI):
+    """
+    通用 JSON HTTP 供應商 API（自建價格服務、代理或測試用模擬伺服器）
+
+    端點：
+        GET {base_url}/search?mpn=...&manufacturer=...  -> {"results": [ComponentPrice 欄位, ...]}
+        GET {base_url}/stock/{sku}                      -> {"stock": 數量}
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        api_key: Optional[str] = None,
+        timeout: float = 10.0,
+        rate_limit: Optional[float] = None
+    ):
+        """
+        Args:
+            name: 供應商名稱
+            base_url: API 根網址
+            api_key: API 金鑰（以 Bearer token 傳送）
+            timeout: 單次請求逾時（秒）
+            rate_limit: 每秒請求數上限
+        """
+        super().__init__(api_key)
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.RATE_LIMIT = rate_limit
+        self._local = threading.local()
+
+    def _get(self, path: str, params: Optional[Dict] = None) -> Dict:
+        """發送 GET 請求（每個執行緒各自一個 Session）"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        headers = {'Authorization': f"Bearer {self.api_key}"} if self.api_key else {}
+        response = session.get(f"{self.base_url}{path}", params=params, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def search(self, mpn: str, manufacturer: str = "") -> List[ComponentPrice]:
+        """搜尋元件"""
+        logger.info(f"搜尋 {self.name}: MPN={mpn}, Manufacturer={manufacturer}")
+        data = self._get('/search', {'mpn': mpn, 'manufacturer': manufacturer})
+        return [ComponentPrice.from_dict({'supplier': self.name, **item}) for item in data.get('results', [])]
+
+    def get_stock(self, sku: str) -> int:
+        """獲取庫存"""
+        return int(self._get(f"/stock/{sku}")['stock'])
+
+
 class SupplierIntegration:
     """供應商整合管理器"""
 
-    def __init__(self, suppliers: Optional[List[str]] = None):
+    def __init__(
+        self,
+        suppliers: Optional[List[str]] = None,
+        apis: Optional[Dict[str, SupplierAPI]] = None,
+        max_workers: int = 8,
+        cache_path: Optional[str] = None,
+        cache_ttl: float = 24 * 3600,
+        rate_limits: Optional[Dict[str, float]] = None
+    ):
         """
         初始化供應商整合
 
         Args:
             suppliers: 供應商列表 ['digikey', 'mouser', 'lcsc']
+            apis: 額外的供應商 API {名稱: SupplierAPI}，例如 HTTPSupplierAPI
+            max_workers: 同時進行的查詢數
+            cache_path: 價格快取 SQLite 檔案（None 表示不快取）
+            cache_ttl: 快取有效期（秒）
+            rate_limits: 各供應商每秒請求數上限，覆蓋 API 的預設值
         """
-        self.suppliers = suppliers or ['digikey', 'mouser', 'lcsc']
+        self.suppliers = suppliers or ([] if apis else ['digikey', 'mouser', 'lcsc'])
         self.apis = {}
 
         # 初始化 API
@@ -184,9 +353,83 @@ class SupplierIntegration:
             self.apis['mouser'] = MouserAPI()
         if 'lcsc' in self.suppliers:
             self.apis['lcsc'] = LCSCAPI()
+        if apis:
+            self.apis.update(apis)
+            self.suppliers = list(dict.fromkeys(self.suppliers + list(apis)))
+
+        rate_limits = rate_limits or {}
+        self.rate_limiters: Dict[str, RateLimiter] = {}
+        for name, api in self.apis.items():
+            rate = rate_limits.get(name, api.RATE_LIMIT)
+            if rate:
+                self.rate_limiters[name] = RateLimiter(rate)
+
+        self.cache = PriceCache(cache_path, cache_ttl) if cache_path else None
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._inflight: Dict[Tuple[str, str, str], Future] = {}
+        self._lock = threading.Lock()
 
         logger.info(f"初始化供應商整合: {', '.join(self.suppliers)}")
 
+    def close(self) -> None:
+        """結束查詢執行緒並關閉快取"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self) -> 'SupplierIntegration':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _lookup(self, supplier: str, mpn: str, manufacturer: str = "") -> Future:
+        """
+        查詢單一供應商（非同步）
+
+        先查快取；同一元件已在查詢中時共用同一個 Future，不重複發出請求。
+        """
+        key = (supplier, mpn, manufacturer)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+
+            cached = self.cache.get(*key) if self.cache is not None else None
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='supplier')
+            future = self._executor.submit(self._fetch, supplier, mpn, manufacturer)
+            self._inflight[key] = future
+            return future
+
+    def _fetch(self, supplier: str, mpn: str, manufacturer: str) -> List[ComponentPrice]:
+        """實際呼叫供應商 API（在工作執行緒中執行）"""
+        try:
+            limiter = self.rate_limiters.get(supplier)
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                prices = self.apis[supplier].search(mpn, manufacturer)
+            except Exception as e:
+                logger.error(f"{supplier} 搜尋失敗: {e}")
+                return []  # 失敗不寫入快取
+
+            if self.cache is not None:
+                self.cache.put(supplier, mpn, manufacturer, prices)
+            return prices
+        finally:
+            with self._lock:
+                self._inflight.pop((supplier, mpn, manufacturer), None)
+
     def search_component(
         self,
         mpn: str,
@@ -204,17 +447,8 @@ class SupplierIntegration:
         Returns:
             {supplier_name: [ComponentPrice, ...]}
         """
-        results = {}
-
-        for supplier_name, api in self.apis.items():
-            try:
-                prices = api.search(mpn, manufacturer)
-                results[supplier_name] = prices
-            except Exception as e:
-                logger.error(f"{supplier_name} 搜尋失敗: {e}")
-                results[supplier_name] = []
-
-        return results
+        futures = {name: self._lookup(name, mpn, manufacturer) for name in self.apis}
+        return {name: future.result() for name, future in futures.items()}
 
     def compare_prices(
         self,
@@ -233,8 +467,14 @@ class SupplierIntegration:
         Returns:
             [(supplier, ComponentPrice, total_price), ...] 按價格排序
         """
-        results = self.search_component(mpn, manufacturer, quantity)
+        return self._compare(self.search_component(mpn, manufacturer, quantity), quantity)
 
+    @staticmethod
+    def _compare(
+        results: Dict[str, List[ComponentPrice]],
+        quantity: int
+    ) -> List[Tuple[str, ComponentPrice, float]]:
+        """依總價排序有足夠庫存的報價"""
         comparisons = []
 
         for supplier, prices in results.items():
@@ -271,6 +511,13 @@ class SupplierIntegration:
         component_costs = []
         unavailable_components = []
 
+        # 先對所有元件、所有供應商同時發出查詢（重複的 MPN 只查一次）
+        lookups = {}
+        for item in bom:
+            key = (item.get('mpn', ''), item.get('manufacturer', ''))
+            if key[0] and key not in lookups:
+                lookups[key] = {name: self._lookup(name, *key) for name in self.apis}
+
         for item in bom:
             mpn = item.get('mpn', '')
             manufacturer = item.get('manufacturer', '')
@@ -280,8 +527,9 @@ class SupplierIntegration:
                 logger.warning(f"跳過沒有 MPN 的元件: {item}")
                 continue
 
-            # 搜尋元件
-            comparisons = self.compare_prices(mpn, manufacturer, comp_qty * quantity)
+            # 比較價格
+            results = {name: future.result() for name, future in lookups[(mpn, manufacturer)].items()}
+            comparisons = self._compare(results, comp_qty * quantity)
 
             if not comparisons:
                 logger.warning(f"找不到元件: {mpn}")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試批次 DRC 檢查（並行、逾時、增量檢查、串流報告）
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'batch-drc-checker' / 'src'))
+
+from drc_checker import BatchDRCChecker, DRCChecker, DRCRules
+
+
+BOARD = """(kicad_pcb (version 20240108)
+	(layers (0 "F.Cu" signal) (31 "B.Cu" signal))
+	(net 0 "") (net 1 "A") (net 2 "B")
+	(segment (start 0 0) (end 10 0) (width {width}) (layer "F.Cu") (net 1))
+	(segment (start 0 0.38) (end 10 0.38) (width 0.2) (layer "F.Cu") (net 2))
+	(via (at 20 20) (size 0.6) (drill 0.3) (layers "F.Cu" "B.Cu") (net 1))
+)
+"""
+
+
+class TestBatchDRC(unittest.TestCase):
+    """批次 DRC 測試"""
+
+    def setUp(self):
+        """設定測試：寬度不同的三塊板子"""
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.files = []
+        for i, width in enumerate([0.1, 0.2, 0.3]):
+            path = self.tmpdir / f'board{i}.kicad_pcb'
+            path.write_text(BOARD.format(width=width), encoding='utf-8')
+            self.files.append(str(path))
+
+    def tearDown(self):
+        """清理"""
+        shutil.rmtree(self.tmpdir)
+
+    @staticmethod
+    def _summary(results):
+        return [sorted(e.type for e in r.errors + r.warnings) for r in results]
+
+    def test_parallel_matches_serial(self):
+        """測試並行結果與循序相同且依輸入順序回傳"""
+        batch = BatchDRCChecker()
+        serial = batch.run_batch(self.files)
+        parallel = batch.run_batch(self.files, parallel=True, workers=2)
+        self.assertEqual(self._summary(parallel), self._summary(serial))
+        self.assertEqual(self._summary(serial),
+                         [['track_width'], ['clearance'], ['clearance']])
+
+    def test_streaming_report(self):
+        """測試 JSON Lines 報告"""
+        report = self.tmpdir / 'report.jsonl'
+        BatchDRCChecker().run_batch(self.files, parallel=True, workers=2, report=str(report))
+        lines = [json.loads(line) for line in report.read_text(encoding='utf-8').splitlines()]
+        self.assertEqual(sorted(line['file'] for line in lines), sorted(self.files))
+        self.assertTrue(all('summary' in line for line in lines))
+
+    def test_incremental(self):
+        """測試未變更的檔案取自快取，檔案或規則變更時重新檢查"""
+        batch = BatchDRCChecker(cache_dir=str(self.tmpdir / 'cache'))
+        first = batch.run_batch(self.files, incremental=True)
+        self.assertFalse(any(r.cached for r in first))
+
+        second = batch.run_batch(self.files, parallel=True, workers=2, incremental=True)
+        self.assertTrue(all(r.cached for r in second))
+        self.assertEqual(self._summary(second), self._summary(first))
+
+        Path(self.files[0]).write_text(BOARD.format(width=0.25), encoding='utf-8')
+        batch.rules.clearance['track_to_track'] = 0.1
+        third = batch.run_batch(self.files, incremental=True)
+        self.assertFalse(any(r.cached for r in third))
+        self.assertEqual(self._summary(third), [[], [], []])
+
+    def test_incremental_requires_cache_dir(self):
+        """測試增量檢查需要快取目錄"""
+        with self.assertRaises(ValueError):
+            BatchDRCChecker().run_batch(self.files, incremental=True)
+
+    def test_rules_digest(self):
+        """測試規則雜湊只取決於指定分類"""
+        rules = DRCRules()
+        before = (rules.digest('clearance'), rules.digest('track'))
+        rules.set_clearance(0.3)
+        self.assertNotEqual(rules.digest('clearance'), before[0])
+        self.assertEqual(rules.digest('track'), before[1])
+
+    @unittest.skipUnless(sys.platform != 'win32', '逾時需要 SIGALRM')
+    def test_timeout(self):
+        """測試單一檔案逾時不影響其他檔案"""
+        def slow(checker, result):
+            if checker.pcb_file.endswith('board1.kicad_pcb'):
+                time.sleep(5)
+
+        with mock.patch.object(DRCChecker, '_check_board_edge', slow):
+            start = time.time()
+            results = BatchDRCChecker().run_batch(self.files, timeout=0.5)
+
+        self.assertLess(time.time() - start, 4)
+        self.assertEqual([r.errors[-1].type for r in results], ['track_width', 'system', 'clearance'])
+        self.assertIn('逾時', results[1].errors[-1].message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試銅箔間距幾何檢查
+"""
+
+import io
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.clearance import (circle_shapes, concat_shapes, find_violations, pad_shapes,
+                           pair_gaps, segment_shapes, sweep_pairs)
+from src.kicad_parser import parse_board
+
+
+def _segments(start, end, width=0.2, net=None):
+    """建立單層走線"""
+    start = np.asarray(start, dtype=float)
+    n = len(start)
+    net = np.arange(1, n + 1) if net is None else net
+    return segment_shapes(start, end, np.full(n, width), np.ones(n, dtype=np.int64), net)
+
+
+class TestPairGaps(unittest.TestCase):
+    """間距計算測試"""
+
+    def test_parallel_tracks(self):
+        """測試平行走線間距"""
+        shapes = _segments([[0, 0], [0, 1]], [[10, 0], [10, 1]])
+        np.testing.assert_allclose(pair_gaps(shapes, np.array([0]), np.array([1])), [0.8])
+
+    def test_crossing_tracks(self):
+        """測試交叉走線（重疊為負值）"""
+        shapes = _segments([[0, 0], [5, -5]], [[10, 0], [5, 5]])
+        np.testing.assert_allclose(pair_gaps(shapes, np.array([0]), np.array([1])), [-0.2])
+
+    def test_track_to_rotated_pad(self):
+        """測試走線對旋轉 90 度的矩形焊盤"""
+        pad = pad_shapes([0], [0], [2.0], [1.0], [90], [False], [False], [1], [1])
+        track = _segments([[-5, 2]], [[5, 2]], net=[2])
+        shapes = concat_shapes(pad, track)
+        # 旋轉後焊盤高 2mm，上緣在 y=1；走線下緣在 y=1.9
+        np.testing.assert_allclose(pair_gaps(shapes, np.array([0]), np.array([1])), [0.9])
+
+    def test_contained_and_oval(self):
+        """測試完全包含於矩形內的過孔，以及橢圓焊盤"""
+        pad = pad_shapes([0, 10], [0, 0], [4.0, 3.0], [4.0, 1.0], [0, 0], [False, False],
+                         [False, True], [1, 1], [1, 2])
+        via = circle_shapes([0.5, 13], [0.5, 0], [0.6, 0.6], [1, 1], [3, 4])
+        shapes = concat_shapes(pad, via)
+        gaps = pair_gaps(shapes, np.array([0, 1]), np.array([2, 3]))
+        # 包含時核心距離為 0；橢圓端點在 x=11.5，過孔邊緣在 x=12.7
+        np.testing.assert_allclose(gaps, [-0.3, 1.2])
+
+
+class TestFindViolations(unittest.TestCase):
+    """違規搜尋測試"""
+
+    def test_matches_brute_force(self):
+        """測試掃描線結果與全部配對一致"""
+        rng = np.random.default_rng(1)
+        start = rng.uniform(0, 50, (400, 2))
+        end = start + rng.uniform(-3, 3, (400, 2))
+        net = rng.integers(0, 20, 400)
+        shapes = _segments(start, end, net=net)
+        rules = np.full((2, 2), 0.3)
+
+        i, j, gap, _ = find_violations(shapes, rules)
+        found = set(zip(i.tolist(), j.tolist()))
+
+        a, b = np.triu_indices(len(shapes), 1)
+        keep = (net[a] != net[b]) | (net[a] == 0)
+        a, b = a[keep], b[keep]
+        expected = pair_gaps(shapes, a, b) < 0.3
+        self.assertEqual(found, set(zip(a[expected].tolist(), b[expected].tolist())))
+        self.assertTrue(found)
+
+    def test_layers_and_kinds(self):
+        """測試不同層不檢查、規則依物件種類查表、多層物件只回報一次"""
+        track = segment_shapes([[0, 0], [0, 0]], [[10, 0], [10, 0]], [0.2, 0.2], [0b01, 0b10], [1, 1])
+        via = circle_shapes([5], [0.6], [0.4], [0b11], [2])
+        shapes = concat_shapes(track, via)
+
+        # 間距 0.3：走線對焊盤規則 0.2 時通過，0.4 時兩層各違規一次
+        i, _, _, _ = find_violations(shapes, [[0.1, 0.2], [0.2, 0.2]])
+        self.assertEqual(len(i), 0)
+        i, j, gap, layer = find_violations(shapes, [[0.1, 0.4], [0.4, 0.4]])
+        self.assertEqual(sorted(zip(i.tolist(), j.tolist())), [(0, 2), (1, 2)])
+        np.testing.assert_allclose(gap, [0.3, 0.3])
+        self.assertEqual(sorted(layer.tolist()), [0, 1])
+
+    def test_small_blocks(self):
+        """測試分塊大小不影響候選對"""
+        rng = np.random.default_rng(2)
+        bounds = rng.uniform(0, 20, (300, 2))
+        bounds = np.hstack([bounds, bounds + 1])
+        full = set()
+        for i, j in sweep_pairs(bounds, 0.5):
+            full |= set(zip(i.tolist(), j.tolist()))
+        small = set()
+        for i, j in sweep_pairs(bounds, 0.5, block=17):
+            small |= set(zip(i.tolist(), j.tolist()))
+        self.assertEqual(full, small)
+
+
+class TestDRCClearance(unittest.TestCase):
+    """DRC 間距檢查測試"""
+
+    BOARD = """(kicad_pcb (version 20240108)
+	(layers (0 "F.Cu" signal) (31 "B.Cu" signal))
+	(net 0 "") (net 1 "A") (net 2 "B")
+	(footprint "Test:Pad" (layer "F.Cu") (at 10 10)
+		(property "Reference" "J1" (at 0 0 0))
+		(pad "1" smd rect (at 0 0) (size 1 1) (layers "F.Cu") (net 1 "A"))
+		(pad "2" np_thru_hole circle (at 0 3) (size 1 1) (drill 1) (layers "*.Cu"))
+	)
+	(segment (start 5 10.65) (end 15 10.65) (width 0.2) (layer "F.Cu") (net 2))
+	(segment (start 5 10.65) (end 15 10.65) (width 0.2) (layer "B.Cu") (net 2))
+	(segment (start 5 13.7) (end 15 13.7) (width 0.2) (layer "F.Cu") (net 2))
+	(via (at 10.5 13) (size 0.6) (drill 0.3) (layers "F.Cu" "B.Cu") (net 2))
+)
+"""
+
+    @classmethod
+    def setUpClass(cls):
+        sys.path.insert(0, str(Path(__file__).parent.parent / 'batch-drc-checker' / 'src'))
+
+    def test_clearance_errors(self):
+        """測試走線對焊盤間距（不同層不違規，非電鍍孔不是銅箔）與鑽孔間距"""
+        from drc_checker import DRCChecker
+
+        checker = DRCChecker()
+        checker.board = parse_board(io.StringIO(self.BOARD))
+        result = checker.run_drc()
+
+        copper = [e for e in result.errors if e.type == 'clearance']
+        self.assertEqual(len(copper), 1)
+        self.assertEqual(copper[0].layer, 'F.Cu')
+        self.assertAlmostEqual(copper[0].actual, 0.05)
+        self.assertEqual(copper[0].required, checker.rules.clearance['track_to_pad'])
+
+        holes = [e for e in result.errors if e.type == 'hole_clearance']
+        self.assertEqual(len(holes), 1)
+        self.assertAlmostEqual(holes[0].actual, -0.15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試 Gerber 輸出快取
+"""
+
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'pcb-gerber-generator' / 'src'))
+
+from generator import OutputCache
+
+
+class TestOutputCache(unittest.TestCase):
+    """內容定址輸出快取測試"""
+
+    def setUp(self):
+        """設定測試"""
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.cache = OutputCache(str(self.tmpdir / 'cache'))
+
+    def tearDown(self):
+        """清理"""
+        shutil.rmtree(self.tmpdir)
+
+    def _files(self, name, *contents):
+        directory = self.tmpdir / name
+        directory.mkdir()
+        files = []
+        for i, content in enumerate(contents):
+            path = directory / f'board-{i}.drl'
+            path.write_text(content)
+            files.append(path)
+        return files
+
+    def test_key(self):
+        """測試鍵取決於層、內容雜湊與設定"""
+        key = OutputCache.key('board', 'F.Cu', 'abc', {'manufacturer': 'jlcpcb'})
+        self.assertEqual(key, OutputCache.key('board', 'F.Cu', 'abc', {'manufacturer': 'jlcpcb'}))
+        self.assertNotEqual(key, OutputCache.key('board', 'B.Cu', 'abc', {'manufacturer': 'jlcpcb'}))
+        self.assertNotEqual(key, OutputCache.key('board', 'F.Cu', 'abd', {'manufacturer': 'jlcpcb'}))
+        self.assertNotEqual(key, OutputCache.key('board', 'F.Cu', 'abc', {'manufacturer': None}))
+
+    def test_put_and_get(self):
+        """測試存入多個檔案後讀回"""
+        key = OutputCache.key('board', 'drill', 'abc', {})
+        self.assertIsNone(self.cache.get(key))
+
+        stored = self.cache.put(key, self._files('out', 'PTH', 'NPTH'))
+        self.assertEqual([p.name for p in stored], ['board-0.drl', 'board-1.drl'])
+        self.assertEqual([p.read_text() for p in self.cache.get(key)], ['PTH', 'NPTH'])
+
+    def test_concurrent_put(self):
+        """測試相同的鍵重複寫入時保留第一份"""
+        key = OutputCache.key('board', 'drill', 'abc', {})
+        self.cache.put(key, self._files('first', 'A'))
+        stored = self.cache.put(key, self._files('second', 'B'))
+        self.assertEqual([p.read_text() for p in stored], ['A'])
+        self.assertEqual(len(list(stored[0].parent.parent.iterdir())), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
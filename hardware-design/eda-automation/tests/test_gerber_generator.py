@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試 Gerber 生成的錯誤處理（以模擬的 pcbnew 模組執行）
+"""
+
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'pcb-gerber-generator' / 'src'))
+
+import generator
+from generator import BatchGerberGenerator, GerberGenerator, _PackageWriter
+
+
+def _fake_pcbnew(drill_error=None):
+    """只實作生成器用到的 pcbnew 介面：每層寫出一個檔案"""
+    pcbnew = types.SimpleNamespace(
+        PLOT_FORMAT_GERBER=1, PLOT_FORMAT_PDF=2,
+        FromMM=lambda mm: int(mm * 1e6), wxPoint=lambda x, y: (x, y),
+        LoadBoard=lambda path: types.SimpleNamespace(name=Path(path).stem),
+    )
+    for layer in GerberGenerator.KICAD_LAYERS:
+        setattr(pcbnew, layer.replace('.', '_'), layer)
+
+    class PlotController:
+        def __init__(self, board):
+            self.board = board
+            self.options = mock.Mock()
+
+        def GetPlotOptions(self):
+            return self.options
+
+        def SetLayer(self, layer):
+            self.layer = layer
+
+        def OpenPlotfile(self, suffix, plot_format, description):
+            directory = Path(self.options.SetOutputDirectory.call_args[0][0])
+            (directory / f"{self.board.name}-{suffix.replace('.', '_')}.gbr").write_text(suffix)
+
+        def PlotLayer(self):
+            pass
+
+        def ClosePlot(self):
+            pass
+
+    class ExcellonWriter:
+        def __init__(self, board):
+            self.board = board
+
+        def __getattr__(self, name):
+            return lambda *args: None
+
+        def CreateDrillandMapFilesSet(self, directory, drill, drill_map):
+            if drill_error:
+                raise drill_error
+            (Path(directory) / f"{self.board.name}.drl").write_text('M48')
+
+    pcbnew.PLOT_CONTROLLER = PlotController
+    pcbnew.EXCELLON_WRITER = ExcellonWriter
+    return pcbnew
+
+
+class TestGerberErrors(unittest.TestCase):
+    """鑽孔檔失敗時的錯誤回報與輸出清理"""
+
+    def setUp(self):
+        """設定測試"""
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.board = self.tmpdir / 'board.kicad_pcb'
+        self.board.write_text('(kicad_pcb)')
+
+    def tearDown(self):
+        """清理"""
+        shutil.rmtree(self.tmpdir)
+
+    def _generator(self, drill_error=None):
+        with mock.patch.dict(sys.modules, {'pcbnew': _fake_pcbnew(drill_error)}):
+            return GerberGenerator('kicad')
+
+    def test_generate(self):
+        """測試正常輸出各層與鑽孔檔"""
+        result = self._generator().generate(str(self.board), str(self.tmpdir / 'out'),
+                                            layers=['F.Cu', 'B.Cu'], zip_output=True)
+
+        self.assertEqual([Path(f).name for f in result['files']],
+                         ['board-F_Cu.gbr', 'board-B_Cu.gbr', 'board.drl'])
+        with zipfile.ZipFile(result['zip_file']) as archive:
+            self.assertEqual(len(archive.namelist()), 3)
+
+    def test_drill_error_is_raised_and_outputs_removed(self):
+        """測試鑽孔檔失敗時拋出錯誤，並刪除已輸出的層與壓縮檔"""
+        gen = self._generator(OSError('disk full'))
+        output = self.tmpdir / 'out'
+
+        with self.assertRaisesRegex(RuntimeError, 'disk full'):
+            gen.generate(str(self.board), str(output), layers=['F.Cu', 'B.Cu'], zip_output=True)
+
+        self.assertEqual(list(output.iterdir()), [])
+
+    def test_batch_result_reports_drill_error(self):
+        """測試批次處理把鑽孔檔錯誤記錄在結果中"""
+        batch = BatchGerberGenerator.__new__(BatchGerberGenerator)
+        batch.generator = self._generator(OSError('disk full'))
+
+        [result] = batch.process([str(self.board)], str(self.tmpdir / 'out'))
+
+        self.assertFalse(result['success'])
+        self.assertIn('disk full', result['error'])
+
+    def test_worker_removes_partial_outputs(self):
+        """測試工作程序失敗時刪除已移到輸出目錄的層"""
+        output = self.tmpdir / 'out'
+        with mock.patch.object(generator, '_worker_generator', self._generator(OSError('disk full'))):
+            with self.assertRaises(RuntimeError):
+                generator._worker_render(str(self.board), str(output), None, ['F.Cu', 'drill'])
+
+        self.assertEqual(list(output.iterdir()), [])
+
+
+class TestPackageWriter(unittest.TestCase):
+    """輸出組裝"""
+
+    def setUp(self):
+        """設定測試"""
+        self.tmpdir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """清理"""
+        shutil.rmtree(self.tmpdir)
+
+    def test_abort_keeps_cached_files(self):
+        """測試放棄時刪除輸出目錄中的檔案，但保留快取中的來源"""
+        cached = self.tmpdir / 'cache' / 'board-F_Cu.gbr'
+        cached.parent.mkdir()
+        cached.write_text('F.Cu')
+        package = _PackageWriter(self.tmpdir / 'out', 'board', zip_output=True)
+        package.add('F.Cu', [str(cached)])
+
+        package.abort()
+
+        self.assertEqual(list((self.tmpdir / 'out').iterdir()), [])
+        self.assertTrue(cached.exists())
+
+    def test_discard_ignores_files_outside_output(self):
+        """測試 discard 不刪除輸出目錄以外的檔案"""
+        outside = self.tmpdir / 'board.drl'
+        outside.write_text('M48')
+        package = _PackageWriter(self.tmpdir / 'out', 'board', zip_output=False)
+
+        package.discard([str(outside)])
+
+        self.assertTrue(outside.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
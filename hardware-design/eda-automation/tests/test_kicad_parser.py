@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試 KiCAD 檔案解析器
+"""
+
+import io
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import kicad_parser
+from src.kicad_parser import SExprReader, load_board, load_schematic, parse_board
+
+
+BOARD = """(kicad_pcb
+	(version 20240108)
+	(generator "pcbnew")
+	(layers
+		(0 "F.Cu" signal)
+		(31 "B.Cu" signal)
+		(44 "Edge.Cuts" user)
+	)
+	(net 0 "")
+	(net 1 "GND")
+	(net 2 "VCC")
+	(footprint "Resistor_SMD:R_0603_1608Metric"
+		(layer "F.Cu")
+		(at 100 50 90)
+		(property "Reference" "R1" (at 0 -1.43 90) (layer "F.SilkS"))
+		(property "Value" "10k" (at 0 1.43 90) (layer "F.Fab"))
+		(property "MPN" "RC0603FR-0710KL" (at 0 0 0) (layer "F.Fab"))
+		(attr smd)
+		(pad "1" smd roundrect (at -0.775 0 90) (size 0.9 0.95)
+			(layers "F.Cu" "F.Paste" "F.Mask") (net 1 "GND"))
+		(pad "2" smd roundrect (at 0.775 0 90) (size 0.9 0.95)
+			(layers "F.Cu" "F.Paste" "F.Mask") (net 2 "VCC"))
+		(model "${KICAD8_3DMODEL_DIR}/R_0603.wrl" (offset (xyz 0 0 0)))
+	)
+	(footprint "Connector:TP"
+		(layer "B.Cu")
+		(at 110 60)
+		(property "Reference" "TP1" (at 0 0 0) (layer "B.SilkS"))
+		(property "Value" "TP \\"(x)\\"" (at 0 0 0) (layer "B.Fab"))
+		(attr exclude_from_pos_files exclude_from_bom)
+		(pad "1" thru_hole circle (at 0 0) (size 1.5 1.5) (drill 0.8)
+			(layers "*.Cu" "*.Mask") (net 1 "GND"))
+	)
+	(gr_rect (start 90 40) (end 130 70) (layer "Edge.Cuts"))
+	(segment (start 100 49.225) (end 105 49.225) (width 0.25) (layer "F.Cu") (net 1))
+	(segment (start 105 49.225) (end 110 60) (width 0.1) (layer "B.Cu") (net 1))
+	(arc (start 100 51) (mid 101 52) (end 102 51) (width 0.2) (layer "F.Cu") (net 2))
+	(via (at 105 49.225) (size 0.6) (drill 0.3) (layers "F.Cu" "B.Cu") (net 1))
+	(zone (net 1) (net_name "GND") (layer "B.Cu")
+		(polygon (pts (xy 90 40) (xy 130 40) (xy 130 70) (xy 90 70)))
+		(filled_polygon (layer "B.Cu") (pts (xy 91 41) (xy 129 41) (xy 129 69)))
+	)
+)
+"""
+
+SCHEMATIC = """(kicad_sch
+	(version 20231120)
+	(generator "eeschema")
+	(lib_symbols
+		(symbol "Device:R" (property "Reference" "R" (at 0 0 0)))
+	)
+	(symbol (lib_id "Device:R") (at 50 50 0) (unit 1) (in_bom yes)
+		(property "Reference" "R1" (at 0 0 0))
+		(property "Value" "10k" (at 0 0 0))
+		(property "Footprint" "Resistor_SMD:R_0603_1608Metric" (at 0 0 0))
+	)
+	(symbol (lib_id "Amplifier:LM358") (at 80 50 0) (unit 1)
+		(property "Reference" "U1" (at 0 0 0))
+		(property "Value" "LM358" (at 0 0 0))
+	)
+	(symbol (lib_id "Amplifier:LM358") (at 80 80 0) (unit 2)
+		(property "Reference" "U1" (at 0 0 0))
+		(property "Value" "LM358" (at 0 0 0))
+	)
+	(symbol (lib_id "power:GND") (at 50 60 0)
+		(property "Reference" "#PWR01" (at 0 0 0))
+		(property "Value" "GND" (at 0 0 0))
+	)
+	(symbol (lib_id "Mechanical:MountingHole") (at 10 10 0) (in_bom no)
+		(property "Reference" "H1" (at 0 0 0))
+		(property "Value" "MountingHole" (at 0 0 0))
+	)
+)
+"""
+
+
+class TestSExprReader(unittest.TestCase):
+    """S-expression 讀取器測試"""
+
+    def test_items_and_root(self):
+        """測試頂層項目與根節點"""
+        reader = SExprReader(io.StringIO('(root (a 1 "x y") (b (c "(")) )\n'))
+        items = list(reader)
+        self.assertEqual(reader.root, 'root')
+        self.assertEqual(items, [['a', '1', 'x y'], ['b', ['c', '(']]])
+
+    def test_skip_subtrees(self):
+        """測試略過的子樹"""
+        reader = SExprReader(io.StringIO('(root (a (skip (x 1) (y)) 2) (b 3))'), skip={'skip'})
+        self.assertEqual(list(reader), [['a', '2'], ['b', '3']])
+
+
+class TestParseBoard(unittest.TestCase):
+    """PCB 解析測試"""
+
+    def setUp(self):
+        """設定測試"""
+        self.board = parse_board(io.StringIO(BOARD))
+
+    def test_layers_and_nets(self):
+        """測試層與網路"""
+        self.assertEqual(self.board.version, '20240108')
+        self.assertEqual(self.board.copper_layers, ['F.Cu', 'B.Cu'])
+        self.assertEqual(self.board.net_name(1), 'GND')
+
+    def test_footprints(self):
+        """測試封裝屬性"""
+        r1, tp1 = self.board.footprints
+        self.assertEqual((r1.reference, r1.value, r1.name), ('R1', '10k', 'R_0603_1608Metric'))
+        self.assertEqual(r1.properties['MPN'], 'RC0603FR-0710KL')
+        self.assertTrue(r1.in_bom)
+        self.assertEqual(tp1.value, 'TP "(x)"')
+        self.assertFalse(tp1.in_bom)
+
+    def test_pads(self):
+        """測試焊盤絕對座標（隨封裝旋轉）與層遮罩"""
+        pads = self.board.pads
+        self.assertEqual(len(pads), 3)
+        np.testing.assert_allclose(pads.x, [100, 100, 110])
+        np.testing.assert_allclose(pads.y, [50.775, 49.225, 60])
+        np.testing.assert_array_equal(pads.net, [1, 2, 1])
+        np.testing.assert_array_equal(pads.layer_mask, [0b01, 0b01, 0b11])
+        np.testing.assert_allclose(pads.drill, [0, 0, 0.8])
+
+    def test_tracks_and_vias(self):
+        """測試走線、弧線與過孔"""
+        tracks = self.board.tracks
+        self.assertEqual(len(tracks), 3)
+        np.testing.assert_allclose(tracks.width, [0.25, 0.1, 0.2])
+        np.testing.assert_array_equal(tracks.is_arc, [False, False, True])
+        self.assertEqual(self.board.layer_name(tracks.layer[1]), 'B.Cu')
+
+        vias = self.board.vias
+        self.assertEqual(len(vias), 1)
+        self.assertEqual(vias.layer_mask[0], 0b11)
+
+    def test_zones_and_outline(self):
+        """測試鋪銅外框（不含填充）與板框"""
+        zone, = self.board.zones
+        self.assertEqual((zone.net, zone.layers), (1, ('B.Cu',)))
+        self.assertEqual(zone.outline.shape, (4, 2))
+        self.assertEqual(self.board.bounds, (90, 40, 130, 70))
+
+    def test_chunk_boundaries(self):
+        """測試分塊大小不影響結果"""
+        small = parse_board(io.StringIO(BOARD), chunk_size=7)
+        np.testing.assert_allclose(small.pads.x, self.board.pads.x)
+        np.testing.assert_allclose(small.tracks.start, self.board.tracks.start)
+        self.assertEqual([fp.value for fp in small.footprints],
+                         [fp.value for fp in self.board.footprints])
+
+    def test_rejects_other_files(self):
+        """測試非 PCB 檔案"""
+        with self.assertRaises(ValueError):
+            parse_board(io.StringIO(SCHEMATIC))
+
+
+class TestLoadAndCache(unittest.TestCase):
+    """載入與快取測試"""
+
+    def setUp(self):
+        """設定測試"""
+        kicad_parser.clear_cache()
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.pcb = self.tmpdir / 'board.kicad_pcb'
+        self.pcb.write_text(BOARD, encoding='utf-8')
+        self.sch = self.tmpdir / 'board.kicad_sch'
+        self.sch.write_text(SCHEMATIC, encoding='utf-8')
+
+    def tearDown(self):
+        """清理"""
+        kicad_parser.clear_cache()
+        shutil.rmtree(self.tmpdir)
+
+    def test_cache_by_content(self):
+        """測試相同內容共用快取，內容改變時重新解析"""
+        board = load_board(self.pcb)
+        copy = self.tmpdir / 'copy.kicad_pcb'
+        copy.write_text(BOARD, encoding='utf-8')
+        self.assertIs(load_board(copy), board)
+
+        copy.write_text(BOARD.replace('(width 0.1)', '(width 0.3)'), encoding='utf-8')
+        changed = load_board(copy)
+        self.assertIsNot(changed, board)
+        self.assertAlmostEqual(changed.tracks.width[1], 0.3)
+
+    def test_disk_cache(self):
+        """測試磁碟快取"""
+        cache_dir = self.tmpdir / 'cache'
+        board = load_board(self.pcb, cache_dir=cache_dir)
+        self.assertEqual(len(list(cache_dir.glob('*.pkl'))), 1)
+
+        kicad_parser.clear_cache()
+        cached = load_board(self.pcb, cache_dir=cache_dir)
+        np.testing.assert_allclose(cached.pads.x, board.pads.x)
+
+    def test_load_boards_parallel(self):
+        """測試並行載入"""
+        paths = [self.pcb] * 3
+        boards = kicad_parser.load_boards(paths, workers=2)
+        self.assertEqual([len(b.footprints) for b in boards], [2, 2, 2])
+
+    def test_layer_digests(self):
+        """測試逐層內容雜湊只在該層內容變更時改變"""
+        layers = ['F.Cu', 'B.Cu', 'F.SilkS', 'Edge.Cuts', 'drill']
+        before = kicad_parser.layer_digests(self.pcb, layers)
+
+        self.pcb.write_text(BOARD.replace('(width 0.1)', '(width 0.3)'), encoding='utf-8')
+        after = kicad_parser.layer_digests(self.pcb, layers)
+        self.assertEqual([before[l] == after[l] for l in layers], [True, False, True, True, True])
+
+        # 過孔經過所有銅層並含鑽孔
+        self.pcb.write_text(BOARD.replace('(via (at 105 49.225)', '(via (at 105 49.3)'), encoding='utf-8')
+        after = kicad_parser.layer_digests(self.pcb, layers)
+        self.assertEqual([before[l] == after[l] for l in layers], [False, False, True, True, False])
+
+    def test_schematic(self):
+        """測試原理圖符號（多單元去重、略過電源符號與 lib_symbols）"""
+        schematic = load_schematic(self.sch)
+        references = [symbol.reference for symbol in schematic.symbols]
+        self.assertEqual(references, ['R1', 'U1', 'H1'])
+        self.assertFalse(schematic.symbols[2].in_bom)
+        self.assertEqual(schematic.symbols[0].footprint, 'Resistor_SMD:R_0603_1608Metric')
+
+
+class TestConsumers(unittest.TestCase):
+    """DRC 檢查器與 BOM 管理器不需要 pcbnew"""
+
+    @classmethod
+    def setUpClass(cls):
+        root = Path(__file__).parent.parent
+        sys.path.insert(0, str(root / 'batch-drc-checker' / 'src'))
+        sys.path.insert(0, str(root / 'bom-manager' / 'src'))
+
+    def setUp(self):
+        """設定測試"""
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.pcb = self.tmpdir / 'board.kicad_pcb'
+        self.pcb.write_text(BOARD, encoding='utf-8')
+
+    def tearDown(self):
+        """清理"""
+        shutil.rmtree(self.tmpdir)
+
+    def test_drc(self):
+        """測試 DRC 走線寬度檢查"""
+        from drc_checker import DRCChecker
+
+        checker = DRCChecker()
+        checker.load_board(str(self.pcb))
+        result = checker.run_drc()
+
+        widths = [e for e in result.errors if e.type == 'track_width']
+        self.assertEqual(len(widths), 1)
+        error = widths[0]
+        self.assertEqual((error.type, error.layer), ('track_width', 'B.Cu'))
+        self.assertAlmostEqual(error.actual, 0.1)
+
+    def test_bom(self):
+        """測試 BOM 提取（排除 exclude_from_bom）"""
+        from bom_manager import BOMManager
+
+        bom = BOMManager()
+        bom.extract_from_kicad(str(self.pcb))
+
+        self.assertEqual(bom.total_components, 1)
+        item = bom.items[0]
+        self.assertEqual((item.references, item.value, item.mpn), (['R1'], '10k', 'RC0603FR-0710KL'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,9 +4,15 @@
 測試供應商整合模組
 """
 
+import json
+import tempfile
+import threading
+import time
 import unittest
 import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs, urlparse
 
 # 添加 src 到路徑
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -16,10 +22,64 @@ from src.supplier_integration import (
     ComponentPrice,
     DigiKeyAPI,
     MouserAPI,
-    LCSCAPI
+    LCSCAPI,
+    HTTPSupplierAPI,
+    PriceCache,
+    RateLimiter
 )
 
 
+class StubSupplier:
+    """本機模擬供應商伺服器，記錄收到的請求"""
+
+    def __init__(self, price: float, delay: float = 0.0, fail: bool = False):
+        self.price = price
+        self.delay = delay
+        self.fail = fail
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                stub.requests.append((time.monotonic(), url.path, query.get('mpn')))
+                time.sleep(stub.delay)
+
+                if stub.fail:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                if url.path == '/search':
+                    body = {'results': [{
+                        'sku': f"SKU-{query['mpn']}", 'mpn': query['mpn'],
+                        'manufacturer': query.get('manufacturer', ''), 'description': '',
+                        'stock': 100, 'moq': 1, 'pricing': {'1': stub.price}, 'lead_time_days': 1
+                    }]}
+                else:
+                    body = {'stock': 42}
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def search_count(self):
+        return sum(1 for _, path, _ in self.requests if path == '/search')
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
 class TestComponentPrice(unittest.TestCase):
     """元件價格測試"""
 
@@ -140,5 +200,108 @@ class TestSupplierIntegration(unittest.TestCase):
         self.assertIn('currency', estimate)
 
 
+class TestConcurrentLookups(unittest.TestCase):
+    """並行查詢、請求合併與快取測試（本機模擬伺服器）"""
+
+    def setUp(self):
+        """啟動兩個模擬供應商"""
+        self.stubs = {'alpha': StubSupplier(0.50, delay=0.1), 'beta': StubSupplier(0.40, delay=0.1)}
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_path = str(Path(self.tmpdir.name) / 'prices.sqlite')
+
+    def tearDown(self):
+        for stub in self.stubs.values():
+            stub.close()
+        self.tmpdir.cleanup()
+
+    def _integration(self, **kwargs):
+        apis = {name: HTTPSupplierAPI(name, stub.url) for name, stub in self.stubs.items()}
+        return SupplierIntegration(apis=apis, **kwargs)
+
+    def test_concurrent_bom(self):
+        """測試 BOM 查詢並行發出，結果與順序不變"""
+        bom = [{'mpn': f"PART-{i}", 'quantity': 2} for i in range(10)]
+
+        start = time.monotonic()
+        with self._integration(max_workers=20) as integration:
+            estimate = integration.estimate_bom_cost(bom, quantity=5)
+        elapsed = time.monotonic() - start
+
+        # 串行需要 20 x 0.1 秒
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual([c['mpn'] for c in estimate['components']], [item['mpn'] for item in bom])
+        self.assertTrue(all(c['supplier'] == 'beta' for c in estimate['components']))
+        self.assertAlmostEqual(estimate['total_cost'], 10 * 0.40 * 10)
+
+    def test_coalescing(self):
+        """測試重複 MPN 只發出一次請求"""
+        bom = [{'mpn': 'DUP', 'quantity': 1}] * 5 + [{'mpn': 'OTHER', 'quantity': 1}]
+        with self._integration() as integration:
+            estimate = integration.estimate_bom_cost(bom)
+
+            threads = [threading.Thread(target=integration.search_component, args=('SAME',))
+                       for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(estimate['available_components'], 6)
+        for stub in self.stubs.values():
+            self.assertEqual(stub.search_count(), 3)
+
+    def test_persistent_cache(self):
+        """測試快取跨執行個體保存，過期後重新查詢"""
+        with self._integration(cache_path=self.cache_path) as integration:
+            first = integration.compare_prices('CACHED', quantity=10)
+        with self._integration(cache_path=self.cache_path) as integration:
+            second = integration.compare_prices('CACHED', quantity=10)
+
+        self.assertEqual(self.stubs['alpha'].search_count(), 1)
+        self.assertEqual([(s, p.sku, t) for s, p, t in first], [(s, p.sku, t) for s, p, t in second])
+        self.assertEqual(second[0][1].pricing, {1: 0.40})
+
+        with self._integration(cache_path=self.cache_path, cache_ttl=0) as integration:
+            integration.compare_prices('CACHED')
+        self.assertEqual(self.stubs['alpha'].search_count(), 2)
+
+    def test_failure_not_cached(self):
+        """測試供應商錯誤時回傳空結果且不寫入快取"""
+        self.stubs['alpha'].fail = True
+        with self._integration(cache_path=self.cache_path) as integration:
+            results = integration.search_component('ERR')
+        self.assertEqual(results['alpha'], [])
+        self.assertEqual(len(results['beta']), 1)
+        self.assertIsNone(PriceCache(self.cache_path).get('alpha', 'ERR'))
+        self.assertIsNotNone(PriceCache(self.cache_path).get('beta', 'ERR'))
+
+    def test_rate_limit(self):
+        """測試各供應商的速率限制"""
+        for stub in self.stubs.values():
+            stub.delay = 0.0
+        bom = [{'mpn': f"RL-{i}"} for i in range(6)]
+        with self._integration(rate_limits={'alpha': 10.0}) as integration:
+            integration.estimate_bom_cost(bom)
+
+        alpha = sorted(t for t, _, _ in self.stubs['alpha'].requests)
+        beta = sorted(t for t, _, _ in self.stubs['beta'].requests)
+        self.assertGreaterEqual(alpha[-1] - alpha[0], 0.45)
+        self.assertLess(beta[-1] - beta[0], 0.3)
+
+    def test_get_stock(self):
+        """測試庫存查詢"""
+        self.assertEqual(HTTPSupplierAPI('alpha', self.stubs['alpha'].url).get_stock('SKU-1'), 42)
+
+    def test_rate_limiter(self):
+        """測試令牌桶"""
+        with self.assertRaises(ValueError):
+            RateLimiter(0)
+        limiter = RateLimiter(20.0, burst=2)
+        start = time.monotonic()
+        for _ in range(4):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
 if __name__ == '__main__':
     unittest.main()
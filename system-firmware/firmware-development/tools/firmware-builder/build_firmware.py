@@ -18,11 +18,16 @@ import subprocess
 import hashlib
 import time
 import re
+import mmap
+import struct
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import shutil
-from dataclasses import dataclass, asdict
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import logging
 from collections import defaultdict
@@ -121,6 +126,9 @@ class BuildConfig:
     defines: Dict[str, str] = None
     include_paths: List[str] = None
     linker_script: Optional[str] = None
+    jobs: int = 0  # 並行編譯數（0 表示 CPU 核心數）
+    cache_dir: Optional[Path] = None  # 目標文件緩存目錄（None 表示 output_dir/.objcache）
+    use_object_cache: bool = True
 
     def __post_init__(self):
         if self.custom_flags is None:
@@ -148,6 +156,9 @@ class BuildResult:
     warnings: List[str]
     manifest_path: Optional[str] = None
     signature: Optional[str] = None
+    compile_times: Dict[str, float] = field(default_factory=dict)  # 源文件 -> 編譯秒數
+    compile_stats: Dict[str, int] = field(default_factory=dict)  # compiled / cached / up_to_date
+    size_diff: Dict[str, Dict] = field(default_factory=dict)  # 與上一次構建的大小差異
 
 
 # ============================================================================
@@ -249,21 +260,158 @@ class VersionManager:
 # 編譯器管理
 # ============================================================================
 
+def parse_depfile(dep_file: Path) -> List[Path]:
+    """解析編譯器生成的 .d 依賴文件（-MMD），返回第一條規則的所有依賴"""
+    text = dep_file.read_text(encoding='utf-8', errors='replace').replace('\\\n', ' ')
+    rule = text.split('\n', 1)[0]
+    separator = re.search(r':(?:\s|$)', rule)
+    if separator is None:
+        return []
+
+    deps = []
+    for token in re.findall(r'(?:\\.|[^\s\\])+', rule[separator.end():]):
+        deps.append(Path(re.sub(r'\\(.)', r'\1', token).replace('$$', '$')))
+    return deps
+
+
+class ObjectCache:
+    """
+    目標文件內容緩存（類似 ccache 的 direct mode）
+
+    第一層鍵由編譯器、編譯標誌和源文件內容計算；每個鍵的 manifest 記錄
+    上次編譯時包含的頭文件及其哈希，頭文件內容全部一致時直接取出目標文件。
+    鍵與輸出路徑無關，因此不同構建類型、不同輸出目錄可共用同一緩存。
+    """
+
+    MAX_MANIFEST_ENTRIES = 16
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self._hashes: Dict[Path, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def file_hash(self, path: Path) -> Optional[str]:
+        """文件內容的 SHA-256（以 mtime 和大小記憶），文件不存在時返回 None"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._hashes.get(path)
+        if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        with self._lock:
+            self._hashes[path] = (stat.st_mtime_ns, stat.st_size, digest.hexdigest())
+        return digest.hexdigest()
+
+    def _manifest_path(self, key: str) -> Path:
+        return self.cache_dir / "manifests" / key[:2] / f"{key}.json"
+
+    def _object_path(self, object_key: str) -> Path:
+        return self.cache_dir / "objects" / object_key[:2] / f"{object_key}.o"
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """查找頭文件內容全部一致的緩存項"""
+        try:
+            with open(self._manifest_path(key), 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        for entry in entries:
+            if all(self.file_hash(Path(header)) == digest for header, digest in entry['headers'].items()):
+                if self._object_path(entry['object']).exists():
+                    return entry
+        return None
+
+    def restore(self, entry: Dict, obj_path: Path, dep_file: Path) -> bool:
+        """從緩存複製目標文件與依賴文件（使用新的修改時間）"""
+        cached = self._object_path(entry['object'])
+        try:
+            shutil.copyfile(cached, obj_path)
+            shutil.copyfile(cached.with_suffix('.d'), dep_file)
+            return True
+        except OSError:
+            return False
+
+    def store(self, key: str, headers: List[Path], obj_path: Path, dep_file: Path,
+              warnings: List[str]) -> None:
+        """將編譯結果寫入緩存"""
+        digests = {str(header): self.file_hash(header) for header in headers}
+        if None in digests.values():
+            return
+
+        object_key = hashlib.sha256(
+            json.dumps([key, sorted(digests.items())]).encode()
+        ).hexdigest()
+        cached = self._object_path(object_key)
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        for src, dst in ((obj_path, cached), (dep_file, cached.with_suffix('.d'))):
+            tmp = dst.with_name(f"{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            shutil.copyfile(src, tmp)
+            os.replace(tmp, dst)
+
+        manifest_path = self._manifest_path(key)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            except (OSError, ValueError):
+                entries = []
+            entries = [e for e in entries if e['object'] != object_key]
+            entries.insert(0, {'headers': digests, 'object': object_key, 'warnings': warnings})
+            tmp = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(entries[:self.MAX_MANIFEST_ENTRIES], f)
+            os.replace(tmp, manifest_path)
+
+
+# 工具鏈檢查結果（編譯器 -> 版本字符串，None 表示不可用），同一進程內的構建共用
+_TOOLCHAIN_CHECKS: Dict[str, Optional[str]] = {}
+_TOOLCHAIN_LOCK = threading.Lock()
+
+
 class Compiler:
     """編譯器管理類"""
 
-    def __init__(self, config: BuildConfig, logger: logging.Logger):
+    def __init__(self, config: BuildConfig, logger: logging.Logger,
+                 job_slots: Optional[threading.Semaphore] = None):
         self.config = config
         self.logger = logger
         self.toolchain = TOOLCHAIN_CONFIG[config.platform]
+        self.job_slots = job_slots or nullcontext()  # 矩陣構建時所有子進程共用的任務名額
         self.errors = []
         self.warnings = []
+        self.compiler_version = ""
+        self.compile_times: Dict[str, float] = {}
+        self.compile_stats: Dict[str, int] = {}
+        self.object_cache: Optional[ObjectCache] = None
+        if config.use_object_cache:
+            self.object_cache = ObjectCache(config.cache_dir or config.output_dir / ".objcache")
 
     def check_toolchain(self) -> bool:
-        """檢查工具鏈是否可用"""
+        """檢查工具鏈是否可用（每個編譯器只檢查一次）"""
+        compiler = self.toolchain["compiler"]
+        with _TOOLCHAIN_LOCK:
+            if compiler not in _TOOLCHAIN_CHECKS:
+                _TOOLCHAIN_CHECKS[compiler] = self._probe_toolchain(compiler)
+            version = _TOOLCHAIN_CHECKS[compiler]
+
+        if version is None:
+            return False
+        self.compiler_version = version
+        return True
+
+    def _probe_toolchain(self, compiler: str) -> Optional[str]:
+        """執行編譯器 --version，返回版本字符串"""
         self.logger.info(f"檢查 {self.config.platform.value} 工具鏈...")
 
-        compiler = self.toolchain["compiler"]
         try:
             result = subprocess.run(
                 [compiler, '--version'],
@@ -274,17 +422,17 @@ class Compiler:
             if result.returncode == 0:
                 version = result.stdout.split('\n')[0]
                 self.logger.info(f"找到編譯器: {version}")
-                return True
+                return version
             else:
                 self.logger.error(f"編譯器 {compiler} 不可用")
-                return False
+                return None
         except FileNotFoundError:
             self.logger.error(f"找不到編譯器: {compiler}")
             self.logger.info("請確保工具鏈已正確安裝並在 PATH 中")
-            return False
+            return None
         except subprocess.TimeoutExpired:
             self.logger.error("編譯器檢查超時")
-            return False
+            return None
 
     def build_compile_flags(self) -> List[str]:
         """構建編譯標誌"""
@@ -328,58 +476,169 @@ class Compiler:
 
         return flags
 
+    def object_path(self, source_file: Path, output_dir: Path) -> Path:
+        """目標文件路徑：保留源文件相對目錄結構，避免不同目錄的同名文件衝突"""
+        try:
+            relative = source_file.resolve().relative_to(self.config.source_dir.resolve())
+        except ValueError:
+            digest = hashlib.sha256(str(source_file.resolve()).encode()).hexdigest()[:8]
+            relative = Path("_external") / f"{source_file.stem}-{digest}{source_file.suffix}"
+        return output_dir / relative.with_name(relative.name + ".o")
+
     def compile_sources(self, source_files: List[Path], output_dir: Path) -> List[Path]:
-        """編譯源文件"""
-        self.logger.info(f"編譯 {len(source_files)} 個源文件...")
+        """
+        編譯源文件
+
+        以 config.jobs 個並行任務編譯；依賴文件（.d）與命令記錄都未變更的目標文件
+        直接沿用，其餘先查目標文件緩存，未命中才調用編譯器。
+        """
+        jobs = self.config.jobs or os.cpu_count() or 1
+        self.logger.info(f"編譯 {len(source_files)} 個源文件（{jobs} 個並行任務）...")
 
         flags = self.build_compile_flags()
-        object_files = []
+        object_files = [self.object_path(source_file, output_dir) for source_file in source_files]
+        stop = threading.Event()
+        failed = False
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                executor.submit(self._compile_one, source_file, obj_path, flags, stop): source_file
+                for source_file, obj_path in zip(source_files, object_files)
+            }
+            for future in as_completed(futures):
+                source_file = futures[future]
+                status, seconds, warnings, error = future.result()
+                if status == 'skipped':
+                    continue
+
+                self.compile_times[self._display_name(source_file)] = seconds
+                self.compile_stats[status] = self.compile_stats.get(status, 0) + 1
+                self.warnings.extend(warnings)
+                self.logger.debug(f"{status}: {self._display_name(source_file)} ({seconds:.2f}s)")
+
+                if error:
+                    self.logger.error(error)
+                    self.errors.append(error)
+                    if not failed:
+                        failed = True
+                        stop.set()
+                        for pending in futures:
+                            pending.cancel()
+
+        if failed:
+            return []
+
+        stats = self.compile_stats
+        self.logger.info(
+            f"成功編譯 {len(object_files)} 個目標文件"
+            f"（編譯 {stats.get('compiled', 0)}、緩存命中 {stats.get('cached', 0)}、"
+            f"已是最新 {stats.get('up_to_date', 0)}）"
+        )
+        return object_files
+
+    def _display_name(self, source_file: Path) -> str:
+        """報告中使用的源文件名稱（相對源代碼目錄）"""
+        try:
+            return str(source_file.resolve().relative_to(self.config.source_dir.resolve()))
+        except ValueError:
+            return str(source_file)
 
-        for source_file in source_files:
-            obj_name = source_file.stem + ".o"
-            obj_path = output_dir / obj_name
+    def _compile_one(self, source_file: Path, obj_path: Path, flags: List[str],
+                     stop: threading.Event) -> Tuple[str, float, List[str], Optional[str]]:
+        """
+        編譯單個源文件（在工作線程中執行）
 
-            cmd = [
-                self.toolchain["compiler"],
-                *flags,
-                "-c",
-                str(source_file),
-                "-o",
-                str(obj_path)
-            ]
+        Returns:
+            (狀態, 耗時秒數, 警告, 錯誤信息)，狀態為 compiled / cached / up_to_date / skipped
+        """
+        if stop.is_set():
+            return 'skipped', 0.0, [], None
 
-            self.logger.debug(f"編譯: {source_file.name}")
+        start = time.time()
+        dep_file = obj_path.with_name(obj_path.name + ".d")
+        stamp_file = obj_path.with_name(obj_path.name + ".cmd")
+        obj_path.parent.mkdir(parents=True, exist_ok=True)
 
-            try:
+        cmd = [
+            self.toolchain["compiler"],
+            *flags,
+            "-MMD", "-MP", "-MF", str(dep_file),
+            "-c",
+            str(source_file),
+            "-o",
+            str(obj_path)
+        ]
+
+        # 目標文件比命令記錄和所有依賴都新：無需重新編譯
+        stamp = self._read_stamp(stamp_file)
+        if stamp is not None and stamp['command'] == cmd and self._up_to_date(obj_path, dep_file):
+            return 'up_to_date', time.time() - start, stamp['warnings'], None
+
+        # 查找目標文件緩存
+        key = None
+        if self.object_cache is not None:
+            source_hash = self.object_cache.file_hash(source_file)
+            key = hashlib.sha256(json.dumps([
+                self.toolchain["compiler"], self.compiler_version, flags,
+                str(source_file.resolve()), os.getcwd(), source_hash
+            ]).encode()).hexdigest()
+            entry = self.object_cache.lookup(key)
+            if entry is not None and self.object_cache.restore(entry, obj_path, dep_file):
+                self._write_stamp(stamp_file, cmd, entry['warnings'])
+                return 'cached', time.time() - start, entry['warnings'], None
+
+        try:
+            with self.job_slots:
                 result = subprocess.run(
                     cmd,
                     capture_output=True,
                     text=True,
                     timeout=60
                 )
+        except subprocess.TimeoutExpired:
+            return 'compiled', time.time() - start, [], f"編譯超時: {self._display_name(source_file)}"
 
-                # 收集警告
-                if result.stderr:
-                    warnings = [line for line in result.stderr.split('\n')
-                              if 'warning:' in line.lower()]
-                    self.warnings.extend(warnings)
+        # 收集警告
+        warnings = [line for line in result.stderr.split('\n')
+                    if 'warning:' in line.lower()] if result.stderr else []
 
-                if result.returncode != 0:
-                    error_msg = f"編譯失敗: {source_file.name}\n{result.stderr}"
-                    self.logger.error(error_msg)
-                    self.errors.append(error_msg)
-                    return []
+        if result.returncode != 0:
+            stamp_file.unlink(missing_ok=True)
+            return 'compiled', time.time() - start, warnings, f"編譯失敗: {self._display_name(source_file)}\n{result.stderr}"
 
-                object_files.append(obj_path)
+        self._write_stamp(stamp_file, cmd, warnings)
+        if key is not None and dep_file.exists():
+            headers = [dep for dep in parse_depfile(dep_file) if dep != source_file]
+            try:
+                self.object_cache.store(key, headers, obj_path, dep_file, warnings)
+            except OSError as e:
+                self.logger.warning(f"寫入目標文件緩存失敗: {e}")
 
-            except subprocess.TimeoutExpired:
-                error_msg = f"編譯超時: {source_file.name}"
-                self.logger.error(error_msg)
-                self.errors.append(error_msg)
-                return []
+        return 'compiled', time.time() - start, warnings, None
 
-        self.logger.info(f"成功編譯 {len(object_files)} 個目標文件")
-        return object_files
+    @staticmethod
+    def _up_to_date(obj_path: Path, dep_file: Path) -> bool:
+        """目標文件是否比 .d 中列出的所有依賴都新"""
+        try:
+            obj_mtime = obj_path.stat().st_mtime_ns
+            return all(dep.stat().st_mtime_ns <= obj_mtime for dep in parse_depfile(dep_file))
+        except OSError:
+            return False
+
+    @staticmethod
+    def _read_stamp(stamp_file: Path) -> Optional[Dict]:
+        """讀取上次編譯的命令記錄"""
+        try:
+            with open(stamp_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_stamp(stamp_file: Path, cmd: List[str], warnings: List[str]) -> None:
+        """保存編譯命令與警告（增量構建時重放警告）"""
+        with open(stamp_file, 'w', encoding='utf-8') as f:
+            json.dump({'command': cmd, 'warnings': warnings}, f)
 
     def link_executable(self, object_files: List[Path], output_elf: Path) -> bool:
         """鏈接可執行文件"""
@@ -405,12 +664,13 @@ class Compiler:
         ])
 
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            with self.job_slots:
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=60
+                )
 
             if result.returncode != 0:
                 error_msg = f"鏈接失敗:\n{result.stderr}"
@@ -487,63 +747,248 @@ class FormatConverter:
 # 大小分析
 # ============================================================================
 
+SHT_SYMTAB = 2
+SHT_NOBITS = 8
+SHF_WRITE = 0x1
+SHF_ALLOC = 0x2
+SHF_EXECINSTR = 0x4
+PT_LOAD = 1
+PF_W = 0x2
+STT_NOTYPE, STT_OBJECT, STT_FUNC, STT_SECTION, STT_FILE, STT_TLS = 0, 1, 2, 3, 4, 6
+STB_LOCAL, STB_GLOBAL, STB_WEAK = 0, 1, 2
+SHN_UNDEF = 0
+SHN_LORESERVE = 0xff00
+SHN_XINDEX = 0xffff
+
+
+@dataclass
+class ElfSection:
+    """ELF 節頭"""
+    index: int
+    name: str
+    type: int
+    flags: int
+    addr: int
+    offset: int
+    size: int
+    link: int
+    entsize: int
+
+    @property
+    def alloc(self) -> bool:
+        """是否佔用目標記憶體"""
+        return bool(self.flags & SHF_ALLOC)
+
+    @property
+    def category(self) -> Optional[str]:
+        """按節標誌分類為 text / rodata / data / bss，非 ALLOC 節（調試信息等）為 None"""
+        if not self.alloc:
+            return None
+        if self.type == SHT_NOBITS:
+            return 'bss'
+        if self.flags & SHF_EXECINSTR:
+            return 'text'
+        if self.flags & SHF_WRITE:
+            return 'data'
+        return 'rodata'
+
+
+@dataclass
+class ElfSegment:
+    """ELF 程序頭"""
+    type: int
+    flags: int
+    offset: int
+    vaddr: int
+    paddr: int
+    filesz: int
+    memsz: int
+
+
+@dataclass
+class ElfSymbol:
+    """ELF 符號"""
+    name: str
+    value: int
+    size: int
+    type: int
+    bind: int
+    shndx: int
+
+
+class ElfFile:
+    """
+    ELF32/ELF64 讀取器（mmap + struct，不依賴工具鏈）
+
+    打開時解析節頭和程序頭；符號表按需從映射中直接解包，不複製整個文件。
+    """
+
+    # 文件頭（e_ident 之後）、節頭、程序頭、符號
+    _LAYOUTS = {
+        32: ('HHIIIIIHHHHHH', 'IIIIIIIIII', 'IIIIIIII', 'IIIBBH'),
+        64: ('HHIQQQIHHHHHH', 'IIQQQQIIQQ', 'IIQQQQQQ', 'IBBHQQ'),
+    }
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):  # 空文件或無法映射的特殊文件
+                raise ValueError(f"不是 ELF 文件: {self.path}") from None
+        self._view = memoryview(self._map)
+        try:
+            self._parse()
+        except struct.error as e:
+            self.close()
+            raise ValueError(f"ELF 文件已損壞: {self.path}") from e
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        """釋放映射"""
+        self._view.release()
+        self._map.close()
+
+    def _parse(self) -> None:
+        ident = self._map[:16]
+        if len(ident) < 16 or ident[:4] != b'\x7fELF' or ident[4] not in (1, 2) or ident[5] not in (1, 2):
+            raise ValueError(f"不是 ELF 文件: {self.path}")
+
+        self.bits = 32 if ident[4] == 1 else 64
+        endian = '<' if ident[5] == 1 else '>'
+        header, shdr, phdr, sym = (struct.Struct(endian + fmt) for fmt in self._LAYOUTS[self.bits])
+        self._sym = sym
+
+        (self.file_type, self.machine, _, self.entry, phoff, shoff, _, _,
+         phentsize, phnum, shentsize, shnum, shstrndx) = header.unpack_from(self._map, 16)
+
+        # 節頭（節數或字符串表索引超出範圍時存放在第 0 個節頭中）
+        raw = []
+        if shoff:
+            first = shdr.unpack_from(self._map, shoff)
+            shnum = shnum or first[5]
+            if shstrndx == SHN_XINDEX:
+                shstrndx = first[6]
+            self._check_range(shoff, shnum * shentsize)
+            raw = [shdr.unpack_from(self._map, shoff + i * shentsize) for i in range(shnum)]
+
+        names = raw[shstrndx][4] if shstrndx < len(raw) else None
+        self.sections = [
+            ElfSection(i, self._string(names + name) if names is not None else '', sh_type, flags,
+                       addr, offset, size, link, entsize)
+            for i, (name, sh_type, flags, addr, offset, size, link, _, _, entsize) in enumerate(raw)
+        ]
+
+        # 程序頭
+        self.segments = []
+        if phoff:
+            self._check_range(phoff, phnum * phentsize)
+            for i in range(phnum):
+                fields = phdr.unpack_from(self._map, phoff + i * phentsize)
+                if self.bits == 32:
+                    p_type, offset, vaddr, paddr, filesz, memsz, flags, _ = fields
+                else:
+                    p_type, flags, offset, vaddr, paddr, filesz, memsz, _ = fields
+                self.segments.append(ElfSegment(p_type, flags, offset, vaddr, paddr, filesz, memsz))
+
+    def _check_range(self, offset: int, size: int) -> None:
+        if offset + size > len(self._map):
+            raise ValueError(f"ELF 文件已損壞: {self.path}")
+
+    def _string(self, offset: int) -> str:
+        end = self._map.find(b'\0', offset)
+        return self._map[offset:end if end >= 0 else len(self._map)].decode('utf-8', 'replace')
+
+    def section_of(self, symbol: ElfSymbol) -> Optional[ElfSection]:
+        """符號所在的節（未定義、絕對、COMMON 等特殊索引返回 None）"""
+        if SHN_UNDEF < symbol.shndx < min(SHN_LORESERVE, len(self.sections)):
+            return self.sections[symbol.shndx]
+        return None
+
+    def symbols(self) -> List[ElfSymbol]:
+        """.symtab 中的所有符號（按表中順序，局部符號在前）"""
+        symbols = []
+        for section in self.sections:
+            if section.type != SHT_SYMTAB or section.entsize != self._sym.size:
+                continue
+            self._check_range(section.offset, section.size)
+            strtab = self.sections[section.link].offset
+            count = section.size // self._sym.size
+            data = self._view[section.offset:section.offset + count * self._sym.size]
+            for fields in self._sym.iter_unpack(data):
+                if self.bits == 32:
+                    name, value, size, info, _, shndx = fields
+                else:
+                    name, info, _, shndx, value, size = fields
+                symbols.append(ElfSymbol(self._string(strtab + name) if name else '',
+                                         value, size, info & 0xf, info >> 4, shndx))
+            data.release()
+        return symbols
+
+
 class SizeAnalyzer:
-    """大小和記憶體分析器"""
+    """
+    大小和記憶體分析器
+
+    直接解析 ELF（ElfFile），不需要安裝交叉工具鏈的 size / nm。
+    """
+
+    SYMBOL_TYPES = (STT_NOTYPE, STT_OBJECT, STT_FUNC, STT_TLS)
+    OTHER = "(其他)"
 
     def __init__(self, toolchain: Dict, logger: logging.Logger):
         self.toolchain = toolchain
         self.logger = logger
 
     def analyze_elf(self, elf_file: Path) -> Dict[str, int]:
-        """分析 ELF 文件大小"""
-        self.logger.info("分析韌體大小...")
+        """
+        分析 ELF 文件大小
 
-        size_tool = self.toolchain["size"]
+        各 ALLOC 節按名稱列出；text / rodata / data / bss 按節標誌匯總
+        （例如 .isr_vector 計入 text），total 為 Flash 佔用，ram 為 data + bss。
+        """
+        self.logger.info("分析韌體大小...")
 
         try:
-            result = subprocess.run(
-                [size_tool, "-A", str(elf_file)],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode != 0:
-                self.logger.error("大小分析失敗")
-                return {}
-
-            # 解析輸出
-            size_info = {}
-            for line in result.stdout.split('\n'):
-                parts = line.split()
-                if len(parts) >= 2 and parts[0] in ['.text', '.data', '.bss', '.rodata']:
-                    try:
-                        size_info[parts[0]] = int(parts[1])
-                    except ValueError:
-                        pass
-
-            # 計算總大小
-            size_info['text'] = size_info.get('.text', 0)
-            size_info['data'] = size_info.get('.data', 0)
-            size_info['bss'] = size_info.get('.bss', 0)
-            size_info['rodata'] = size_info.get('.rodata', 0)
-            size_info['total'] = size_info['text'] + size_info['data'] + size_info['rodata']
-            size_info['ram'] = size_info['data'] + size_info['bss']
-
-            self.logger.info(f"  Flash: {size_info['total']:,} bytes")
-            self.logger.info(f"  RAM:   {size_info['ram']:,} bytes")
-
-            return size_info
-
-        except subprocess.TimeoutExpired:
-            self.logger.error("大小分析超時")
-            return {}
+            with ElfFile(elf_file) as elf:
+                size_info = self._section_sizes(elf)
         except Exception as e:
             self.logger.error(f"大小分析錯誤: {e}")
             return {}
 
+        self.logger.info(f"  Flash: {size_info['total']:,} bytes")
+        self.logger.info(f"  RAM:   {size_info['ram']:,} bytes")
+
+        return size_info
+
+    @staticmethod
+    def _section_sizes(elf: ElfFile) -> Dict[str, int]:
+        size_info = {'text': 0, 'rodata': 0, 'data': 0, 'bss': 0}
+        for section in elf.sections:
+            category = section.category
+            if category:
+                size_info[section.name] = size_info.get(section.name, 0) + section.size
+                size_info[category] += section.size
+
+        size_info['total'] = size_info['text'] + size_info['data'] + size_info['rodata']
+        size_info['ram'] = size_info['data'] + size_info['bss']
+        return size_info
+
     def analyze_memory_usage(self, elf_file: Path) -> Dict[str, Dict[str, int]]:
-        """分析詳細記憶體使用"""
+        """
+        分析詳細記憶體使用
+
+        total 取自 PT_LOAD 程序頭（Flash 為文件內大小，RAM 為可寫段的記憶體大小，含對齊填充），
+        其餘鍵為各節的佔用。
+        """
         self.logger.info("分析記憶體使用...")
 
         memory_usage = {
@@ -551,51 +996,177 @@ class SizeAnalyzer:
             "ram": {}
         }
 
-        nm_tool = self.toolchain["nm"]
-
         try:
-            result = subprocess.run(
-                [nm_tool, "--print-size", "--size-sort", str(elf_file)],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            if result.returncode != 0:
-                return memory_usage
-
-            # 統計符號大小
-            flash_total = 0
-            ram_total = 0
-
-            for line in result.stdout.split('\n'):
-                parts = line.split()
-                if len(parts) >= 4:
-                    try:
-                        size = int(parts[1], 16)
-                        symbol_type = parts[2]
-                        symbol_name = parts[3]
-
-                        # 根據符號類型分類
-                        if symbol_type in ['T', 't', 'R', 'r']:  # 代碼和只讀數據
-                            flash_total += size
-                        elif symbol_type in ['D', 'd', 'B', 'b']:  # 數據和 BSS
-                            ram_total += size
-                    except (ValueError, IndexError):
-                        pass
-
-            memory_usage["flash"]["total"] = flash_total
-            memory_usage["ram"]["total"] = ram_total
+            with ElfFile(elf_file) as elf:
+                for section in elf.sections:
+                    category = section.category
+                    if category in ('text', 'rodata', 'data') and section.size:
+                        memory_usage["flash"][section.name] = section.size
+                    if category in ('data', 'bss') and section.size:
+                        memory_usage["ram"][section.name] = section.size
+
+                load = [segment for segment in elf.segments if segment.type == PT_LOAD]
+                if load:
+                    memory_usage["flash"]["total"] = sum(segment.filesz for segment in load)
+                    memory_usage["ram"]["total"] = sum(segment.memsz for segment in load if segment.flags & PF_W)
+                else:
+                    memory_usage["flash"]["total"] = sum(memory_usage["flash"].values())
+                    memory_usage["ram"]["total"] = sum(memory_usage["ram"].values())
 
             return memory_usage
 
-        except subprocess.TimeoutExpired:
-            self.logger.error("記憶體分析超時")
-            return memory_usage
         except Exception as e:
             self.logger.error(f"記憶體分析錯誤: {e}")
             return memory_usage
 
+    def size_report(self, elf_file: Path, object_files: Optional[List[Path]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        符號級與目標文件級的大小報告
+
+        Args:
+            elf_file: 鏈接後的 ELF 文件
+            object_files: 參與鏈接的目標文件（提供時按目標文件歸屬大小）
+
+        Returns:
+            {"size_info": ..., "symbols": {符號: 大小}, "objects": {目標文件: 大小}}，
+            局部符號寫作 "名稱 (目標文件)"，無法歸屬時為 "名稱 (源文件)"；
+            未提供 object_files 時不含 objects
+        """
+        with ElfFile(elf_file) as elf:
+            size_info = self._section_sizes(elf)
+            symbols = self._sized_symbols(elf)
+        owners = self._symbol_owners(symbols, object_files) if object_files else [None] * len(symbols)
+
+        symbol_sizes: Dict[str, int] = defaultdict(int)
+        object_sizes: Dict[str, int] = defaultdict(int)
+        for (symbol, source, _), owner in zip(symbols, owners):
+            if source:
+                symbol_sizes[f"{symbol.name} ({owner or source})"] += symbol.size
+            else:
+                symbol_sizes[symbol.name] += symbol.size
+            object_sizes[owner or self.OTHER] += symbol.size
+
+        def by_size(sizes):
+            return dict(sorted(sizes.items(), key=lambda item: (-item[1], item[0])))
+
+        report = {"size_info": size_info, "symbols": by_size(symbol_sizes)}
+        if object_files:
+            report["objects"] = by_size(object_sizes)
+        return report
+
+    @classmethod
+    def _sized_symbols(cls, elf: ElfFile) -> List[Tuple[ElfSymbol, Optional[str], int]]:
+        """
+        佔用 ALLOC 節的符號，附帶 STT_FILE 源文件名和分組序號（只對局部符號有效，全局符號為 None / -1）
+
+        同一地址的別名只計算一次。
+        """
+        result = []
+        seen = set()
+        source, group = None, -1
+        for symbol in elf.symbols():
+            if symbol.type == STT_FILE:
+                source, group = symbol.name, group + 1
+                continue
+            section = elf.section_of(symbol)
+            if not symbol.size or section is None or not section.alloc or symbol.type not in cls.SYMBOL_TYPES:
+                continue
+            if (symbol.shndx, symbol.value) in seen:
+                continue
+            seen.add((symbol.shndx, symbol.value))
+            local = symbol.bind == STB_LOCAL
+            result.append((symbol, source if local else None, group if local else -1))
+        return result
+
+    @classmethod
+    def _symbol_owners(cls, symbols: List[Tuple[ElfSymbol, Optional[str], int]],
+                       object_files: List[Path]) -> List[Optional[str]]:
+        """
+        每個符號所屬的目標文件（相對於目標文件的公共目錄），無法歸屬時為 None
+
+        全局符號按各目標文件中的定義查找（強定義優先於弱定義）；局部符號按最終 ELF 中的
+        STT_FILE 分組，與源文件名相同的目標文件配對。同名源文件（如 a/util.c 與 b/util.c）
+        按鏈接順序逐一配對，優先選擇局部符號名重疊最多者。
+        libc、libgcc、啟動代碼等不在 object_files 中的符號返回 None。
+        """
+        root = Path(os.path.commonpath([str(path.parent) for path in object_files]))
+        definitions: Dict[str, str] = {}
+        by_source: Dict[str, List[Tuple[str, set]]] = defaultdict(list)
+
+        for path in object_files:
+            name = path.relative_to(root).as_posix()
+            source, local_names = path.name, set()
+            with ElfFile(path) as obj:
+                for symbol in obj.symbols():
+                    if symbol.type == STT_FILE:
+                        source = symbol.name
+                    elif symbol.shndx == SHN_UNDEF or not symbol.name or symbol.type not in cls.SYMBOL_TYPES:
+                        continue
+                    elif symbol.bind == STB_LOCAL:
+                        local_names.add(symbol.name)
+                    elif symbol.bind == STB_GLOBAL or symbol.name not in definitions:
+                        definitions[symbol.name] = name
+            by_source[source].append((name, local_names))
+
+        group_names: Dict[int, set] = defaultdict(set)
+        group_source: Dict[int, str] = {}
+        for symbol, source, group in symbols:
+            if group >= 0:
+                group_names[group].add(symbol.name)
+                group_source[group] = source
+
+        group_owner: Dict[int, str] = {}
+        for group in sorted(group_names):
+            candidates = by_source.get(group_source[group])
+            if candidates:
+                best = max(range(len(candidates)), key=lambda i: (len(candidates[i][1] & group_names[group]), -i))
+                group_owner[group] = candidates.pop(best)[0]
+
+        return [group_owner.get(group) if group >= 0 else definitions.get(symbol.name)
+                for symbol, _, group in symbols]
+
+    def load_report(self, path: Path) -> Dict[str, Dict[str, int]]:
+        """讀取大小報告：*_size.json 直接加載，其他文件按 ELF 分析"""
+        if path.suffix == '.json':
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return self.size_report(path)
+
+    @staticmethod
+    def diff_reports(old: Dict[str, Dict[str, int]], new: Dict[str, Dict[str, int]]) -> Dict[str, Dict]:
+        """
+        比較兩份大小報告
+
+        Returns:
+            {"size_info" / "symbols" / "objects": {名稱: {"old", "new", "delta"}}}，
+            只包含有變化的項目，按變化量絕對值降序；兩份報告都有的類別才比較
+        """
+        diff = {}
+        for category in ('size_info', 'symbols', 'objects'):
+            if category not in old or category not in new:
+                continue
+            before, after = old[category], new[category]
+            changes = {}
+            for name in before.keys() | after.keys():
+                delta = after.get(name, 0) - before.get(name, 0)
+                if delta:
+                    changes[name] = {"old": before.get(name, 0), "new": after.get(name, 0), "delta": delta}
+            diff[category] = dict(sorted(changes.items(), key=lambda item: (-abs(item[1]["delta"]), item[0])))
+        return diff
+
+    @staticmethod
+    def format_diff(diff: Dict[str, Dict], limit: int = 10) -> List[str]:
+        """大小差異的文字摘要（每個類別最多 limit 項）"""
+        titles = {'size_info': '段', 'symbols': '符號', 'objects': '目標文件'}
+        lines = []
+        for category, changes in diff.items():
+            if not changes:
+                continue
+            lines.append(f"{titles[category]}（{len(changes)} 項變化）:")
+            for name, change in list(changes.items())[:limit]:
+                lines.append(f"  {change['delta']:+9,}  {change['old']:>9,} -> {change['new']:<9,} {name}")
+        return lines or ["大小無變化"]
+
 
 # ============================================================================
 # 簽名和加密
@@ -812,7 +1383,10 @@ class ReportGenerator:
                 "signature": result.signature,
                 "success": result.success,
                 "error_count": len(result.errors),
-                "warning_count": len(result.warnings)
+                "warning_count": len(result.warnings),
+                "compile_stats": result.compile_stats,
+                "compile_times": result.compile_times,
+                "size_diff": result.size_diff
             }
 
             with open(output_path, 'w', encoding='utf-8') as f:
@@ -1050,6 +1624,32 @@ class ReportGenerator:
     </div>
 """
 
+            # 添加編譯耗時（最慢的 10 個文件）
+            if result.compile_times:
+                stats = result.compile_stats
+                html_content += f"""
+    <div class="section">
+        <h2>編譯耗時</h2>
+        <p>編譯 {stats.get('compiled', 0)}、緩存命中 {stats.get('cached', 0)}、已是最新 {stats.get('up_to_date', 0)}</p>
+        <table>
+            <tr>
+                <th>源文件</th>
+                <th>耗時 (秒)</th>
+            </tr>
+"""
+                slowest = sorted(result.compile_times.items(), key=lambda item: item[1], reverse=True)
+                for source, seconds in slowest[:10]:
+                    html_content += f"""
+            <tr>
+                <td>{source}</td>
+                <td>{seconds:.2f}</td>
+            </tr>
+"""
+                html_content += """
+        </table>
+    </div>
+"""
+
             # 添加警告
             if result.warnings:
                 html_content += """
@@ -1101,18 +1701,117 @@ class ReportGenerator:
             self.logger.error(f"生成 HTML 報告失敗: {e}")
             return False
 
+    def generate_matrix_report(self, results: List[BuildResult], output_dir: Path) -> bool:
+        """生成矩陣構建的匯總報告（matrix_report.json 與 matrix_report.html）"""
+        self.logger.info("生成矩陣構建匯總報告...")
+
+        try:
+            targets = []
+            for result in results:
+                targets.append({
+                    "target": f"{result.platform}-{result.build_type}",
+                    "success": result.success,
+                    "build_id": result.build_id,
+                    "duration_seconds": result.duration_seconds,
+                    "flash_bytes": result.size_info.get('total', 0),
+                    "ram_bytes": result.size_info.get('ram', 0),
+                    "error_count": len(result.errors),
+                    "warning_count": len(result.warnings),
+                    "compile_stats": result.compile_stats,
+                    "output_files": result.output_files,
+                    "manifest_path": result.manifest_path,
+                    "errors": result.errors
+                })
+
+            summary = {
+                "timestamp": datetime.now().isoformat(),
+                "total": len(results),
+                "succeeded": sum(1 for result in results if result.success),
+                "failed": sum(1 for result in results if not result.success),
+                "targets": targets
+            }
+
+            with open(output_dir / "matrix_report.json", 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False)
+
+            rows = ""
+            for target in targets:
+                stats = target["compile_stats"]
+                status = "success" if target["success"] else "failed"
+                rows += f"""        <tr>
+            <td>{target['target']}</td>
+            <td><span class="status {status}">{'成功' if target['success'] else '失敗'}</span></td>
+            <td>{target['duration_seconds']:.2f} 秒</td>
+            <td>{target['flash_bytes']:,}</td>
+            <td>{target['ram_bytes']:,}</td>
+            <td>{stats.get('compiled', 0)} / {stats.get('cached', 0)} / {stats.get('up_to_date', 0)}</td>
+            <td>{target['warning_count']}</td>
+            <td>{target['error_count']}</td>
+        </tr>
+"""
+
+            html_content = f"""
+<!DOCTYPE html>
+<html lang="zh-TW">
+<head>
+    <meta charset="UTF-8">
+    <title>矩陣構建報告</title>
+    <style>
+        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; max-width: 1200px; margin: 0 auto; padding: 20px; }}
+        table {{ width: 100%; border-collapse: collapse; }}
+        th, td {{ padding: 10px; text-align: left; border-bottom: 1px solid #ddd; }}
+        th {{ background-color: #667eea; color: white; }}
+        .status {{ padding: 3px 10px; border-radius: 10px; color: white; }}
+        .status.success {{ background-color: #4caf50; }}
+        .status.failed {{ background-color: #f44336; }}
+    </style>
+</head>
+<body>
+    <h1>矩陣構建報告</h1>
+    <p>{summary['timestamp']} — 共 {summary['total']} 個目標，成功 {summary['succeeded']} 個，失敗 {summary['failed']} 個</p>
+    <table>
+        <tr>
+            <th>目標</th><th>狀態</th><th>持續時間</th><th>Flash (bytes)</th><th>RAM (bytes)</th>
+            <th>編譯 / 緩存命中 / 已是最新</th><th>警告</th><th>錯誤</th>
+        </tr>
+{rows}    </table>
+</body>
+</html>
+"""
+            with open(output_dir / "matrix_report.html", 'w', encoding='utf-8') as f:
+                f.write(html_content)
+
+            self.logger.info(f"矩陣構建報告已保存: {output_dir / 'matrix_report.html'}")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"生成矩陣構建報告失敗: {e}")
+            return False
+
 
 # ============================================================================
 # 主構建器
 # ============================================================================
 
+@dataclass
+class LinkedBuild:
+    """編譯與鏈接完成、等待後處理的構建"""
+    build_id: str
+    start_time: float
+    elf_file: Path
+    output_name: str
+    object_files: List[Path] = field(default_factory=list)
+
+
 class FirmwareBuilder:
     """主韌體構建器"""
 
-    def __init__(self, config: BuildConfig, logger: logging.Logger):
+    def __init__(self, config: BuildConfig, logger: logging.Logger,
+                 job_slots: Optional[threading.Semaphore] = None):
         self.config = config
         self.logger = logger
-        self.compiler = Compiler(config, logger)
+        self.job_slots = job_slots or nullcontext()
+        self.compiler = Compiler(config, logger, job_slots)
         self.format_converter = FormatConverter(TOOLCHAIN_CONFIG[config.platform], logger)
         self.size_analyzer = SizeAnalyzer(TOOLCHAIN_CONFIG[config.platform], logger)
         self.security_handler = SecurityHandler(logger)
@@ -1120,8 +1819,8 @@ class FirmwareBuilder:
         self.version_manager = VersionManager()
 
     def prepare_build_directory(self) -> Path:
-        """準備構建目錄"""
-        build_dir = self.config.output_dir / "build"
+        """準備構建目錄（每個平台與構建類型各自一個，增量構建互不干擾）"""
+        build_dir = self.config.output_dir / "build" / f"{self.config.platform.value}-{self.config.build_type.value}"
         build_dir.mkdir(parents=True, exist_ok=True)
         return build_dir
 
@@ -1136,8 +1835,45 @@ class FirmwareBuilder:
         self.logger.info(f"找到 {len(source_files)} 個源文件")
         return source_files
 
-    def build(self) -> BuildResult:
-        """執行完整構建流程"""
+    def build(self, source_files: Optional[List[Path]] = None) -> BuildResult:
+        """
+        執行完整構建流程
+
+        Args:
+            source_files: 已找到的源文件（None 表示在 source_dir 中查找）
+        """
+        stage = self.compile_stage(source_files)
+        if isinstance(stage, BuildResult):
+            return stage
+        return self.post_stage(stage)
+
+    def _failure(self, build_id: str, start_time: float, errors: List[str],
+                 warnings: Optional[List[str]] = None) -> BuildResult:
+        """構建失敗的結果"""
+        return BuildResult(
+            success=False,
+            build_id=build_id,
+            version=self.config.version,
+            platform=self.config.platform.value,
+            build_type=self.config.build_type.value,
+            timestamp=datetime.now().isoformat(),
+            duration_seconds=time.time() - start_time,
+            output_files={},
+            size_info={},
+            memory_usage={},
+            errors=errors,
+            warnings=warnings or [],
+            compile_times=self.compiler.compile_times,
+            compile_stats=self.compiler.compile_stats
+        )
+
+    def compile_stage(self, source_files: Optional[List[Path]] = None):
+        """
+        構建第一階段：檢查工具鏈、編譯、鏈接
+
+        Returns:
+            成功時為 LinkedBuild，失敗時為 BuildResult
+        """
         start_time = time.time()
         build_id = self.version_manager.generate_build_id()
 
@@ -1150,91 +1886,59 @@ class FirmwareBuilder:
 
         # 檢查工具鏈
         if not self.compiler.check_toolchain():
-            return BuildResult(
-                success=False,
-                build_id=build_id,
-                version=self.config.version,
-                platform=self.config.platform.value,
-                build_type=self.config.build_type.value,
-                timestamp=datetime.now().isoformat(),
-                duration_seconds=time.time() - start_time,
-                output_files={},
-                size_info={},
-                memory_usage={},
-                errors=["工具鏈檢查失敗"],
-                warnings=[]
-            )
+            return self._failure(build_id, start_time, ["工具鏈檢查失敗"])
 
         # 準備構建目錄
         build_dir = self.prepare_build_directory()
 
         # 查找源文件
-        source_files = self.find_source_files()
+        if source_files is None:
+            source_files = self.find_source_files()
         if not source_files:
-            return BuildResult(
-                success=False,
-                build_id=build_id,
-                version=self.config.version,
-                platform=self.config.platform.value,
-                build_type=self.config.build_type.value,
-                timestamp=datetime.now().isoformat(),
-                duration_seconds=time.time() - start_time,
-                output_files={},
-                size_info={},
-                memory_usage={},
-                errors=["未找到源文件"],
-                warnings=[]
-            )
+            return self._failure(build_id, start_time, ["未找到源文件"])
 
         # 編譯源文件
         object_files = self.compiler.compile_sources(source_files, build_dir)
         if not object_files:
-            return BuildResult(
-                success=False,
-                build_id=build_id,
-                version=self.config.version,
-                platform=self.config.platform.value,
-                build_type=self.config.build_type.value,
-                timestamp=datetime.now().isoformat(),
-                duration_seconds=time.time() - start_time,
-                output_files={},
-                size_info={},
-                memory_usage={},
-                errors=self.compiler.errors,
-                warnings=self.compiler.warnings
-            )
+            return self._failure(build_id, start_time, self.compiler.errors, self.compiler.warnings)
 
         # 鏈接可執行文件
         output_name = f"{self.config.project_name}_v{self.config.version}_{build_id}"
         elf_file = self.config.output_dir / f"{output_name}.elf"
 
         if not self.compiler.link_executable(object_files, elf_file):
-            return BuildResult(
-                success=False,
-                build_id=build_id,
-                version=self.config.version,
-                platform=self.config.platform.value,
-                build_type=self.config.build_type.value,
-                timestamp=datetime.now().isoformat(),
-                duration_seconds=time.time() - start_time,
-                output_files={},
-                size_info={},
-                memory_usage={},
-                errors=self.compiler.errors,
-                warnings=self.compiler.warnings
-            )
+            return self._failure(build_id, start_time, self.compiler.errors, self.compiler.warnings)
+
+        return LinkedBuild(build_id, start_time, elf_file, output_name, object_files)
 
-        # 轉換輸出格式
-        output_files = {"elf": str(elf_file)}
-        for fmt in self.config.formats:
-            if fmt != OutputFormat.ELF:
-                converted_file = self.format_converter.convert_to_format(elf_file, fmt)
+    def post_stage(self, linked: LinkedBuild) -> BuildResult:
+        """
+        構建第二階段：格式轉換、大小分析、簽名、加密與 manifest
+
+        各輸出格式的轉換（objcopy 子進程）同時執行，大小分析在本進程內解析 ELF 與之並行。
+        """
+        elf_file = linked.elf_file
+
+        def limited(func, *args):
+            with self.job_slots:
+                return func(*args)
+
+        # 轉換輸出格式、分析大小
+        formats = [fmt for fmt in self.config.formats if fmt != OutputFormat.ELF]
+        with ThreadPoolExecutor(max_workers=max(len(formats), 1)) as executor:
+            conversions = [(fmt, executor.submit(limited, self.format_converter.convert_to_format, elf_file, fmt))
+                           for fmt in formats]
+            size_info = self.size_analyzer.analyze_elf(elf_file)
+            memory_usage = self.size_analyzer.analyze_memory_usage(elf_file)
+            size_report, size_diff = self.compare_size(linked)
+
+            output_files = {"elf": str(elf_file)}
+            for fmt, future in conversions:
+                converted_file = future.result()
                 if converted_file:
                     output_files[fmt.value[1:]] = str(converted_file)
-
-        # 分析大小
-        size_info = self.size_analyzer.analyze_elf(elf_file)
-        memory_usage = self.size_analyzer.analyze_memory_usage(elf_file)
+            if size_report:
+                output_files["size"] = str(size_report)
 
         # 簽名（如果啟用）
         signature = None
@@ -1244,15 +1948,15 @@ class FirmwareBuilder:
         # 加密（如果啟用）
         if self.config.enable_encryption:
             # 使用構建 ID 作為加密密鑰（實際應用中應使用更安全的密鑰管理）
-            self.security_handler.encrypt_firmware(elf_file, build_id)
+            self.security_handler.encrypt_firmware(elf_file, linked.build_id)
 
         # 計算持續時間
-        duration = time.time() - start_time
+        duration = time.time() - linked.start_time
 
         # 創建構建結果
         result = BuildResult(
             success=True,
-            build_id=build_id,
+            build_id=linked.build_id,
             version=self.config.version,
             platform=self.config.platform.value,
             build_type=self.config.build_type.value,
@@ -1263,11 +1967,14 @@ class FirmwareBuilder:
             memory_usage=memory_usage,
             errors=self.compiler.errors,
             warnings=self.compiler.warnings,
-            signature=signature
+            signature=signature,
+            compile_times=self.compiler.compile_times,
+            compile_stats=self.compiler.compile_stats,
+            size_diff=size_diff
         )
 
         # 生成 manifest
-        manifest_path = self.config.output_dir / f"{output_name}_manifest.json"
+        manifest_path = self.config.output_dir / f"{linked.output_name}_manifest.json"
         if self.report_generator.generate_manifest(result, manifest_path):
             result.manifest_path = str(manifest_path)
 
@@ -1280,6 +1987,162 @@ class FirmwareBuilder:
         return result
 
 
+    def compare_size(self, linked: LinkedBuild) -> Tuple[Optional[Path], Dict[str, Dict]]:
+        """
+        保存本次構建的符號 / 目標文件大小報告，並與輸出目錄中上一次構建的報告比較
+
+        Returns:
+            (大小報告路徑, 與上一次構建的差異)；沒有上一次構建時差異為空
+        """
+        previous = sorted(self.config.output_dir.glob(f"{self.config.project_name}_v*_size.json"),
+                          key=lambda path: path.stat().st_mtime)
+        try:
+            report = self.size_analyzer.size_report(linked.elf_file, linked.object_files)
+        except Exception as e:
+            self.logger.warning(f"生成大小報告失敗: {e}")
+            return None, {}
+
+        report_path = self.config.output_dir / f"{linked.output_name}_size.json"
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        if not previous:
+            return report_path, {}
+        try:
+            diff = SizeAnalyzer.diff_reports(self.size_analyzer.load_report(previous[-1]), report)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"讀取上一次的大小報告失敗: {e}")
+            return report_path, {}
+
+        self.logger.info(f"與上一次構建 ({previous[-1].name}) 的大小差異:")
+        for line in SizeAnalyzer.format_diff(diff, limit=5):
+            self.logger.info(f"  {line}")
+        return report_path, diff
+
+
+class _TargetLogger(logging.LoggerAdapter):
+    """在日誌前加上構建目標名稱"""
+
+    def process(self, msg, kwargs):
+        return f"[{self.extra['target']}] {msg}", kwargs
+
+
+class MatrixBuilder:
+    """
+    多目標矩陣構建器
+
+    同時構建多個配置，所有編譯、鏈接與後處理子進程共用同一個任務名額上限；
+    源文件搜尋、工具鏈檢查與目標文件緩存在配置之間共用。
+    鏈接完成的目標立即交給後處理階段（格式轉換、大小分析），不阻塞其他目標的編譯。
+    """
+
+    def __init__(self, configs: List[BuildConfig], logger: logging.Logger, jobs: int = 0):
+        """
+        Args:
+            configs: 構建配置列表
+            logger: 日誌記錄器
+            jobs: 全局並行任務數（0 表示 CPU 核心數）
+        """
+        self.configs = self.merge_formats(configs)
+        self.logger = logger
+        self.jobs = jobs or os.cpu_count() or 1
+
+    @staticmethod
+    def expand(base: BuildConfig, platforms: List[Platform],
+               build_types: List[BuildType]) -> List[BuildConfig]:
+        """
+        展開 平台 × 構建類型 矩陣
+
+        每個目標輸出到 base.output_dir/<平台>-<構建類型>，目標文件緩存共用 base 的緩存目錄。
+        """
+        configs = []
+        for platform in platforms:
+            for build_type in build_types:
+                config = BuildConfig(**{**base.__dict__, 'platform': platform, 'build_type': build_type})
+                config.output_dir = base.output_dir / f"{platform.value}-{build_type.value}"
+                config.cache_dir = base.cache_dir or base.output_dir / ".objcache"
+                configs.append(config)
+        return configs
+
+    @staticmethod
+    def merge_formats(configs: List[BuildConfig]) -> List[BuildConfig]:
+        """只有輸出格式不同的配置合併為一次構建（編譯和鏈接結果相同）"""
+        merged: Dict[str, BuildConfig] = {}
+        for config in configs:
+            key = repr({k: v for k, v in config.__dict__.items() if k != 'formats'})
+            if key in merged:
+                formats = merged[key].formats
+                formats.extend(fmt for fmt in config.formats if fmt not in formats)
+            else:
+                merged[key] = BuildConfig(**{**config.__dict__, 'formats': list(config.formats)})
+        return list(merged.values())
+
+    @staticmethod
+    def target_name(config: BuildConfig) -> str:
+        """構建目標名稱"""
+        return f"{config.platform.value}-{config.build_type.value}"
+
+    def build(self) -> List[BuildResult]:
+        """
+        構建所有目標
+
+        Returns:
+            與 self.configs 順序相同的構建結果
+        """
+        slots = threading.BoundedSemaphore(self.jobs)
+        builders = [
+            FirmwareBuilder(config, _TargetLogger(self.logger, {'target': self.target_name(config)}), slots)
+            for config in self.configs
+        ]
+
+        # 共用目標文件緩存（文件哈希只計算一次）
+        caches: Dict[Path, ObjectCache] = {}
+        for builder in builders:
+            cache = builder.compiler.object_cache
+            if cache is not None:
+                builder.compiler.object_cache = caches.setdefault(cache.cache_dir.resolve(), cache)
+
+        # 共用源文件搜尋
+        sources: Dict[Path, List[Path]] = {}
+        for builder in builders:
+            source_dir = builder.config.source_dir.resolve()
+            if source_dir not in sources:
+                sources[source_dir] = builder.find_source_files()
+
+        self.logger.info(f"矩陣構建: {len(builders)} 個目標，{self.jobs} 個並行任務")
+        results: List[Optional[BuildResult]] = [None] * len(builders)
+        workers = max(len(builders), 1)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='compile') as compile_pool, \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix='post') as post_pool:
+            compiling = {
+                compile_pool.submit(builder.compile_stage, sources[builder.config.source_dir.resolve()]): i
+                for i, builder in enumerate(builders)
+            }
+            post = {}
+            for future in as_completed(compiling):
+                i = compiling[future]
+                try:
+                    stage = future.result()
+                except Exception as e:
+                    self.logger.error(f"[{self.target_name(self.configs[i])}] 構建失敗: {e}", exc_info=True)
+                    stage = builders[i]._failure("", time.time(), [str(e)])
+                if isinstance(stage, BuildResult):
+                    results[i] = stage
+                else:
+                    post[post_pool.submit(builders[i].post_stage, stage)] = i
+
+            for future in as_completed(post):
+                i = post[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    self.logger.error(f"[{self.target_name(self.configs[i])}] 後處理失敗: {e}", exc_info=True)
+                    results[i] = builders[i]._failure("", time.time(), [str(e)])
+
+        return results
+
+
 # ============================================================================
 # 配置加載
 # ============================================================================
@@ -1316,6 +2179,7 @@ class ConfigLoader:
 
         source_dir = Path(args.source_dir or config_dict.get('source_dir', '.'))
         output_dir = Path(args.output_dir or config_dict.get('output_dir', './output'))
+        cache_dir = args.cache_dir or config_dict.get('cache_dir')
 
         # 輸出格式
         formats = []
@@ -1342,9 +2206,21 @@ class ConfigLoader:
             custom_flags=config_dict.get('custom_flags', []),
             defines=config_dict.get('defines', {}),
             include_paths=config_dict.get('include_paths', []),
-            linker_script=config_dict.get('linker_script')
+            linker_script=config_dict.get('linker_script'),
+            jobs=args.jobs if args.jobs is not None else config_dict.get('jobs', 0),
+            cache_dir=Path(cache_dir) if cache_dir else None,
+            use_object_cache=not args.no_cache and config_dict.get('use_object_cache', True)
         )
 
+    @staticmethod
+    def matrix_targets(config_dict: Dict, args: argparse.Namespace,
+                       base: BuildConfig) -> Tuple[List[Platform], List[BuildType]]:
+        """從配置文件的 matrix 段或命令行參數獲取矩陣的平台與構建類型"""
+        matrix = config_dict.get('matrix') or {}
+        platforms = args.platforms or matrix.get('platforms') or [base.platform.value]
+        build_types = args.build_types or matrix.get('build_types') or [base.build_type.value]
+        return [Platform(p) for p in platforms], [BuildType(b) for b in build_types]
+
 
 # ============================================================================
 # 命令行接口
@@ -1369,6 +2245,9 @@ def create_argument_parser() -> argparse.ArgumentParser:
   # CI/CD 模式
   %(prog)s --config config.yaml --ci --output-dir ./artifacts
 
+  # 矩陣構建（所有平台的 debug 與 release，共用 8 個並行任務）
+  %(prog)s --config config.yaml --platforms stm32 esp32 nrf52 --build-types debug release -j 8
+
   # 啟用 AI 分析
   %(prog)s --config config.yaml --ai --api-key YOUR_API_KEY
 
@@ -1435,6 +2314,55 @@ def create_argument_parser() -> argparse.ArgumentParser:
         help='優化級別'
     )
 
+    # 編譯選項
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        help='並行編譯數（默認為 CPU 核心數）'
+    )
+
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        help='目標文件緩存目錄（默認為 輸出目錄/.objcache，可跨構建類型共用）'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='停用目標文件緩存'
+    )
+
+    # 大小分析選項
+    parser.add_argument(
+        '--size-diff',
+        nargs=2,
+        type=Path,
+        metavar=('OLD', 'NEW'),
+        help='比較兩個 ELF 文件或大小報告 (*_size.json) 後退出，不執行構建'
+    )
+
+    # 矩陣構建選項
+    parser.add_argument(
+        '--matrix',
+        action='store_true',
+        help='矩陣構建（平台 × 構建類型，並行執行並生成匯總報告）'
+    )
+
+    parser.add_argument(
+        '--platforms',
+        nargs='+',
+        choices=['stm32', 'esp32', 'nrf52'],
+        help='矩陣構建的平台列表（隱含 --matrix）'
+    )
+
+    parser.add_argument(
+        '--build-types',
+        nargs='+',
+        choices=['debug', 'release', 'production'],
+        help='矩陣構建的構建類型列表（隱含 --matrix）'
+    )
+
     # 安全選項
     parser.add_argument(
         '--sign',
@@ -1499,6 +2427,13 @@ def main():
     logger = setup_logging(args.log_file, args.verbose)
 
     try:
+        # 只比較大小（不需要工具鏈）
+        if args.size_diff:
+            analyzer = SizeAnalyzer({}, logger)
+            old, new = (analyzer.load_report(path) for path in args.size_diff)
+            print("\n".join(SizeAnalyzer.format_diff(SizeAnalyzer.diff_reports(old, new), limit=20)))
+            sys.exit(0)
+
         # 加載配置
         config_dict = {}
         if args.config:
@@ -1519,6 +2454,30 @@ def main():
         # 創建輸出目錄
         build_config.output_dir.mkdir(parents=True, exist_ok=True)
 
+        # 矩陣構建
+        if args.matrix or args.platforms or args.build_types or config_dict.get('matrix'):
+            platforms, build_types = ConfigLoader.matrix_targets(config_dict, args, build_config)
+            configs = MatrixBuilder.expand(build_config, platforms, build_types)
+            matrix_builder = MatrixBuilder(configs, logger, build_config.jobs)
+            results = matrix_builder.build()
+            ReportGenerator(logger).generate_matrix_report(results, build_config.output_dir)
+
+            print("\n" + "=" * 70)
+            print("矩陣構建摘要")
+            print("=" * 70)
+            print(f"{'目標':<20}{'狀態':<6}{'時間(秒)':>10}{'Flash':>12}{'RAM':>10}{'警告':>6}{'錯誤':>6}")
+            for result in results:
+                print(f"{result.platform + '-' + result.build_type:<20}"
+                      f"{'成功' if result.success else '失敗':<6}"
+                      f"{result.duration_seconds:>10.2f}"
+                      f"{result.size_info.get('total', 0):>12,}"
+                      f"{result.size_info.get('ram', 0):>10,}"
+                      f"{len(result.warnings):>6}{len(result.errors):>6}")
+            print(f"報告: {build_config.output_dir / 'matrix_report.html'}")
+            print("=" * 70)
+
+            sys.exit(0 if all(result.success for result in results) else 1)
+
         # 創建構建器
         builder = FirmwareBuilder(build_config, logger)
 
@@ -1555,6 +2514,10 @@ def main():
         print(f"版本: {result.version}")
         print(f"平台: {result.platform}")
         print(f"持續時間: {result.duration_seconds:.2f} 秒")
+        if result.compile_stats:
+            stats = result.compile_stats
+            print(f"編譯: {stats.get('compiled', 0)} 個, 緩存命中: {stats.get('cached', 0)} 個, "
+                  f"已是最新: {stats.get('up_to_date', 0)} 個")
         print(f"Flash 使用: {result.size_info.get('total', 0):,} bytes")
         print(f"RAM 使用: {result.size_info.get('ram', 0):,} bytes")
         print(f"警告: {len(result.warnings)}")
@@ -0,0 +1,326 @@
+"""
+firmware-builder 測試
+
+需要編譯的測試以主機 gcc 與 binutils 代替交叉編譯工具鏈，未安裝時跳過。
+"""
+
+import json
+import logging
+import os
+import shutil
+import struct
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+import build_firmware as bf
+
+HOST_TOOLS = ('gcc', 'objcopy', 'size', 'nm', 'readelf')
+
+
+
+@pytest.fixture(autouse=True)
+def host_toolchain(monkeypatch):
+    monkeypatch.setitem(bf.TOOLCHAIN_CONFIG, bf.Platform.STM32, {
+        'compiler': 'gcc', 'objcopy': 'objcopy', 'size': 'size',
+        'nm': 'nm', 'readelf': 'readelf', 'default_flags': [],
+    })
+
+
+@pytest.fixture
+def project(tmp_path):
+    if any(shutil.which(tool) is None for tool in HOST_TOOLS):
+        pytest.skip("需要主機 gcc 與 binutils")
+    src = tmp_path / 'src'
+    (src / 'inc').mkdir(parents=True)
+    (src / 'a').mkdir()
+    (src / 'b').mkdir()
+    (src / 'inc' / 'common.h').write_text('#define K 3\n')
+    (src / 'inc' / 'other.h').write_text('#define J 4\n')
+    (src / 'a' / 'util.c').write_text('#include "common.h"\nint ua(void){return K;}\n')
+    (src / 'b' / 'util.c').write_text('#include "other.h"\nint ub(void){return J;}\n')
+    (src / 'main.c').write_text('int ua(void);int ub(void);\nint main(void){return ua()+ub();}\n')
+    return tmp_path
+
+
+def build(project, build_type=bf.BuildType.RELEASE, **kwargs):
+    config = bf.BuildConfig(
+        platform=bf.Platform.STM32, build_type=build_type, version='1.0.0',
+        project_name='fw', source_dir=project / 'src', output_dir=project / 'out',
+        formats=[bf.OutputFormat.ELF], include_paths=[str(project / 'src' / 'inc')],
+        **kwargs)
+    return bf.FirmwareBuilder(config, logging.getLogger('test')).build()
+
+
+def test_rebuild_is_up_to_date(project):
+    first = build(project)
+    assert first.success, first.errors
+    assert first.compile_stats == {'compiled': 3}
+    assert set(first.compile_times) == {'main.c', os.path.join('a', 'util.c'),
+                                        os.path.join('b', 'util.c')}
+
+    second = build(project)
+    assert second.success
+    assert second.compile_stats == {'up_to_date': 3}
+
+
+def test_header_change_recompiles_dependents_only(project):
+    build(project)
+    (project / 'src' / 'inc' / 'other.h').write_text('#define J 5\n')
+
+    result = build(project)
+
+    assert result.success
+    assert result.compile_stats == {'up_to_date': 2, 'compiled': 1}
+
+
+def test_flag_change_recompiles_everything(project):
+    build(project)
+
+    result = build(project, defines={'EXTRA': '1'})
+
+    assert result.compile_stats == {'compiled': 3}
+
+
+def test_object_cache_hit_after_clean(project):
+    build(project)
+    shutil.rmtree(project / 'out' / 'build')
+
+    result = build(project)
+
+    assert result.success
+    assert result.compile_stats == {'cached': 3}
+
+
+def test_object_cache_checks_header_contents(project):
+    build(project)
+    (project / 'src' / 'inc' / 'other.h').write_text('#define J 5\n')
+    build(project)
+    (project / 'src' / 'inc' / 'other.h').write_text('#define J 4\n')
+
+    result = build(project)
+
+    assert result.compile_stats == {'up_to_date': 2, 'cached': 1}
+
+
+def test_compile_error_reports_relative_path(project):
+    (project / 'src' / 'b' / 'util.c').write_text('int x = ;\n')
+
+    result = build(project, jobs=1)
+
+    assert not result.success
+    assert result.errors[0].startswith(f"編譯失敗: {os.path.join('b', 'util.c')}\n")
+
+
+# ============================================================================
+# 矩陣構建
+# ============================================================================
+
+@pytest.fixture
+def matrix_base(project, monkeypatch):
+    host = dict(bf.TOOLCHAIN_CONFIG[bf.Platform.STM32])
+    monkeypatch.setitem(bf.TOOLCHAIN_CONFIG, bf.Platform.NRF52, host)
+    monkeypatch.setitem(bf.TOOLCHAIN_CONFIG, bf.Platform.ESP32,
+                        {**host, 'compiler': 'no-such-cross-gcc'})
+    return bf.BuildConfig(
+        platform=bf.Platform.STM32, build_type=bf.BuildType.DEBUG, version='1.0.0',
+        project_name='fw', source_dir=project / 'src', output_dir=project / 'out',
+        formats=[bf.OutputFormat.ELF, bf.OutputFormat.BIN],
+        include_paths=[str(project / 'src' / 'inc')])
+
+
+def test_expand_matrix(matrix_base):
+    configs = bf.MatrixBuilder.expand(matrix_base, [bf.Platform.STM32, bf.Platform.NRF52],
+                                      [bf.BuildType.DEBUG, bf.BuildType.RELEASE])
+
+    assert [bf.MatrixBuilder.target_name(c) for c in configs] == [
+        'stm32-debug', 'stm32-release', 'nrf52-debug', 'nrf52-release']
+    assert {c.output_dir for c in configs} == {
+        matrix_base.output_dir / bf.MatrixBuilder.target_name(c) for c in configs}
+    assert {c.cache_dir for c in configs} == {matrix_base.output_dir / '.objcache'}
+
+
+def test_merge_formats(matrix_base):
+    hex_only = bf.BuildConfig(**{**matrix_base.__dict__, 'formats': [bf.OutputFormat.HEX]})
+    release = bf.BuildConfig(**{**matrix_base.__dict__, 'build_type': bf.BuildType.RELEASE})
+
+    merged = bf.MatrixBuilder.merge_formats([matrix_base, hex_only, release])
+
+    assert len(merged) == 2
+    assert merged[0].formats == [bf.OutputFormat.ELF, bf.OutputFormat.BIN, bf.OutputFormat.HEX]
+    assert matrix_base.formats == [bf.OutputFormat.ELF, bf.OutputFormat.BIN]
+
+
+def test_matrix_build(matrix_base):
+    configs = bf.MatrixBuilder.expand(matrix_base, [bf.Platform.STM32, bf.Platform.NRF52],
+                                      [bf.BuildType.DEBUG, bf.BuildType.RELEASE])
+    logger = logging.getLogger('test')
+
+    results = bf.MatrixBuilder(configs, logger, jobs=4).build()
+
+    assert [(r.platform, r.build_type) for r in results] == [
+        (c.platform.value, c.build_type.value) for c in configs]
+    for result in results:
+        assert result.success, result.errors
+        assert {'elf', 'bin'} <= set(result.output_files)
+        assert all(os.path.exists(path) for path in result.output_files.values())
+
+    again = bf.MatrixBuilder(configs, logger, jobs=4).build()
+    assert [r.compile_stats for r in again] == [{'up_to_date': 3}] * len(configs)
+
+
+def test_matrix_missing_toolchain_fails_only_its_targets(matrix_base):
+    configs = bf.MatrixBuilder.expand(matrix_base, [bf.Platform.ESP32, bf.Platform.STM32],
+                                      [bf.BuildType.DEBUG])
+
+    results = bf.MatrixBuilder(configs, logging.getLogger('test'), jobs=2).build()
+
+    assert [r.success for r in results] == [False, True]
+    assert results[0].errors
+
+
+# ============================================================================
+# ELF 解析與大小報告
+# ============================================================================
+
+def make_elf(path, bits, endian):
+    """寫出最小 ELF：.text 中的局部函數 helper、.bss 中的全局變量 counter"""
+    fmt = '<' if endian == 'little' else '>'
+    header, shdr, phdr, sym = (struct.Struct(fmt + layout) for layout in bf.ElfFile._LAYOUTS[bits])
+    ehsize = 16 + header.size
+
+    shstrtab = b'\0.text\0.bss\0.symtab\0.strtab\0.shstrtab\0'
+    strtab = b'\0main.c\0helper\0counter\0'
+    text = b'\x90' * 32
+
+    def name(table, text_name):
+        return table.index(text_name.encode() + b'\0')
+
+    def pack_symbol(st_name, value, size, st_type, bind, shndx):
+        info = (bind << 4) | st_type
+        if bits == 32:
+            return sym.pack(st_name, value, size, info, 0, shndx)
+        return sym.pack(st_name, info, 0, shndx, value, size)
+
+    symtab = b''.join([
+        pack_symbol(0, 0, 0, 0, 0, 0),
+        pack_symbol(name(strtab, 'main.c'), 0, 0, bf.STT_FILE, bf.STB_LOCAL, 0xfff1),
+        pack_symbol(name(strtab, 'helper'), 0x1000, 16, bf.STT_FUNC, bf.STB_LOCAL, 1),
+        pack_symbol(name(strtab, 'counter'), 0x2000, 64, bf.STT_OBJECT, bf.STB_GLOBAL, 2),
+    ])
+
+    text_off = ehsize + phdr.size
+    symtab_off = text_off + len(text)
+    strtab_off = symtab_off + len(symtab)
+    shstrtab_off = strtab_off + len(strtab)
+    shoff = shstrtab_off + len(shstrtab)
+
+    sections = [
+        (0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+        (name(shstrtab, '.text'), 1, bf.SHF_ALLOC | bf.SHF_EXECINSTR, 0x1000, text_off, len(text), 0, 0, 4, 0),
+        (name(shstrtab, '.bss'), bf.SHT_NOBITS, bf.SHF_ALLOC | bf.SHF_WRITE, 0x2000, strtab_off, 64, 0, 0, 4, 0),
+        (name(shstrtab, '.symtab'), bf.SHT_SYMTAB, 0, 0, symtab_off, len(symtab), 4, 3, 4, sym.size),
+        (name(shstrtab, '.strtab'), 3, 0, 0, strtab_off, len(strtab), 0, 0, 1, 0),
+        (name(shstrtab, '.shstrtab'), 3, 0, 0, shstrtab_off, len(shstrtab), 0, 0, 1, 0),
+    ]
+    if bits == 32:
+        segment = phdr.pack(bf.PT_LOAD, text_off, 0x1000, 0x1000, len(text), len(text), 5, 4)
+    else:
+        segment = phdr.pack(bf.PT_LOAD, 5, text_off, 0x1000, 0x1000, len(text), len(text), 4)
+
+    ident = b'\x7fELF' + bytes([1 if bits == 32 else 2, 1 if endian == 'little' else 2, 1]) + bytes(9)
+    data = (ident + header.pack(2, 40, 1, 0x1000, ehsize, shoff, 0, ehsize, phdr.size, 1,
+                                shdr.size, len(sections), 5)
+            + segment + text + symtab + strtab + shstrtab
+            + b''.join(shdr.pack(*section) for section in sections))
+    path.write_bytes(data)
+    return path
+
+
+@pytest.mark.parametrize('bits', [32, 64])
+@pytest.mark.parametrize('endian', ['little', 'big'])
+def test_elf_file_parses_synthetic_elf(tmp_path, bits, endian):
+    path = make_elf(tmp_path / 'fw.elf', bits, endian)
+
+    with bf.ElfFile(path) as elf:
+        assert elf.bits == bits
+        assert elf.entry == 0x1000
+        assert [s.name for s in elf.sections] == ['', '.text', '.bss', '.symtab', '.strtab', '.shstrtab']
+        assert [s.category for s in elf.sections[1:3]] == ['text', 'bss']
+        assert [(seg.type, seg.vaddr, seg.filesz) for seg in elf.segments] == [(bf.PT_LOAD, 0x1000, 32)]
+
+        symbols = elf.symbols()
+        assert [(s.name, s.value, s.size, s.type, s.bind) for s in symbols[1:]] == [
+            ('main.c', 0, 0, bf.STT_FILE, bf.STB_LOCAL),
+            ('helper', 0x1000, 16, bf.STT_FUNC, bf.STB_LOCAL),
+            ('counter', 0x2000, 64, bf.STT_OBJECT, bf.STB_GLOBAL),
+        ]
+        assert elf.section_of(symbols[2]).name == '.text'
+        assert elf.section_of(symbols[1]) is None
+
+    report = bf.SizeAnalyzer({}, logging.getLogger('test')).size_report(path)
+    assert report['symbols'] == {'counter': 64, 'helper (main.c)': 16}
+    assert report['size_info']['text'] == 32
+    assert report['size_info']['bss'] == 64
+
+
+@pytest.mark.parametrize('content', [b'', b'not an elf file', b'\x7fELF\x01\x01\x01' + bytes(20)])
+def test_elf_file_rejects_invalid_files(tmp_path, content):
+    path = tmp_path / 'bad.elf'
+    path.write_bytes(content)
+
+    with pytest.raises(ValueError):
+        bf.ElfFile(path)
+
+
+def test_elf_file_rejects_truncated_section_table(tmp_path):
+    path = make_elf(tmp_path / 'fw.elf', 32, 'little')
+    path.write_bytes(path.read_bytes()[:-8])
+
+    with pytest.raises(ValueError):
+        bf.ElfFile(path)
+
+
+def _size_a(path):
+    output = subprocess.run(['size', '-A', str(path)], capture_output=True, text=True).stdout
+    sizes = {}
+    for line in output.splitlines()[2:]:
+        fields = line.split()
+        if len(fields) >= 3 and fields[0] != 'Total':
+            sizes[fields[0]] = int(fields[1])
+    return sizes
+
+
+def test_size_report_attributes_same_named_statics(project):
+    src = project / 'src'
+    (src / 'a' / 'util.c').write_text(
+        'static int table[100] = {1};\nstatic int helper(int i){return table[i]++;}\n'
+        'int ua(void){return helper(1);}\n')
+    (src / 'b' / 'util.c').write_text(
+        'static int table[10] = {1};\nstatic int helper(int i){return table[i]++;}\n'
+        'int ub(void){return helper(2);}\n')
+    first = build(project, build_type=bf.BuildType.DEBUG)
+    assert first.success, first.errors
+
+    elf_path = first.output_files['elf']
+    with bf.ElfFile(elf_path) as elf:
+        sections = {s.name: s.size for s in elf.sections if s.name}
+    assert all(sections.get(name) == size for name, size in _size_a(elf_path).items())
+
+    with open(first.output_files['size'], encoding='utf-8') as f:
+        report = json.load(f)
+    a_obj, b_obj = (os.path.join(d, 'util.c.o').replace(os.sep, '/') for d in ('a', 'b'))
+    assert report['symbols'][f'table ({a_obj})'] == 400
+    assert report['symbols'][f'table ({b_obj})'] == 40
+    assert report['objects'][a_obj] > report['objects'][b_obj]
+
+    (src / 'b' / 'util.c').write_text(
+        'static int table[50] = {1};\nstatic int helper(int i){return table[i]++;}\n'
+        'int ub(void){return helper(2);}\n')
+    second = build(project, build_type=bf.BuildType.DEBUG)
+
+    assert second.size_diff['symbols'][f'table ({b_obj})'] == {'old': 40, 'new': 200, 'delta': 160}
+    assert second.size_diff['objects'][b_obj]['delta'] >= 160
@@ -7,14 +7,23 @@ Creates differential update packages using various algorithms (bsdiff, xdelta3)
 import os
 import sys
 import argparse
+import bz2
+import gzip
 import hashlib
 import subprocess
 import tempfile
 import json
 from pathlib import Path
-from typing import Optional, Dict, Tuple
+from typing import BinaryIO, Optional, Dict, Iterator, Tuple
 import logging
 
+# NumPy speeds up the rolling hash scan; the pure-Python path produces identical patches
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,19 +36,33 @@ class DeltaGenerator:
     """Generate delta/differential update patches"""
 
     SUPPORTED_ALGORITHMS = ['bsdiff', 'xdelta3', 'custom']
+    SUPPORTED_COMPRESSION = ['bz2', 'gz', 'none']
+
+    # Custom patch format 2: instruction stream opcodes
+    OP_COPY = b'C'
+    OP_INSERT = b'I'
+    OP_END = b'E'
+
+    SCAN_CHUNK = 1 << 20   # target positions hashed per NumPy batch
+    IO_CHUNK = 1 << 16     # bounded buffer size when applying patches
 
-    def __init__(self, algorithm: str = 'bsdiff'):
+    def __init__(self, algorithm: str = 'bsdiff', block_size: int = 64):
         """
         Initialize delta generator
 
         Args:
             algorithm: Diff algorithm to use (bsdiff, xdelta3, custom)
+            block_size: Source block size for the custom rolling-hash matcher
         """
         if algorithm not in self.SUPPORTED_ALGORITHMS:
             raise ValueError(f"Unsupported algorithm: {algorithm}")
+        if block_size < 8:
+            raise ValueError(f"Block size too small: {block_size}")
 
         self.algorithm = algorithm
+        self.block_size = block_size
         self.stats = {}
+        self.delta_stats = {}
 
     def generate_delta(
         self,
@@ -66,6 +89,9 @@ class DeltaGenerator:
         if not os.path.exists(target_file):
             raise FileNotFoundError(f"Target file not found: {target_file}")
 
+        if compression not in self.SUPPORTED_COMPRESSION:
+            raise ValueError(f"Unsupported compression: {compression}")
+
         logger.info(f"Generating delta patch using {self.algorithm}")
         logger.info(f"Source: {source_file}")
         logger.info(f"Target: {target_file}")
@@ -84,7 +110,7 @@ class DeltaGenerator:
         elif self.algorithm == 'xdelta3':
             patch_size = self._generate_xdelta3(source_file, target_file, output_patch)
         else:
-            patch_size = self._generate_custom(source_file, target_file, output_patch)
+            patch_size = self._generate_custom(source_file, target_file, output_patch, compression)
 
         # Calculate patch checksum
         patch_checksum = self._calculate_checksum(output_patch)
@@ -111,6 +137,8 @@ class DeltaGenerator:
             'compression_ratio': round((1 - patch_size / target_size) * 100, 2) if target_size > 0 else 0,
             'size_reduction': target_size - patch_size
         }
+        if self.delta_stats:
+            stats['delta'] = self.delta_stats
 
         logger.info(f"Patch generated successfully: {output_patch}")
         logger.info(f"Patch size: {patch_size} bytes ({stats['compression_ratio']}% smaller than target)")
@@ -162,47 +190,234 @@ class DeltaGenerator:
             logger.warning("xdelta3 not found, falling back to bsdiff")
             return self._generate_bsdiff(source, target, patch)
 
-    def _generate_custom(self, source: str, target: str, patch: str) -> int:
+    def _generate_custom(self, source: str, target: str, patch: str, compression: str = 'bz2') -> int:
         """
         Custom delta generation implementation
-        Simple block-based differential algorithm
+        rsync-style rolling-hash matcher producing a copy/insert instruction stream
+
+        Source blocks are indexed by a weak rolling checksum and a strong hash; every
+        target offset is scanned, so inserted or deleted bytes only cost the bytes
+        themselves instead of invalidating all following blocks. Matches are extended
+        byte-wise in both directions, so copies are not limited to block boundaries.
         """
-        BLOCK_SIZE = 4096
-
-        with open(source, 'rb') as sf, open(target, 'rb') as tf, open(patch, 'wb') as pf:
-            # Write header
-            header = {
-                'algorithm': 'custom',
-                'block_size': BLOCK_SIZE,
-                'source_size': os.path.getsize(source),
-                'target_size': os.path.getsize(target)
-            }
+        with open(source, 'rb') as sf:
+            source_data = sf.read()
+        with open(target, 'rb') as tf:
+            target_data = tf.read()
+
+        header = {
+            'algorithm': 'custom',
+            'format': 2,
+            'block_size': self.block_size,
+            'compression': compression,
+            'source_size': len(source_data),
+            'target_size': len(target_data),
+            'source_checksum': hashlib.sha256(source_data).hexdigest(),
+            'target_checksum': hashlib.sha256(target_data).hexdigest()
+        }
+        stats = {'copies': 0, 'copied_bytes': 0, 'inserts': 0, 'literal_bytes': 0}
+
+        with open(patch, 'wb') as pf:
             header_bytes = json.dumps(header).encode('utf-8')
             pf.write(len(header_bytes).to_bytes(4, 'little'))
             pf.write(header_bytes)
 
-            # Read files in blocks and write differences
-            block_num = 0
-            while True:
-                source_block = sf.read(BLOCK_SIZE)
-                target_block = tf.read(BLOCK_SIZE)
-
-                if not target_block:
-                    break
-
-                if source_block != target_block:
-                    # Write block number and new data
-                    pf.write(block_num.to_bytes(4, 'little'))
-                    pf.write(len(target_block).to_bytes(4, 'little'))
-                    pf.write(target_block)
-
-                block_num += 1
-
-            # Write end marker
-            pf.write(b'\xFF\xFF\xFF\xFF')
+            body = self._open_body(pf, compression, 'wb')
+            try:
+                copy_end = 0
+                for op, offset, length in self._diff(source_data, target_data, self.block_size):
+                    if op == self.OP_COPY:
+                        body.write(op + self._encode_varint(self._zigzag(offset - copy_end))
+                                   + self._encode_varint(length))
+                        copy_end = offset + length
+                        stats['copies'] += 1
+                        stats['copied_bytes'] += length
+                    else:
+                        body.write(op + self._encode_varint(length))
+                        body.write(target_data[offset:offset + length])
+                        stats['inserts'] += 1
+                        stats['literal_bytes'] += length
+                body.write(self.OP_END)
+            finally:
+                if body is not pf:
+                    body.close()
+
+        self.delta_stats = stats
+        logger.info(f"Delta: {stats['copies']} copies ({stats['copied_bytes']} bytes), "
+                    f"{stats['inserts']} inserts ({stats['literal_bytes']} literal bytes)")
 
         return os.path.getsize(patch)
 
+    def _diff(self, source: bytes, target: bytes, block: int) -> Iterator[Tuple[bytes, int, int]]:
+        """
+        Yield (OP_COPY, source_offset, length) and (OP_INSERT, target_offset, length)
+        instructions that rebuild target from source, in target order
+        """
+        index = self._index_source(source, block)
+        pos = literal_start = 0
+
+        if index:
+            for k, weak in self._weak_candidates(target, block, index.keys()):
+                if k < pos:
+                    continue
+                window = target[k:k + block]
+                offset = index[weak].get(self._strong_hash(window))
+                if offset is None or source[offset:offset + block] != window:
+                    continue
+
+                back = self._backward_match(source, offset, target, k, min(offset, k - literal_start))
+                forward = block + self._forward_match(source, offset + block, target, k + block)
+
+                if k - back > literal_start:
+                    yield self.OP_INSERT, literal_start, k - back - literal_start
+                yield self.OP_COPY, offset - back, back + forward
+                pos = literal_start = k + forward
+
+        if literal_start < len(target):
+            yield self.OP_INSERT, literal_start, len(target) - literal_start
+
+    @classmethod
+    def _index_source(cls, source: bytes, block: int) -> Dict[int, Dict[bytes, int]]:
+        """Map weak checksum -> strong hash -> offset for every aligned source block"""
+        count = len(source) // block
+        if NUMPY_AVAILABLE:
+            blocks = np.frombuffer(source, dtype=np.uint8, count=count * block).reshape(count, block)
+            a = blocks.sum(axis=1, dtype=np.uint64)
+            b = blocks.astype(np.uint64) @ np.arange(block, 0, -1, dtype=np.uint64)
+            weaks = ((a & 0xFFFF) | ((b & 0xFFFF) << 16)).tolist()
+        else:
+            weaks = [cls._weak_checksum(source[i * block:(i + 1) * block]) for i in range(count)]
+
+        index: Dict[int, Dict[bytes, int]] = {}
+        for i, weak in enumerate(weaks):
+            offset = i * block
+            # Identical blocks (e.g. erased 0xFF padding) keep the first offset
+            index.setdefault(weak, {}).setdefault(cls._strong_hash(source[offset:offset + block]), offset)
+        return index
+
+    @staticmethod
+    def _weak_checksum(data: bytes) -> int:
+        """rsync weak checksum: a = sum(x), b = sum((n - i) * x), each mod 2^16"""
+        n = len(data)
+        a = sum(data)
+        b = sum((n - i) * x for i, x in enumerate(data))
+        return (a & 0xFFFF) | ((b & 0xFFFF) << 16)
+
+    @staticmethod
+    def _strong_hash(data: bytes) -> bytes:
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    @classmethod
+    def _weak_candidates(cls, data: bytes, block: int, weaks) -> Iterator[Tuple[int, int]]:
+        """Yield (offset, weak checksum) for every window of data whose checksum is in weaks"""
+        positions = len(data) - block + 1
+        if positions <= 0:
+            return
+
+        if NUMPY_AVAILABLE:
+            keys = np.unique(np.fromiter(weaks, dtype=np.uint64))
+            buffer = np.frombuffer(data, dtype=np.uint8)
+            for start in range(0, positions, cls.SCAN_CHUNK):
+                m = min(cls.SCAN_CHUNK, positions - start)
+                segment = buffer[start:start + m + block - 1].astype(np.uint64)
+                local = np.arange(len(segment), dtype=np.uint64)
+                # Window sums from prefix sums; uint64 wrap-around is harmless mod 2^16
+                s1 = np.zeros(len(segment) + 1, dtype=np.uint64)
+                np.cumsum(segment, out=s1[1:])
+                s2 = np.zeros(len(segment) + 1, dtype=np.uint64)
+                np.cumsum(segment * local, out=s2[1:])
+                a = s1[block:block + m] - s1[:m]
+                b = (local[:m] + np.uint64(block)) * a - (s2[block:block + m] - s2[:m])
+                weak = (a & 0xFFFF) | ((b & 0xFFFF) << 16)
+                hits = np.flatnonzero(np.isin(weak, keys))
+                for k, value in zip(hits.tolist(), weak[hits].tolist()):
+                    yield start + k, value
+            return
+
+        weaks = set(weaks)
+        a = sum(data[:block])
+        b = sum((block - i) * x for i, x in enumerate(data[:block]))
+        for k in range(positions):
+            weak = (a & 0xFFFF) | ((b & 0xFFFF) << 16)
+            if weak in weaks:
+                yield k, weak
+            if k + block < len(data):
+                old, new = data[k], data[k + block]
+                a += new - old
+                b += a - block * old
+
+    @staticmethod
+    def _forward_match(a: bytes, ai: int, b: bytes, bi: int) -> int:
+        """Length of the common prefix of a[ai:] and b[bi:] (galloping slice compares)"""
+        limit = min(len(a) - ai, len(b) - bi)
+        length, step = 0, 64
+        while length < limit:
+            step = min(step, limit - length)
+            if a[ai + length:ai + length + step] == b[bi + length:bi + length + step]:
+                length += step
+                step *= 2
+            elif step == 1:
+                break
+            else:
+                step //= 2
+        return length
+
+    @staticmethod
+    def _backward_match(a: bytes, ai: int, b: bytes, bi: int, limit: int) -> int:
+        """Length of the common suffix of a[:ai] and b[:bi], at most limit bytes"""
+        length, step = 0, 64
+        while length < limit:
+            step = min(step, limit - length)
+            if a[ai - length - step:ai - length] == b[bi - length - step:bi - length]:
+                length += step
+                step *= 2
+            elif step == 1:
+                break
+            else:
+                step //= 2
+        return length
+
+    @staticmethod
+    def _zigzag(value: int) -> int:
+        return value * 2 if value >= 0 else -value * 2 - 1
+
+    @staticmethod
+    def _unzigzag(value: int) -> int:
+        return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+    @staticmethod
+    def _encode_varint(value: int) -> bytes:
+        out = bytearray()
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+        return bytes(out)
+
+    @staticmethod
+    def _read_varint(stream: BinaryIO) -> int:
+        value = shift = 0
+        while True:
+            byte = stream.read(1)
+            if not byte:
+                raise ValueError("Truncated patch")
+            value |= (byte[0] & 0x7F) << shift
+            if byte[0] < 0x80:
+                return value
+            shift += 7
+
+    @staticmethod
+    def _open_body(fileobj: BinaryIO, compression: str, mode: str) -> BinaryIO:
+        """Wrap the patch file (positioned after the header) in a streaming (de)compressor"""
+        if compression == 'bz2':
+            return bz2.BZ2File(fileobj, mode)
+        if compression == 'gz':
+            # No file name or timestamp in the gzip header, so identical inputs give identical patches
+            return gzip.GzipFile(filename='', fileobj=fileobj, mode=mode, mtime=0)
+        if compression == 'none':
+            return fileobj
+        raise ValueError(f"Unsupported compression: {compression}")
+
     def apply_delta(
         self,
         source_file: str,
@@ -277,39 +492,17 @@ class DeltaGenerator:
             return False
 
     def _apply_custom(self, source: str, patch: str, output: str) -> bool:
-        """Apply custom delta patch"""
+        """Apply custom delta patch, streaming source, patch and output with bounded memory"""
         try:
-            BLOCK_SIZE = 4096
-
             with open(source, 'rb') as sf, open(patch, 'rb') as pf, open(output, 'wb') as of:
                 # Read header
                 header_len = int.from_bytes(pf.read(4), 'little')
                 header = json.loads(pf.read(header_len).decode('utf-8'))
 
-                BLOCK_SIZE = header['block_size']
-
-                # Read source file into memory (for small files)
-                source_data = sf.read()
-
-                # Create output buffer
-                output_data = bytearray(source_data)
-
-                # Apply patches
-                while True:
-                    block_num_bytes = pf.read(4)
-                    if not block_num_bytes or block_num_bytes == b'\xFF\xFF\xFF\xFF':
-                        break
-
-                    block_num = int.from_bytes(block_num_bytes, 'little')
-                    block_len = int.from_bytes(pf.read(4), 'little')
-                    block_data = pf.read(block_len)
-
-                    # Update block
-                    offset = block_num * BLOCK_SIZE
-                    output_data[offset:offset + block_len] = block_data
-
-                # Write output
-                of.write(output_data[:header['target_size']])
+                if header.get('format', 1) == 1:
+                    self._apply_blocks(sf, pf, of, header)
+                else:
+                    self._apply_instructions(sf, pf, of, header)
 
             return True
 
@@ -317,6 +510,82 @@ class DeltaGenerator:
             logger.error(f"Failed to apply custom patch: {e}")
             return False
 
+    def _apply_instructions(self, sf: BinaryIO, pf: BinaryIO, of: BinaryIO, header: Dict):
+        """Apply a format 2 (copy/insert instruction stream) patch"""
+        if os.fstat(sf.fileno()).st_size != header['source_size'] or \
+                self._stream_checksum(sf) != header['source_checksum']:
+            raise ValueError("Source file does not match the patch")
+
+        digest = hashlib.sha256()
+        body = self._open_body(pf, header['compression'], 'rb')
+        try:
+            copy_end = 0
+            while True:
+                op = body.read(1)
+                if op == self.OP_COPY:
+                    offset = copy_end + self._unzigzag(self._read_varint(body))
+                    length = self._read_varint(body)
+                    sf.seek(offset)
+                    self._stream_copy(sf, of, length, digest)
+                    copy_end = offset + length
+                elif op == self.OP_INSERT:
+                    self._stream_copy(body, of, self._read_varint(body), digest)
+                elif op == self.OP_END:
+                    break
+                else:
+                    raise ValueError(f"Corrupt patch: unexpected opcode {op!r}")
+        finally:
+            if body is not pf:
+                body.close()
+
+        if of.tell() != header['target_size'] or digest.hexdigest() != header['target_checksum']:
+            raise ValueError("Patched output does not match the target checksum")
+
+    def _apply_blocks(self, sf: BinaryIO, pf: BinaryIO, of: BinaryIO, header: Dict):
+        """Apply a format 1 (aligned block replacement) patch"""
+        block_size = header['block_size']
+        target_size = header['target_size']
+        written = 0
+
+        while written < target_size:
+            block_num_bytes = pf.read(4)
+            if not block_num_bytes or block_num_bytes == b'\xFF\xFF\xFF\xFF':
+                break
+
+            block_num = int.from_bytes(block_num_bytes, 'little')
+            block_len = int.from_bytes(pf.read(4), 'little')
+
+            # Unchanged source bytes before the replaced block
+            offset = block_num * block_size
+            sf.seek(written)
+            self._stream_copy(sf, of, offset - written, None, strict=False)
+            self._stream_copy(pf, of, block_len, None)
+            written = of.tell()
+
+        sf.seek(written)
+        self._stream_copy(sf, of, target_size - written, None, strict=False)
+
+    def _stream_copy(self, src: BinaryIO, dst: BinaryIO, length: int, digest, strict: bool = True):
+        """Copy length bytes in bounded chunks, updating digest if given"""
+        while length > 0:
+            chunk = src.read(min(length, self.IO_CHUNK))
+            if not chunk:
+                if strict:
+                    raise ValueError("Truncated patch or source")
+                return
+            dst.write(chunk)
+            if digest is not None:
+                digest.update(chunk)
+            length -= len(chunk)
+
+    def _stream_checksum(self, stream: BinaryIO) -> str:
+        """SHA-256 of a stream from its start, leaving the position at the end"""
+        stream.seek(0)
+        hash_obj = hashlib.sha256()
+        while chunk := stream.read(self.IO_CHUNK):
+            hash_obj.update(chunk)
+        return hash_obj.hexdigest()
+
     def _calculate_checksum(self, file_path: str, algorithm: str = 'sha256') -> str:
         """Calculate file checksum"""
         hash_obj = hashlib.new(algorithm)
@@ -351,6 +620,9 @@ Examples:
   # Apply delta patch
   %(prog)s apply -s old_firmware.bin -p patch.delta -o new_firmware.bin
 
+  # Pure-Python rolling-hash delta (no external tools), 32-byte blocks
+  %(prog)s generate -s old.bin -t new.bin -o patch.delta -a custom --block-size 32
+
   # Generate and save statistics
   %(prog)s generate -s old.bin -t new.bin -o patch.delta --stats stats.json
         """
@@ -374,6 +646,8 @@ Examples:
                            choices=['bz2', 'gz', 'none'],
                            default='bz2',
                            help='Compression algorithm (default: bz2)')
+    gen_parser.add_argument('--block-size', type=int, default=64,
+                           help='Block size for the custom algorithm (default: 64)')
     gen_parser.add_argument('--stats', help='Save statistics to JSON file')
 
     # Apply command
@@ -399,7 +673,7 @@ Examples:
 
     try:
         if args.command == 'generate':
-            generator = DeltaGenerator(algorithm=args.algorithm)
+            generator = DeltaGenerator(algorithm=args.algorithm, block_size=args.block_size)
             stats = generator.generate_delta(
                 args.source,
                 args.target,
@@ -414,6 +688,10 @@ Examples:
             print(f"Patch: {stats['patch']['file']} ({stats['patch']['size']} bytes)")
             print(f"Compression ratio: {stats['compression_ratio']}%")
             print(f"Size reduction: {stats['size_reduction']} bytes")
+            if 'delta' in stats:
+                delta = stats['delta']
+                print(f"Instructions: {delta['copies']} copies ({delta['copied_bytes']} bytes), "
+                      f"{delta['inserts']} inserts ({delta['literal_bytes']} bytes)")
 
             if args.stats:
                 generator.save_stats(args.stats)
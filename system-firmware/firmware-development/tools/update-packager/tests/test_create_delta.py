@@ -0,0 +1,164 @@
+"""
+Round-trip tests for the custom delta format
+"""
+
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+import create_delta
+
+
+def firmware(rng, size):
+    """Code-like data: repeated instruction patterns with varying operands, then 0xFF padding"""
+    out = bytearray()
+    while len(out) < size * 0.85:
+        out += rng.choice([b'\x00\xbf', b'\x70\x47', b'\x10\xb5', b'\x08\x46']) + rng.randbytes(2)
+    out += b'\xff' * (size - len(out))
+    return bytes(out[:size])
+
+
+def mutate(rng, data, kind):
+    d = bytearray(data)
+    if kind == 'insert':
+        d[1000:1000] = b'\x42'
+        d[len(d) // 2:len(d) // 2] = rng.randbytes(3000)
+    elif kind == 'delete':
+        del d[500:501]
+        del d[len(d) // 2:len(d) // 2 + 700]
+    elif kind == 'patch':
+        for _ in range(20):
+            i = rng.randrange(len(d) - 100)
+            d[i:i + rng.randrange(1, 60)] = rng.randbytes(rng.randrange(1, 60))
+    elif kind == 'truncate':
+        d = d[:len(d) // 3]
+    elif kind == 'random':
+        d = bytearray(rng.randbytes(len(d)))
+    return bytes(d)
+
+
+def write_legacy_patch(source, target, patch, block_size=4096):
+    """Format 1 writer: aligned blocks that differ from the source are stored whole"""
+    with open(source, 'rb') as sf, open(target, 'rb') as tf, open(patch, 'wb') as pf:
+        header = json.dumps({'algorithm': 'custom', 'block_size': block_size,
+                             'source_size': os.path.getsize(source),
+                             'target_size': os.path.getsize(target)}).encode()
+        pf.write(len(header).to_bytes(4, 'little'))
+        pf.write(header)
+        block = 0
+        while True:
+            s, t = sf.read(block_size), tf.read(block_size)
+            if not t:
+                break
+            if s != t:
+                pf.write(block.to_bytes(4, 'little'))
+                pf.write(len(t).to_bytes(4, 'little'))
+                pf.write(t)
+            block += 1
+        pf.write(b'\xff' * 4)
+
+
+@pytest.fixture
+def files(tmp_path):
+    def write(source, target):
+        (tmp_path / 'source.bin').write_bytes(source)
+        (tmp_path / 'target.bin').write_bytes(target)
+        return str(tmp_path / 'source.bin'), str(tmp_path / 'target.bin')
+    return write
+
+
+def round_trip(tmp_path, source, target, compression='bz2', block_size=64):
+    generator = create_delta.DeltaGenerator('custom', block_size=block_size)
+    patch, output = str(tmp_path / 'update.delta'), str(tmp_path / 'output.bin')
+    stats = generator.generate_delta(source, target, patch, compression)
+    assert generator.apply_delta(source, patch, output)
+    with open(output, 'rb') as f, open(target, 'rb') as t:
+        assert f.read() == t.read()
+    return stats
+
+
+@pytest.mark.parametrize('kind', ['insert', 'delete', 'patch', 'truncate', 'random'])
+@pytest.mark.parametrize('compression', ['bz2', 'gz', 'none'])
+def test_round_trip(tmp_path, files, kind, compression):
+    rng = random.Random(kind)
+    data = firmware(rng, 64 * 1024)
+    source, target = files(data, mutate(rng, data, kind))
+
+    stats = round_trip(tmp_path, source, target, compression)
+
+    if kind in ('insert', 'delete'):
+        # Shifted data is still matched, so only the changed bytes are stored
+        assert stats['delta']['literal_bytes'] <= 3001
+        assert stats['delta']['copied_bytes'] >= len(data) - 4000
+
+
+@pytest.mark.parametrize('source, target', [
+    (b'', b''),
+    (b'', b'new firmware'),
+    (b'old firmware', b''),
+    (b'short', b'shorter'),
+    (b'abc' * 5, b'abc' * 6),
+    (bytes(range(256)) * 4, bytes(range(256)) * 4),
+])
+def test_empty_and_short_files(tmp_path, files, source, target):
+    round_trip(tmp_path, *files(source, target), block_size=8)
+
+
+def test_pure_python_scan_matches_numpy(tmp_path, files, monkeypatch):
+    pytest.importorskip('numpy')
+    rng = random.Random(3)
+    data = firmware(rng, 32 * 1024)
+    source, target = files(data, mutate(rng, data, 'patch'))
+    generator = create_delta.DeltaGenerator('custom')
+
+    generator.generate_delta(source, target, str(tmp_path / 'numpy.delta'))
+    monkeypatch.setattr(create_delta, 'NUMPY_AVAILABLE', False)
+    generator.generate_delta(source, target, str(tmp_path / 'python.delta'))
+
+    assert (tmp_path / 'numpy.delta').read_bytes() == (tmp_path / 'python.delta').read_bytes()
+
+
+@pytest.mark.parametrize('compression', ['bz2', 'gz', 'none'])
+def test_patches_are_deterministic(tmp_path, files, compression):
+    rng = random.Random(5)
+    data = firmware(rng, 16 * 1024)
+    source, target = files(data, mutate(rng, data, 'patch'))
+    generator = create_delta.DeltaGenerator('custom')
+
+    generator.generate_delta(source, target, str(tmp_path / 'a.delta'), compression)
+    os.utime(source, (0, 0))
+    generator.generate_delta(source, target, str(tmp_path / 'b.delta'), compression)
+
+    assert (tmp_path / 'a.delta').read_bytes() == (tmp_path / 'b.delta').read_bytes()
+
+
+@pytest.mark.parametrize('kind', ['patch', 'truncate', 'insert'])
+def test_apply_legacy_format_1(tmp_path, files, kind):
+    rng = random.Random(kind)
+    data = firmware(rng, 20 * 1024 + 123)
+    new = mutate(rng, data, kind)
+    source, target = files(data, new)
+    patch, output = str(tmp_path / 'legacy.delta'), str(tmp_path / 'output.bin')
+    write_legacy_patch(source, target, patch)
+
+    assert create_delta.DeltaGenerator('custom').apply_delta(source, patch, output)
+    with open(output, 'rb') as f:
+        assert f.read() == new
+
+
+def test_rejects_wrong_source(tmp_path, files):
+    rng = random.Random(9)
+    data = firmware(rng, 8 * 1024)
+    source, target = files(data, mutate(rng, data, 'patch'))
+    generator = create_delta.DeltaGenerator('custom')
+    patch = str(tmp_path / 'update.delta')
+    generator.generate_delta(source, target, patch)
+
+    (tmp_path / 'other.bin').write_bytes(mutate(rng, data, 'patch'))
+
+    assert not generator.apply_delta(str(tmp_path / 'other.bin'), patch, str(tmp_path / 'output.bin'))